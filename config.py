@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from .constants import DATA_DIR, DB_FILE_NAME
 
@@ -5,5 +6,19 @@ BASE_DIR = Path(__file__).resolve().parent
 DATA_PATH = BASE_DIR / DATA_DIR
 DB_PATH = DATA_PATH / DB_FILE_NAME
 
+# SQLite tuning profiles (database.tuning); env APP_DB_PROFILE / APP_DB_READER_PROFILE override
+DB_PROFILE = "interactive"
+DB_READER_PROFILE = "reporting"
+
+# Main window builds nav modules on first selection; with pre-warm on, the rest
+# are built one per idle tick after the window is shown (env APP_PREWARM_MODULES=0 disables)
+PREWARM_MODULES = os.getenv("APP_PREWARM_MODULES", "1") != "0"
+PREWARM_DELAY_MS = 1500
+PREWARM_STEP_MS = 150
+
+# Reporting tabs are built and loaded on first activation; revisiting a tab within
+# this many seconds shows the last result instead of re-querying (0 = always refresh)
+REPORT_TAB_STALE_S = float(os.getenv("APP_REPORT_STALE_S", "60"))
+
 # ensure data dir exists early
 DATA_PATH.mkdir(parents=True, exist_ok=True)
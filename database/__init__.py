@@ -5,55 +5,39 @@ from pathlib import Path
 import sqlite3
 
 from ..config import DB_PATH
-from ..constants import TABLE_SCHEMA_VERSION, SCHEMA_VERSION
-from . import schema as schema_module
-from .seeders.default_data import seed as seed_default_data
-
-
-def _ensure_version_table(conn: sqlite3.Connection) -> None:
-    conn.execute(f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_SCHEMA_VERSION}(
-            id INTEGER PRIMARY KEY CHECK (id=1),
-            version TEXT NOT NULL
-        );
-    """)
-    row = conn.execute(
-        f"SELECT version FROM {TABLE_SCHEMA_VERSION} WHERE id=1;"
-    ).fetchone()
-    if row is None:
-        conn.execute(
-            f"INSERT INTO {TABLE_SCHEMA_VERSION}(id, version) VALUES (1, ?);",
-            (SCHEMA_VERSION,),
-        )
+from ..utils import startup_profile
+from .tuning import active_profile_name, apply_profile
+from .upgrade import ensure_current
+
+
+class AppConnection(sqlite3.Connection):
+    """sqlite3.Connection that supports weak references (database.refdata)."""
 
 
 def get_connection() -> sqlite3.Connection:
     """
     Returns a sqlite3.Connection with:
-      - WAL mode
-      - foreign_keys ON
+      - the active tuning profile applied (WAL, foreign_keys ON, cache, ...;
+        see database.tuning)
       - row_factory = sqlite3.Row (so rows behave like dicts and tuples)
-    Ensures schema & seed data are applied idempotently.
+    Schema & seed data are applied only when the stored fingerprint / seed
+    version differ from the running code (see database.upgrade).
     """
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-    # Always apply the schema (idempotent: uses CREATE IF NOT EXISTS / DROP TRIGGER IF EXISTS)
-    schema_module.init_schema(DB_PATH)
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    conn.execute("PRAGMA journal_mode = WAL;")
-
-    _ensure_version_table(conn)
+    with startup_profile.phase("db.connect"):
+        conn = sqlite3.connect(DB_PATH, factory=AppConnection)
+        conn.row_factory = sqlite3.Row
+        apply_profile(conn, active_profile_name())
 
-    # Seeders should be safe to run repeatedly (idempotent).
-    seed_default_data(conn)
+    with startup_profile.phase("db.ensure_current"):
+        ensure_current(conn)
 
     conn.commit()
     return conn
 
 
 __all__ = [
+    "AppConnection",
     "get_connection",
 ]
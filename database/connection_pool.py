@@ -0,0 +1,352 @@
+# database/connection_pool.py
+"""
+Pooled, pre-configured connections for path-based repositories and services.
+
+`SalePaymentsRepo`, `CustomerAdvancesRepo`, `CustomerHistoryService`, ... are
+constructed with a database path and used to open a fresh sqlite3 connection
+(and re-issue PRAGMAs) on every call. A `ConnectionProvider` keeps one open
+connection per (database file, thread) instead, so:
+
+- PRAGMAs are applied once per connection and are identical everywhere
+  (the configured tuning profile, see database.tuning);
+- the page cache survives between calls (repeat lookups hit memory);
+- nested repos on the same thread share one connection, so a payment that
+  spills over into a customer credit runs in a single transaction (nested
+  `with con:` blocks become SAVEPOINTs, see PooledConnection).
+
+Thread affinity: a connection is only ever handed to the thread that opened
+it, and is normally closed by that thread too. `close_all()` (backup/restore,
+shutdown) closes only connections that are idle, belong to the calling
+thread or whose thread has exited, interrupting other threads' connections
+first; a connection still in use is marked stale, and its owner closes it
+and opens a fresh one on its next `connection()` call. Connections are
+created with check_same_thread=False for those cross-thread closes.
+
+Health checks: a connection idle for longer than `check_interval_s` is probed
+with `SELECT 1` before being handed out; a closed or broken one is replaced.
+
+Callers keep using `with repo._connect() as con:`. The context manager only
+commits / rolls back; pooled connections are never closed by callers. Only
+the outermost block commits: an inner block releases its savepoint on success
+and rolls back just its own work on error, and a later failure in the outer
+block still rolls back everything.
+
+Readers
+-------
+Reports run on reader connections: opened with a `mode=ro` URI, the reader
+tuning profile and `PRAGMA query_only`, pooled per thread like writers. `read_snapshot(path)`
+wraps one report in a single read transaction, so every query of the report
+sees the same WAL snapshot while writers keep committing.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from . import refdata
+from .tuning import (
+    DEFAULT_PROFILE,
+    DEFAULT_READER_PROFILE,
+    PROFILES,
+    Pragmas,
+    active_profile_name,
+    apply_limits,
+    get_profile,
+    reader_profile_name,
+)
+
+# Fallbacks for providers built directly; the registry below uses the
+# configured writer / reader profiles (database.tuning).
+DEFAULT_PRAGMAS = PROFILES[DEFAULT_PROFILE].pragmas_for()
+READER_PRAGMAS = PROFILES[DEFAULT_READER_PROFILE].pragmas_for(read_only=True)
+
+
+@dataclass
+class PoolStats:
+    opened: int = 0
+    reused: int = 0
+    replaced: int = 0          # failed a health check and was reopened
+    closed: int = 0
+    open_now: int = 0
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3.Connection whose `with con:` blocks nest. The outermost block
+    commits or rolls back as usual; inner blocks run as SAVEPOINTs inside it.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._depth = 0
+
+    def __enter__(self) -> "PooledConnection":
+        if self._depth:
+            if not self.in_transaction:
+                self.execute("BEGIN")   # releasing an outermost savepoint would commit
+            self.execute(f"SAVEPOINT pool_{self._depth}")
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._depth -= 1
+        if not self._depth:
+            return super().__exit__(exc_type, exc, tb)
+        if self.in_transaction:         # an explicit commit() inside ends the savepoints
+            name = f"pool_{self._depth}"
+            if exc_type is not None:
+                self.execute(f"ROLLBACK TO {name}")
+            self.execute(f"RELEASE {name}")
+        return False
+
+
+class _Slot:
+    __slots__ = ("conn", "thread", "last_used", "stale")
+
+    def __init__(self, conn: sqlite3.Connection, thread: threading.Thread) -> None:
+        self.conn = conn
+        self.thread = thread
+        self.last_used = time.monotonic()
+        self.stale = False          # retired by close_all(); the owner closes it
+
+
+def _idle(con: sqlite3.Connection) -> bool:
+    """No open transaction and no `with con:` block in progress."""
+    return not con.in_transaction and not getattr(con, "_depth", 0)
+
+
+class ConnectionProvider:
+    """
+    Hands out one configured connection per thread for a single database file.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        *,
+        pragmas: Pragmas = DEFAULT_PRAGMAS,
+        limits: Tuple[Tuple[str, int], ...] = (),
+        timeout: float = 30.0,
+        check_interval_s: float = 30.0,
+        read_only: bool = False,
+    ) -> None:
+        self.db_path = str(db_path)
+        self.read_only = bool(read_only)
+        self.profile_name: Optional[str] = None      # set by the registry
+        self._pragmas = tuple(pragmas)
+        self._limits = tuple(limits)
+        self._timeout = float(timeout)
+        self._check_interval_s = float(check_interval_s)
+        self._lock = threading.Lock()
+        self._slots: Dict[int, _Slot] = {}
+        self.stats = PoolStats()
+
+    # ---- configuration ----
+    def _open(self) -> sqlite3.Connection:
+        if self.read_only:
+            con = sqlite3.connect(
+                f"{Path(self.db_path).resolve().as_uri()}?mode=ro",
+                uri=True, timeout=self._timeout, check_same_thread=False, factory=PooledConnection,
+            )
+        else:
+            con = sqlite3.connect(self.db_path, timeout=self._timeout, check_same_thread=False,
+                                  factory=PooledConnection)
+        con.row_factory = sqlite3.Row
+        for name, value in self._pragmas:
+            con.execute(f"PRAGMA {name} = {value};")
+        apply_limits(con, self._limits)
+        return con
+
+    @staticmethod
+    def _healthy(con: sqlite3.Connection) -> bool:
+        try:
+            con.execute("SELECT 1").fetchone()
+            return True
+        except (sqlite3.ProgrammingError, sqlite3.DatabaseError):
+            return False
+
+    # ---- API ----
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection (opened and configured on first use)."""
+        me = threading.current_thread()
+        key = threading.get_ident()
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None and (slot.thread is not me or slot.stale):
+                # thread ident recycled after the previous owner exited, or
+                # retired by close_all() while this thread was using it
+                self._discard(key)
+                slot = None
+        now = time.monotonic()
+
+        if slot is not None:
+            if now - slot.last_used < self._check_interval_s or self._healthy(slot.conn):
+                slot.last_used = now
+                self.stats.reused += 1
+                return slot.conn
+            with self._lock:
+                self._discard(key)
+                self.stats.replaced += 1
+
+        con = self._open()
+        with self._lock:
+            self._slots[key] = _Slot(con, me)
+            self.stats.opened += 1
+            self.stats.open_now = len(self._slots)
+        return con
+
+    def release_thread(self) -> None:
+        """Close the calling thread's connection (e.g. at the end of a worker)."""
+        with self._lock:
+            self._discard(threading.get_ident())
+
+    def prune(self) -> int:
+        """Close connections owned by threads that have exited. Returns how many."""
+        with self._lock:
+            dead = [k for k, s in self._slots.items() if not s.thread.is_alive()]
+            for k in dead:
+                self._discard(k)
+        return len(dead)
+
+    def close_all(self) -> int:
+        """
+        Retire every pooled connection (call before replacing the database
+        file, after waiting for worker jobs to finish). Connections of the
+        calling thread, of exited threads and idle ones are closed now (other
+        threads' interrupted first); one still in use is marked stale and
+        closed by its owner on its next connection() call. Returns how many
+        were left to their owners.
+        """
+        me = threading.current_thread()
+        left = 0
+        with self._lock:
+            for k, slot in list(self._slots.items()):
+                owned = slot.thread is me or not slot.thread.is_alive()
+                if owned or _idle(slot.conn):
+                    if not owned:
+                        slot.conn.interrupt()
+                    self._discard(k)
+                else:
+                    slot.stale = True
+                    left += 1
+        return left
+
+    def _discard(self, key: int) -> None:
+        # caller holds self._lock
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        refdata.forget(slot.conn)
+        try:
+            if slot.conn.in_transaction:
+                slot.conn.rollback()
+            slot.conn.close()
+        except sqlite3.Error:
+            pass
+        self.stats.closed += 1
+        self.stats.open_now = len(self._slots)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide registry
+# ---------------------------------------------------------------------------
+
+_providers: Dict[Tuple[str, bool], ConnectionProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def _key(db_path: Union[str, Path]) -> str:
+    p = str(db_path)
+    if p == ":memory:" or p.startswith("file:"):
+        return p
+    return str(Path(p).resolve())
+
+
+def get_provider(db_path: Union[str, Path], *, read_only: bool = False) -> ConnectionProvider:
+    """The shared writer (or reader) provider for a database file (created on first use)."""
+    path = _key(db_path)
+    key = (path, bool(read_only))
+    with _providers_lock:
+        prov = _providers.get(key)
+        if prov is None:
+            profile = get_profile(reader_profile_name() if read_only else active_profile_name())
+            prov = _providers[key] = ConnectionProvider(
+                path, pragmas=profile.pragmas_for(read_only=read_only), limits=profile.limits,
+                read_only=read_only,
+            )
+            prov.profile_name = profile.name
+        return prov
+
+
+def pooled_connection(source: Union[str, Path, sqlite3.Connection]) -> sqlite3.Connection:
+    """
+    Connection for a path-based repo. `source` is normally the database path;
+    an already-open sqlite3.Connection is returned unchanged so a repo built
+    from a caller's connection joins that caller's transaction.
+    """
+    if isinstance(source, sqlite3.Connection):
+        return source
+    return get_provider(source).connection()
+
+
+def db_path_from_conn(conn: sqlite3.Connection) -> Optional[str]:
+    """File path of the 'main' database for an open connection (None for :memory:)."""
+    try:
+        for _seq, name, path in conn.execute("PRAGMA database_list").fetchall():
+            if name == "main" and path:
+                return path
+    except sqlite3.Error:
+        pass
+    return None
+
+
+@contextmanager
+def read_snapshot(db_path: Union[str, Path]) -> Iterator[sqlite3.Connection]:
+    """
+    The calling thread's reader connection inside one read transaction. The
+    snapshot is taken at the first query and held until the block exits.
+    """
+    con = get_provider(db_path, read_only=True).connection()
+    con.execute("BEGIN")
+    try:
+        yield con
+    finally:
+        if con.in_transaction:
+            con.rollback()
+
+
+def pool_snapshot() -> List[ConnectionProvider]:
+    """Registered providers (for diagnostics)."""
+    with _providers_lock:
+        return list(_providers.values())
+
+
+def close_all_pooled() -> int:
+    """
+    Retire the pooled connections of every provider (backup/restore,
+    shutdown); see ConnectionProvider.close_all. Returns how many busy
+    connections were left for their owning threads to close.
+    """
+    with _providers_lock:
+        providers = list(_providers.values())
+    return sum(prov.close_all() for prov in providers)
+
+
+__all__ = [
+    "DEFAULT_PRAGMAS",
+    "READER_PRAGMAS",
+    "PoolStats",
+    "PooledConnection",
+    "ConnectionProvider",
+    "get_provider",
+    "pooled_connection",
+    "db_path_from_conn",
+    "pool_snapshot",
+    "read_snapshot",
+    "close_all_pooled",
+]
@@ -0,0 +1,93 @@
+# database/doc_numbers.py
+"""
+Document numbers: prefix + yyyymmdd + "-NNNN" (SO20261016-0001).
+
+The last number issued per (prefix, day) lives in `doc_sequences`
+(schema.py). `allocate()` bumps it with a single UPDATE ... RETURNING on
+the connection that is about to insert the document, so the number belongs
+to the posting transaction:
+
+    sid = doc_numbers.allocate(conn, doc_numbers.SALE, "2026-10-16")
+    ... INSERT INTO sales ... ; conn.commit()
+
+The UPDATE takes the database write lock, so a second terminal allocating
+for the same day waits for the first to commit and then gets the next
+number; no two saves can produce the same id. A rolled-back save returns
+its number. A (prefix, day) seen for the first time starts after the
+highest id already on file for that day (one indexed lookup), which keeps
+rows written before the table existed, or by imports, from colliding.
+"""
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Tuple
+
+SALE = "SO"
+QUOTATION = "QO"
+PURCHASE = "PO"
+
+# prefix -> (table, id column) holding documents with that prefix
+_SOURCES: Dict[str, Tuple[str, str]] = {
+    SALE: ("sales", "sale_id"),
+    QUOTATION: ("sales", "sale_id"),
+    PURCHASE: ("purchases", "purchase_id"),
+}
+
+
+def _day(date_str: str) -> str:
+    return (date_str or "").replace("-", "")[:8]
+
+
+def format_id(prefix: str, day: str, number: int) -> str:
+    return f"{prefix}{day}-{number:04d}"
+
+
+def _highest_on_file(conn: sqlite3.Connection, prefix: str, day: str) -> int:
+    table, col = _SOURCES[prefix]
+    stem = f"{prefix}{day}-"
+    row = conn.execute(
+        f"SELECT MAX({col}) FROM {table} WHERE {col} >= ? AND {col} < ?",
+        (stem, stem[:-1] + "."),           # '.' sorts right after '-'
+    ).fetchone()
+    if not row or not row[0]:
+        return 0
+    try:
+        return int(str(row[0]).rsplit("-", 1)[-1])
+    except ValueError:
+        return 0
+
+
+def allocate(conn: sqlite3.Connection, prefix: str, date_str: str) -> str:
+    """
+    Issue the next document id for `prefix` on `date_str` (YYYY-MM-DD).
+    Call inside the transaction that inserts the document; nothing is
+    committed here.
+    """
+    if prefix not in _SOURCES:
+        raise ValueError(f"Unknown document prefix {prefix!r} (expected one of: {', '.join(_SOURCES)})")
+    day = _day(date_str)
+    row = conn.execute(
+        "UPDATE doc_sequences SET last_no = last_no + 1 WHERE prefix = ? AND day = ? RETURNING last_no",
+        (prefix, day),
+    ).fetchone()
+    if row is None:
+        # First document of the day (the upsert covers a racing autocommit connection)
+        row = conn.execute(
+            "INSERT INTO doc_sequences (prefix, day, last_no) VALUES (?, ?, ?) "
+            "ON CONFLICT (prefix, day) DO UPDATE SET last_no = last_no + 1 RETURNING last_no",
+            (prefix, day, _highest_on_file(conn, prefix, day) + 1),
+        ).fetchone()
+    return format_id(prefix, day, int(row[0]))
+
+
+def peek(conn: sqlite3.Connection, prefix: str, date_str: str) -> str:
+    """The id allocate() would issue next (display only; nothing is reserved)."""
+    day = _day(date_str)
+    row = conn.execute(
+        "SELECT last_no FROM doc_sequences WHERE prefix = ? AND day = ?", (prefix, day)
+    ).fetchone()
+    last = int(row[0]) if row else _highest_on_file(conn, prefix, day)
+    return format_id(prefix, day, last + 1)
+
+
+__all__ = ["SALE", "QUOTATION", "PURCHASE", "allocate", "peek", "format_id"]
@@ -0,0 +1,151 @@
+# database/events.py
+"""
+In-process change events for incremental screen refresh.
+
+Repositories publish a `ChangeEvent(entity, id, kind)` for every document or
+master row they write; list models subscribe and patch the affected row
+(insert / update / remove) instead of re-running the whole list query.
+
+    events.publish(conn, "sales", sid, events.INSERT)      # in a repository
+    unsubscribe = events.bus.subscribe(on_change, ("sales",))
+
+Delivery happens after commit. When the publishing connection is still in a
+transaction (repositories that leave the boundary to the caller, e.g.
+PurchasesRepo), the events are held until the caller commits through
+`events.commit(conn)`; `events.rollback(conn)` drops them. Publishing with
+conn=None, or on a connection with no open transaction, delivers at once.
+Subscribers re-read the row they are told about, so an event for a write
+that was later rolled back elsewhere is harmless.
+
+Callbacks run synchronously in the publishing thread and are held weakly
+(bound methods die with their object); Qt code subscribes through
+widgets.change_listener.ChangeListener, which re-emits on the GUI thread.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import sqlite3
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_log = logging.getLogger(__name__)
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+KINDS = (INSERT, UPDATE, DELETE)
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    entity: str          # "sales", "purchases", "products", "customers", "vendors"
+    id: Any              # primary key of the changed row
+    kind: str = UPDATE   # insert | update | delete
+
+
+Callback = Callable[[ChangeEvent], None]
+
+
+class ChangeBus:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._subs: List[Tuple[Callable[[], Optional[Callback]], Optional[frozenset]]] = []
+        self._pending: Dict[int, List[ChangeEvent]] = {}
+
+    # ---- subscribers ----
+    def subscribe(self, callback: Callback, entities: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """
+        Call `callback(event)` for events of `entities` (all when None).
+        Returns an unsubscribe function. Bound methods are referenced weakly.
+        """
+        if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+            ref: Callable[[], Optional[Callback]] = weakref.WeakMethod(callback)  # type: ignore[arg-type]
+        else:
+            ref = lambda cb=callback: cb  # noqa: E731
+        entry = (ref, frozenset(entities) if entities is not None else None)
+        with self._lock:
+            self._subs.append(entry)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if entry in self._subs:
+                    self._subs.remove(entry)
+
+        return unsubscribe
+
+    # ---- publishers ----
+    def publish(self, conn: Optional[sqlite3.Connection], *events: ChangeEvent) -> None:
+        for ev in events:
+            if ev.kind not in KINDS:
+                raise ValueError(f"Unknown change kind {ev.kind!r} (expected one of: {', '.join(KINDS)})")
+        if conn is not None and conn.in_transaction:
+            with self._lock:
+                self._pending.setdefault(id(conn), []).extend(events)
+            return
+        self._deliver(self._take(conn) + list(events))
+
+    def committed(self, conn: sqlite3.Connection) -> None:
+        """Deliver events held for `conn` (call after committing it)."""
+        self._deliver(self._take(conn))
+
+    def discard(self, conn: sqlite3.Connection) -> None:
+        """Drop events held for `conn` (call after rolling it back)."""
+        self._take(conn)
+
+    # ---- internals ----
+    def _take(self, conn: Optional[sqlite3.Connection]) -> List[ChangeEvent]:
+        if conn is None:
+            return []
+        with self._lock:
+            return self._pending.pop(id(conn), [])
+
+    def _deliver(self, events: List[ChangeEvent]) -> None:
+        if not events:
+            return
+        with self._lock:
+            self._subs = [s for s in self._subs if s[0]() is not None]
+            subs = list(self._subs)
+        for ev in events:
+            for ref, entities in subs:
+                cb = ref()
+                if cb is None or (entities is not None and ev.entity not in entities):
+                    continue
+                try:
+                    cb(ev)
+                except Exception:
+                    _log.exception("Change subscriber failed for %s", ev)
+
+
+bus = ChangeBus()
+
+
+def publish(conn: Optional[sqlite3.Connection], entity: str, row_id: Any, kind: str = UPDATE) -> None:
+    """Publish one change on the application bus (held until commit if `conn` is in a transaction)."""
+    bus.publish(conn, ChangeEvent(entity, row_id, kind))
+
+
+def commit(conn: sqlite3.Connection) -> None:
+    """Commit `conn`, then deliver the change events held for it."""
+    conn.commit()
+    bus.committed(conn)
+
+
+def rollback(conn: sqlite3.Connection) -> None:
+    """Roll back `conn` and drop the change events held for it."""
+    conn.rollback()
+    bus.discard(conn)
+
+
+__all__ = [
+    "INSERT",
+    "UPDATE",
+    "DELETE",
+    "ChangeEvent",
+    "ChangeBus",
+    "bus",
+    "publish",
+    "commit",
+    "rollback",
+]
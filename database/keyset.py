@@ -0,0 +1,89 @@
+# inventory_management/database/keyset.py
+"""
+Keyset ("seek") pagination for list queries.
+
+Pages are ordered by (sort expression, unique id) and the next page starts
+strictly after the last row seen, so rows inserted meanwhile do not shift
+later pages and there is no OFFSET scan. The seek is a row-value comparison,
+`(sort, id) > (?, ?)`, which SQLite turns into an index range when an index
+covers (equality filters..., sort, id); with one, page N costs the same as
+page 1. (The expanded `s > ? OR (s = ? AND id > ?)` form is not a range.)
+
+    order = order_by("s.date", "s.sale_id", descending=True)
+    seek, params = seek_after("s.date", "s.sale_id", after, descending=True)
+
+`after` is the cursor of the last row of the previous page:
+(row[<sort key>], row[<id key>]), or None for the first page. Sort
+expressions must be NOT NULL (NULLs never compare in the seek predicate).
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+Cursor = Tuple[Any, Any]
+
+DEFAULT_PAGE_SIZE = 200
+
+
+def order_by(sort_expr: str, id_expr: str, *, descending: bool) -> str:
+    direction = "DESC" if descending else "ASC"
+    return f"ORDER BY {sort_expr} {direction}, {id_expr} {direction}"
+
+
+def seek_after(
+    sort_expr: str,
+    id_expr: str,
+    after: Optional[Cursor],
+    *,
+    descending: bool,
+) -> Tuple[str, List[Any]]:
+    """WHERE fragment (or "") selecting rows that come after `after`."""
+    if after is None:
+        return "", []
+    value, row_id = after
+    op = "<" if descending else ">"
+    return f"({sort_expr}, {id_expr}) {op} (?, ?)", [value, row_id]
+
+
+def resolve_sort(sort: str, sort_exprs: Dict[str, str]) -> str:
+    """SQL expression for a whitelisted sort key (ValueError otherwise)."""
+    try:
+        return sort_exprs[sort]
+    except KeyError:
+        raise ValueError(f"Unsupported sort key {sort!r} (expected one of: {', '.join(sort_exprs)})") from None
+
+
+def page_query(
+    base_sql: str,
+    where: Sequence[str],
+    params: Sequence[Any],
+    *,
+    sort_expr: str,
+    id_expr: str,
+    descending: bool,
+    after: Optional[Cursor],
+    limit: int,
+) -> Tuple[str, List[Any]]:
+    """Append filters, the seek predicate, ORDER BY and LIMIT to `base_sql`."""
+    clauses = list(where)
+    args = list(params)
+    seek, seek_args = seek_after(sort_expr, id_expr, after, descending=descending)
+    if seek:
+        clauses.append(seek)
+        args += seek_args
+    sql = base_sql
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " " + order_by(sort_expr, id_expr, descending=descending) + " LIMIT ?"
+    args.append(int(limit))
+    return sql, args
+
+
+__all__ = [
+    "Cursor",
+    "DEFAULT_PAGE_SIZE",
+    "order_by",
+    "seek_after",
+    "resolve_sort",
+    "page_query",
+]
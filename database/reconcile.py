@@ -0,0 +1,434 @@
+# database/reconcile.py
+"""
+Consistency checks for values that triggers maintain incrementally.
+
+Header payment rollups
+----------------------
+`sales.paid_amount` / `purchases.paid_amount` and `payment_status` are moved by the
+payment triggers using per-row deltas. `verify_payment_rollups` recomputes them
+from the payment tables in one grouped pass per document type and reports (and
+optionally fixes) any header that drifted, e.g. after a hand edit or an import
+that bypassed the triggers.
+
+Expected values (same rules as the triggers):
+- sales:     paid = max(0, Σ sale_payments.amount)
+- purchases: paid = max(0, Σ purchase_payments.amount WHERE clearing_state='cleared')
+- status:    'paid' if paid >= total, 'partial' if paid > 0, else 'unpaid'
+             ('paid' is also accepted when paid + advance_payment_applied covers the
+             total, which is how credit applications settle a document)
+
+Credit balances
+---------------
+`customer_credit_balance` / `vendor_credit_balance` cache Σ amount of the advances
+ledgers and are moved by per-row triggers. `verify_credit_balances` compares them
+with a grouped recompute; `rebuild_credit_balances` regenerates both tables.
+
+Daily sales facts
+-----------------
+`fact_sales_daily` (reporting) is moved by the sale / line / COGS triggers.
+`verify_sales_facts` compares it with a grouped recompute from the source rows;
+`rebuild_sales_facts` regenerates it. `fact_purchases_daily` is handled the same
+way by `verify_purchase_facts` / `rebuild_purchase_facts`.
+
+CLI
+---
+    python -m inventory_management.database.reconcile [--db PATH] [--fix]
+        [--rebuild-sales-facts] [--rebuild-purchase-facts]
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+import sqlite3
+from typing import List, Optional, Sequence
+
+from .schema import FACT_PURCHASES_DAILY_SQL, FACT_SALES_DAILY_SQL
+
+
+@dataclass(frozen=True)
+class RollupDrift:
+    doc_type: str            # 'sale' | 'purchase'
+    doc_id: str
+    stored_paid: float
+    expected_paid: float
+    stored_status: str
+    expected_status: str
+
+
+# table, id column, payments table, extra payment filter, header filter
+_ROLLUPS = {
+    "sale": ("sales", "sale_id", "sale_payments", "", "WHERE h.doc_type = 'sale'"),
+    "purchase": ("purchases", "purchase_id", "purchase_payments", "WHERE clearing_state = 'cleared'", ""),
+}
+
+
+def _drift_sql(doc_type: str) -> str:
+    table, key, pay_table, pay_filter, head_filter = _ROLLUPS[doc_type]
+    return f"""
+        SELECT doc_id, stored_paid, expected_paid, stored_status,
+               CASE
+                 WHEN stored_status = 'paid' AND expected_paid + adv >= total - :tol THEN 'paid'
+                 WHEN expected_paid >= total THEN 'paid'
+                 WHEN expected_paid > 0      THEN 'partial'
+                 ELSE 'unpaid'
+               END AS expected_status,
+               has_payments
+        FROM (
+            SELECT h.{key}                                         AS doc_id,
+                   CAST(h.paid_amount AS REAL)                     AS stored_paid,
+                   MAX(0.0, ROUND(COALESCE(p.amt, 0.0), 9))        AS expected_paid,
+                   h.payment_status                                AS stored_status,
+                   CAST(h.total_amount AS REAL)                    AS total,
+                   COALESCE(CAST(h.advance_payment_applied AS REAL), 0.0) AS adv,
+                   (p.{key} IS NOT NULL)                           AS has_payments
+            FROM {table} h
+            LEFT JOIN (
+                SELECT {key}, SUM(CAST(amount AS REAL)) AS amt
+                FROM {pay_table}
+                {pay_filter}
+                GROUP BY {key}
+            ) p ON p.{key} = h.{key}
+            {head_filter}
+        )
+        WHERE ABS(stored_paid - expected_paid) > :tol
+           OR (has_payments AND stored_status <> expected_status)
+        ORDER BY doc_id
+    """
+
+
+def verify_payment_rollups(
+    conn: sqlite3.Connection,
+    *,
+    fix: bool = False,
+    tolerance: float = 1e-6,
+) -> List[RollupDrift]:
+    """
+    Return headers whose paid_amount/payment_status disagree with their payments.
+    Status is only checked for documents that have payment rows (before the first
+    payment the header carries whatever the document was created with).
+    With fix=True the drifted headers are rewritten; no commit here.
+    """
+    drift: List[RollupDrift] = []
+    for doc_type in ("sale", "purchase"):
+        rows = conn.execute(_drift_sql(doc_type), {"tol": float(tolerance)}).fetchall()
+        for doc_id, stored_paid, expected_paid, stored_status, expected_status, has_pay in rows:
+            drift.append(RollupDrift(
+                doc_type=doc_type,
+                doc_id=str(doc_id),
+                stored_paid=float(stored_paid or 0.0),
+                expected_paid=float(expected_paid or 0.0),
+                stored_status=str(stored_status),
+                expected_status=str(expected_status if has_pay else stored_status),
+            ))
+
+    if fix and drift:
+        for doc_type in ("sale", "purchase"):
+            table, key = _ROLLUPS[doc_type][0], _ROLLUPS[doc_type][1]
+            conn.executemany(
+                f"UPDATE {table} SET paid_amount = ?, payment_status = ? WHERE {key} = ?",
+                [
+                    (d.expected_paid, d.expected_status, d.doc_id)
+                    for d in drift if d.doc_type == doc_type
+                ],
+            )
+    return drift
+
+
+# ----------------------------
+# Credit balances
+# ----------------------------
+
+@dataclass(frozen=True)
+class BalanceDrift:
+    party_type: str          # 'customer' | 'vendor'
+    party_id: int
+    stored_balance: float
+    expected_balance: float
+
+
+# balance table, key column, ledger table
+_BALANCES = {
+    "customer": ("customer_credit_balance", "customer_id", "customer_advances"),
+    "vendor": ("vendor_credit_balance", "vendor_id", "vendor_advances"),
+}
+
+
+def verify_credit_balances(
+    conn: sqlite3.Connection,
+    *,
+    fix: bool = False,
+    tolerance: float = 1e-6,
+) -> List[BalanceDrift]:
+    """
+    Return parties whose cached balance differs from Σ ledger amount (a missing
+    cache row counts as 0). With fix=True those rows are rewritten; no commit here.
+    """
+    drift: List[BalanceDrift] = []
+    for party, (table, key, ledger) in _BALANCES.items():
+        rows = conn.execute(
+            f"""
+            SELECT party_id, stored, expected
+            FROM (
+                SELECT k.party_id,
+                       COALESCE((SELECT CAST(b.balance AS REAL) FROM {table} b
+                                  WHERE b.{key} = k.party_id), 0.0) AS stored,
+                       COALESCE(l.amt, 0.0) AS expected
+                FROM (
+                    SELECT {key} AS party_id FROM {ledger}
+                    UNION
+                    SELECT {key} FROM {table}
+                ) k
+                LEFT JOIN (
+                    SELECT {key}, SUM(CAST(amount AS REAL)) AS amt
+                    FROM {ledger}
+                    GROUP BY {key}
+                ) l ON l.{key} = k.party_id
+            )
+            WHERE ABS(stored - expected) > ?
+            ORDER BY party_id
+            """,
+            (float(tolerance),),
+        ).fetchall()
+        drift.extend(
+            BalanceDrift(party, int(pid), float(stored), float(expected))
+            for pid, stored, expected in rows
+        )
+
+    if fix and drift:
+        for party, (table, key, _ledger) in _BALANCES.items():
+            conn.executemany(
+                f"""
+                INSERT INTO {table} ({key}, balance, updated_at)
+                VALUES (?, ROUND(?, 9), CURRENT_TIMESTAMP)
+                ON CONFLICT({key}) DO UPDATE SET
+                    balance = excluded.balance, updated_at = CURRENT_TIMESTAMP
+                """,
+                [(d.party_id, d.expected_balance) for d in drift if d.party_type == party],
+            )
+    return drift
+
+
+def rebuild_credit_balances(conn: sqlite3.Connection) -> None:
+    """Regenerate both cached balance tables from their ledgers (no commit here)."""
+    for table, key, ledger in _BALANCES.values():
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(
+            f"""
+            INSERT INTO {table} ({key}, balance)
+            SELECT {key}, ROUND(SUM(CAST(amount AS REAL)), 9)
+            FROM {ledger}
+            GROUP BY {key}
+            """
+        )
+
+
+# ----------------------------
+# Daily sales facts
+# ----------------------------
+
+@dataclass(frozen=True)
+class FactDrift:
+    product_id: int          # 0 = order-level row
+    day: str
+    customer_id: int
+    payment_status: str
+    stored_revenue: float
+    expected_revenue: float
+    stored_orders: int
+    expected_orders: int
+
+
+_FACT_COLUMNS = "product_id, day, customer_id, payment_status, category, qty_base, revenue, cogs, orders"
+
+
+def verify_sales_facts(
+    conn: sqlite3.Connection,
+    *,
+    fix: bool = False,
+    tolerance: float = 1e-6,
+) -> List[FactDrift]:
+    """
+    Return fact_sales_daily keys whose measures differ from the source rows (a
+    missing row counts as zeros). With fix=True the table is rebuilt; no commit here.
+    """
+    rows = conn.execute(
+        f"""
+        SELECT product_id, day, customer_id, payment_status,
+               SUM(s_rev), SUM(e_rev), SUM(s_ord), SUM(e_ord)
+        FROM (
+            SELECT product_id, day, customer_id, payment_status,
+                   revenue AS s_rev, 0.0 AS e_rev, orders AS s_ord, 0 AS e_ord,
+                   qty_base AS s_qty, 0.0 AS e_qty, cogs AS s_cogs, 0.0 AS e_cogs
+            FROM fact_sales_daily
+            UNION ALL
+            SELECT product_id, day, customer_id, payment_status,
+                   0.0, revenue, 0, orders, 0.0, qty_base, 0.0, cogs
+            FROM ({FACT_SALES_DAILY_SQL})
+        )
+        GROUP BY product_id, day, customer_id, payment_status
+        HAVING ABS(SUM(s_rev) - SUM(e_rev)) > :tol
+            OR ABS(SUM(s_qty) - SUM(e_qty)) > :tol
+            OR ABS(SUM(s_cogs) - SUM(e_cogs)) > :tol
+            OR SUM(s_ord) <> SUM(e_ord)
+        ORDER BY day, product_id, customer_id, payment_status
+        """,
+        {"tol": float(tolerance)},
+    ).fetchall()
+    drift = [
+        FactDrift(int(r[0]), str(r[1]), int(r[2]), str(r[3]),
+                  float(r[4] or 0.0), float(r[5] or 0.0), int(r[6] or 0), int(r[7] or 0))
+        for r in rows
+    ]
+    if fix and drift:
+        rebuild_sales_facts(conn)
+    return drift
+
+
+def rebuild_sales_facts(conn: sqlite3.Connection) -> None:
+    """Regenerate fact_sales_daily from sales / sale_items / sale_item_cogs (no commit here)."""
+    conn.execute("DELETE FROM fact_sales_daily")
+    conn.execute(f"INSERT INTO fact_sales_daily ({_FACT_COLUMNS}) {FACT_SALES_DAILY_SQL}")
+
+
+# ----------------------------
+# Daily purchase facts
+# ----------------------------
+
+@dataclass(frozen=True)
+class PurchaseFactDrift:
+    product_id: int          # 0 = order-level row
+    day: str
+    vendor_id: int
+    stored_spend: float
+    expected_spend: float
+    stored_orders: int
+    expected_orders: int
+
+
+_PURCHASE_FACT_COLUMNS = (
+    "product_id, day, vendor_id, category, qty_base, spend, orders, paid, advance_applied, "
+    "qty_returned, returns_value, payments_cleared"
+)
+_PURCHASE_FACT_MEASURES = (
+    "qty_base", "spend", "paid", "advance_applied", "qty_returned", "returns_value", "payments_cleared"
+)
+
+
+def verify_purchase_facts(
+    conn: sqlite3.Connection,
+    *,
+    fix: bool = False,
+    tolerance: float = 1e-6,
+) -> List[PurchaseFactDrift]:
+    """
+    Return fact_purchases_daily keys whose measures differ from the source rows
+    (a missing row counts as zeros). With fix=True the table is rebuilt; no commit here.
+    """
+    stored = ", ".join(f"{m} AS s_{m}, 0.0 AS e_{m}" for m in _PURCHASE_FACT_MEASURES)
+    expected = ", ".join(f"0.0, {m}" for m in _PURCHASE_FACT_MEASURES)
+    differs = "\n            OR ".join(
+        f"ABS(SUM(s_{m}) - SUM(e_{m})) > :tol" for m in _PURCHASE_FACT_MEASURES
+    )
+    rows = conn.execute(
+        f"""
+        SELECT product_id, day, vendor_id,
+               SUM(s_spend), SUM(e_spend), SUM(s_ord), SUM(e_ord)
+        FROM (
+            SELECT product_id, day, vendor_id, orders AS s_ord, 0 AS e_ord, {stored}
+            FROM fact_purchases_daily
+            UNION ALL
+            SELECT product_id, day, vendor_id, 0, orders, {expected}
+            FROM ({FACT_PURCHASES_DAILY_SQL})
+        )
+        GROUP BY product_id, day, vendor_id
+        HAVING SUM(s_ord) <> SUM(e_ord)
+            OR {differs}
+        ORDER BY day, product_id, vendor_id
+        """,
+        {"tol": float(tolerance)},
+    ).fetchall()
+    drift = [
+        PurchaseFactDrift(int(r[0]), str(r[1]), int(r[2]),
+                          float(r[3] or 0.0), float(r[4] or 0.0), int(r[5] or 0), int(r[6] or 0))
+        for r in rows
+    ]
+    if fix and drift:
+        rebuild_purchase_facts(conn)
+    return drift
+
+
+def rebuild_purchase_facts(conn: sqlite3.Connection) -> None:
+    """Regenerate fact_purchases_daily from purchases, lines, returns and payments (no commit here)."""
+    conn.execute("DELETE FROM fact_purchases_daily")
+    conn.execute(f"INSERT INTO fact_purchases_daily ({_PURCHASE_FACT_COLUMNS}) {FACT_PURCHASES_DAILY_SQL}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from ..config import DB_PATH
+
+    parser = argparse.ArgumentParser(description="Reconcile trigger-maintained rollups against their source rows")
+    parser.add_argument("--db", default=str(DB_PATH), help="Path to SQLite DB")
+    parser.add_argument("--fix", action="store_true", help="Rewrite drifted headers / balances / sales and purchase facts")
+    parser.add_argument(
+        "--rebuild-sales-facts", action="store_true",
+        help="Regenerate the daily sales fact table from the sales and exit",
+    )
+    parser.add_argument(
+        "--rebuild-purchase-facts", action="store_true",
+        help="Regenerate the daily purchase fact table from the purchases and exit",
+    )
+    args = parser.parse_args(argv)
+
+    con = sqlite3.connect(args.db)
+    try:
+        if args.rebuild_sales_facts:
+            rebuild_sales_facts(con)
+            con.commit()
+            n = con.execute("SELECT COUNT(*) FROM fact_sales_daily").fetchone()[0]
+            print(f"fact_sales_daily rebuilt: {n} row(s)")
+            return 0
+        if args.rebuild_purchase_facts:
+            rebuild_purchase_facts(con)
+            con.commit()
+            n = con.execute("SELECT COUNT(*) FROM fact_purchases_daily").fetchone()[0]
+            print(f"fact_purchases_daily rebuilt: {n} row(s)")
+            return 0
+        drift = verify_payment_rollups(con, fix=args.fix)
+        for d in drift:
+            print(
+                f"{d.doc_type:<8} {d.doc_id:<20} paid {d.stored_paid:.2f} -> {d.expected_paid:.2f}  "
+                f"status {d.stored_status} -> {d.expected_status}"
+            )
+        balances = verify_credit_balances(con, fix=args.fix)
+        for b in balances:
+            print(
+                f"{b.party_type:<8} #{b.party_id:<19} credit {b.stored_balance:.2f} -> {b.expected_balance:.2f}"
+            )
+        facts = verify_sales_facts(con, fix=args.fix)
+        for f in facts:
+            print(
+                f"fact     {f.day} product {f.product_id} customer {f.customer_id} {f.payment_status}  "
+                f"revenue {f.stored_revenue:.2f} -> {f.expected_revenue:.2f}  "
+                f"orders {f.stored_orders} -> {f.expected_orders}"
+            )
+        purchase_facts = verify_purchase_facts(con, fix=args.fix)
+        for f in purchase_facts:
+            print(
+                f"fact     {f.day} product {f.product_id} vendor {f.vendor_id}  "
+                f"spend {f.stored_spend:.2f} -> {f.expected_spend:.2f}  "
+                f"orders {f.stored_orders} -> {f.expected_orders}"
+            )
+        if args.fix:
+            con.commit()
+        done = " fixed" if args.fix else ""
+        print(
+            f"{len(drift)} drifted header(s), {len(balances)} drifted balance(s), "
+            f"{len(facts)} drifted sales fact(s), {len(purchase_facts)} drifted purchase fact(s){done}"
+        )
+    finally:
+        con.close()
+    return 1 if (drift or balances or facts or purchase_facts) and not args.fix else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
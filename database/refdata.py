@@ -0,0 +1,417 @@
+# database/refdata.py
+"""
+Process-wide cache of reference (master) data: products, UoMs, product UoM
+factors, customers, vendors and company bank accounts.
+
+Sale/purchase/return forms, receipt dialogs and report filters all need the
+same small tables every time they open. `reference_data(conn)` returns the
+cache for a connection's database file; each section is loaded on first use
+into compact NamedTuple records, indexed by id (and by lower-cased name where
+that is a lookup key), and kept until the underlying table changes:
+
+    ref = reference_data(conn)
+    ref.uoms()                       # -> tuple[UomRef, ...] by unit_name
+    ref.product_uoms(pid)            # -> base first, then by unit_name
+    ref.customer(42), ref.vendor_by_name("acme traders")
+
+Invalidation is change driven. Triggers on every master table bump a
+counter in `ref_data_version` (schema.py), so writes through the
+repositories -- and any other write -- invalidate exactly the sections built
+from that table. The counters are only re-read when something may have
+changed: this connection wrote (`total_changes`), another connection
+committed (`PRAGMA data_version`), or a transaction is open/ended. Sections
+read inside a transaction are returned but not kept: the transaction may
+still roll back, and a later committed write can bring the counters back to
+the same values. Opening a form while nothing changed runs no table queries
+at all.
+
+Loaded sections are shared by every connection to the same database file
+(the UI connection, module connections, pooled thread connections): they are
+stored per file path under the counter values they were read at, so any
+connection whose counters match is served the same copy. A :memory:
+database, or one without the counter table, keeps its sections private to
+its connection.
+
+The per-connection part is only the change probe above. It is tracked per
+connection object in a WeakKeyDictionary, so a connection that is dropped
+takes it along. Plain sqlite3.Connection objects do not support weak
+references; those get an id()-keyed entry that is pruned once the connection
+is closed (`forget()` drops it at once).
+
+Records are read-only snapshots; callers that need a dict (the repository
+APIs) convert with `._asdict()`.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import weakref
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class UomRef(NamedTuple):
+    uom_id: int
+    unit_name: str
+
+
+class ProductRef(NamedTuple):
+    product_id: int
+    name: str
+    description: Optional[str]
+    category: Optional[str]
+    min_stock_level: float
+
+
+class ProductUomRef(NamedTuple):
+    product_uom_id: int
+    product_id: int
+    uom_id: int
+    unit_name: str
+    is_base: int
+    factor_to_base: float
+
+
+class PartyRef(NamedTuple):
+    """A customer or vendor."""
+    id: int
+    name: str
+    contact_info: Optional[str]
+    address: Optional[str]
+    is_active: bool
+
+
+class BankAccountRef(NamedTuple):
+    account_id: int
+    label: str
+    bank_name: Optional[str]
+    account_no: Optional[str]
+    is_active: bool
+
+
+class _Catalog(NamedTuple):
+    rows: Tuple                       # all records, in the section's order
+    by_id: Dict[int, tuple]
+    by_name: Dict[str, tuple]         # lower(name) -> first record with it
+
+
+def _catalog(rows: Iterable[tuple], name_of: Optional[Callable[[tuple], str]] = None) -> _Catalog:
+    rows = tuple(rows)
+    by_name: Dict[str, tuple] = {}
+    if name_of is not None:
+        for r in rows:
+            by_name.setdefault((name_of(r) or "").strip().lower(), r)
+    return _Catalog(rows, {r[0]: r for r in rows}, by_name)
+
+
+def _load_uoms(conn: sqlite3.Connection) -> _Catalog:
+    rows = conn.execute("SELECT uom_id, unit_name FROM uoms ORDER BY unit_name").fetchall()
+    return _catalog((UomRef(int(r[0]), str(r[1])) for r in rows), lambda u: u.unit_name)
+
+
+def _load_products(conn: sqlite3.Connection) -> _Catalog:
+    rows = conn.execute(
+        "SELECT product_id, name, description, category, CAST(min_stock_level AS REAL) "
+        "FROM products ORDER BY product_id DESC"
+    ).fetchall()
+    return _catalog(
+        (ProductRef(int(r[0]), str(r[1]), r[2], r[3], float(r[4] or 0.0)) for r in rows),
+        lambda p: p.name,
+    )
+
+
+def _load_product_uoms(conn: sqlite3.Connection) -> Dict[int, Tuple[ProductUomRef, ...]]:
+    rows = conn.execute(
+        """
+        SELECT pu.product_uom_id, pu.product_id, u.uom_id, u.unit_name,
+               pu.is_base, CAST(pu.factor_to_base AS REAL)
+        FROM product_uoms pu
+        JOIN uoms u ON u.uom_id = pu.uom_id
+        ORDER BY pu.product_id, pu.is_base DESC, u.unit_name
+        """
+    ).fetchall()
+    grouped: Dict[int, List[ProductUomRef]] = {}
+    for r in rows:
+        ref = ProductUomRef(int(r[0]), int(r[1]), int(r[2]), str(r[3]), int(r[4]), float(r[5]))
+        grouped.setdefault(ref.product_id, []).append(ref)
+    return {pid: tuple(refs) for pid, refs in grouped.items()}
+
+
+def _load_parties(table: str, id_col: str, has_active: bool) -> Callable[[sqlite3.Connection], _Catalog]:
+    active = "is_active" if has_active else "1"
+
+    def load(conn: sqlite3.Connection) -> _Catalog:
+        rows = conn.execute(
+            f"SELECT {id_col}, name, contact_info, address, {active} "
+            f"FROM {table} ORDER BY {id_col} DESC"
+        ).fetchall()
+        return _catalog(
+            (PartyRef(int(r[0]), str(r[1]), r[2], r[3], bool(r[4])) for r in rows),
+            lambda p: p.name,
+        )
+
+    return load
+
+
+def _load_bank_accounts(conn: sqlite3.Connection) -> _Catalog:
+    rows = conn.execute(
+        "SELECT account_id, label, bank_name, account_no, is_active "
+        "FROM company_bank_accounts ORDER BY account_id"
+    ).fetchall()
+    return _catalog(
+        (BankAccountRef(int(r[0]), str(r[1]), r[2], r[3], bool(r[4])) for r in rows),
+        lambda a: a.label,
+    )
+
+
+# section -> (tables it is built from, loader)
+_SECTIONS: Dict[str, Tuple[Tuple[str, ...], Callable[[sqlite3.Connection], object]]] = {
+    "uoms": (("uoms",), _load_uoms),
+    "products": (("products",), _load_products),
+    "product_uoms": (("product_uoms", "uoms"), _load_product_uoms),
+    "customers": (("customers",), _load_parties("customers", "customer_id", True)),
+    "vendors": (("vendors",), _load_parties("vendors", "vendor_id", False)),
+    "bank_accounts": (("company_bank_accounts",), _load_bank_accounts),
+}
+
+
+class _Sections:
+    """Loaded sections of one database: section -> (table versions, data)."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.data: Dict[str, Tuple[tuple, object]] = {}
+
+
+class ReferenceData:
+    """Lazily loaded, version-checked master data, read through one connection."""
+
+    def __init__(self, conn: sqlite3.Connection, shared: Optional[_Sections] = None) -> None:
+        try:
+            self._conn_ref: Callable[[], Optional[sqlite3.Connection]] = weakref.ref(conn)
+        except TypeError:       # plain sqlite3.Connection: no weak references
+            self._conn_ref = lambda: conn
+        self._lock = threading.RLock()
+        self._shared = shared                                # per database file (None: :memory:)
+        self._own = _Sections()                              # keys only this connection can check
+        self._stamp: Optional[tuple] = None
+        self._versions: Dict[str, object] = {}
+        self.loads = 0                                       # section (re)loads, for diagnostics
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = self._conn_ref()
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return conn
+
+    # ---- change detection ----
+    def _table_versions(self) -> Dict[str, object]:
+        conn = self.conn
+        stamp = (
+            conn.total_changes,
+            conn.execute("PRAGMA data_version").fetchone()[0],
+            conn.in_transaction,
+        )
+        if stamp == self._stamp and not conn.in_transaction:
+            return self._versions
+        try:
+            versions: Dict[str, object] = {
+                str(r[0]): int(r[1])
+                for r in conn.execute("SELECT table_name, version FROM ref_data_version")
+            }
+        except sqlite3.OperationalError:
+            # No version table (ad-hoc schema): any change invalidates everything.
+            versions = {}
+        self._stamp = stamp
+        self._versions = versions
+        return versions
+
+    def _get(self, section: str):
+        tables, loader = _SECTIONS[section]
+        with self._lock:
+            versions = self._table_versions()
+            if self._shared is not None and all(t in versions for t in tables):
+                store, key = self._shared, tuple(versions[t] for t in tables)
+            else:
+                # no counters: this connection's change stamp is the only key
+                store, key = self._own, tuple(versions.get(t, self._stamp[:2]) for t in tables)
+            with store.lock:
+                hit = store.data.get(section)
+            if hit is not None and hit[0] == key:
+                return hit[1]
+            data = loader(self.conn)
+            self.loads += 1
+            if not self.conn.in_transaction:     # only committed state is kept
+                with store.lock:
+                    store.data[section] = (key, data)
+            return data
+
+    def _lookup(self, section: str, key, index: str = "by_id"):
+        try:
+            key = int(key) if index == "by_id" else (key or "").strip().lower()
+        except (TypeError, ValueError):
+            return None
+        return getattr(self._get(section), index).get(key)
+
+    def invalidate(self, *sections: str) -> None:
+        """Drop cached sections (all when none given); they reload on next use."""
+        for store in (self._own, self._shared):
+            if store is None:
+                continue
+            with store.lock:
+                for s in sections or tuple(store.data):
+                    store.data.pop(s, None)
+
+    # ---- UoMs ----
+    def uoms(self) -> Tuple[UomRef, ...]:
+        return self._get("uoms").rows
+
+    def uom(self, uom_id: int) -> Optional[UomRef]:
+        return self._lookup("uoms", uom_id)
+
+    def uom_by_name(self, unit_name: str) -> Optional[UomRef]:
+        return self._lookup("uoms", unit_name, "by_name")
+
+    # ---- products ----
+    def products(self) -> Tuple[ProductRef, ...]:
+        """All products, newest (highest id) first."""
+        return self._get("products").rows
+
+    def product(self, product_id: int) -> Optional[ProductRef]:
+        return self._lookup("products", product_id)
+
+    def product_by_name(self, name: str) -> Optional[ProductRef]:
+        return self._lookup("products", name, "by_name")
+
+    def product_names(self) -> Dict[int, str]:
+        return {p.product_id: p.name for p in self.products()}
+
+    def product_uoms(self, product_id: int) -> Tuple[ProductUomRef, ...]:
+        """UoM mappings of a product, base first, then by unit_name."""
+        return self._get("product_uoms").get(int(product_id), ())
+
+    def base_uom(self, product_id: int) -> Optional[ProductUomRef]:
+        return next((m for m in self.product_uoms(product_id) if m.is_base), None)
+
+    def factor_to_base(self, product_id: int, uom_id: int) -> Optional[float]:
+        m = next((m for m in self.product_uoms(product_id) if m.uom_id == int(uom_id)), None)
+        return m.factor_to_base if m else None
+
+    # ---- parties ----
+    def customers(self, active_only: bool = True) -> Tuple[PartyRef, ...]:
+        """Customers, newest first."""
+        rows = self._get("customers").rows
+        return tuple(c for c in rows if c.is_active) if active_only else rows
+
+    def customer(self, customer_id: int) -> Optional[PartyRef]:
+        return self._lookup("customers", customer_id)
+
+    def customer_by_name(self, name: str) -> Optional[PartyRef]:
+        return self._lookup("customers", name, "by_name")
+
+    def vendors(self) -> Tuple[PartyRef, ...]:
+        """Vendors, newest first."""
+        return self._get("vendors").rows
+
+    def vendor(self, vendor_id: int) -> Optional[PartyRef]:
+        return self._lookup("vendors", vendor_id)
+
+    def vendor_by_name(self, name: str) -> Optional[PartyRef]:
+        return self._lookup("vendors", name, "by_name")
+
+    # ---- company bank accounts ----
+    def bank_accounts(self, active_only: bool = True) -> Tuple[BankAccountRef, ...]:
+        """Company bank accounts by account_id."""
+        rows = self._get("bank_accounts").rows
+        return tuple(a for a in rows if a.is_active) if active_only else rows
+
+    def bank_account(self, account_id: int) -> Optional[BankAccountRef]:
+        return self._lookup("bank_accounts", account_id)
+
+    def bank_account_choices(self) -> List[Dict[str, object]]:
+        """Active accounts as [{id, name}] (the shape payment dialogs take), by name."""
+        return sorted(
+            ({"id": a.account_id, "name": a.label} for a in self.bank_accounts()),
+            key=lambda d: str(d["name"]).lower(),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Registry: sections per database file, a change probe per open connection
+# ---------------------------------------------------------------------------
+
+_shared: Dict[str, _Sections] = {}
+_registry: "weakref.WeakKeyDictionary[sqlite3.Connection, ReferenceData]" = weakref.WeakKeyDictionary()
+_by_id: Dict[int, ReferenceData] = {}       # connections without weak reference support
+_registry_lock = threading.Lock()
+
+
+def _sections_for(conn: sqlite3.Connection) -> Optional[_Sections]:
+    # caller holds _registry_lock
+    from .connection_pool import db_path_from_conn     # connection_pool imports this module
+
+    path = db_path_from_conn(conn)
+    if not path:
+        return None                         # :memory: is private to its connection
+    store = _shared.get(path)
+    if store is None:
+        store = _shared[path] = _Sections()
+    return store
+
+
+def reference_data(conn: sqlite3.Connection) -> ReferenceData:
+    """The reference-data cache for `conn`'s database (created on first use)."""
+    with _registry_lock:
+        try:
+            ref = _registry.get(conn)
+            if ref is None:
+                ref = _registry[conn] = ReferenceData(conn, _sections_for(conn))
+            return ref
+        except TypeError:
+            pass
+        ref = _by_id.get(id(conn))
+        if ref is None or ref._conn_ref() is not conn:
+            _prune_closed()
+            ref = _by_id[id(conn)] = ReferenceData(conn, _sections_for(conn))
+        return ref
+
+
+def _prune_closed() -> None:
+    # caller holds _registry_lock
+    for key, ref in list(_by_id.items()):
+        try:
+            ref.conn.total_changes
+        except sqlite3.ProgrammingError:
+            del _by_id[key]
+
+
+def forget(conn: sqlite3.Connection) -> None:
+    """Drop the cache of a connection that is being closed."""
+    with _registry_lock:
+        try:
+            _registry.pop(conn, None)
+        except TypeError:
+            ref = _by_id.get(id(conn))
+            if ref is not None and ref._conn_ref() is conn:
+                del _by_id[id(conn)]
+
+
+def clear_all() -> None:
+    """Drop every cache (e.g. after a database restore)."""
+    with _registry_lock:
+        _shared.clear()
+        _registry.clear()
+        _by_id.clear()
+
+
+__all__ = [
+    "UomRef",
+    "ProductRef",
+    "ProductUomRef",
+    "PartyRef",
+    "BankAccountRef",
+    "ReferenceData",
+    "reference_data",
+    "forget",
+    "clear_all",
+]
@@ -0,0 +1,288 @@
+# database/report_cache.py
+"""
+Process-wide cache of report and dashboard results.
+
+Report tabs and the dashboard re-run the same aggregate queries every time
+they are shown or their period changes back. `report_cache(conn)` returns the
+cache for the connection's database file (shared by the UI connection and the
+pooled reader connections that run reports):
+
+    cache = report_cache(con)
+    rows = cache.get_or_compute(con, "sales", params, lambda: run_report(con))
+
+Query classes decorate their methods instead, naming the counters of the
+tables the query reads (`@cached_query("sales", "customers")`).
+
+Entries are keyed by (report id, normalized parameters) and stamped with the
+table write counters in `ref_data_version` (schema.py). Triggers bump the
+master, document-header and payment counters on every write, in any
+connection; code that writes stock rows bumps 'stock' once per write
+(`bump_versions`). A result is served only while none of its counters moved,
+so a write recomputes only the reports that read the written table.
+`tables=` names those counters (default: all of them).
+
+Not cached: databases without the counter table, and lookups on a writable
+connection inside an open transaction (its uncommitted writes could be rolled
+back, and the counters with them).
+
+Eviction is LRU, bounded by entry count and by an approximate result size.
+Every caller gets its own copy of the lists and dicts of a cached result, so
+sorting or appending to one does not change what the next caller sees.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+import functools
+import sqlite3
+import sys
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from .connection_pool import db_path_from_conn
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0          # lookups that could not be cached (see module doc)
+    evictions: int = 0
+    entries: int = 0
+    approx_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        looked_up = self.hits + self.misses
+        return self.hits / looked_up if looked_up else 0.0
+
+
+def normalize_params(params: Any) -> Hashable:
+    """A hashable, order-insensitive (for mappings) form of report parameters."""
+    if isinstance(params, dict):
+        return tuple(sorted((str(k), normalize_params(v)) for k, v in params.items()))
+    if isinstance(params, (list, tuple)):
+        return tuple(normalize_params(v) for v in params)
+    if isinstance(params, (set, frozenset)):
+        return tuple(sorted((normalize_params(v) for v in params), key=repr))
+    if isinstance(params, (date, datetime)):
+        return params.isoformat()
+    if isinstance(params, str):
+        return params.strip()
+    if isinstance(params, float) and params.is_integer():
+        return int(params)
+    return params
+
+
+def _approx_size(value: Any, depth: int = 0) -> int:
+    size = sys.getsizeof(value, 64)
+    if depth > 3:
+        return size
+    if isinstance(value, dict):
+        return size + sum(_approx_size(k, depth + 1) + _approx_size(v, depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset, sqlite3.Row)):
+        return size + sum(_approx_size(v, depth + 1) for v in value)
+    return size
+
+
+def _copy_result(value: Any) -> Any:
+    """A copy of `value` sharing only its immutable parts (rows, scalars)."""
+    if isinstance(value, list):
+        return [_copy_result(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _copy_result(v) for k, v in value.items()}
+    if isinstance(value, set):
+        return {_copy_result(v) for v in value}
+    if type(value) is tuple:
+        return tuple(_copy_result(v) for v in value)
+    return value
+
+
+def bump_versions(conn: sqlite3.Connection, *tables: str) -> None:
+    """
+    Bump the write counters of `tables` once, for writes that have no counting
+    trigger (stock rows). Call it inside the writing transaction.
+    """
+    if tables:
+        conn.execute(
+            f"UPDATE ref_data_version SET version = version + 1 "
+            f"WHERE table_name IN ({','.join('?' for _ in tables)})",
+            tables,
+        )
+
+
+def data_stamp(conn: sqlite3.Connection, tables: Optional[Iterable[str]] = None) -> Optional[tuple]:
+    """
+    Current write counters of `tables` (all counted tables when None), or None
+    when results read through `conn` cannot be cached right now.
+    """
+    if conn.in_transaction and not conn.execute("PRAGMA query_only").fetchone()[0]:
+        return None
+    try:
+        rows = conn.execute("SELECT table_name, version FROM ref_data_version").fetchall()
+    except sqlite3.OperationalError:
+        return None
+    versions = {str(r[0]): int(r[1]) for r in rows}
+    if tables is None:
+        return tuple(sorted(versions.items())) or None
+    tables = tuple(tables)
+    if any(t not in versions for t in tables):
+        return None                         # a table without a counter can't be validated
+    return tuple(versions[t] for t in tables)
+
+
+class ReportCache:
+    """LRU cache of report results, validated against table write counters."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        # (report_id, params) -> (stamp, result, approx size)
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[tuple, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = CacheStats()
+
+    def get_or_compute(
+        self,
+        conn: sqlite3.Connection,
+        report_id: str,
+        params: Any,
+        compute: Callable[[], Any],
+        *,
+        tables: Optional[Iterable[str]] = None,
+    ) -> Any:
+        """
+        The cached result of `report_id` for `params`, or `compute()` (a copy
+        is stored for next time) when there is none or the data changed since.
+        `conn` is the connection `compute` reads through.
+        """
+        stamp = data_stamp(conn, tables)
+        if stamp is None:
+            with self._lock:
+                self._stats.bypassed += 1
+            return compute()
+        key = (report_id, normalize_params(params))
+        with self._lock:
+            hit = self._entries.get(key)
+            fresh = hit is not None and hit[0] == stamp
+            if fresh:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+            else:
+                self._stats.misses += 1
+        if fresh:
+            return _copy_result(hit[1])     # stored values are never mutated
+        result = compute()
+        self._store(key, stamp, _copy_result(result))
+        return result
+
+    def _store(self, key: Tuple[str, Hashable], stamp: tuple, result: Any) -> None:
+        size = _approx_size(result)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (stamp, result, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _key, (_stamp, _result, dropped) = self._entries.popitem(last=False)
+                self._bytes -= dropped
+                self._stats.evictions += 1
+
+    def invalidate(self, report_id: Optional[str] = None) -> None:
+        """Drop the entries of `report_id` (all entries when None)."""
+        with self._lock:
+            for key in [k for k in self._entries if report_id is None or k[0] == report_id]:
+                self._bytes -= self._entries.pop(key)[2]
+
+    def stats(self) -> CacheStats:
+        """A snapshot of the counters (for diagnostics)."""
+        with self._lock:
+            s = self._stats
+            return CacheStats(s.hits, s.misses, s.bypassed, s.evictions, len(self._entries), self._bytes)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ---------------------------------------------------------------------------
+# Registry: one cache per database file
+# ---------------------------------------------------------------------------
+
+# key -> (owning connection for :memory: databases, cache)
+_registry: Dict[str, Tuple[Optional[sqlite3.Connection], ReportCache]] = {}
+_registry_lock = threading.Lock()
+
+
+def report_cache(conn: sqlite3.Connection) -> ReportCache:
+    """The shared report cache for the database `conn` is open on."""
+    path = db_path_from_conn(conn)
+    # a :memory: database is private to its connection
+    key, owner = (path, None) if path else (f":memory:{id(conn)}", conn)
+    with _registry_lock:
+        entry = _registry.get(key)
+        if entry is None or entry[0] is not owner:
+            entry = _registry[key] = (owner, ReportCache())
+        return entry[1]
+
+
+def cached(
+    conn: sqlite3.Connection,
+    report_id: str,
+    params: Any,
+    compute: Callable[[], Any],
+    *,
+    tables: Optional[Iterable[str]] = None,
+) -> Any:
+    """report_cache(conn).get_or_compute(conn, ...)."""
+    return report_cache(conn).get_or_compute(conn, report_id, params, compute, tables=tables)
+
+
+def cached_query(*tables: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorator for read-only query methods of classes holding `self.conn`
+    (ReportingRepo, DashboardRepo): results are cached per method and
+    arguments, and recomputed after a write to one of `tables` (counter
+    names in ref_data_version; see schema.py for what each one covers).
+    """
+    if not tables or callable(tables[0]):
+        raise TypeError("cached_query needs the counters of the tables the query reads")
+
+    def decorate(method: Callable[..., Any]) -> Callable[..., Any]:
+        report_id = method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return cached(
+                self.conn, report_id, (args, kwargs), lambda: method(self, *args, **kwargs), tables=tables
+            )
+
+        return wrapper
+
+    return decorate
+
+
+def clear_all() -> None:
+    """Drop every cache (e.g. after a database restore)."""
+    with _registry_lock:
+        _registry.clear()
+
+
+__all__ = [
+    "CacheStats",
+    "ReportCache",
+    "normalize_params",
+    "data_stamp",
+    "bump_versions",
+    "report_cache",
+    "cached",
+    "cached_query",
+    "clear_all",
+]
@@ -5,6 +5,9 @@ import sqlite3
 from pathlib import Path
 from typing import Optional
 
+from .. import events
+from ..connection_pool import pooled_connection
+
 
 class CustomerAdvancesRepo:
     """
@@ -14,7 +17,7 @@ class CustomerAdvancesRepo:
       • Deposits and return credits ADD credit (positive amounts).
       • Applications to a sale CONSUME credit (written as negative amounts).
       • DB trigger (e.g., trg_advances_no_overdraw) prevents overall overdraw.
-      • v_customer_advance_balance view provides current balance by customer.
+      • customer_credit_balance (trigger-maintained) holds the current balance by customer.
 
     source_type values:
       - 'deposit'
@@ -22,16 +25,14 @@ class CustomerAdvancesRepo:
       - 'applied_to_sale'
     """
 
-    def __init__(self, db_path: str | Path):
-        self.db_path = str(db_path)
+    def __init__(self, db_path: str | Path | sqlite3.Connection):
+        self._source = db_path if isinstance(db_path, sqlite3.Connection) else str(db_path)
+        self.db_path = self._source if isinstance(self._source, str) else None
 
     # ---- internals --------------------------------------------------------
 
     def _connect(self) -> sqlite3.Connection:
-        con = sqlite3.connect(self.db_path)
-        con.row_factory = sqlite3.Row
-        con.execute("PRAGMA foreign_keys = ON;")
-        return con
+        return pooled_connection(self._source)
 
     @staticmethod
     def _clamp_non_negative(x: float) -> float:
@@ -191,16 +192,18 @@ class CustomerAdvancesRepo:
                     "created_by": created_by,
                 },
             )
-            return int(cur.lastrowid)
+            entry_id = int(cur.lastrowid)
+        events.publish(con, "sales", sale_id, events.UPDATE)
+        return entry_id
 
     def get_balance(self, customer_id: int) -> float:
         """
-        Fetch the current credit balance for a customer from v_customer_advance_balance.
+        Fetch the current credit balance for a customer from customer_credit_balance.
         Returns 0.0 when no rows exist.
         """
         with self._connect() as con:
             row = con.execute(
-                "SELECT balance FROM v_customer_advance_balance WHERE customer_id = ?",
+                "SELECT CAST(balance AS REAL) AS balance FROM customer_credit_balance WHERE customer_id = ?",
                 (customer_id,),
             ).fetchone()
             return float(row["balance"]) if row and row["balance"] is not None else 0.0
@@ -2,6 +2,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 import sqlite3
 
+from .. import events
+from ..refdata import PartyRef, reference_data
+from ..search import EntitySearch
+
 
 # Domain-level error the controller can surface directly (e.g., toast/snackbar)
 class DomainError(Exception):
@@ -16,6 +20,10 @@ class Customer:
     address: str | None
 
 
+def _customer(c: PartyRef) -> Customer:
+    return Customer(c.id, c.name, c.contact_info, c.address)
+
+
 class CustomersRepo:
     def __init__(self, conn: sqlite3.Connection):
         # ensure rows behave like dicts/tuples
@@ -40,68 +48,25 @@ class CustomersRepo:
 
     def list_customers(self, active_only: bool = True) -> list[Customer]:
         """
-        Returns customers. By default, only active rows (is_active=1).
+        Returns customers, newest first. By default, only active rows (is_active=1).
         Set active_only=False to include inactive as well.
+        Served from the shared reference cache (database.refdata).
         """
-        if active_only:
-            rows = self.conn.execute(
-                "SELECT customer_id, name, contact_info, address "
-                "FROM customers "
-                "WHERE is_active = 1 "
-                "ORDER BY customer_id DESC"
-            ).fetchall()
-        else:
-            rows = self.conn.execute(
-                "SELECT customer_id, name, contact_info, address "
-                "FROM customers "
-                "ORDER BY customer_id DESC"
-            ).fetchall()
-        return [Customer(**dict(r)) for r in rows]
-
-    def search(self, term: str, active_only: bool = True) -> list[Customer]:
+        return [_customer(c) for c in reference_data(self.conn).customers(active_only)]
+
+    def search(self, term: str, active_only: bool = True, limit: int = 500) -> list[Customer]:
         """
-        Server-side search over id/name/contact/address.
-        Matches using LIKE on:
-          - CAST(customer_id AS TEXT)
-          - name
-          - contact_info
-          - address
+        Server-side search over id/name/contact/address, best match first.
+        Uses the customers_fts index (prefix match per token, bm25 ranking,
+        exact id first); see database.search.
         """
-        pattern = f"%{term.strip()}%"
-        if active_only:
-            rows = self.conn.execute(
-                "SELECT customer_id, name, contact_info, address "
-                "FROM customers "
-                "WHERE is_active = 1 AND ("
-                "  CAST(customer_id AS TEXT) LIKE ? OR "
-                "  name LIKE ? OR "
-                "  contact_info LIKE ? OR "
-                "  address LIKE ?"
-                ") "
-                "ORDER BY customer_id DESC",
-                (pattern, pattern, pattern, pattern),
-            ).fetchall()
-        else:
-            rows = self.conn.execute(
-                "SELECT customer_id, name, contact_info, address "
-                "FROM customers "
-                "WHERE "
-                "  CAST(customer_id AS TEXT) LIKE ? OR "
-                "  name LIKE ? OR "
-                "  contact_info LIKE ? OR "
-                "  address LIKE ? "
-                "ORDER BY customer_id DESC",
-                (pattern, pattern, pattern, pattern),
-            ).fetchall()
-        return [Customer(**dict(r)) for r in rows]
+        ids = EntitySearch(self.conn).ids("customers", term, limit=limit, active_only=active_only)
+        ref = reference_data(self.conn)
+        return [_customer(c) for c in map(ref.customer, ids) if c is not None]
 
     def get(self, customer_id: int) -> Customer | None:
-        r = self.conn.execute(
-            "SELECT customer_id, name, contact_info, address "
-            "FROM customers WHERE customer_id=?",
-            (customer_id,),
-        ).fetchone()
-        return Customer(**dict(r)) if r else None
+        c = reference_data(self.conn).customer(customer_id)
+        return _customer(c) if c else None
 
     # ---- Mutations --------------------------------------------------------
 
@@ -123,7 +88,9 @@ class CustomersRepo:
             (name_n, contact_n, address_n),
         )
         self.conn.commit()
-        return int(cur.lastrowid)
+        customer_id = int(cur.lastrowid)
+        events.publish(self.conn, "customers", customer_id, events.INSERT)
+        return customer_id
 
     def update(self, customer_id: int, name: str, contact_info: str, address: str | None) -> None:
         """
@@ -143,6 +110,7 @@ class CustomersRepo:
             (name_n, contact_n, address_n, customer_id),
         )
         self.conn.commit()
+        events.publish(self.conn, "customers", customer_id, events.UPDATE)
 
     # def delete(self, customer_id: int) -> None:
     #     self.conn.execute("DELETE FROM customers WHERE customer_id=?", (customer_id,))
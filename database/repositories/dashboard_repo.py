@@ -4,6 +4,8 @@ from __future__ import annotations
 import sqlite3
 from typing import Any, Dict, List, Optional, Tuple
 
+from ..report_cache import cached_query
+
 
 def _to_float(x: Optional[Any]) -> float:
     try:
@@ -41,6 +43,7 @@ class DashboardRepo:
 
     # ----------------------------- Sales & P&L -----------------------------
 
+    @cached_query("sales")
     def total_sales(self, date_from: str, date_to: str) -> float:
         sql = """
             SELECT COALESCE(SUM(CAST(s.total_amount AS REAL)), 0.0) AS v
@@ -50,8 +53,9 @@ class DashboardRepo:
         """
         return _to_float(self._scalar(sql, (date_from, date_to)))
 
+    @cached_query("sales", "stock")
     def cogs_for_sales(self, date_from: str, date_to: str) -> float:
-        # sale_item_cogs already ties COGS to the sale date via its join.
+        # sale_item_cogs holds one costed row per sold line (written at posting).
         sql = """
             SELECT COALESCE(SUM(c.cogs_value), 0.0) AS v
             FROM sale_item_cogs c
@@ -61,6 +65,7 @@ class DashboardRepo:
         """
         return _to_float(self._scalar(sql, (date_from, date_to)))
 
+    @cached_query("expenses")
     def expenses_total(self, date_from: str, date_to: str) -> float:
         sql = """
             SELECT COALESCE(SUM(CAST(e.amount AS REAL)), 0.0) AS v
@@ -69,11 +74,13 @@ class DashboardRepo:
         """
         return _to_float(self._scalar(sql, (date_from, date_to)))
 
+    @cached_query("sales", "stock")
     def gross_profit(self, date_from: str, date_to: str) -> float:
         sales = self.total_sales(date_from, date_to)
         cogs = self.cogs_for_sales(date_from, date_to)
         return sales - cogs
 
+    @cached_query("sales", "stock", "expenses")
     def net_profit(self, date_from: str, date_to: str) -> float:
         sales = self.total_sales(date_from, date_to)
         cogs = self.cogs_for_sales(date_from, date_to)
@@ -82,6 +89,7 @@ class DashboardRepo:
 
     # --------------------------- Cash & Bank flows -------------------------
 
+    @cached_query("sale_payments")
     def receipts_cleared(self, date_from: str, date_to: str) -> float:
         """
         Incoming receipts that actually CLEARED in the window.
@@ -96,6 +104,7 @@ class DashboardRepo:
         """
         return _to_float(self._scalar(sql, (date_from, date_to)))
 
+    @cached_query("purchase_payments")
     def vendor_payments_cleared(self, date_from: str, date_to: str) -> float:
         """
         Outgoing payments to vendors that CLEARED in the window.
@@ -111,6 +120,7 @@ class DashboardRepo:
         """
         return _to_float(self._scalar(sql, (date_from, date_to)))
 
+    @cached_query("sale_payments", "purchase_payments", "company_bank_accounts")
     def bank_movements_by_account(
         self, date_from: str, date_to: str
     ) -> List[Dict[str, Any]]:
@@ -149,6 +159,7 @@ class DashboardRepo:
 
     # ----------------------------- AR / AP & health ------------------------
 
+    @cached_query("sales")
     def open_receivables(self) -> float:
         """
         Remaining = total_amount - (paid_amount + advance_payment_applied).
@@ -171,6 +182,7 @@ class DashboardRepo:
         """
         return _to_float(self._scalar(sql))
 
+    @cached_query("purchases")
     def open_payables(self) -> float:
         """
         Remaining for purchases = total_amount - (paid_amount + advance_payment_applied).
@@ -193,6 +205,7 @@ class DashboardRepo:
         """
         return _to_float(self._scalar(sql))
 
+    @cached_query("stock", "products")
     def low_stock_count(self) -> int:
         """
         Products with on-hand < min_stock_level.
@@ -210,6 +223,7 @@ class DashboardRepo:
         except Exception:
             return 0
 
+    @cached_query("stock", "products")
     def low_stock_rows(self, limit_n: int = 20) -> List[Dict[str, Any]]:
         sql = """
             SELECT
@@ -237,6 +251,7 @@ class DashboardRepo:
 
     # --------------------------- Leaderboards / lists -----------------------
 
+    @cached_query("sales", "products", "product_uoms")
     def top_products(
         self, date_from: str, date_to: str, limit_n: int = 5
     ) -> List[Dict[str, Any]]:
@@ -282,6 +297,7 @@ class DashboardRepo:
             for r in rows
         ]
 
+    @cached_query("sales", "customers")
     def top_customers(
         self, date_from: str, date_to: str, limit_n: int = 5
     ) -> List[Dict[str, Any]]:
@@ -312,6 +328,7 @@ class DashboardRepo:
             for r in rows
         ]
 
+    @cached_query("sales", "customers")
     def quotations_expiring(self, date_from: str, date_to: str) -> List[Dict[str, Any]]:
         """
         Quotations whose expiry_date is within [date_from, date_to] (inclusive).
@@ -344,6 +361,7 @@ class DashboardRepo:
 
     # ---------------------- Payment pipeline breakdowns --------------------
 
+    @cached_query("sale_payments")
     def sales_payments_breakdown(
         self, date_from: str, date_to: str
     ) -> List[Dict[str, Any]]:
@@ -373,6 +391,7 @@ class DashboardRepo:
             for r in rows
         ]
 
+    @cached_query("purchase_payments")
     def purchase_payments_breakdown(
         self, date_from: str, date_to: str
     ) -> List[Dict[str, Any]]:
@@ -402,6 +421,7 @@ class DashboardRepo:
 
     # --------------------------- Paid-total helpers -------------------------
 
+    @cached_query("sales")
     def sales_paid_total(self, date_from: str, date_to: str) -> float:
         """
         Sum of (paid_amount + advance_payment_applied) for sales whose *invoice date*
@@ -418,6 +438,7 @@ class DashboardRepo:
         """
         return _to_float(self._scalar(sql, (date_from, date_to)))
 
+    @cached_query("purchases")
     def purchases_paid_total(self, date_from: str, date_to: str) -> float:
         """
         Sum of (paid_amount + advance_payment_applied) for purchases whose *header date*
@@ -16,6 +16,8 @@ Conventions:
 import sqlite3
 from typing import Optional, List, Dict
 
+from ..report_cache import bump_versions
+
 
 class DomainError(Exception):
     """Domain-level error suitable for surfacing to the UI."""
@@ -234,6 +236,7 @@ class InventoryRepo:
             """,
             (int(product_id), float(quantity), int(uom_id), date, notes, created_by),
         )
+        bump_versions(self.conn, "stock")
         self.conn.commit()
         return int(cur.lastrowid)
 
@@ -4,6 +4,10 @@ from typing import Optional, Dict, List
 import sqlite3
 from contextlib import contextmanager
 
+from .. import events
+from ..refdata import reference_data
+from ..search import EntitySearch
+
 
 class DomainError(Exception):
     """Domain-level error the controller/UI can surface (toast/snackbar)."""
@@ -49,29 +53,38 @@ class ProductsRepo:
 
     # ---------------------------- Products ----------------------------
 
+    def _with_uom_names(self, products) -> list[Product]:
+        """ProductRefs -> Product rows with base/alternate UoM names (cached)."""
+        ref = reference_data(self.conn)
+        out = []
+        for p in products:
+            maps = ref.product_uoms(p.product_id)
+            base = next((m.unit_name for m in maps if m.is_base), None)
+            alts = ", ".join(m.unit_name for m in maps if not m.is_base) or None
+            out.append(Product(*p, base_uom_name=base, alt_uom_names=alts))
+        return out
+
     def list_products(self) -> list[Product]:
-        rows = self.conn.execute(
-            "SELECT "
-            "  p.product_id, p.name, p.description, p.category, p.min_stock_level, "
-            "  (SELECT u.unit_name "
-            "     FROM product_uoms pu JOIN uoms u ON u.uom_id = pu.uom_id "
-            "    WHERE pu.product_id = p.product_id AND pu.is_base = 1 "
-            "    LIMIT 1) AS base_uom_name, "
-            "  (SELECT GROUP_CONCAT(u.unit_name, ', ') "
-            "     FROM product_uoms pu JOIN uoms u ON u.uom_id = pu.uom_id "
-            "    WHERE pu.product_id = p.product_id AND pu.is_base = 0) AS alt_uom_names "
-            "FROM products p "
-            "ORDER BY p.product_id DESC"
-        ).fetchall()
-        return [Product(**dict(r)) for r in rows]
+        # newest first; served from the shared reference cache (database.refdata)
+        return self._with_uom_names(reference_data(self.conn).products())
+
+    def search(self, term: str, limit: int = 500) -> list[Product]:
+        """
+        Products matching `term` (id/name/category/description), best match
+        first, with the same UoM columns as list_products().
+        """
+        ids = EntitySearch(self.conn).ids("products", term, limit=limit)
+        ref = reference_data(self.conn)
+        return self._with_uom_names(p for p in map(ref.product, ids) if p is not None)
 
     def get(self, product_id: int) -> Product | None:
-        r = self.conn.execute(
-            "SELECT product_id, name, description, category, min_stock_level "
-            "FROM products WHERE product_id=?",
-            (product_id,),
-        ).fetchone()
-        return Product(**dict(r)) if r else None
+        p = reference_data(self.conn).product(product_id)
+        return Product(*p) if p else None
+
+    def get_listed(self, product_id: int) -> Product | None:
+        """One product with the UoM columns of list_products() (live list updates)."""
+        p = reference_data(self.conn).product(product_id)
+        return self._with_uom_names([p])[0] if p else None
 
     def create(
         self,
@@ -86,7 +99,9 @@ class ProductsRepo:
                 "VALUES (?, ?, ?, ?)",
                 (name, description, category, min_stock_level),
             )
-            return int(cur.lastrowid)
+        product_id = int(cur.lastrowid)
+        events.publish(self.conn, "products", product_id, events.INSERT)
+        return product_id
 
     def update(
         self,
@@ -103,6 +118,7 @@ class ProductsRepo:
                 "WHERE product_id=?",
                 (name, description, category, min_stock_level, product_id),
             )
+        events.publish(self.conn, "products", product_id, events.UPDATE)
 
     def _product_is_referenced(self, product_id: int) -> bool:
         """
@@ -138,6 +154,7 @@ class ProductsRepo:
             )
         with self._immediate_tx():
             self.conn.execute("UPDATE products SET is_active=0 WHERE product_id=?", (product_id,))
+        events.publish(self.conn, "products", product_id, events.UPDATE)
 
     def delete(self, product_id: int) -> None:
         """
@@ -155,14 +172,12 @@ class ProductsRepo:
             # and by schema triggers on product_uoms when transactions exist.
             self.conn.execute("DELETE FROM product_uoms WHERE product_id=?", (product_id,))
             self.conn.execute("DELETE FROM products WHERE product_id=?", (product_id,))
+        events.publish(self.conn, "products", product_id, events.DELETE)
 
     # ---------------------------- UOMs & product_uoms ----------------------------
 
     def list_uoms(self) -> List[Dict]:
-        cur = self.conn.execute(
-            "SELECT uom_id, unit_name FROM uoms ORDER BY unit_name"
-        )
-        return [dict(r) for r in cur.fetchall()]
+        return [u._asdict() for u in reference_data(self.conn).uoms()]
 
     def add_uom(self, unit_name: str) -> int:
         """
@@ -192,49 +207,16 @@ class ProductsRepo:
             return int(row["uom_id"])
 
     def product_uoms(self, product_id: int) -> List[Dict]:
-        cur = self.conn.execute(
-            """
-            SELECT
-              pu.product_uom_id, pu.product_id, u.uom_id, u.unit_name,
-              pu.is_base, CAST(pu.factor_to_base AS REAL) AS factor_to_base
-            FROM product_uoms pu
-            JOIN uoms u ON u.uom_id = pu.uom_id
-            WHERE pu.product_id=?
-            ORDER BY pu.is_base DESC, u.unit_name
-            """,
-            (product_id,),
-        )
-        return [dict(r) for r in cur.fetchall()]
+        """UoM mappings of a product (base first), from the reference cache."""
+        return [m._asdict() for m in reference_data(self.conn).product_uoms(product_id)]
 
     def list_product_uoms(self, product_id: int) -> List[Dict]:
         """Expose all UoMs for a product with factors (base-first)."""
-        cur = self.conn.execute(
-            """
-            SELECT
-              pu.product_id, pu.uom_id, pu.is_base,
-              CAST(pu.factor_to_base AS REAL) AS factor_to_base,
-              u.unit_name
-            FROM product_uoms pu
-            JOIN uoms u ON u.uom_id = pu.uom_id
-            WHERE pu.product_id = ?
-            ORDER BY pu.is_base DESC, u.unit_name
-            """,
-            (product_id,),
-        )
-        return [dict(r) for r in cur.fetchall()]
+        return self.product_uoms(product_id)
 
     def get_base_uom(self, product_id: int) -> Optional[Dict]:
-        row = self.conn.execute(
-            """
-            SELECT u.uom_id, u.unit_name
-            FROM product_uoms pu
-            JOIN uoms u ON u.uom_id = pu.uom_id
-            WHERE pu.product_id=? AND pu.is_base=1
-            LIMIT 1
-            """,
-            (product_id,),
-        ).fetchone()
-        return dict(row) if row else None
+        m = reference_data(self.conn).base_uom(product_id)
+        return {"uom_id": m.uom_id, "unit_name": m.unit_name} if m else None
 
     def set_base_uom(self, product_id: int, uom_id: int) -> None:
         with self._immediate_tx():
@@ -248,6 +230,7 @@ class ProductsRepo:
                 """,
                 (product_id, uom_id),
             )
+        events.publish(self.conn, "products", product_id, events.UPDATE)
 
     def add_alt_uom(self, product_id: int, uom_id: int, factor_to_base: float) -> None:
         with self._immediate_tx():
@@ -261,16 +244,20 @@ class ProductsRepo:
                 """,
                 (product_id, uom_id, factor_to_base),
             )
+        events.publish(self.conn, "products", product_id, events.UPDATE)
 
     def remove_alt_uom(self, product_uom_id: int) -> None:
+        row = self.conn.execute(
+            "SELECT product_id FROM product_uoms WHERE product_uom_id=?", (product_uom_id,)
+        ).fetchone()
         with self._immediate_tx():
             self.conn.execute("DELETE FROM product_uoms WHERE product_uom_id=?", (product_uom_id,))
+        if row is not None:
+            events.publish(self.conn, "products", int(row["product_id"]), events.UPDATE)
 
     def uom_by_id(self, uom_id: int) -> Optional[Dict]:
-        row = self.conn.execute(
-            "SELECT uom_id, unit_name FROM uoms WHERE uom_id=?", (uom_id,)
-        ).fetchone()
-        return dict(row) if row else None
+        u = reference_data(self.conn).uom(uom_id)
+        return u._asdict() if u else None
 
     # ---------------- Latest prices & stock in BASE UoM ----------------
 
@@ -294,12 +281,7 @@ class ProductsRepo:
         if not row:
             return {"cost": 0.0, "sale": 0.0, "date": None}
 
-        frow = self.conn.execute(
-            "SELECT CAST(factor_to_base AS REAL) AS f "
-            "FROM product_uoms WHERE product_id=? AND uom_id=?",
-            (product_id, row["uom_id"]),
-        ).fetchone()
-        f = float(frow["f"]) if frow else 1.0
+        f = reference_data(self.conn).factor_to_base(product_id, row["uom_id"]) or 1.0
 
         return {
             "cost": float(row["purchase_price"]) / f,
@@ -2,6 +2,7 @@ from __future__ import annotations
 import sqlite3
 from typing import Optional
 
+from .. import events
 from .vendor_advances_repo import VendorAdvancesRepo
 
 
@@ -135,6 +136,7 @@ class PurchasePaymentsRepo:
             ),
         )
         # Note: This method does not commit; caller is responsible for transaction management
+        events.publish(self.conn, "purchases", purchase_id, events.UPDATE)
         return payment_id
 
     def update_clearing_state(
@@ -157,6 +159,11 @@ class PurchasePaymentsRepo:
         params.append(payment_id)
         sql = f"UPDATE purchase_payments SET {', '.join(sets)} WHERE payment_id = ?"
         cur = self.conn.execute(sql, params)
+        row = self.conn.execute(
+            "SELECT purchase_id FROM purchase_payments WHERE payment_id = ?", (payment_id,)
+        ).fetchone()
+        if row is not None:
+            events.publish(self.conn, "purchases", row["purchase_id"], events.UPDATE)
         return cur.rowcount
 
     def list_payments(self, purchase_id: str) -> list[dict]:
@@ -1,7 +1,11 @@
 from __future__ import annotations
 from dataclasses import dataclass
 import sqlite3
-from typing import Iterable, Optional
+from typing import Iterable, Optional, Sequence
+
+from .. import events
+from ..keyset import DEFAULT_PAGE_SIZE, Cursor, page_query, resolve_sort
+from ..report_cache import bump_versions
 
 # For settlements
 from ...database.repositories.purchase_payments_repo import PurchasePaymentsRepo
@@ -39,6 +43,8 @@ class PurchasesRepo:
         # ensure rows behave like dicts/tuples
         conn.row_factory = sqlite3.Row
         self.conn = conn
+        # (query, field) -> search_filter() result of the list being paged
+        self._page_filter: tuple[tuple[str, str], tuple[str, list]] | None = None
 
     # ---------- Query ----------
     def list_purchases(self) -> list[dict]:
@@ -55,6 +61,122 @@ class PurchasesRepo:
         """
         return self.conn.execute(sql).fetchall()
 
+    # Sort keys accepted by page_purchases (result column name -> SQL expression)
+    PAGE_SORT_KEYS = {
+        "purchase_id": "p.purchase_id",
+        "date": "p.date",
+        "vendor_name": "v.name",
+        "total_amount": "CAST(p.total_amount AS REAL)",
+        "paid_total": "(CAST(p.paid_amount AS REAL) + CAST(p.advance_payment_applied AS REAL))",
+        "payment_status": "p.payment_status",
+    }
+
+    # Search fields accepted by page_purchases / search_filter:
+    #   field -> (purchases_fts column or None for all, fallback LIKE columns)
+    SEARCH_FIELDS = {
+        "all": (None, ("p.purchase_id", "p.date", "v.name", "CAST(p.total_amount AS TEXT)",
+                       "CAST(p.paid_amount AS TEXT)", "p.payment_status")),
+        "id": ("purchase_id", ("p.purchase_id",)),
+        "vendor": ("vendor_name", ("v.name",)),
+        "status": ("payment_status", ("p.payment_status",)),
+    }
+
+    # The trigram index only answers patterns of 3+ characters
+    _FTS_MIN_CHARS = 3
+    # A pattern matching at least this many purchases is "dense": scanning in
+    # page order with LIKE finds a page of hits sooner than collecting every
+    # matching rowid from the index first.
+    _FTS_DENSE_MATCHES = 2000
+
+    def search_filter(self, query: str, field: str = "all") -> tuple[str, list]:
+        """
+        WHERE fragment (aliases p = purchases, v = vendors) and params for a
+        case-insensitive substring search on `field` ('all', 'id', 'vendor',
+        'status'). ("", []) for no query.
+
+        Selective patterns use the purchases_fts trigram index. Patterns under
+        3 characters, or matching _FTS_DENSE_MATCHES+ rows (checked with a
+        bounded probe of the index), use LIKE on the base columns instead.
+        """
+        query = (query or "").strip()
+        if not query:
+            return "", []
+        column, like_cols = self.SEARCH_FIELDS.get(field, self.SEARCH_FIELDS["all"])
+        if len(query) >= self._FTS_MIN_CHARS:
+            phrase = '"' + query.replace('"', '""') + '"'
+            match = f"{column} : {phrase}" if column else phrase
+            probe = self.conn.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM purchases_fts WHERE purchases_fts MATCH ? LIMIT ?)",
+                (match, self._FTS_DENSE_MATCHES),
+            ).fetchone()[0]
+            if probe < self._FTS_DENSE_MATCHES:
+                return (
+                    "p.rowid IN (SELECT rowid FROM purchases_fts WHERE purchases_fts MATCH ?)",
+                    [match],
+                )
+        return (
+            "(" + " OR ".join(f"{c} LIKE ?" for c in like_cols) + ")",
+            [f"%{query}%"] * len(like_cols),
+        )
+
+    def page_purchases(
+        self,
+        *,
+        query: str = "",
+        field: str = "all",
+        sort: str = "date",
+        descending: bool = True,
+        after: Cursor | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        ids: Sequence[str] | None = None,
+    ) -> list[dict]:
+        """
+        One keyset page of purchases ordered by (`sort`, purchase_id).
+        `after` is (row[sort], row['purchase_id']) of the last row of the
+        previous page; None for the first page. `query` is a case-insensitive
+        substring match on `field` ('all', 'id', 'vendor' or 'status'),
+        see search_filter(). `ids` restricts the page to those purchases
+        (re-reading changed rows for a live list).
+
+        The search filter (and its dense-match probe) is worked out on the
+        first page of a query and reused for later pages and `ids` re-reads
+        of the same query.
+        """
+        where: list[str] = []
+        params: list = []
+        key = ((query or "").strip(), field)
+        if (after is None and ids is None) or self._page_filter is None or self._page_filter[0] != key:
+            self._page_filter = (key, self.search_filter(query, field))
+        clause, clause_params = self._page_filter[1]
+        if clause:
+            where.append(clause)
+            params += clause_params
+        if ids is not None:
+            where.append(f"p.purchase_id IN ({','.join('?' * len(ids))})" if ids else "0")
+            params += list(ids)
+
+        sql, args = page_query(
+            """
+            SELECT p.purchase_id, p.date, p.vendor_id, v.name AS vendor_name,
+                   CAST(p.total_amount AS REAL) AS total_amount,
+                   CAST(p.order_discount AS REAL) AS order_discount,
+                   p.payment_status, CAST(p.paid_amount AS REAL) AS paid_amount,
+                   CAST(p.advance_payment_applied AS REAL) AS advance_payment_applied,
+                   (CAST(p.paid_amount AS REAL) + CAST(p.advance_payment_applied AS REAL)) AS paid_total,
+                   p.notes
+            FROM purchases p
+            JOIN vendors v ON v.vendor_id = p.vendor_id
+            """,
+            where,
+            params,
+            sort_expr=resolve_sort(sort, self.PAGE_SORT_KEYS),
+            id_expr="p.purchase_id",
+            descending=descending,
+            after=after,
+            limit=limit,
+        )
+        return self.conn.execute(sql, args).fetchall()
+
     def get_header(self, pid: str) -> dict | None:
         return self.conn.execute("SELECT * FROM purchases WHERE purchase_id=?", (pid,)).fetchone()
 
@@ -223,6 +345,8 @@ class PurchasesRepo:
                 ),
             )
             next_seq += 10
+        bump_versions(self.conn, "stock")
+        events.publish(self.conn, "purchases", header.purchase_id, events.INSERT)
 
     def update_purchase(self, header: PurchaseHeader, items: Iterable[PurchaseItem]):
         """
@@ -309,6 +433,8 @@ class PurchasesRepo:
                 ),
             )
             next_seq += 10
+        bump_versions(self.conn, "stock")
+        events.publish(self.conn, "purchases", header.purchase_id, events.UPDATE)
 
     # ---------- Returns ----------
     def record_return(
@@ -413,6 +539,7 @@ class PurchasesRepo:
             )
             inserted_txn_ids.append(int(cur.lastrowid))
             seq += 10
+        bump_versions(self.conn, "stock")
 
         # Compute return monetary value using the view for the inserted txns
         if inserted_txn_ids:
@@ -480,6 +607,7 @@ class PurchasesRepo:
                 f"Returned items with total value of {return_value:g}. Lines: {len(lines)}",
             ),
         )
+        events.publish(self.conn, "purchases", pid, events.UPDATE)
 
     # ---------- Hard delete ----------
     def _delete_purchase_content(self, pid: str):
@@ -494,6 +622,8 @@ class PurchasesRepo:
         # no implicit commit; caller controls transaction
         self._delete_purchase_content(pid)
         self.conn.execute("DELETE FROM purchases WHERE purchase_id=?", (pid,))
+        bump_versions(self.conn, "stock")
+        events.publish(self.conn, "purchases", pid, events.DELETE)
 
     # ---------- Vendor-scoped listings & summaries ----------
     def list_purchases_by_vendor(
@@ -532,19 +662,21 @@ class PurchasesRepo:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
     ) -> dict:
+        # fact_purchases_daily order-level rows (schema.py) carry each purchase's
+        # total / paid / advance applied on its purchase date
         row = self.conn.execute(
             "\n".join(
                 [
                     """
                     SELECT
-                      COALESCE(SUM(CAST(p.total_amount AS REAL)), 0.0)           AS purchases_total,
-                      COALESCE(SUM(CAST(p.paid_amount AS REAL)), 0.0)             AS paid_total,
-                      COALESCE(SUM(CAST(p.advance_payment_applied AS REAL)), 0.0) AS advance_applied_total
-                    FROM purchases p
-                    WHERE p.vendor_id = ?
+                      COALESCE(SUM(f.spend), 0.0)           AS purchases_total,
+                      COALESCE(SUM(f.paid), 0.0)            AS paid_total,
+                      COALESCE(SUM(f.advance_applied), 0.0) AS advance_applied_total
+                    FROM fact_purchases_daily f
+                    WHERE f.vendor_id = ? AND f.product_id = 0
                     """,
-                    "AND DATE(p.date) >= DATE(?)" if date_from else "",
-                    "AND DATE(p.date) <= DATE(?)" if date_to else "",
+                    "AND f.day >= DATE(?)" if date_from else "",
+                    "AND f.day <= DATE(?)" if date_to else "",
                 ]
             ),
             ([vendor_id] + ([date_from] if date_from else []) + ([date_to] if date_to else [])),
@@ -704,6 +836,7 @@ class PurchasesRepo:
         remaining = max(0.0, total_calc - cleared_paid - adv_applied)
         if remaining <= 1e-9:  # Using the same epsilon as in the controller
             self.conn.execute("UPDATE purchases SET payment_status = 'paid' WHERE purchase_id = ?;", (purchase_id,))
+        events.publish(self.conn, "purchases", purchase_id, events.UPDATE)
 
     def get_open_purchases_for_vendor(self, vendor_id: int) -> list[dict]:
         """
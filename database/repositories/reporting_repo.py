@@ -4,6 +4,25 @@ from __future__ import annotations
 import sqlite3
 from typing import Optional, Sequence
 
+from ..report_cache import cached_query
+
+# Default aging buckets in days: (lo, hi) inclusive, hi=None open-ended
+AGING_BUCKETS: tuple[tuple[int, Optional[int]], ...] = ((0, 30), (31, 60), (61, 90), (91, None))
+
+# Counters behind fact_sales_daily: its triggers read sales / sale_items,
+# sale_item_cogs (replayed by valuation repair) and products.category
+_SALES_FACTS = ("sales", "stock", "products")
+
+
+def aging_bucket_label(lo: int, hi: Optional[int]) -> str:
+    """'0-30', '91+' (display label of an aging bucket)."""
+    return f"{lo}+" if hi is None else f"{lo}-{hi}"
+
+
+def aging_bucket_key(lo: int, hi: Optional[int]) -> str:
+    """'b_0_30', 'b_91_plus' (row key read by AgingSnapshotTableModel)."""
+    return "b_" + aging_bucket_label(lo, hi).replace("-", "_").replace("+", "_plus")
+
 
 class ReportingRepo:
     """
@@ -15,8 +34,9 @@ class ReportingRepo:
                 purchases, purchase_payments, vendor_advances,
                 expenses, expense_categories,
                 inventory_transactions, product_uoms,
-                stock_valuation_history
-      - Views:  sale_detailed_totals, v_stock_on_hand, sale_item_cogs
+                stock_valuation_history, sale_item_cogs,
+                fact_sales_daily (sales / margin reports)
+      - Views:  sale_detailed_totals, v_stock_on_hand
 
     Notes on date handling:
       • All ORDER BY clauses sort directly on the date/timestamp column (no DATE() wrapper)
@@ -48,6 +68,7 @@ class ReportingRepo:
     # -------------------------- AGING (AP / AR) ---------------------------
     # ----------------------------------------------------------------------
 
+    @cached_query("purchases")
     def vendor_headers_as_of(self, vendor_id: int, as_of: str) -> list[sqlite3.Row]:
         """
         Purchase headers for remaining due calc as of a cutoff (inclusive).
@@ -67,6 +88,7 @@ class ReportingRepo:
         """
         return list(self.conn.execute(sql, (vendor_id, as_of)))
     
+    @cached_query("purchases")
     def vendor_headers_as_of_batch(self, vendor_ids: list[int], as_of: str) -> list[sqlite3.Row]:
         """
         Purchase headers for remaining due calc as of a cutoff for multiple vendors.
@@ -93,6 +115,7 @@ class ReportingRepo:
         params = vendor_ids + [as_of]
         return list(self.conn.execute(sql, params))
 
+    @cached_query("vendor_advances")
     def vendor_credit_as_of_batch(self, vendor_ids: list[int], as_of: str) -> dict[int, float]:
         """
         Get vendor credit for multiple vendor IDs as of a specific date.
@@ -117,6 +140,7 @@ class ReportingRepo:
             result[int(row["vendor_id"])] = float(row["credit"])
         return result
 
+    @cached_query("vendor_advances")
     def vendor_credit_as_of(self, vendor_id: int, as_of: str) -> float:
         sql = """
         SELECT COALESCE(SUM(CAST(va.amount AS REAL)), 0.0) AS credit
@@ -127,6 +151,7 @@ class ReportingRepo:
         row = self.conn.execute(sql, (vendor_id, as_of)).fetchone()
         return float(row["credit"] if row and row["credit"] is not None else 0.0)
 
+    @cached_query("sales")
     def customer_headers_as_of(self, customer_id: int, as_of: str) -> list[sqlite3.Row]:
         """
         Sales headers (doc_type='sale') for remaining due calc as of cutoff.
@@ -146,6 +171,7 @@ class ReportingRepo:
         """
         return list(self.conn.execute(sql, (customer_id, as_of)))
     
+    @cached_query("sales")
     def customer_headers_as_of_batch(self, customer_ids: list[int], as_of: str) -> list[sqlite3.Row]:
         """
         Sales headers (doc_type='sale') for remaining due calc as of cutoff for multiple customers.
@@ -173,6 +199,7 @@ class ReportingRepo:
         params = customer_ids + [as_of]
         return list(self.conn.execute(sql, params))
 
+    @cached_query("customer_advances")
     def customer_credit_as_of_batch(self, customer_ids: list[int], as_of: str) -> dict[int, float]:
         """
         Get customer credit for multiple customer IDs as of a specific date.
@@ -197,6 +224,7 @@ class ReportingRepo:
             result[int(row["customer_id"])] = float(row["credit"])
         return result
 
+    @cached_query("customer_advances")
     def customer_credit_as_of(self, customer_id: int, as_of: str) -> float:
         sql = """
         SELECT COALESCE(SUM(CAST(ca.amount AS REAL)), 0.0) AS credit
@@ -207,10 +235,139 @@ class ReportingRepo:
         row = self.conn.execute(sql, (customer_id, as_of)).fetchone()
         return float(row["credit"] if row and row["credit"] is not None else 0.0)
 
+    # ---- Set-based aging engine ----
+
+    # party -> (document table, party column, extra document filter, party table, credit ledger)
+    _AGING_SOURCES = {
+        "customer": ("sales", "customer_id", "AND d.doc_type = 'sale'", "customers", "customer_advances"),
+        "vendor": ("purchases", "vendor_id", "", "vendors", "vendor_advances"),
+    }
+
+    def _aging_sql(
+        self,
+        party: str,
+        as_of: str,
+        buckets: Sequence[tuple[int, Optional[int]]],
+        party_id: Optional[int],
+    ) -> tuple[str, list[object]]:
+        if party not in self._AGING_SOURCES:
+            raise ValueError(f"Unknown aging party {party!r} (expected 'customer' or 'vendor')")
+        doc_table, party_col, doc_filter, party_table, ledger = self._AGING_SOURCES[party]
+
+        # One CASE picks each document's bucket, so the first matching bucket wins
+        # (like the per-row loop this replaces) and overlapping buckets never
+        # count a document twice; hi=None is open-ended.
+        when_sql: list[str] = []
+        bucket_params: list[object] = []
+        for i, (lo, hi) in enumerate(buckets):
+            if hi is None:
+                when_sql.append(f"WHEN age >= ? THEN {i}")
+                bucket_params.append(int(lo))
+            else:
+                when_sql.append(f"WHEN age BETWEEN ? AND ? THEN {i}")
+                bucket_params += [int(lo), int(hi)]
+        bucket_case = f"CASE {' '.join(when_sql)} END" if when_sql else "NULL"
+        bucket_sql = "".join(
+            f",\n                   SUM(CASE WHEN bucket = {i} THEN remaining ELSE 0.0 END) AS b{i}"
+            for i in range(len(buckets))
+        )
+
+        params: list[object] = [as_of, as_of]
+        party_filter = ""
+        if party_id is not None:
+            party_filter = f"AND d.{party_col} = ?"
+            params.append(party_id)
+        params += bucket_params
+        params.append(as_of)
+
+        sql = f"""
+        WITH docs AS (
+            SELECT d.{party_col} AS party_id,
+                   CAST(julianday(?) - julianday(DATE(d.date)) AS INTEGER) AS age,
+                   CAST(d.total_amount AS REAL)
+                     - CAST(d.paid_amount AS REAL)
+                     - CAST(d.advance_payment_applied AS REAL) AS remaining
+            FROM {doc_table} d
+            WHERE d.date <= ?
+              {doc_filter}
+              {party_filter}
+        ),
+        bucketed AS (
+            SELECT party_id, remaining, {bucket_case} AS bucket
+            FROM docs
+            WHERE remaining > 1e-9
+        ),
+        due AS (
+            SELECT party_id,
+                   SUM(remaining) AS total_due{bucket_sql}
+            FROM bucketed
+            GROUP BY party_id
+        )
+        SELECT
+            due.*,
+            p.name AS name,
+            COALESCE((
+                SELECT SUM(CAST(l.amount AS REAL))
+                FROM {ledger} l
+                WHERE l.{party_col} = due.party_id AND l.tx_date <= ?
+            ), 0.0) AS available_credit
+        FROM due
+        JOIN {party_table} p ON p.{party_col} = due.party_id
+        ORDER BY p.name COLLATE NOCASE, due.party_id
+        """
+        return sql, params
+
+    def aging_snapshot_iter(
+        self,
+        party: str,
+        as_of: str,
+        buckets: Sequence[tuple[int, Optional[int]]] = AGING_BUCKETS,
+        party_id: Optional[int] = None,
+    ) -> Iterable[sqlite3.Row]:
+        """
+        AR ('customer') / AP ('vendor') aging as of a cutoff, computed in one
+        grouped query: one row per party with an open balance, ordered by name.
+        Columns: party_id, name, total_due, b0..b{n-1} (one per bucket),
+        available_credit (Σ advances ledger up to the cutoff).
+
+        Documents dated <= as_of with remaining = total - paid - advance_applied > 0
+        are aged in days and put in the first (lo, hi) bucket containing the age
+        (hi=None: open-ended). The parameter count is fixed, whatever the number of
+        parties; rows are yielded as the cursor produces them.
+        """
+        sql, params = self._aging_sql(party, as_of, buckets, party_id)
+        cursor = self.conn.execute(sql, params)
+        for row in cursor:
+            yield row
+
+    @cached_query("sales", "purchases")
+    def open_due_total_as_of(self, party: str, as_of: str) -> float:
+        """Σ positive remaining due of all customer ('customer') or vendor ('vendor') documents."""
+        if party not in self._AGING_SOURCES:
+            raise ValueError(f"Unknown aging party {party!r} (expected 'customer' or 'vendor')")
+        doc_table, _party_col, doc_filter, _party_table, _ledger = self._AGING_SOURCES[party]
+        row = self.conn.execute(
+            f"""
+            SELECT COALESCE(SUM(remaining), 0.0) AS total
+            FROM (
+                SELECT CAST(d.total_amount AS REAL)
+                         - CAST(d.paid_amount AS REAL)
+                         - CAST(d.advance_payment_applied AS REAL) AS remaining
+                FROM {doc_table} d
+                WHERE d.date <= ?
+                  {doc_filter}
+            )
+            WHERE remaining > 0
+            """,
+            (as_of,),
+        ).fetchone()
+        return float(row["total"] or 0.0)
+
     # ----------------------------------------------------------------------
     # ------------------------------ EXPENSES ------------------------------
     # ----------------------------------------------------------------------
 
+    @cached_query("expenses", "expense_categories")
     def expense_summary_by_category(
         self, date_from: str, date_to: str, category_id: Optional[int]
     ) -> list[sqlite3.Row]:
@@ -273,6 +430,7 @@ class ReportingRepo:
         for row in cursor:
             yield row
 
+    @cached_query("expenses", "expense_categories")
     def expense_lines(
         self, date_from: str, date_to: str, category_id: Optional[int]
     ) -> list[sqlite3.Row]:
@@ -337,6 +495,7 @@ class ReportingRepo:
     # ------------------------------ INVENTORY -----------------------------
     # ----------------------------------------------------------------------
 
+    @cached_query("stock", "products")
     def stock_on_hand_current(self) -> list[sqlite3.Row]:
         """
         Current snapshot from v_stock_on_hand.
@@ -379,6 +538,7 @@ class ReportingRepo:
         for row in cursor:
             yield row
 
+    @cached_query("stock", "products")
     def stock_on_hand_as_of(self, as_of: str) -> list[sqlite3.Row]:
         """
         Latest valuation row per product where valuation_date <= as_of.
@@ -435,6 +595,7 @@ class ReportingRepo:
         for row in cursor:
             yield row
 
+    @cached_query("stock", "product_uoms")
     def inventory_transactions(self, date_from: str, date_to: str, product_id: int | None) -> list[sqlite3.Row]:
         """
         Return transactions with base-qty conversion.
@@ -498,6 +659,7 @@ class ReportingRepo:
         for row in cursor:
             yield row
 
+    @cached_query("stock")
     def valuation_history(self, product_id: int, limit: int) -> list[sqlite3.Row]:
         """
         Latest N valuation rows for a product.
@@ -520,6 +682,7 @@ class ReportingRepo:
     # ------------------------------ FINANCIALS ----------------------------
     # ----------------------------------------------------------------------
 
+    @cached_query("sales")
     def revenue_total(self, date_from: str, date_to: str) -> float:
         """
         Revenue over period by sales.date; doc_type='sale' only.
@@ -539,9 +702,10 @@ class ReportingRepo:
         row = self.conn.execute(sql, (date_from, date_to)).fetchone()
         return float(row["rev"] if row and row["rev"] is not None else 0.0)
 
+    @cached_query("sales", "stock")
     def cogs_total(self, date_from: str, date_to: str) -> float:
         """
-        Use sale_item_cogs view (moving-average at sale date; doc_type='sale' only).
+        Use sale_item_cogs (moving-average cost captured at posting; doc_type='sale' only).
         """
         sql = """
         SELECT COALESCE(SUM(c.cogs_value), 0.0) AS cogs
@@ -553,6 +717,7 @@ class ReportingRepo:
         row = self.conn.execute(sql, (date_from, date_to)).fetchone()
         return float(row["cogs"] if row and row["cogs"] is not None else 0.0)
 
+    @cached_query("expenses", "expense_categories")
     def expenses_by_category(self, date_from: str, date_to: str) -> list[sqlite3.Row]:
         """
         Detailed expense totals by category for P&L middle block.
@@ -572,6 +737,7 @@ class ReportingRepo:
         """
         return list(self.conn.execute(sql, (date_from, date_to)))
 
+    @cached_query("sale_payments")
     def sale_collections_by_day(self, date_from: str, date_to: str) -> list[sqlite3.Row]:
         """
         Cash collections grouped by cleared_date from sale_payments (clearing_state='cleared').
@@ -589,6 +755,7 @@ class ReportingRepo:
         """
         return list(self.conn.execute(sql, (date_from, date_to)))
 
+    @cached_query("purchase_payments")
     def purchase_disbursements_by_day(self, date_from: str, date_to: str) -> list[sqlite3.Row]:
         """
         Cash disbursements grouped by cleared_date from purchase_payments (clearing_state='cleared').
@@ -651,6 +818,7 @@ class ReportingRepo:
 
     # ---- Lists & lookups ----
 
+    @cached_query("products")
     def get_product_categories(self) -> list[sqlite3.Row]:
         """
         Distinct non-empty categories from products.
@@ -665,6 +833,7 @@ class ReportingRepo:
         """
         return list(self.conn.execute(sql))
     
+    @cached_query("customers")
     def get_all_customers(self) -> list[sqlite3.Row]:
         """
         Get all customers with id and name for batch operations.
@@ -677,6 +846,7 @@ class ReportingRepo:
         """
         return list(self.conn.execute(sql))
     
+    @cached_query("vendors")
     def get_all_vendors(self) -> list[sqlite3.Row]:
         """
         Get all vendors with id and name for batch operations.
@@ -689,8 +859,67 @@ class ReportingRepo:
         """
         return list(self.conn.execute(sql))
 
+    # ---- Sales facts ----
+    # The sales / margin reports below read fact_sales_daily (schema.py), which
+    # triggers keep current. product_id 0 rows carry order totals (after order
+    # discount), order counts and COGS; product rows carry line revenue, base
+    # quantity, COGS and the number of sales containing the product. With a
+    # product or category filter the order-level reports sum the matching
+    # product rows instead, i.e. report the sales of those products.
+
+    @staticmethod
+    def _fact_where(
+        date_from: str,
+        date_to: str,
+        statuses: Optional[Sequence[str]],
+        customer_id: Optional[int],
+        product_id: Optional[int] = None,
+        category: Optional[str] = None,
+        *,
+        products: bool = False,
+    ) -> tuple[str, list[object]]:
+        """
+        WHERE clause over fact_sales_daily f: order-level rows (products=False and
+        no product filter) or product rows.
+        """
+        if products or product_id is not None or category:
+            where, params = " WHERE f.product_id > 0 ", []
+            if product_id is not None:
+                where += " AND f.product_id = ? "
+                params.append(product_id)
+            if category:
+                where += " AND COALESCE(f.category,'') = ? "
+                params.append(category)
+        else:
+            where, params = " WHERE f.product_id = 0 ", []
+        where += " AND f.day >= ? AND f.day <= ? "
+        params += [date_from, date_to]
+        if statuses:
+            where += f" AND f.payment_status IN ({','.join('?' for _ in statuses)}) "
+            params += list(statuses)
+        if customer_id is not None:
+            where += " AND f.customer_id = ? "
+            params.append(customer_id)
+        return where, params
+
+    _MARGIN_COLUMNS = """
+          r.revenue,
+          r.cogs,
+          (r.revenue - r.cogs) AS gross,
+          CASE WHEN r.revenue = 0 THEN 0.0 ELSE (r.revenue - r.cogs) / r.revenue END AS margin_pct
+    """
+
+    @staticmethod
+    def _period_format(granularity: str) -> str:
+        return {
+            "daily": "%Y-%m-%d",
+            "monthly": "%Y-%m",
+            "yearly": "%Y",
+        }.get(granularity, "%Y-%m-%d")
+
     # ---- Sales by period (daily/monthly/yearly) ----
 
+    @cached_query(*_SALES_FACTS)
     def sales_by_period(
         self,
         date_from: str,
@@ -701,46 +930,23 @@ class ReportingRepo:
         product_id: Optional[int],
         category: Optional[str],
     ) -> list[sqlite3.Row]:
-        fmt = {
-            "daily": "%Y-%m-%d",
-            "monthly": "%Y-%m",
-            "yearly": "%Y",
-        }.get(granularity, "%Y-%m-%d")
-
-        params: list[object] = [date_from, date_to]
-        where = " WHERE s.doc_type = 'sale' AND s.date >= ? AND s.date <= ? "
-
-        # optional filters
-        sw, sp = self._statuses_where(statuses)
-        where += sw
-        params += sp
-
-        cw, cp = self._customer_where(customer_id)
-        where += cw
-        params += cp
-
-        pw, pp_ = self._product_exists_where(product_id)
-        where += pw
-        params += pp_
-
-        kw, kp = self._category_exists_where(category)
-        where += kw
-        params += kp
-
+        fmt = self._period_format(granularity)
+        where, params = self._fact_where(date_from, date_to, statuses, customer_id, product_id, category)
         sql = f"""
         SELECT
-          STRFTIME('{fmt}', DATE(s.date)) AS period,
-          COUNT(*)                         AS order_count,
-          COALESCE(SUM(CAST(s.total_amount AS REAL)), 0.0) AS revenue
-        FROM sales s
+          STRFTIME('{fmt}', f.day)        AS period,
+          SUM(f.orders)                   AS order_count,
+          COALESCE(SUM(f.revenue), 0.0)   AS revenue
+        FROM fact_sales_daily f
         {where}
-        GROUP BY STRFTIME('{fmt}', DATE(s.date))
+        GROUP BY STRFTIME('{fmt}', f.day)
         ORDER BY period
         """
         return list(self.conn.execute(sql, params))
 
     # ---- Sales by customer ----
 
+    @cached_query(*_SALES_FACTS, "customers")
     def sales_by_customer(
         self,
         date_from: str,
@@ -750,60 +956,29 @@ class ReportingRepo:
         product_id: Optional[int],
         category: Optional[str],
     ) -> list[sqlite3.Row]:
-        params: list[object] = [date_from, date_to]
-        where = " WHERE s.doc_type = 'sale' AND s.date >= ? AND s.date <= ? "
-
-        sw, sp = self._statuses_where(statuses)
-        where += sw
-        params += sp
-
-        cw, cp = self._customer_where(customer_id)
-        where += cw
-        params += cp
-
-        pw, pp_ = self._product_exists_where(product_id)
-        where += pw
-        params += pp_
-
-        kw, kp = self._category_exists_where(category)
-        where += kw
-        params += kp
-
-        # Revenue from headers; COGS via sale_item_cogs joined by sale_id (aggregated per customer)
+        where, params = self._fact_where(date_from, date_to, statuses, customer_id, product_id, category)
         sql = f"""
-        WITH revenue AS (
-          SELECT s.customer_id,
-                 COALESCE(SUM(CAST(s.total_amount AS REAL)), 0.0) AS revenue,
-                 COUNT(*) AS order_count
-          FROM sales s
-          {where}
-          GROUP BY s.customer_id
-        ), cogs AS (
-          SELECT s.customer_id,
-                 COALESCE(SUM(CAST(c.cogs_value AS REAL)), 0.0) AS cogs
-          FROM sales s
-          JOIN sale_item_cogs c ON c.sale_id = s.sale_id
-          {where}
-          GROUP BY s.customer_id
-        )
         SELECT
           cu.name AS customer_name,
-          COALESCE(r.order_count, 0) AS order_count,
-          COALESCE(r.revenue, 0.0)   AS revenue,
-          COALESCE(g.cogs, 0.0)      AS cogs,
-          (COALESCE(r.revenue,0.0) - COALESCE(g.cogs,0.0)) AS gross,
-          CASE WHEN COALESCE(r.revenue,0.0) = 0 THEN 0.0
-               ELSE (COALESCE(r.revenue,0.0) - COALESCE(g.cogs,0.0)) / COALESCE(r.revenue,0.0)
-          END AS margin_pct
-        FROM revenue r
-        LEFT JOIN cogs g ON g.customer_id = r.customer_id
+          r.order_count,
+          {self._MARGIN_COLUMNS}
+        FROM (
+          SELECT f.customer_id,
+                 SUM(f.orders)                 AS order_count,
+                 COALESCE(SUM(f.revenue), 0.0) AS revenue,
+                 COALESCE(SUM(f.cogs), 0.0)    AS cogs
+          FROM fact_sales_daily f
+          {where}
+          GROUP BY f.customer_id
+        ) r
         LEFT JOIN customers cu ON cu.customer_id = r.customer_id
-        ORDER BY revenue DESC, cu.name COLLATE NOCASE
+        ORDER BY r.revenue DESC, cu.name COLLATE NOCASE
         """
-        return list(self.conn.execute(sql, params * 2))  # same WHERE/params repeated for cogs CTE
+        return list(self.conn.execute(sql, params))
 
     # ---- Sales by product ----
 
+    @cached_query(*_SALES_FACTS)
     def sales_by_product(
         self,
         date_from: str,
@@ -814,88 +989,34 @@ class ReportingRepo:
         category: Optional[str],
     ) -> list[sqlite3.Row]:
         """
-        Revenue at product-level from line items:
-          line_revenue = quantity * (unit_price - item_discount)
-        qty_base via product_uoms.factor_to_base
-        COGS via sale_item_cogs (already at product granularity)
+        Line revenue (quantity * (unit_price - item_discount)), base quantity
+        and COGS per product.
         """
-        params: list[object] = [date_from, date_to]
-        where = " WHERE s.doc_type = 'sale' AND s.date >= ? AND s.date <= ? "
-
-        sw, sp = self._statuses_where(statuses)
-        where += sw
-        params += sp
-
-        cw, cp = self._customer_where(customer_id)
-        where += cw
-        params += cp
-
-        if product_id is not None:
-            where += " AND si.product_id = ? "
-            params.append(product_id)
-
-        if category:
-            where += " AND COALESCE(p.category,'') = ? "
-            params.append(category)
-
-        sql = f"""
-        WITH line_rev AS (
-          SELECT
-            si.product_id,
-            p.name AS product_name,
-            SUM(CAST(si.quantity AS REAL) * (CAST(si.unit_price AS REAL) - COALESCE(CAST(si.item_discount AS REAL),0))) AS revenue,
-            SUM(CAST(si.quantity AS REAL) * COALESCE(CAST(pu.factor_to_base AS REAL), 1.0)) AS qty_base
-          FROM sales s
-          JOIN sale_items si ON si.sale_id = s.sale_id
-          LEFT JOIN products p ON p.product_id = si.product_id
-          LEFT JOIN product_uoms pu
-                 ON pu.product_id = si.product_id AND pu.uom_id = si.uom_id
-          {where}
-          GROUP BY si.product_id, p.name
-        ),
-        cogs AS (
-          SELECT
-            c.product_id,
-            SUM(CAST(c.cogs_value AS REAL)) AS cogs
-          FROM sales s
-          JOIN sale_item_cogs c ON c.sale_id = s.sale_id
-          {self._statuses_where(statuses)[0].replace('s.', 's.')}
-          {self._customer_where(customer_id)[0].replace('s.', 's.')}
-          {" AND c.product_id = ? " if product_id is not None else ""}
-          {" AND EXISTS (SELECT 1 FROM products p3 WHERE p3.product_id = c.product_id AND COALESCE(p3.category,'') = ?) " if category else ""}
-          AND s.doc_type = 'sale'
-          AND s.date >= ? AND s.date <= ?
-          GROUP BY c.product_id
+        where, params = self._fact_where(
+            date_from, date_to, statuses, customer_id, product_id, category, products=True
         )
+        sql = f"""
         SELECT
-          lr.product_name,
-          lr.qty_base,
-          COALESCE(lr.revenue, 0.0) AS revenue,
-          COALESCE(g.cogs, 0.0)     AS cogs,
-          (COALESCE(lr.revenue,0.0) - COALESCE(g.cogs,0.0)) AS gross,
-          CASE WHEN COALESCE(lr.revenue,0.0) = 0 THEN 0.0
-               ELSE (COALESCE(lr.revenue,0.0) - COALESCE(g.cogs,0.0)) / COALESCE(lr.revenue,0.0)
-          END AS margin_pct
-        FROM line_rev lr
-        LEFT JOIN cogs g ON g.product_id = lr.product_id
-        ORDER BY revenue DESC, lr.product_name COLLATE NOCASE
-        """
-        params_cogs: list[object] = []
-        # replicate optional filters for cogs CTE (order: statuses, customer, product, category, dates)
-        if statuses:
-            params_cogs += list(statuses)
-        if customer_id is not None:
-            params_cogs.append(customer_id)
-        if product_id is not None:
-            params_cogs.append(product_id)
-        if category:
-            params_cogs.append(category)
-        params_cogs += [date_from, date_to]
-
-        return list(self.conn.execute(sql, params + params_cogs))
+          p.name AS product_name,
+          r.qty_base,
+          {self._MARGIN_COLUMNS}
+        FROM (
+          SELECT f.product_id,
+                 SUM(f.qty_base)               AS qty_base,
+                 COALESCE(SUM(f.revenue), 0.0) AS revenue,
+                 COALESCE(SUM(f.cogs), 0.0)    AS cogs
+          FROM fact_sales_daily f
+          {where}
+          GROUP BY f.product_id
+        ) r
+        LEFT JOIN products p ON p.product_id = r.product_id
+        ORDER BY r.revenue DESC, p.name COLLATE NOCASE
+        """
+        return list(self.conn.execute(sql, params))
 
     # ---- Sales by category ----
 
+    @cached_query(*_SALES_FACTS)
     def sales_by_category(
         self,
         date_from: str,
@@ -908,82 +1029,30 @@ class ReportingRepo:
         """
         Use products.category free-text.
         """
-        params: list[object] = [date_from, date_to]
-        where = " WHERE s.doc_type = 'sale' AND s.date >= ? AND s.date <= ? "
-
-        sw, sp = self._statuses_where(statuses)
-        where += sw
-        params += sp
-
-        cw, cp = self._customer_where(customer_id)
-        where += cw
-        params += cp
-
-        if product_id is not None:
-            where += " AND si.product_id = ? "
-            params.append(product_id)
-
-        if category:
-            where += " AND COALESCE(p.category,'') = ? "
-            params.append(category)
-
-        sql = f"""
-        WITH line_rev AS (
-          SELECT
-            COALESCE(p.category, '(Uncategorized)') AS category,
-            SUM(CAST(si.quantity AS REAL) * (CAST(si.unit_price AS REAL) - COALESCE(CAST(si.item_discount AS REAL),0))) AS revenue,
-            SUM(CAST(si.quantity AS REAL) * COALESCE(CAST(pu.factor_to_base AS REAL), 1.0)) AS qty_base
-          FROM sales s
-          JOIN sale_items si ON si.sale_id = s.sale_id
-          LEFT JOIN products p ON p.product_id = si.product_id
-          LEFT JOIN product_uoms pu
-                 ON pu.product_id = si.product_id AND pu.uom_id = si.uom_id
-          {where}
-          GROUP BY COALESCE(p.category, '(Uncategorized)')
-        ),
-        cogs AS (
-          SELECT
-            COALESCE(p2.category, '(Uncategorized)') AS category,
-            SUM(CAST(c.cogs_value AS REAL)) AS cogs
-          FROM sales s
-          JOIN sale_item_cogs c ON c.sale_id = s.sale_id
-          LEFT JOIN products p2 ON p2.product_id = c.product_id
-          {self._statuses_where(statuses)[0].replace('s.', 's.')}
-          {self._customer_where(customer_id)[0].replace('s.', 's.')}
-          {" AND c.product_id = ? " if product_id is not None else ""}
-          {" AND COALESCE(p2.category,'') = ? " if category else ""}
-          AND s.doc_type = 'sale'
-          AND s.date >= ? AND s.date <= ?
-          GROUP BY COALESCE(p2.category, '(Uncategorized)')
+        where, params = self._fact_where(
+            date_from, date_to, statuses, customer_id, product_id, category, products=True
         )
+        sql = f"""
         SELECT
-          lr.category,
-          lr.qty_base,
-          COALESCE(lr.revenue, 0.0) AS revenue,
-          COALESCE(g.cogs, 0.0)     AS cogs,
-          (COALESCE(lr.revenue,0.0) - COALESCE(g.cogs,0.0)) AS gross,
-          CASE WHEN COALESCE(lr.revenue,0.0) = 0 THEN 0.0
-               ELSE (COALESCE(lr.revenue,0.0) - COALESCE(g.cogs,0.0)) / COALESCE(lr.revenue,0.0)
-          END AS margin_pct
-        FROM line_rev lr
-        LEFT JOIN cogs g ON g.category = lr.category
-        ORDER BY revenue DESC, lr.category COLLATE NOCASE
-        """
-        params_cogs: list[object] = []
-        if statuses:
-            params_cogs += list(statuses)
-        if customer_id is not None:
-            params_cogs.append(customer_id)
-        if product_id is not None:
-            params_cogs.append(product_id)
-        if category:
-            params_cogs.append(category)
-        params_cogs += [date_from, date_to]
-
-        return list(self.conn.execute(sql, params + params_cogs))
+          r.category,
+          r.qty_base,
+          {self._MARGIN_COLUMNS}
+        FROM (
+          SELECT COALESCE(f.category, '(Uncategorized)') AS category,
+                 SUM(f.qty_base)               AS qty_base,
+                 COALESCE(SUM(f.revenue), 0.0) AS revenue,
+                 COALESCE(SUM(f.cogs), 0.0)    AS cogs
+          FROM fact_sales_daily f
+          {where}
+          GROUP BY COALESCE(f.category, '(Uncategorized)')
+        ) r
+        ORDER BY r.revenue DESC, r.category COLLATE NOCASE
+        """
+        return list(self.conn.execute(sql, params))
 
     # ---- Margin by period (daily/monthly/yearly) ----
 
+    @cached_query(*_SALES_FACTS)
     def margin_by_period(
         self,
         date_from: str,
@@ -994,66 +1063,27 @@ class ReportingRepo:
         product_id: Optional[int],
         category: Optional[str],
     ) -> list[sqlite3.Row]:
-        fmt = {
-            "daily": "%Y-%m-%d",
-            "monthly": "%Y-%m",
-            "yearly": "%Y",
-        }.get(granularity, "%Y-%m-%d")
-
-        params: list[object] = [date_from, date_to]
-        where = " WHERE s.doc_type = 'sale' AND s.date >= ? AND s.date <= ? "
-
-        sw, sp = self._statuses_where(statuses)
-        where += sw
-        params += sp
-
-        cw, cp = self._customer_where(customer_id)
-        where += cw
-        params += cp
-
-        pw, pp_ = self._product_exists_where(product_id)
-        where += pw
-        params += pp_
-
-        kw, kp = self._category_exists_where(category)
-        where += kw
-        params += kp
-
+        fmt = self._period_format(granularity)
+        where, params = self._fact_where(date_from, date_to, statuses, customer_id, product_id, category)
         sql = f"""
-        WITH rev AS (
-          SELECT
-            STRFTIME('{fmt}', DATE(s.date)) AS period,
-            SUM(CAST(s.total_amount AS REAL)) AS revenue
-          FROM sales s
-          {where}
-          GROUP BY STRFTIME('{fmt}', DATE(s.date))
-        ),
-        cg AS (
-          SELECT
-            STRFTIME('{fmt}', DATE(s.date)) AS period,
-            SUM(CAST(c.cogs_value AS REAL)) AS cogs
-          FROM sales s
-          JOIN sale_item_cogs c ON c.sale_id = s.sale_id
-          {where}
-          GROUP BY STRFTIME('{fmt}', DATE(s.date))
-        )
         SELECT
           r.period,
-          COALESCE(r.revenue, 0.0) AS revenue,
-          COALESCE(cg.cogs, 0.0)   AS cogs,
-          (COALESCE(r.revenue,0.0) - COALESCE(cg.cogs,0.0)) AS gross,
-          CASE WHEN COALESCE(r.revenue,0.0) = 0 THEN 0.0
-               ELSE (COALESCE(r.revenue,0.0) - COALESCE(cg.cogs,0.0)) / COALESCE(r.revenue,0.0)
-          END AS margin_pct
-        FROM rev r
-        LEFT JOIN cg ON cg.period = r.period
+          {self._MARGIN_COLUMNS}
+        FROM (
+          SELECT STRFTIME('{fmt}', f.day)       AS period,
+                 COALESCE(SUM(f.revenue), 0.0) AS revenue,
+                 COALESCE(SUM(f.cogs), 0.0)    AS cogs
+          FROM fact_sales_daily f
+          {where}
+          GROUP BY STRFTIME('{fmt}', f.day)
+        ) r
         ORDER BY r.period
         """
-        # NOTE: same WHERE block used twice (rev + cg), so duplicate params
-        return list(self.conn.execute(sql, params + params))
+        return list(self.conn.execute(sql, params))
 
     # ---- Margin by customer ----
 
+    @cached_query(*_SALES_FACTS, "customers")
     def margin_by_customer(
         self,
         date_from: str,
@@ -1069,6 +1099,7 @@ class ReportingRepo:
 
     # ---- Margin by product ----
 
+    @cached_query(*_SALES_FACTS)
     def margin_by_product(
         self,
         date_from: str,
@@ -1083,6 +1114,7 @@ class ReportingRepo:
 
     # ---- Margin by category ----
 
+    @cached_query(*_SALES_FACTS)
     def margin_by_category(
         self,
         date_from: str,
@@ -1096,6 +1128,7 @@ class ReportingRepo:
 
     # ---- Top customers ----
 
+    @cached_query(*_SALES_FACTS, "customers")
     def top_customers(
         self,
         date_from: str,
@@ -1103,23 +1136,22 @@ class ReportingRepo:
         statuses: Optional[Sequence[str]],
         limit_n: int,
     ) -> list[sqlite3.Row]:
-        params: list[object] = [date_from, date_to]
-        where = " WHERE s.doc_type = 'sale' AND s.date >= ? AND s.date <= ? "
-
-        sw, sp = self._statuses_where(statuses)
-        where += sw
-        params += sp
-
+        where, params = self._fact_where(date_from, date_to, statuses, None)
         sql = f"""
         SELECT
           cu.name AS customer_name,
-          COUNT(*) AS order_count,
-          COALESCE(SUM(CAST(s.total_amount AS REAL)), 0.0) AS revenue
-        FROM sales s
-        LEFT JOIN customers cu ON cu.customer_id = s.customer_id
-        {where}
-        GROUP BY s.customer_id, cu.name
-        ORDER BY revenue DESC, cu.name COLLATE NOCASE
+          r.order_count,
+          r.revenue
+        FROM (
+          SELECT f.customer_id,
+                 SUM(f.orders)                 AS order_count,
+                 COALESCE(SUM(f.revenue), 0.0) AS revenue
+          FROM fact_sales_daily f
+          {where}
+          GROUP BY f.customer_id
+        ) r
+        LEFT JOIN customers cu ON cu.customer_id = r.customer_id
+        ORDER BY r.revenue DESC, cu.name COLLATE NOCASE
         LIMIT ?
         """
         params.append(int(limit_n))
@@ -1127,6 +1159,7 @@ class ReportingRepo:
 
     # ---- Top products ----
 
+    @cached_query(*_SALES_FACTS)
     def top_products(
         self,
         date_from: str,
@@ -1135,28 +1168,24 @@ class ReportingRepo:
         limit_n: int,
     ) -> list[sqlite3.Row]:
         """
-        Rank by revenue from line items; also return qty_base.
+        Rank by line revenue; also return qty_base.
         """
-        params: list[object] = [date_from, date_to]
-        where = " WHERE s.doc_type = 'sale' AND s.date >= ? AND s.date <= ? "
-
-        sw, sp = self._statuses_where(statuses)
-        where += sw
-        params += sp
-
+        where, params = self._fact_where(date_from, date_to, statuses, None, products=True)
         sql = f"""
         SELECT
           p.name AS product_name,
-          SUM(CAST(si.quantity AS REAL) * COALESCE(CAST(pu.factor_to_base AS REAL), 1.0)) AS qty_base,
-          SUM(CAST(si.quantity AS REAL) * (CAST(si.unit_price AS REAL) - COALESCE(CAST(si.item_discount AS REAL),0))) AS revenue
-        FROM sales s
-        JOIN sale_items si ON si.sale_id = s.sale_id
-        LEFT JOIN products p ON p.product_id = si.product_id
-        LEFT JOIN product_uoms pu
-               ON pu.product_id = si.product_id AND pu.uom_id = si.uom_id
-        {where}
-        GROUP BY p.name
-        ORDER BY revenue DESC, p.name COLLATE NOCASE
+          r.qty_base,
+          r.revenue
+        FROM (
+          SELECT f.product_id,
+                 SUM(f.qty_base)               AS qty_base,
+                 COALESCE(SUM(f.revenue), 0.0) AS revenue
+          FROM fact_sales_daily f
+          {where}
+          GROUP BY f.product_id
+        ) r
+        LEFT JOIN products p ON p.product_id = r.product_id
+        ORDER BY r.revenue DESC, p.name COLLATE NOCASE
         LIMIT ?
         """
         params.append(int(limit_n))
@@ -1164,6 +1193,7 @@ class ReportingRepo:
 
     # ---- Returns summary ----
 
+    @cached_query("sale_payments", "stock", "product_uoms")
     def returns_summary(self, date_from: str, date_to: str) -> list[sqlite3.Row]:
         """
         Basic returns indicators using available schema:
@@ -1201,6 +1231,7 @@ class ReportingRepo:
 
     # ---- Status breakdown ----
 
+    @cached_query("sales", "products")
     def status_breakdown(
         self,
         date_from: str,
@@ -1238,6 +1269,7 @@ class ReportingRepo:
 
     # ---- Drill-down sales ----
 
+    @cached_query("sales", "customers", "products")
     def drilldown_sales(
         self,
         date_from: str,
@@ -4,6 +4,8 @@ import sqlite3
 from pathlib import Path
 from typing import Optional
 
+from .. import events
+from ..connection_pool import pooled_connection
 from .customer_advances_repo import CustomerAdvancesRepo
 
 
@@ -58,16 +60,18 @@ class SalePaymentsRepo:
         "Cash Deposit": "pending",  # typically pending until cleared
     }
 
-    def __init__(self, db_path: str | Path):
-        self.db_path = str(db_path)
+    def __init__(self, db_path: str | Path | sqlite3.Connection):
+        # A path resolves to the calling thread's pooled connection; an open
+        # connection is used as-is (joins the caller's transaction).
+        self._source = db_path if isinstance(db_path, sqlite3.Connection) else str(db_path)
+        self.db_path = self._source if isinstance(self._source, str) else None
 
     # --- connection helper -------------------------------------------------
 
     def _connect(self) -> sqlite3.Connection:
-        con = sqlite3.connect(self.db_path)
-        con.row_factory = sqlite3.Row
-        con.execute("PRAGMA foreign_keys=ON;")
-        return con
+        # Pooled per thread, PRAGMAs applied once (database.connection_pool).
+        # `with self._connect() as con:` commits/rolls back; it never closes.
+        return pooled_connection(self._source)
 
     # --- soft validations mirroring DB rules -------------------------------
 
@@ -287,7 +291,9 @@ class SalePaymentsRepo:
                     "created_by": created_by,
                 },
             )
-            return int(cur.lastrowid)
+            payment_id = int(cur.lastrowid)
+        events.publish(con, "sales", sale_id, events.UPDATE)
+        return payment_id
 
     def update_clearing_state(
         self,
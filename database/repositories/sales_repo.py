@@ -1,7 +1,11 @@
 from __future__ import annotations
 from dataclasses import dataclass
 import sqlite3
-from typing import Iterable, Optional
+from typing import Iterable, Optional, Sequence
+
+from .. import events
+from ..keyset import DEFAULT_PAGE_SIZE, Cursor, page_query, resolve_sort
+from ..report_cache import bump_versions
 
 # For settlements
 from .sale_payments_repo import SalePaymentsRepo
@@ -41,6 +45,7 @@ class SalesRepo:
 
     Key behavior:
       - SALES are rows with sales.doc_type='sale' and carry inventory postings.
+        Each posted line also gets its sale_item_cogs row (cost at posting).
       - QUOTATIONS are rows with sales.doc_type='quotation'; they have items but NO inventory,
         and must keep (payment_status='unpaid', paid_amount=0, advance_payment_applied=0).
       - Payments roll-up (paid_amount/payment_status) comes from sale_payments triggers.
@@ -108,6 +113,64 @@ class SalesRepo:
 
         return self.conn.execute(sql, params).fetchall()
 
+    # Sort keys accepted by page_sales (result column name -> SQL expression)
+    PAGE_SORT_KEYS = {
+        "sale_id": "s.sale_id",
+        "date": "s.date",
+        "customer_name": "c.name",
+        "total_amount": "CAST(s.total_amount AS REAL)",
+        "paid_amount": "CAST(s.paid_amount AS REAL)",
+        "payment_status": "s.payment_status",
+    }
+
+    def page_sales(
+        self,
+        *,
+        doc_type: str = "sale",
+        query: str = "",
+        sort: str = "date",
+        descending: bool = True,
+        after: Cursor | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        ids: Sequence[str] | None = None,
+    ) -> list[dict]:
+        """
+        One keyset page of sales (or quotations with doc_type='quotation'),
+        ordered by (`sort`, sale_id). `after` is (row[sort], row['sale_id'])
+        of the last row of the previous page; None for the first page.
+        `query` filters like search_sales (SO number or customer name).
+        `ids` restricts the page to those documents (re-reading changed rows
+        for a live list).
+        """
+        where = ["s.doc_type = ?"]
+        params: list = [doc_type]
+        if query:
+            where.append("(s.sale_id LIKE ? OR c.name LIKE ?)")
+            params += [f"%{query}%", f"%{query}%"]
+        if ids is not None:
+            where.append(f"s.sale_id IN ({','.join('?' * len(ids))})" if ids else "0")
+            params += list(ids)
+
+        sql, args = page_query(
+            """
+            SELECT s.sale_id, s.date, s.customer_id, c.name AS customer_name,
+                   CAST(s.total_amount AS REAL)   AS total_amount,
+                   CAST(s.order_discount AS REAL) AS order_discount,
+                   CAST(s.paid_amount AS REAL)    AS paid_amount,
+                   s.payment_status, s.quotation_status, s.notes
+            FROM sales s
+            JOIN customers c ON c.customer_id = s.customer_id
+            """,
+            where,
+            params,
+            sort_expr=resolve_sort(sort, self.PAGE_SORT_KEYS),
+            id_expr="s.sale_id",
+            descending=descending,
+            after=after,
+            limit=limit,
+        )
+        return self.conn.execute(sql, args).fetchall()
+
     def get_header(self, sid: str) -> dict | None:
         return self.conn.execute("SELECT * FROM sales WHERE sale_id=?", (sid,)).fetchone()
 
@@ -212,6 +275,31 @@ class SalesRepo:
             """,
             (product_id, qty, uom_id, sid, item_id, date, notes, created_by),
         )
+        # COGS at the moving-average cost the posting just ran at (state is
+        # already updated by the valuation trigger; sales don't move unit cost).
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO sale_item_cogs (
+                item_id, sale_id, product_id, sale_date,
+                qty_base, unit_cost_base, cogs_value
+            )
+            SELECT ?, ?, ?, ?, q.qty_base, q.unit_cost, q.qty_base * q.unit_cost
+            FROM (
+                SELECT
+                  CAST(? AS REAL) * COALESCE((
+                      SELECT CAST(pu.factor_to_base AS REAL)
+                      FROM product_uoms pu
+                      WHERE pu.product_id = ? AND pu.uom_id = ?
+                  ), 1.0) AS qty_base,
+                  COALESCE((
+                      SELECT CAST(st.unit_value AS REAL)
+                      FROM stock_valuation_state st
+                      WHERE st.product_id = ?
+                  ), 0.0) AS unit_cost
+            ) q
+            """,
+            (item_id, sid, product_id, date, qty, product_id, uom_id, product_id),
+        )
 
     def _delete_sale_content(self, sid: str):
         self.conn.execute(
@@ -243,10 +331,14 @@ class SalesRepo:
                     created_by=header.created_by,
                     notes=header.notes,
                 )
+            bump_versions(self.conn, "stock")
+        events.publish(self.conn, "sales", header.sale_id, events.INSERT)
 
     def update_sale(self, header: SaleHeader, items: Iterable[SaleItem]):
         """
         Update a SALE (doc_type must be 'sale'). Rebuild items & inventory.
+        paid_amount is left alone: the sale_payments triggers only add deltas
+        to it, so a stale header value written here would never be corrected.
         """
         with self.conn:
             # Ensure we’re editing a sale row
@@ -262,7 +354,6 @@ class SalesRepo:
                        total_amount=?,
                        order_discount=?,
                        payment_status=?,      -- maintained by triggers; UI should not hand-edit
-                       paid_amount=?,         -- maintained by triggers; UI should not hand-edit
                        advance_payment_applied=?,
                        notes=?,
                        created_by=?,
@@ -276,7 +367,6 @@ class SalesRepo:
                     header.total_amount,
                     header.order_discount,
                     header.payment_status,
-                    header.paid_amount,
                     header.advance_payment_applied,
                     header.notes,
                     header.created_by,
@@ -300,11 +390,15 @@ class SalesRepo:
                     created_by=header.created_by,
                     notes=header.notes,
                 )
+            bump_versions(self.conn, "stock")
+        events.publish(self.conn, "sales", header.sale_id, events.UPDATE)
 
     def delete_sale(self, sid: str):
         with self.conn:
             self._delete_sale_content(sid)
             self.conn.execute("DELETE FROM sales WHERE sale_id=?", (sid,))
+            bump_versions(self.conn, "stock")
+        events.publish(self.conn, "sales", sid, events.DELETE)
 
     # ---------------------------------------------------------------------
     # WRITE — QUOTATIONS (doc_type='quotation')
@@ -352,6 +446,7 @@ class SalesRepo:
             for it in items:
                 it.sale_id = header.sale_id
                 self._insert_item(it)
+        events.publish(self.conn, "sales", header.sale_id, events.INSERT)
 
     def update_quotation(
         self,
@@ -408,6 +503,7 @@ class SalesRepo:
             for it in items:
                 it.sale_id = header.sale_id
                 self._insert_item(it)
+        events.publish(self.conn, "sales", header.sale_id, events.UPDATE)
 
     # ---------------------------------------------------------------------
     # CONVERSION — QUOTATION ➜ SALE
@@ -523,6 +619,9 @@ class SalesRepo:
                 """,
                 (qo_id,),
             )
+            bump_versions(self.conn, "stock")
+        events.publish(self.conn, "sales", new_so_id, events.INSERT)
+        events.publish(self.conn, "sales", qo_id, events.UPDATE)
 
     # ---------------------------------------------------------------------
     # RETURNS (with settlement)
@@ -639,6 +738,7 @@ class SalesRepo:
                         created_by,
                     ),
                 )
+            bump_versions(self.conn, "stock")
 
             # Settlement handling (if applicable)
             if settlement and final_return_value > 0:
@@ -674,6 +774,7 @@ class SalesRepo:
                         # Keep return credits explicitly labeled
                         source_type="return_credit",
                     )
+        events.publish(self.conn, "sales", sid, events.UPDATE)
 
     def sale_return_totals(self, sale_id: str) -> dict:
         row = self.conn.execute(
@@ -2,6 +2,8 @@ from __future__ import annotations
 import sqlite3
 from typing import Optional
 
+from .. import events
+
 
 # ----------------------------
 # Domain errors (friendly)
@@ -93,6 +95,7 @@ class VendorAdvancesRepo:
                 """,
                 (vendor_id, date, applied, purchase_id, notes, created_by),
             )
+            events.publish(self.conn, "purchases", purchase_id, events.UPDATE)
             return int(cur.lastrowid)
         except sqlite3.IntegrityError as e:
             # Map well-known trigger messages
@@ -185,12 +188,12 @@ class VendorAdvancesRepo:
     # ---------- Balances ----------
     def get_balance(self, vendor_id: int) -> float:
         """
-        Current credit balance from view v_vendor_advance_balance.
+        Current credit balance from vendor_credit_balance (trigger-maintained; O(1)).
         +ve = you hold credit from the vendor; 0 = none.
         (Negative shouldn't occur under triggers.)
         """
         row = self.conn.execute(
-            "SELECT balance FROM v_vendor_advance_balance WHERE vendor_id = ?",
+            "SELECT CAST(balance AS REAL) AS balance FROM vendor_credit_balance WHERE vendor_id = ?",
             (vendor_id,),
         ).fetchone()
         if not row:
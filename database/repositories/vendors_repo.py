@@ -1,6 +1,10 @@
 from dataclasses import dataclass
 import sqlite3
 
+from .. import events
+from ..refdata import PartyRef, reference_data
+from ..search import EntitySearch
+
 @dataclass
 class Vendor:
     vendor_id: int | None
@@ -8,6 +12,9 @@ class Vendor:
     contact_info: str
     address: str | None
 
+def _vendor(v: PartyRef) -> Vendor:
+    return Vendor(v.id, v.name, v.contact_info, v.address)
+
 class VendorsRepo:
     def __init__(self, conn: sqlite3.Connection):
         # ensure rows behave like dicts/tuples
@@ -15,17 +22,18 @@ class VendorsRepo:
         self.conn = conn
 
     def list_vendors(self) -> list[Vendor]:
-        rows = self.conn.execute(
-            "SELECT vendor_id, name, contact_info, address FROM vendors ORDER BY vendor_id DESC"
-        ).fetchall()
-        return [Vendor(**dict(r)) for r in rows]
+        # newest first; served from the shared reference cache (database.refdata)
+        return [_vendor(v) for v in reference_data(self.conn).vendors()]
+
+    def search(self, term: str, limit: int = 500) -> list[Vendor]:
+        """Vendors matching `term` (id/name/contact/address), best match first."""
+        ids = EntitySearch(self.conn).ids("vendors", term, limit=limit)
+        ref = reference_data(self.conn)
+        return [_vendor(v) for v in map(ref.vendor, ids) if v is not None]
 
     def get(self, vendor_id: int) -> Vendor | None:
-        r = self.conn.execute(
-            "SELECT vendor_id, name, contact_info, address FROM vendors WHERE vendor_id=?",
-            (vendor_id,)
-        ).fetchone()
-        return Vendor(**dict(r)) if r else None
+        v = reference_data(self.conn).vendor(vendor_id)
+        return _vendor(v) if v else None
 
     def create(self, name: str, contact_info: str, address: str | None) -> int:
         cur = self.conn.execute(
@@ -33,7 +41,9 @@ class VendorsRepo:
             (name, contact_info, address)
         )
         self.conn.commit()
-        return int(cur.lastrowid)
+        vendor_id = int(cur.lastrowid)
+        events.publish(self.conn, "vendors", vendor_id, events.INSERT)
+        return vendor_id
 
     def update(self, vendor_id: int, name: str, contact_info: str, address: str | None):
         self.conn.execute(
@@ -41,6 +51,7 @@ class VendorsRepo:
             (name, contact_info, address, vendor_id)
         )
         self.conn.commit()
+        events.publish(self.conn, "vendors", vendor_id, events.UPDATE)
 
     # def delete(self, vendor_id: int):
     #     self.conn.execute("DELETE FROM vendors WHERE vendor_id=?", (vendor_id,))
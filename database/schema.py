@@ -1,3 +1,5 @@
+import hashlib
+import inspect
 from pathlib import Path
 import sqlite3
 import sys
@@ -123,6 +125,54 @@ CREATE TABLE IF NOT EXISTS purchases (
 CREATE INDEX IF NOT EXISTS idx_purchases_date ON purchases(date);
 CREATE INDEX IF NOT EXISTS idx_purchases_vendor_id ON purchases(vendor_id);
 CREATE INDEX IF NOT EXISTS idx_purchases_payment_status ON purchases(payment_status);
+/* keyset pagination of the purchases list: ORDER BY date, purchase_id */
+CREATE INDEX IF NOT EXISTS idx_purchases_date_id ON purchases(date, purchase_id);
+
+/* purchases search index (PurchasesRepo.page_purchases). Trigram FTS5 so
+   substring queries ('%abc%') are answered from the index; rowid = purchases.rowid.
+   Kept in sync by the triggers below; backfilled by _ensure_purchases_fts. */
+CREATE VIRTUAL TABLE IF NOT EXISTS purchases_fts USING fts5(
+    purchase_id, date, vendor_name, payment_status, amounts,
+    tokenize = 'trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_purchases_fts_ai
+AFTER INSERT ON purchases
+BEGIN
+  INSERT INTO purchases_fts (rowid, purchase_id, date, vendor_name, payment_status, amounts)
+  VALUES (
+    NEW.rowid, NEW.purchase_id, NEW.date,
+    (SELECT name FROM vendors WHERE vendor_id = NEW.vendor_id),
+    NEW.payment_status,
+    CAST(NEW.total_amount AS TEXT) || ' ' || CAST(NEW.paid_amount AS TEXT)
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_purchases_fts_au
+AFTER UPDATE OF purchase_id, date, vendor_id, payment_status, total_amount, paid_amount ON purchases
+BEGIN
+  DELETE FROM purchases_fts WHERE rowid = OLD.rowid;
+  INSERT INTO purchases_fts (rowid, purchase_id, date, vendor_name, payment_status, amounts)
+  VALUES (
+    NEW.rowid, NEW.purchase_id, NEW.date,
+    (SELECT name FROM vendors WHERE vendor_id = NEW.vendor_id),
+    NEW.payment_status,
+    CAST(NEW.total_amount AS TEXT) || ' ' || CAST(NEW.paid_amount AS TEXT)
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_purchases_fts_ad
+AFTER DELETE ON purchases
+BEGIN
+  DELETE FROM purchases_fts WHERE rowid = OLD.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_purchases_fts_vendor_name
+AFTER UPDATE OF name ON vendors
+BEGIN
+  UPDATE purchases_fts SET vendor_name = NEW.name
+   WHERE rowid IN (SELECT rowid FROM purchases WHERE vendor_id = NEW.vendor_id);
+END;
 
 /* Unified: sales + quotations in one table via doc_type */
 CREATE TABLE IF NOT EXISTS sales (
@@ -164,6 +214,10 @@ CREATE TABLE IF NOT EXISTS sales (
 );
 CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(date);
 CREATE INDEX IF NOT EXISTS idx_sales_doc_type_date ON sales(doc_type, date);
+/* per-customer documents as of a cutoff (aging drill-down) */
+CREATE INDEX IF NOT EXISTS idx_sales_customer_date ON sales(customer_id, date);
+/* keyset pagination of the sales / quotations lists: ORDER BY date, sale_id */
+CREATE INDEX IF NOT EXISTS idx_sales_doc_type_date_id ON sales(doc_type, date, sale_id);
 
 -- (Removed separate quotations/quotation_items tables)
 
@@ -226,6 +280,8 @@ CREATE TABLE IF NOT EXISTS inventory_transactions (
 CREATE INDEX IF NOT EXISTS idx_inventory_product  ON inventory_transactions(product_id);
 CREATE INDEX IF NOT EXISTS idx_inventory_date     ON inventory_transactions(date);
 CREATE INDEX IF NOT EXISTS idx_inventory_type     ON inventory_transactions(transaction_type);
+/* returns of a purchase / purchase line (fact triggers, returnable quantities) */
+CREATE INDEX IF NOT EXISTS idx_inventory_reference ON inventory_transactions(reference_id, reference_item_id);
 CREATE INDEX IF NOT EXISTS idx_it_product_order
   ON inventory_transactions(product_id, date, txn_seq, posted_at, transaction_id);
 
@@ -243,6 +299,74 @@ CREATE TABLE IF NOT EXISTS stock_valuation_history (
 CREATE INDEX IF NOT EXISTS idx_valuation_product_date
   ON stock_valuation_history(product_id, valuation_date);
 
+/* -------- running valuation state (one row per product; O(1) costing input) -------- */
+CREATE TABLE IF NOT EXISTS stock_valuation_state (
+    product_id          INTEGER PRIMARY KEY,
+    quantity            NUMERIC NOT NULL DEFAULT 0,   -- on-hand qty in BASE UoM
+    unit_value          NUMERIC NOT NULL DEFAULT 0,   -- moving average unit cost (base)
+    total_value         NUMERIC NOT NULL DEFAULT 0,
+    last_valuation_id   INTEGER,                      -- stock_valuation_history row that produced this state
+    last_valuation_date DATE,                         -- latest business date applied (frontier)
+    updated_at          TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (product_id) REFERENCES products(product_id)
+);
+
+/* -------- COGS per sold line (moving-average cost captured when the line posts;
+   rewritten by the valuation repair path when history before it changes) -------- */
+CREATE TABLE IF NOT EXISTS sale_item_cogs (
+    item_id        INTEGER PRIMARY KEY,        -- sale_items.item_id
+    sale_id        TEXT    NOT NULL,
+    product_id     INTEGER NOT NULL,
+    sale_date      DATE    NOT NULL,
+    qty_base       NUMERIC NOT NULL,           -- sold qty in BASE UoM
+    unit_cost_base NUMERIC NOT NULL,           -- moving-average unit cost at posting
+    cogs_value     NUMERIC NOT NULL,           -- qty_base * unit_cost_base
+    FOREIGN KEY (sale_id)    REFERENCES sales(sale_id),
+    FOREIGN KEY (product_id) REFERENCES products(product_id)
+);
+CREATE INDEX IF NOT EXISTS idx_sale_item_cogs_sale         ON sale_item_cogs(sale_id);
+CREATE INDEX IF NOT EXISTS idx_sale_item_cogs_product_date ON sale_item_cogs(product_id, sale_date);
+
+/* -------- daily sales facts (reports; kept current by the DAILY SALES FACTS triggers) --------
+   One row per product, day, customer and payment status of posted sales.
+   product_id 0 carries the order level: header totals (after order discount),
+   order count and the orders' COGS, so period/customer reports read only those. */
+CREATE TABLE IF NOT EXISTS fact_sales_daily (
+    product_id     INTEGER NOT NULL,            -- 0: order-level row
+    day            DATE    NOT NULL,
+    customer_id    INTEGER NOT NULL,
+    payment_status TEXT    NOT NULL,
+    category       TEXT,                        -- products.category (NULL on order-level rows)
+    qty_base       REAL    NOT NULL DEFAULT 0,
+    revenue        REAL    NOT NULL DEFAULT 0,  -- Σ line revenue; Σ total_amount on order-level rows
+    cogs           REAL    NOT NULL DEFAULT 0,
+    orders         INTEGER NOT NULL DEFAULT 0,  -- sales with this product (all sales on order-level rows)
+    PRIMARY KEY (product_id, day, customer_id, payment_status)
+) WITHOUT ROWID;
+
+/* -------- daily purchase facts (reports; kept current by the DAILY PURCHASE FACTS triggers) --------
+   One row per product, day and vendor. Measures sit on the day of their event:
+   spend / quantity / paid on the purchase date, returns on the return date,
+   cleared payments on the payment date. product_id 0 carries the order level
+   (header totals, order count, paid, advance applied, all returns and payments). */
+CREATE TABLE IF NOT EXISTS fact_purchases_daily (
+    product_id       INTEGER NOT NULL,            -- 0: order-level row
+    day              DATE    NOT NULL,
+    vendor_id        INTEGER NOT NULL,
+    category         TEXT,                        -- products.category (NULL on order-level rows)
+    qty_base         REAL    NOT NULL DEFAULT 0,
+    spend            REAL    NOT NULL DEFAULT 0,  -- Σ line spend; Σ total_amount on order-level rows
+    orders           INTEGER NOT NULL DEFAULT 0,  -- purchases with this product (all purchases on order-level rows)
+    paid             REAL    NOT NULL DEFAULT 0,  -- Σ purchases.paid_amount (order-level rows)
+    advance_applied  REAL    NOT NULL DEFAULT 0,  -- Σ purchases.advance_payment_applied (order-level rows)
+    qty_returned     REAL    NOT NULL DEFAULT 0,
+    returns_value    REAL    NOT NULL DEFAULT 0,  -- as purchase_return_valuations.return_value
+    payments_cleared REAL    NOT NULL DEFAULT 0,  -- Σ cleared outgoing purchase_payments (order-level rows)
+    PRIMARY KEY (product_id, day, vendor_id)
+) WITHOUT ROWID;
+/* vendor spend over any period (PurchasesRepo.get_purchase_totals_for_vendor) */
+CREATE INDEX IF NOT EXISTS idx_fact_purchases_vendor_day ON fact_purchases_daily(vendor_id, day);
+
 /* -------- customer advances (credit ledger) -------- */
 CREATE TABLE IF NOT EXISTS customer_advances (
     tx_id       INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -259,6 +383,14 @@ CREATE TABLE IF NOT EXISTS customer_advances (
 CREATE INDEX IF NOT EXISTS idx_cadv_cust    ON customer_advances(customer_id);
 CREATE INDEX IF NOT EXISTS idx_cadv_cust_dt ON customer_advances(customer_id, tx_date);
 
+/* -------- cached customer credit balance (Σ customer_advances.amount; kept by triggers) -------- */
+CREATE TABLE IF NOT EXISTS customer_credit_balance (
+    customer_id INTEGER PRIMARY KEY,
+    balance     NUMERIC NOT NULL DEFAULT 0,
+    updated_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
+);
+
 /* -------- logs -------- */
 CREATE TABLE IF NOT EXISTS audit_logs (
     log_id      INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -400,6 +532,14 @@ CREATE INDEX IF NOT EXISTS idx_vadv_vendor     ON vendor_advances(vendor_id);
 CREATE INDEX IF NOT EXISTS idx_vadv_vendor_dt  ON vendor_advances(vendor_id, tx_date);
 CREATE INDEX IF NOT EXISTS idx_vadv_source     ON vendor_advances(source_id);
 
+/* -------- cached vendor credit balance (Σ vendor_advances.amount; kept by triggers) -------- */
+CREATE TABLE IF NOT EXISTS vendor_credit_balance (
+    vendor_id  INTEGER PRIMARY KEY,
+    balance    NUMERIC NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (vendor_id) REFERENCES vendors(vendor_id)
+);
+
 /* -------- customers: indexes to speed list/search -------- */
 
 /* 1) Cover the common list view: WHERE is_active=1 ORDER BY customer_id DESC */
@@ -420,6 +560,405 @@ CREATE INDEX IF NOT EXISTS idx_customers_address
 CREATE INDEX IF NOT EXISTS idx_customers_id_text
   ON customers( CAST(customer_id AS TEXT) );
 
+/* -------- party & product search indexes (database.search.EntitySearch) --------
+   External-content FTS5 over the text columns; rowid = the entity id, so no
+   text is stored twice. Prefix indexes make short "jo"/"smi" prefix queries
+   index lookups. Kept in sync by the triggers below; backfilled by
+   _ensure_entity_fts. */
+
+CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+    name, contact_info, address,
+    content = 'customers', content_rowid = 'customer_id',
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_customers_fts_ai
+AFTER INSERT ON customers
+BEGIN
+  INSERT INTO customers_fts (rowid, name, contact_info, address) VALUES (NEW.customer_id, NEW.name, NEW.contact_info, NEW.address);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customers_fts_au
+AFTER UPDATE OF name, contact_info, address ON customers
+BEGIN
+  INSERT INTO customers_fts (customers_fts, rowid, name, contact_info, address) VALUES ('delete', OLD.customer_id, OLD.name, OLD.contact_info, OLD.address);
+  INSERT INTO customers_fts (rowid, name, contact_info, address) VALUES (NEW.customer_id, NEW.name, NEW.contact_info, NEW.address);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customers_fts_ad
+AFTER DELETE ON customers
+BEGIN
+  INSERT INTO customers_fts (customers_fts, rowid, name, contact_info, address) VALUES ('delete', OLD.customer_id, OLD.name, OLD.contact_info, OLD.address);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS vendors_fts USING fts5(
+    name, contact_info, address,
+    content = 'vendors', content_rowid = 'vendor_id',
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_vendors_fts_ai
+AFTER INSERT ON vendors
+BEGIN
+  INSERT INTO vendors_fts (rowid, name, contact_info, address) VALUES (NEW.vendor_id, NEW.name, NEW.contact_info, NEW.address);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vendors_fts_au
+AFTER UPDATE OF name, contact_info, address ON vendors
+BEGIN
+  INSERT INTO vendors_fts (vendors_fts, rowid, name, contact_info, address) VALUES ('delete', OLD.vendor_id, OLD.name, OLD.contact_info, OLD.address);
+  INSERT INTO vendors_fts (rowid, name, contact_info, address) VALUES (NEW.vendor_id, NEW.name, NEW.contact_info, NEW.address);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vendors_fts_ad
+AFTER DELETE ON vendors
+BEGIN
+  INSERT INTO vendors_fts (vendors_fts, rowid, name, contact_info, address) VALUES ('delete', OLD.vendor_id, OLD.name, OLD.contact_info, OLD.address);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, category, description,
+    content = 'products', content_rowid = 'product_id',
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_products_fts_ai
+AFTER INSERT ON products
+BEGIN
+  INSERT INTO products_fts (rowid, name, category, description) VALUES (NEW.product_id, NEW.name, NEW.category, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_fts_au
+AFTER UPDATE OF name, category, description ON products
+BEGIN
+  INSERT INTO products_fts (products_fts, rowid, name, category, description) VALUES ('delete', OLD.product_id, OLD.name, OLD.category, OLD.description);
+  INSERT INTO products_fts (rowid, name, category, description) VALUES (NEW.product_id, NEW.name, NEW.category, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_fts_ad
+AFTER DELETE ON products
+BEGIN
+  INSERT INTO products_fts (products_fts, rowid, name, category, description) VALUES ('delete', OLD.product_id, OLD.name, OLD.category, OLD.description);
+END;
+
+/* -------- reference-data versions (database.refdata) --------
+   One counter per master-data table, bumped by every write to that table.
+   The in-process reference cache compares these instead of re-reading the
+   tables, so forms opened repeatedly only re-query what actually changed.
+   Report tables get counters too (report data versions, below). */
+
+CREATE TABLE IF NOT EXISTS ref_data_version (
+    table_name TEXT PRIMARY KEY,
+    version    INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO ref_data_version (table_name) VALUES
+  ('products'), ('uoms'), ('product_uoms'), ('customers'), ('vendors'), ('company_bank_accounts');
+
+CREATE TRIGGER IF NOT EXISTS trg_products_refver_ai
+AFTER INSERT ON products
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_refver_au
+AFTER UPDATE ON products
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_refver_ad
+AFTER DELETE ON products
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_uoms_refver_ai
+AFTER INSERT ON uoms
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'uoms';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_uoms_refver_au
+AFTER UPDATE ON uoms
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'uoms';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_uoms_refver_ad
+AFTER DELETE ON uoms
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'uoms';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_product_uoms_refver_ai
+AFTER INSERT ON product_uoms
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'product_uoms';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_product_uoms_refver_au
+AFTER UPDATE ON product_uoms
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'product_uoms';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_product_uoms_refver_ad
+AFTER DELETE ON product_uoms
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'product_uoms';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customers_refver_ai
+AFTER INSERT ON customers
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'customers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customers_refver_au
+AFTER UPDATE ON customers
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'customers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customers_refver_ad
+AFTER DELETE ON customers
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'customers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vendors_refver_ai
+AFTER INSERT ON vendors
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'vendors';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vendors_refver_au
+AFTER UPDATE ON vendors
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'vendors';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vendors_refver_ad
+AFTER DELETE ON vendors
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'vendors';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_company_bank_accounts_refver_ai
+AFTER INSERT ON company_bank_accounts
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'company_bank_accounts';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_company_bank_accounts_refver_au
+AFTER UPDATE ON company_bank_accounts
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'company_bank_accounts';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_company_bank_accounts_refver_ad
+AFTER DELETE ON company_bank_accounts
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'company_bank_accounts';
+END;
+
+/* -------- report data versions (database.report_cache) --------
+   The same counters for the document, payment and expense tables that
+   reports and the dashboard aggregate. Cached report results are stamped
+   with them and recomputed only after one of their tables was written.
+
+   Only document headers and payments carry triggers: they fire once per
+   document, and every write to sale_items / purchase_items also writes its
+   header, so 'sales' and 'purchases' stand for their lines. Stock rows (inventory_transactions, the valuation
+   tables, sale_item_cogs) are written many per document and in bulk by the
+   repair and rebuild paths; their single 'stock' counter is bumped once per
+   write by that code (report_cache.bump_versions) instead of once per row. */
+
+INSERT OR IGNORE INTO ref_data_version (table_name) VALUES
+  ('sales'), ('sale_payments'), ('purchases'), ('purchase_payments'),
+  ('customer_advances'), ('vendor_advances'), ('expenses'), ('expense_categories'),
+  ('stock');
+
+DELETE FROM ref_data_version WHERE table_name IN
+  ('sale_items', 'purchase_items', 'inventory_transactions',
+   'stock_valuation_history', 'stock_valuation_state', 'sale_item_cogs');
+
+DROP TRIGGER IF EXISTS trg_sale_items_refver_ai;
+DROP TRIGGER IF EXISTS trg_sale_items_refver_au;
+DROP TRIGGER IF EXISTS trg_sale_items_refver_ad;
+DROP TRIGGER IF EXISTS trg_purchase_items_refver_ai;
+DROP TRIGGER IF EXISTS trg_purchase_items_refver_au;
+DROP TRIGGER IF EXISTS trg_purchase_items_refver_ad;
+DROP TRIGGER IF EXISTS trg_inventory_transactions_refver_ai;
+DROP TRIGGER IF EXISTS trg_inventory_transactions_refver_au;
+DROP TRIGGER IF EXISTS trg_inventory_transactions_refver_ad;
+DROP TRIGGER IF EXISTS trg_stock_valuation_history_refver_ai;
+DROP TRIGGER IF EXISTS trg_stock_valuation_history_refver_au;
+DROP TRIGGER IF EXISTS trg_stock_valuation_history_refver_ad;
+DROP TRIGGER IF EXISTS trg_stock_valuation_state_refver_ai;
+DROP TRIGGER IF EXISTS trg_stock_valuation_state_refver_au;
+DROP TRIGGER IF EXISTS trg_stock_valuation_state_refver_ad;
+DROP TRIGGER IF EXISTS trg_sale_item_cogs_refver_ai;
+DROP TRIGGER IF EXISTS trg_sale_item_cogs_refver_au;
+DROP TRIGGER IF EXISTS trg_sale_item_cogs_refver_ad;
+
+CREATE TRIGGER IF NOT EXISTS trg_sales_refver_ai
+AFTER INSERT ON sales
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'sales';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sales_refver_au
+AFTER UPDATE ON sales
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'sales';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sales_refver_ad
+AFTER DELETE ON sales
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'sales';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sale_payments_refver_ai
+AFTER INSERT ON sale_payments
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'sale_payments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sale_payments_refver_au
+AFTER UPDATE ON sale_payments
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'sale_payments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sale_payments_refver_ad
+AFTER DELETE ON sale_payments
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'sale_payments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_purchases_refver_ai
+AFTER INSERT ON purchases
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'purchases';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_purchases_refver_au
+AFTER UPDATE ON purchases
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'purchases';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_purchases_refver_ad
+AFTER DELETE ON purchases
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'purchases';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_purchase_payments_refver_ai
+AFTER INSERT ON purchase_payments
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'purchase_payments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_purchase_payments_refver_au
+AFTER UPDATE ON purchase_payments
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'purchase_payments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_purchase_payments_refver_ad
+AFTER DELETE ON purchase_payments
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'purchase_payments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_advances_refver_ai
+AFTER INSERT ON customer_advances
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'customer_advances';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_advances_refver_au
+AFTER UPDATE ON customer_advances
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'customer_advances';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_advances_refver_ad
+AFTER DELETE ON customer_advances
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'customer_advances';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vendor_advances_refver_ai
+AFTER INSERT ON vendor_advances
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'vendor_advances';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vendor_advances_refver_au
+AFTER UPDATE ON vendor_advances
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'vendor_advances';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vendor_advances_refver_ad
+AFTER DELETE ON vendor_advances
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'vendor_advances';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_expenses_refver_ai
+AFTER INSERT ON expenses
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'expenses';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_expenses_refver_au
+AFTER UPDATE ON expenses
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'expenses';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_expenses_refver_ad
+AFTER DELETE ON expenses
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'expenses';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_expense_categories_refver_ai
+AFTER INSERT ON expense_categories
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'expense_categories';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_expense_categories_refver_au
+AFTER UPDATE ON expense_categories
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'expense_categories';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_expense_categories_refver_ad
+AFTER DELETE ON expense_categories
+BEGIN
+  UPDATE ref_data_version SET version = version + 1 WHERE table_name = 'expense_categories';
+END;
+
+/* -------- document number sequences (database.doc_numbers) --------
+   Last number issued per document prefix (SO/QO/PO) and day (yyyymmdd).
+   Bumped inside the posting transaction, so ids are allocated in O(1) and
+   never collide between terminals. */
+
+CREATE TABLE IF NOT EXISTS doc_sequences (
+    prefix  TEXT NOT NULL,
+    day     TEXT NOT NULL,
+    last_no INTEGER NOT NULL,
+    PRIMARY KEY (prefix, day)
+) WITHOUT ROWID;
+
 
 
 /* ======================== UoM INTEGRITY TRIGGERS ======================== */
@@ -633,384 +1172,181 @@ BEGIN
 END;
 
 /* ======================== MOVING-AVERAGE COSTING TRIGGER ======================== */
+/* The running state per product is read by primary key, so posting cost does not
+   depend on how long stock_valuation_history has grown. Rows dated before the
+   product's frontier are applied to the current state and the product is queued in
+   valuation_dirty; the repair path rewrites the impacted tail. */
 DROP TRIGGER IF EXISTS trg_stock_valuation_after_transaction;
+DROP TRIGGER IF EXISTS trg_mark_dirty_on_backdate_ins;
 CREATE TRIGGER trg_stock_valuation_after_transaction
 AFTER INSERT ON inventory_transactions
 FOR EACH ROW
 BEGIN
+  INSERT OR IGNORE INTO stock_valuation_state (product_id) VALUES (NEW.product_id);
+
+  /* back-dated posting: queue the product for tail replay */
+  INSERT INTO valuation_dirty (product_id, earliest_impacted, reason, updated_at)
+  SELECT NEW.product_id, NEW.date, 'inventory_insert_backdate', CURRENT_TIMESTAMP
+  FROM stock_valuation_state s
+  WHERE s.product_id = NEW.product_id
+    AND s.last_valuation_date > DATE(NEW.date)
+  ON CONFLICT(product_id) DO UPDATE SET
+    earliest_impacted = MIN(valuation_dirty.earliest_impacted, excluded.earliest_impacted),
+    reason            = COALESCE(valuation_dirty.reason, excluded.reason),
+    updated_at        = CURRENT_TIMESTAMP;
+
   INSERT INTO stock_valuation_history
     (product_id, valuation_date, quantity, unit_value, total_value, valuation_method)
   SELECT
     NEW.product_id,
     NEW.date,
-
-    /* quantity in base UoM after this txn */
-    CASE
-      WHEN NEW.transaction_type IN ('purchase','sale_return','adjustment') THEN
-        COALESCE((
-          SELECT svh.quantity
-          FROM stock_valuation_history svh
-          WHERE svh.product_id = NEW.product_id
-            AND DATE(svh.valuation_date) <= DATE(NEW.date)
-          ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-          LIMIT 1
-        ), 0.0)
-        + (CAST(NEW.quantity AS REAL) * COALESCE((
-            SELECT CAST(pu.factor_to_base AS REAL)
-            FROM product_uoms pu
-            WHERE pu.product_id = NEW.product_id
-              AND pu.uom_id     = NEW.uom_id
-            LIMIT 1
-          ), 1.0))
-      WHEN NEW.transaction_type IN ('sale','purchase_return') THEN
-        COALESCE((
-          SELECT svh.quantity
-          FROM stock_valuation_history svh
-          WHERE svh.product_id = NEW.product_id
-            AND DATE(svh.valuation_date) <= DATE(NEW.date)
-          ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-          LIMIT 1
-        ), 0.0)
-        - (CAST(NEW.quantity AS REAL) * COALESCE((
-            SELECT CAST(pu.factor_to_base AS REAL)
-            FROM product_uoms pu
-            WHERE pu.product_id = NEW.product_id
-              AND pu.uom_id     = NEW.uom_id
-            LIMIT 1
-          ), 1.0))
-      ELSE
-        COALESCE((
-          SELECT svh.quantity
-          FROM stock_valuation_history svh
-          WHERE svh.product_id = NEW.product_id
-            AND DATE(svh.valuation_date) <= DATE(NEW.date)
-          ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-          LIMIT 1
-        ), 0.0)
-    END AS qty_new,
-
-    /* unit cost (moving average) */
+    v.qty_new,
+    v.uc_new,
+    /* total value after txn (uc * qty_new; inbound never goes below zero value) */
     CASE
-      WHEN NEW.transaction_type = 'purchase' THEN
-        CASE
-          WHEN (
-            COALESCE((
-              SELECT svh.quantity
-              FROM stock_valuation_history svh
-              WHERE svh.product_id = NEW.product_id
-                AND DATE(svh.valuation_date) <= DATE(NEW.date)
-              ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-              LIMIT 1
-            ), 0.0)
-            +
-            (CAST(NEW.quantity AS REAL) * COALESCE((
-              SELECT CAST(pu.factor_to_base AS REAL)
-              FROM product_uoms pu
-              WHERE pu.product_id = NEW.product_id
-                AND pu.uom_id     = NEW.uom_id
-              LIMIT 1
-            ), 1.0))
-          ) > 0
-          THEN (
-            (
-              COALESCE((
-                SELECT svh.quantity
-                FROM stock_valuation_history svh
-                WHERE svh.product_id = NEW.product_id
-                  AND DATE(svh.valuation_date) <= DATE(NEW.date)
-                ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-                LIMIT 1
-              ), 0.0)
-              *
-              COALESCE((
-                SELECT svh.unit_value
-                FROM stock_valuation_history svh
-                WHERE svh.product_id = NEW.product_id
-                  AND DATE(svh.valuation_date) <= DATE(NEW.date)
-                ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-                LIMIT 1
-              ), 0.0)
-            )
-            +
-            (
-              (CAST(NEW.quantity AS REAL) * COALESCE((
-                SELECT CAST(pu.factor_to_base AS REAL)
-                FROM product_uoms pu
-                WHERE pu.product_id = NEW.product_id
-                  AND pu.uom_id     = NEW.uom_id
-                LIMIT 1
-              ), 1.0))
-              *
-              COALESCE((
-                SELECT (
-                         CAST(pi.purchase_price AS REAL)
-                         - COALESCE(CAST(pi.item_discount AS REAL), 0.0)
-                       )
-                       /
-                       COALESCE((
-                         SELECT CAST(pu.factor_to_base AS REAL)
-                         FROM product_uoms pu
-                         WHERE pu.product_id = pi.product_id
-                           AND pu.uom_id     = pi.uom_id
-                         LIMIT 1
-                       ), 1.0)
-                FROM purchase_items pi
-                WHERE pi.item_id = NEW.reference_item_id
-              ), 0.0)
-            )
-          )
-          /
-          (
-            COALESCE((
-              SELECT svh.quantity
-              FROM stock_valuation_history svh
-              WHERE svh.product_id = NEW.product_id
-                AND DATE(svh.valuation_date) <= DATE(NEW.date)
-              ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-              LIMIT 1
-            ), 0.0)
-            +
-            (CAST(NEW.quantity AS REAL) * COALESCE((
-              SELECT CAST(pu.factor_to_base AS REAL)
-              FROM product_uoms pu
-              WHERE pu.product_id = NEW.product_id
-                AND pu.uom_id     = NEW.uom_id
-              LIMIT 1
-            ), 1.0))
-          )
-          ELSE
-            COALESCE((
-              SELECT (
-                       CAST(pi.purchase_price AS REAL)
-                       - COALESCE(CAST(pi.item_discount AS REAL), 0.0)
-                     )
-                     /
-                     COALESCE((
-                       SELECT CAST(pu.factor_to_base AS REAL)
-                       FROM product_uoms pu
-                       WHERE pu.product_id = pi.product_id
-                         AND pu.uom_id     = pi.uom_id
-                       LIMIT 1
-                     ), 1.0)
-              FROM purchase_items pi
-              WHERE pi.item_id = NEW.reference_item_id
-            ),
-            COALESCE((
-              SELECT svh.unit_value
-              FROM stock_valuation_history svh
-              WHERE svh.product_id = NEW.product_id
-                AND DATE(svh.valuation_date) <= DATE(NEW.date)
-              ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-              LIMIT 1
-            ), 0.0))
-        END
-      ELSE
-        COALESCE((
-          SELECT svh.unit_value
-          FROM stock_valuation_history svh
-          WHERE svh.product_id = NEW.product_id
-            AND DATE(svh.valuation_date) <= DATE(NEW.date)
-          ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-          LIMIT 1
-        ), 0.0)
-    END AS uc_new,
-
-    /* total value after txn (uc * qty_new) */
-    CASE
-      WHEN NEW.transaction_type IN ('purchase','sale_return','adjustment') THEN
-        (
+      WHEN v.direction > 0 THEN CASE WHEN v.qty_new > 0 THEN v.uc_new * v.qty_new ELSE 0.0 END
+      ELSE v.uc_new * v.qty_new
+    END,
+    'moving_average'
+  FROM (
+    SELECT
+      b.q0 + b.direction * b.dq AS qty_new,
+      /* unit cost (moving average); only purchases move it */
+      CASE
+        WHEN NEW.transaction_type = 'purchase' THEN
           CASE
-            WHEN (
-              COALESCE((
-                SELECT svh.quantity
-                FROM stock_valuation_history svh
-                WHERE svh.product_id = NEW.product_id
-                  AND DATE(svh.valuation_date) <= DATE(NEW.date)
-                ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-                LIMIT 1
-              ), 0.0)
-              +
-              (CAST(NEW.quantity AS REAL) * COALESCE((
-                SELECT CAST(pu.factor_to_base AS REAL)
-                FROM product_uoms pu
-                WHERE pu.product_id = NEW.product_id
-                  AND pu.uom_id     = NEW.uom_id
-                LIMIT 1
-              ), 1.0))
-            ) > 0
-            THEN
-              (
-                CASE
-                  WHEN NEW.transaction_type = 'purchase' THEN
-                    (
-                      (
-                        COALESCE((
-                          SELECT svh.quantity
-                          FROM stock_valuation_history svh
-                          WHERE svh.product_id = NEW.product_id
-                            AND DATE(svh.valuation_date) <= DATE(NEW.date)
-                          ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-                          LIMIT 1
-                        ), 0.0)
-                        *
-                        COALESCE((
-                          SELECT svh.unit_value
-                          FROM stock_valuation_history svh
-                          WHERE svh.product_id = NEW.product_id
-                            AND DATE(svh.valuation_date) <= DATE(NEW.date)
-                          ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-                          LIMIT 1
-                        ), 0.0)
-                      )
-                      +
-                      (
-                        (CAST(NEW.quantity AS REAL) * COALESCE((
-                          SELECT CAST(pu.factor_to_base AS REAL)
-                          FROM product_uoms pu
-                          WHERE pu.product_id = NEW.product_id
-                            AND pu.uom_id     = NEW.uom_id
-                          LIMIT 1
-                        ), 1.0))
-                        *
-                        COALESCE((
-                          SELECT (
-                                   CAST(pi.purchase_price AS REAL)
-                                   - COALESCE(CAST(pi.item_discount AS REAL), 0.0)
-                                 )
-                                 /
-                                 COALESCE((
-                                   SELECT CAST(pu.factor_to_base AS REAL)
-                                   FROM product_uoms pu
-                                   WHERE pu.product_id = pi.product_id
-                                     AND pu.uom_id     = pi.uom_id
-                                   LIMIT 1
-                                 ), 1.0)
-                          FROM purchase_items pi
-                          WHERE pi.item_id = NEW.reference_item_id
-                        ), 0.0)
-                      )
-                    )
-                    /
-                    (
-                      COALESCE((
-                        SELECT svh.quantity
-                        FROM stock_valuation_history svh
-                        WHERE svh.product_id = NEW.product_id
-                          AND DATE(svh.valuation_date) <= DATE(NEW.date)
-                        ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-                        LIMIT 1
-                      ), 0.0)
-                      +
-                      (CAST(NEW.quantity AS REAL) * COALESCE((
-                        SELECT CAST(pu.factor_to_base AS REAL)
-                        FROM product_uoms pu
-                        WHERE pu.product_id = NEW.product_id
-                          AND pu.uom_id     = NEW.uom_id
-                        LIMIT 1
-                      ), 1.0))
-                    )
-                  ELSE
-                    COALESCE((
-                      SELECT svh.unit_value
-                      FROM stock_valuation_history svh
-                      WHERE svh.product_id = NEW.product_id
-                        AND DATE(svh.valuation_date) <= DATE(NEW.date)
-                      ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-                      LIMIT 1
-                    ), 0.0)
-                END
-              )
-              *
-              (
-                COALESCE((
-                  SELECT svh.quantity
-                  FROM stock_valuation_history svh
-                  WHERE svh.product_id = NEW.product_id
-                    AND DATE(svh.valuation_date) <= DATE(NEW.date)
-                  ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-                  LIMIT 1
-                ), 0.0)
-                +
-                (CAST(NEW.quantity AS REAL) * COALESCE((
-                  SELECT CAST(pu.factor_to_base AS REAL)
-                  FROM product_uoms pu
-                  WHERE pu.product_id = NEW.product_id
-                    AND pu.uom_id     = NEW.uom_id
-                  LIMIT 1
-                ), 1.0))
-              )
-            ELSE 0.0
+            WHEN b.q0 + b.dq > 0 THEN (b.q0 * b.uc0 + b.dq * COALESCE(b.pc, 0.0)) / (b.q0 + b.dq)
+            ELSE COALESCE(b.pc, b.uc0)
           END
-        )
-      WHEN NEW.transaction_type IN ('sale','purchase_return') THEN
-        COALESCE((
-          SELECT svh.unit_value
-          FROM stock_valuation_history svh
-          WHERE svh.product_id = NEW.product_id
-            AND DATE(svh.valuation_date) <= DATE(NEW.date)
-          ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-          LIMIT 1
-        ), 0.0)
-        *
-        (
-          COALESCE((
-            SELECT svh.quantity
-            FROM stock_valuation_history svh
-            WHERE svh.product_id = NEW.product_id
-              AND DATE(svh.valuation_date) <= DATE(NEW.date)
-            ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-            LIMIT 1
-          ), 0.0)
-          -
-          (CAST(NEW.quantity AS REAL) * COALESCE((
-            SELECT CAST(pu.factor_to_base AS REAL)
-            FROM product_uoms pu
-            WHERE pu.product_id = NEW.product_id
-              AND pu.uom_id     = NEW.uom_id
-            LIMIT 1
-          ), 1.0))
-        )
-      ELSE
-        COALESCE((
-          SELECT svh.unit_value
-          FROM stock_valuation_history svh
-          WHERE svh.product_id = NEW.product_id
-            AND DATE(svh.valuation_date) <= DATE(NEW.date)
-          ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-          LIMIT 1
-        ), 0.0)
-        *
-        COALESCE((
-          SELECT svh.quantity
-          FROM stock_valuation_history svh
-          WHERE svh.product_id = NEW.product_id
-            AND DATE(svh.valuation_date) <= DATE(NEW.date)
-          ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
+        ELSE b.uc0
+      END AS uc_new,
+      b.direction
+    FROM (
+      SELECT
+        CAST(s.quantity   AS REAL) AS q0,
+        CAST(s.unit_value AS REAL) AS uc0,
+        /* quantity of this txn in base UoM */
+        CAST(NEW.quantity AS REAL) * COALESCE((
+          SELECT CAST(pu.factor_to_base AS REAL)
+          FROM product_uoms pu
+          WHERE pu.product_id = NEW.product_id
+            AND pu.uom_id     = NEW.uom_id
           LIMIT 1
-        ), 0.0)
-    END AS total_value_new,
-
-    'moving_average';
+        ), 1.0) AS dq,
+        /* purchase unit cost in base UoM (net of per-unit discount) */
+        CASE WHEN NEW.transaction_type = 'purchase' THEN (
+          SELECT (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0.0))
+                 / COALESCE((
+                     SELECT CAST(pu.factor_to_base AS REAL)
+                     FROM product_uoms pu
+                     WHERE pu.product_id = pi.product_id
+                       AND pu.uom_id     = pi.uom_id
+                     LIMIT 1
+                   ), 1.0)
+          FROM purchase_items pi
+          WHERE pi.item_id = NEW.reference_item_id
+        ) END AS pc,
+        CASE
+          WHEN NEW.transaction_type IN ('purchase','sale_return','adjustment') THEN 1.0
+          WHEN NEW.transaction_type IN ('sale','purchase_return')             THEN -1.0
+          ELSE 0.0
+        END AS direction
+      FROM stock_valuation_state s
+      WHERE s.product_id = NEW.product_id
+    ) b
+  ) v;
+
+  /* advance the running state to the row just written */
+  UPDATE stock_valuation_state
+     SET (quantity, unit_value, total_value, last_valuation_id) = (
+           SELECT svh.quantity, svh.unit_value, svh.total_value, svh.valuation_id
+           FROM stock_valuation_history svh
+           WHERE svh.valuation_id = last_insert_rowid()
+         ),
+         last_valuation_date = MAX(COALESCE(last_valuation_date, ''), DATE(NEW.date)),
+         updated_at          = CURRENT_TIMESTAMP
+   WHERE product_id = NEW.product_id;
 END;
 
+/* Keep on-hand quantity exact when ledger rows are removed or rewritten; unit cost
+   stays as-is until the dirty tail is replayed. */
+DROP TRIGGER IF EXISTS trg_stock_valuation_state_after_delete;
+CREATE TRIGGER trg_stock_valuation_state_after_delete
+AFTER DELETE ON inventory_transactions
+FOR EACH ROW
+BEGIN
+  UPDATE stock_valuation_state
+     SET quantity = CAST(quantity AS REAL) - (
+           CASE
+             WHEN OLD.transaction_type IN ('purchase','sale_return','adjustment') THEN 1.0
+             WHEN OLD.transaction_type IN ('sale','purchase_return')             THEN -1.0
+             ELSE 0.0
+           END
+           * CAST(OLD.quantity AS REAL)
+           * COALESCE((
+               SELECT CAST(pu.factor_to_base AS REAL)
+               FROM product_uoms pu
+               WHERE pu.product_id = OLD.product_id
+                 AND pu.uom_id     = OLD.uom_id
+               LIMIT 1
+             ), 1.0)
+         ),
+         updated_at = CURRENT_TIMESTAMP
+   WHERE product_id = OLD.product_id;
 
+  UPDATE stock_valuation_state
+     SET total_value = CAST(unit_value AS REAL) * CAST(quantity AS REAL)
+   WHERE product_id = OLD.product_id;
+END;
 
-DROP TRIGGER IF EXISTS trg_mark_dirty_on_backdate_ins;
-CREATE TRIGGER trg_mark_dirty_on_backdate_ins
-AFTER INSERT ON inventory_transactions
+DROP TRIGGER IF EXISTS trg_stock_valuation_state_after_update;
+CREATE TRIGGER trg_stock_valuation_state_after_update
+AFTER UPDATE OF product_id, quantity, uom_id, transaction_type ON inventory_transactions
 FOR EACH ROW
-WHEN EXISTS (
-  SELECT 1 FROM stock_valuation_history svh
-  WHERE svh.product_id = NEW.product_id
-    AND DATE(svh.valuation_date) > DATE(NEW.date)
-)
 BEGIN
-  INSERT INTO valuation_dirty (product_id, earliest_impacted, reason, updated_at)
-  VALUES (NEW.product_id, NEW.date, 'inventory_insert_backdate', CURRENT_TIMESTAMP)
-  ON CONFLICT(product_id) DO UPDATE SET
-    earliest_impacted = MIN(valuation_dirty.earliest_impacted, excluded.earliest_impacted),
-    reason            = COALESCE(valuation_dirty.reason, excluded.reason),
-    updated_at        = CURRENT_TIMESTAMP;
+  UPDATE stock_valuation_state
+     SET quantity = CAST(quantity AS REAL) - (
+           CASE
+             WHEN OLD.transaction_type IN ('purchase','sale_return','adjustment') THEN 1.0
+             WHEN OLD.transaction_type IN ('sale','purchase_return')             THEN -1.0
+             ELSE 0.0
+           END
+           * CAST(OLD.quantity AS REAL)
+           * COALESCE((
+               SELECT CAST(pu.factor_to_base AS REAL)
+               FROM product_uoms pu
+               WHERE pu.product_id = OLD.product_id
+                 AND pu.uom_id     = OLD.uom_id
+               LIMIT 1
+             ), 1.0)
+         ),
+         updated_at = CURRENT_TIMESTAMP
+   WHERE product_id = OLD.product_id;
+
+  INSERT OR IGNORE INTO stock_valuation_state (product_id) VALUES (NEW.product_id);
+
+  UPDATE stock_valuation_state
+     SET quantity = CAST(quantity AS REAL) + (
+           CASE
+             WHEN NEW.transaction_type IN ('purchase','sale_return','adjustment') THEN 1.0
+             WHEN NEW.transaction_type IN ('sale','purchase_return')             THEN -1.0
+             ELSE 0.0
+           END
+           * CAST(NEW.quantity AS REAL)
+           * COALESCE((
+               SELECT CAST(pu.factor_to_base AS REAL)
+               FROM product_uoms pu
+               WHERE pu.product_id = NEW.product_id
+                 AND pu.uom_id     = NEW.uom_id
+               LIMIT 1
+             ), 1.0)
+         ),
+         updated_at = CURRENT_TIMESTAMP
+   WHERE product_id = NEW.product_id;
+
+  UPDATE stock_valuation_state
+     SET total_value = CAST(unit_value AS REAL) * CAST(quantity AS REAL)
+   WHERE product_id IN (OLD.product_id, NEW.product_id);
 END;
 
 DROP TRIGGER IF EXISTS trg_mark_dirty_on_inventory_upd;
@@ -1057,9 +1393,840 @@ BEGIN
     updated_at        = CURRENT_TIMESTAMP;
 END;
 
+/* sale line removed (sale edit/delete) -> drop its COGS row */
+DROP TRIGGER IF EXISTS trg_sale_item_cogs_after_item_delete;
+CREATE TRIGGER trg_sale_item_cogs_after_item_delete
+AFTER DELETE ON sale_items
+FOR EACH ROW
+BEGIN
+  DELETE FROM sale_item_cogs WHERE item_id = OLD.item_id;
+END;
+
+/* ======================== DAILY SALES FACTS (reporting) ======================== */
+/* fact_sales_daily is maintained from sales / sale_items / sale_item_cogs by the
+   triggers below; sales reports aggregate it instead of the line items.
+   Writes go through the fact_sales_delta view, whose INSTEAD OF trigger adds a
+   signed delta to one fact row and drops rows that no longer hold any sale.
+   database.reconcile verifies / rebuilds the table. */
+
+DROP VIEW IF EXISTS fact_sales_delta;
+CREATE VIEW fact_sales_delta AS
+SELECT product_id, day, customer_id, payment_status, category, qty_base, revenue, cogs, orders
+FROM fact_sales_daily
+WHERE 0;
+
+DROP TRIGGER IF EXISTS trg_fact_sales_delta_ii;
+CREATE TRIGGER trg_fact_sales_delta_ii
+INSTEAD OF INSERT ON fact_sales_delta
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_sales_daily
+      (product_id, day, customer_id, payment_status, category, qty_base, revenue, cogs, orders)
+  VALUES
+      (NEW.product_id, NEW.day, NEW.customer_id, NEW.payment_status, NEW.category,
+       ROUND(NEW.qty_base, 9), ROUND(NEW.revenue, 9), ROUND(NEW.cogs, 9), NEW.orders)
+  ON CONFLICT (product_id, day, customer_id, payment_status) DO UPDATE SET
+      category = excluded.category,
+      qty_base = ROUND(qty_base + excluded.qty_base, 9),
+      revenue  = ROUND(revenue + excluded.revenue, 9),
+      cogs     = ROUND(cogs + excluded.cogs, 9),
+      orders   = orders + excluded.orders;
+  DELETE FROM fact_sales_daily
+   WHERE product_id = NEW.product_id AND day = NEW.day
+     AND customer_id = NEW.customer_id AND payment_status = NEW.payment_status
+     AND orders <= 0 AND ABS(cogs) < 0.000001;
+END;
+
+/* sale header: order count and header total (product_id 0) */
+DROP TRIGGER IF EXISTS trg_fact_sales_ai;
+CREATE TRIGGER trg_fact_sales_ai
+AFTER INSERT ON sales
+FOR EACH ROW
+WHEN NEW.doc_type = 'sale'
+BEGIN
+  INSERT INTO fact_sales_delta
+  SELECT 0, COALESCE(DATE(NEW.date), NEW.date), NEW.customer_id, NEW.payment_status, NULL, 0.0, CAST(NEW.total_amount AS REAL), 0.0, 1;
+END;
+
+/* key, type or total changed (incl. payment status moved by the payment triggers):
+   move the whole sale from its old fact rows to the new ones */
+DROP TRIGGER IF EXISTS trg_fact_sales_au;
+CREATE TRIGGER trg_fact_sales_au
+AFTER UPDATE OF date, customer_id, payment_status, doc_type, total_amount ON sales
+FOR EACH ROW
+WHEN (OLD.doc_type = 'sale' OR NEW.doc_type = 'sale')
+ AND (OLD.date IS NOT NEW.date OR OLD.customer_id IS NOT NEW.customer_id
+      OR OLD.payment_status IS NOT NEW.payment_status OR OLD.doc_type IS NOT NEW.doc_type
+      OR OLD.total_amount IS NOT NEW.total_amount)
+BEGIN
+  INSERT INTO fact_sales_delta
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), OLD.customer_id, OLD.payment_status, NULL, 0.0, -CAST(OLD.total_amount AS REAL), 0.0, -1
+  WHERE OLD.doc_type = 'sale';
+  INSERT INTO fact_sales_delta
+  SELECT si.product_id, COALESCE(DATE(OLD.date), OLD.date), OLD.customer_id, OLD.payment_status, p.category,
+         -SUM(CAST(si.quantity AS REAL) * COALESCE(CAST(pu.factor_to_base AS REAL), 1.0)),
+         -SUM(CAST(si.quantity AS REAL) * (CAST(si.unit_price AS REAL) - COALESCE(CAST(si.item_discount AS REAL), 0))),
+         0.0, -1
+  FROM sale_items si
+  LEFT JOIN products p ON p.product_id = si.product_id
+  LEFT JOIN product_uoms pu ON pu.product_id = si.product_id AND pu.uom_id = si.uom_id
+  WHERE si.sale_id = OLD.sale_id AND OLD.doc_type = 'sale'
+  GROUP BY si.product_id;
+  INSERT INTO fact_sales_delta
+  SELECT c.product_id, COALESCE(DATE(OLD.date), OLD.date), OLD.customer_id, OLD.payment_status, p.category, 0.0, 0.0, -SUM(CAST(c.cogs_value AS REAL)), 0
+  FROM sale_item_cogs c
+  LEFT JOIN products p ON p.product_id = c.product_id
+  WHERE c.sale_id = OLD.sale_id AND OLD.doc_type = 'sale'
+  GROUP BY c.product_id;
+  INSERT INTO fact_sales_delta
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), OLD.customer_id, OLD.payment_status, NULL, 0.0, 0.0, -t.cogs, 0
+  FROM (
+      SELECT SUM(CAST(c.cogs_value AS REAL)) AS cogs, COUNT(*) AS n
+      FROM sale_item_cogs c
+      WHERE c.sale_id = OLD.sale_id
+  ) t
+  WHERE t.n > 0 AND OLD.doc_type = 'sale';
+  INSERT INTO fact_sales_delta
+  SELECT 0, COALESCE(DATE(NEW.date), NEW.date), NEW.customer_id, NEW.payment_status, NULL, 0.0, CAST(NEW.total_amount AS REAL), 0.0, 1
+  WHERE NEW.doc_type = 'sale';
+  INSERT INTO fact_sales_delta
+  SELECT si.product_id, COALESCE(DATE(NEW.date), NEW.date), NEW.customer_id, NEW.payment_status, p.category,
+         SUM(CAST(si.quantity AS REAL) * COALESCE(CAST(pu.factor_to_base AS REAL), 1.0)),
+         SUM(CAST(si.quantity AS REAL) * (CAST(si.unit_price AS REAL) - COALESCE(CAST(si.item_discount AS REAL), 0))),
+         0.0, 1
+  FROM sale_items si
+  LEFT JOIN products p ON p.product_id = si.product_id
+  LEFT JOIN product_uoms pu ON pu.product_id = si.product_id AND pu.uom_id = si.uom_id
+  WHERE si.sale_id = NEW.sale_id AND NEW.doc_type = 'sale'
+  GROUP BY si.product_id;
+  INSERT INTO fact_sales_delta
+  SELECT c.product_id, COALESCE(DATE(NEW.date), NEW.date), NEW.customer_id, NEW.payment_status, p.category, 0.0, 0.0, SUM(CAST(c.cogs_value AS REAL)), 0
+  FROM sale_item_cogs c
+  LEFT JOIN products p ON p.product_id = c.product_id
+  WHERE c.sale_id = NEW.sale_id AND NEW.doc_type = 'sale'
+  GROUP BY c.product_id;
+  INSERT INTO fact_sales_delta
+  SELECT 0, COALESCE(DATE(NEW.date), NEW.date), NEW.customer_id, NEW.payment_status, NULL, 0.0, 0.0, t.cogs, 0
+  FROM (
+      SELECT SUM(CAST(c.cogs_value AS REAL)) AS cogs, COUNT(*) AS n
+      FROM sale_item_cogs c
+      WHERE c.sale_id = NEW.sale_id
+  ) t
+  WHERE t.n > 0 AND NEW.doc_type = 'sale';
+END;
+
+/* BEFORE: lines removed by the cascade no longer find their sale */
+DROP TRIGGER IF EXISTS trg_fact_sales_bd;
+CREATE TRIGGER trg_fact_sales_bd
+BEFORE DELETE ON sales
+FOR EACH ROW
+WHEN OLD.doc_type = 'sale'
+BEGIN
+  INSERT INTO fact_sales_delta
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), OLD.customer_id, OLD.payment_status, NULL, 0.0, -CAST(OLD.total_amount AS REAL), 0.0, -1
+  WHERE OLD.doc_type = 'sale';
+  INSERT INTO fact_sales_delta
+  SELECT si.product_id, COALESCE(DATE(OLD.date), OLD.date), OLD.customer_id, OLD.payment_status, p.category,
+         -SUM(CAST(si.quantity AS REAL) * COALESCE(CAST(pu.factor_to_base AS REAL), 1.0)),
+         -SUM(CAST(si.quantity AS REAL) * (CAST(si.unit_price AS REAL) - COALESCE(CAST(si.item_discount AS REAL), 0))),
+         0.0, -1
+  FROM sale_items si
+  LEFT JOIN products p ON p.product_id = si.product_id
+  LEFT JOIN product_uoms pu ON pu.product_id = si.product_id AND pu.uom_id = si.uom_id
+  WHERE si.sale_id = OLD.sale_id AND OLD.doc_type = 'sale'
+  GROUP BY si.product_id;
+  INSERT INTO fact_sales_delta
+  SELECT c.product_id, COALESCE(DATE(OLD.date), OLD.date), OLD.customer_id, OLD.payment_status, p.category, 0.0, 0.0, -SUM(CAST(c.cogs_value AS REAL)), 0
+  FROM sale_item_cogs c
+  LEFT JOIN products p ON p.product_id = c.product_id
+  WHERE c.sale_id = OLD.sale_id AND OLD.doc_type = 'sale'
+  GROUP BY c.product_id;
+  INSERT INTO fact_sales_delta
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), OLD.customer_id, OLD.payment_status, NULL, 0.0, 0.0, -t.cogs, 0
+  FROM (
+      SELECT SUM(CAST(c.cogs_value AS REAL)) AS cogs, COUNT(*) AS n
+      FROM sale_item_cogs c
+      WHERE c.sale_id = OLD.sale_id
+  ) t
+  WHERE t.n > 0 AND OLD.doc_type = 'sale';
+END;
+
+/* sale lines: quantity and line revenue; orders counts sales per product */
+DROP TRIGGER IF EXISTS trg_fact_sale_items_ai;
+CREATE TRIGGER trg_fact_sale_items_ai
+AFTER INSERT ON sale_items
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_sales_delta
+  SELECT NEW.product_id, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status,
+         (SELECT p.category FROM products p WHERE p.product_id = NEW.product_id),
+         CAST(NEW.quantity AS REAL) * COALESCE((
+             SELECT CAST(pu.factor_to_base AS REAL) FROM product_uoms pu
+             WHERE pu.product_id = NEW.product_id AND pu.uom_id = NEW.uom_id
+         ), 1.0),
+         CAST(NEW.quantity AS REAL) * (CAST(NEW.unit_price AS REAL) - COALESCE(CAST(NEW.item_discount AS REAL), 0)),
+         0.0,
+         (NOT EXISTS (
+             SELECT 1 FROM sale_items o
+             WHERE o.sale_id = NEW.sale_id AND o.product_id = NEW.product_id AND o.item_id <> NEW.item_id
+         ))
+  FROM sales s
+  WHERE s.sale_id = NEW.sale_id AND s.doc_type = 'sale';
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_sale_items_au;
+CREATE TRIGGER trg_fact_sale_items_au
+AFTER UPDATE ON sale_items
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_sales_delta
+  SELECT OLD.product_id, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status,
+         (SELECT p.category FROM products p WHERE p.product_id = OLD.product_id),
+         -CAST(OLD.quantity AS REAL) * COALESCE((
+             SELECT CAST(pu.factor_to_base AS REAL) FROM product_uoms pu
+             WHERE pu.product_id = OLD.product_id AND pu.uom_id = OLD.uom_id
+         ), 1.0),
+         -CAST(OLD.quantity AS REAL) * (CAST(OLD.unit_price AS REAL) - COALESCE(CAST(OLD.item_discount AS REAL), 0)),
+         0.0,
+         -(NOT EXISTS (
+             SELECT 1 FROM sale_items o
+             WHERE o.sale_id = OLD.sale_id AND o.product_id = OLD.product_id AND o.item_id <> OLD.item_id
+         ))
+  FROM sales s
+  WHERE s.sale_id = OLD.sale_id AND s.doc_type = 'sale';
+  INSERT INTO fact_sales_delta
+  SELECT NEW.product_id, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status,
+         (SELECT p.category FROM products p WHERE p.product_id = NEW.product_id),
+         CAST(NEW.quantity AS REAL) * COALESCE((
+             SELECT CAST(pu.factor_to_base AS REAL) FROM product_uoms pu
+             WHERE pu.product_id = NEW.product_id AND pu.uom_id = NEW.uom_id
+         ), 1.0),
+         CAST(NEW.quantity AS REAL) * (CAST(NEW.unit_price AS REAL) - COALESCE(CAST(NEW.item_discount AS REAL), 0)),
+         0.0,
+         (NOT EXISTS (
+             SELECT 1 FROM sale_items o
+             WHERE o.sale_id = NEW.sale_id AND o.product_id = NEW.product_id AND o.item_id <> NEW.item_id
+         ))
+  FROM sales s
+  WHERE s.sale_id = NEW.sale_id AND s.doc_type = 'sale';
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_sale_items_ad;
+CREATE TRIGGER trg_fact_sale_items_ad
+AFTER DELETE ON sale_items
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_sales_delta
+  SELECT OLD.product_id, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status,
+         (SELECT p.category FROM products p WHERE p.product_id = OLD.product_id),
+         -CAST(OLD.quantity AS REAL) * COALESCE((
+             SELECT CAST(pu.factor_to_base AS REAL) FROM product_uoms pu
+             WHERE pu.product_id = OLD.product_id AND pu.uom_id = OLD.uom_id
+         ), 1.0),
+         -CAST(OLD.quantity AS REAL) * (CAST(OLD.unit_price AS REAL) - COALESCE(CAST(OLD.item_discount AS REAL), 0)),
+         0.0,
+         -(NOT EXISTS (
+             SELECT 1 FROM sale_items o
+             WHERE o.sale_id = OLD.sale_id AND o.product_id = OLD.product_id AND o.item_id <> OLD.item_id
+         ))
+  FROM sales s
+  WHERE s.sale_id = OLD.sale_id AND s.doc_type = 'sale';
+END;
+
+/* COGS rows: on the product row and the header row */
+DROP TRIGGER IF EXISTS trg_fact_sale_item_cogs_ai;
+CREATE TRIGGER trg_fact_sale_item_cogs_ai
+AFTER INSERT ON sale_item_cogs
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_sales_delta
+  SELECT NEW.product_id, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status,
+         (SELECT p.category FROM products p WHERE p.product_id = NEW.product_id),
+         0.0, 0.0, CAST(NEW.cogs_value AS REAL), 0
+  FROM sales s
+  WHERE s.sale_id = NEW.sale_id AND s.doc_type = 'sale'
+  UNION ALL
+  SELECT 0, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status, NULL, 0.0, 0.0, CAST(NEW.cogs_value AS REAL), 0
+  FROM sales s
+  WHERE s.sale_id = NEW.sale_id AND s.doc_type = 'sale';
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_sale_item_cogs_au;
+CREATE TRIGGER trg_fact_sale_item_cogs_au
+AFTER UPDATE ON sale_item_cogs
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_sales_delta
+  SELECT OLD.product_id, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status,
+         (SELECT p.category FROM products p WHERE p.product_id = OLD.product_id),
+         0.0, 0.0, -CAST(OLD.cogs_value AS REAL), 0
+  FROM sales s
+  WHERE s.sale_id = OLD.sale_id AND s.doc_type = 'sale'
+  UNION ALL
+  SELECT 0, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status, NULL, 0.0, 0.0, -CAST(OLD.cogs_value AS REAL), 0
+  FROM sales s
+  WHERE s.sale_id = OLD.sale_id AND s.doc_type = 'sale';
+  INSERT INTO fact_sales_delta
+  SELECT NEW.product_id, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status,
+         (SELECT p.category FROM products p WHERE p.product_id = NEW.product_id),
+         0.0, 0.0, CAST(NEW.cogs_value AS REAL), 0
+  FROM sales s
+  WHERE s.sale_id = NEW.sale_id AND s.doc_type = 'sale'
+  UNION ALL
+  SELECT 0, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status, NULL, 0.0, 0.0, CAST(NEW.cogs_value AS REAL), 0
+  FROM sales s
+  WHERE s.sale_id = NEW.sale_id AND s.doc_type = 'sale';
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_sale_item_cogs_ad;
+CREATE TRIGGER trg_fact_sale_item_cogs_ad
+AFTER DELETE ON sale_item_cogs
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_sales_delta
+  SELECT OLD.product_id, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status,
+         (SELECT p.category FROM products p WHERE p.product_id = OLD.product_id),
+         0.0, 0.0, -CAST(OLD.cogs_value AS REAL), 0
+  FROM sales s
+  WHERE s.sale_id = OLD.sale_id AND s.doc_type = 'sale'
+  UNION ALL
+  SELECT 0, COALESCE(DATE(s.date), s.date), s.customer_id, s.payment_status, NULL, 0.0, 0.0, -CAST(OLD.cogs_value AS REAL), 0
+  FROM sales s
+  WHERE s.sale_id = OLD.sale_id AND s.doc_type = 'sale';
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_sales_product_category_au;
+CREATE TRIGGER trg_fact_sales_product_category_au
+AFTER UPDATE OF category ON products
+FOR EACH ROW
+WHEN OLD.category IS NOT NEW.category
+BEGIN
+  UPDATE fact_sales_daily SET category = NEW.category WHERE product_id = NEW.product_id;
+END;
+
+/* ====================== DAILY PURCHASE FACTS (reporting) ====================== */
+/* fact_purchases_daily is maintained from purchases / purchase_items / purchase
+   returns (inventory_transactions) / purchase_payments by the triggers below;
+   purchase reports aggregate it instead of the documents. Same scheme as the
+   sales facts: writes go through fact_purchases_delta, whose INSTEAD OF trigger
+   adds a signed delta to one fact row and drops rows left empty.
+   database.reconcile verifies / rebuilds the table. */
+
+DROP VIEW IF EXISTS fact_purchases_delta;
+CREATE VIEW fact_purchases_delta AS
+SELECT product_id, day, vendor_id, category, qty_base, spend, orders, paid, advance_applied, qty_returned, returns_value, payments_cleared
+FROM fact_purchases_daily
+WHERE 0;
+
+DROP TRIGGER IF EXISTS trg_fact_purchases_delta_ii;
+CREATE TRIGGER trg_fact_purchases_delta_ii
+INSTEAD OF INSERT ON fact_purchases_delta
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_purchases_daily
+      (product_id, day, vendor_id, category, qty_base, spend, orders, paid, advance_applied, qty_returned, returns_value, payments_cleared)
+  VALUES
+      (NEW.product_id, NEW.day, NEW.vendor_id, NEW.category,
+       ROUND(NEW.qty_base, 9), ROUND(NEW.spend, 9), NEW.orders,
+       ROUND(NEW.paid, 9), ROUND(NEW.advance_applied, 9),
+       ROUND(NEW.qty_returned, 9), ROUND(NEW.returns_value, 9), ROUND(NEW.payments_cleared, 9))
+  ON CONFLICT (product_id, day, vendor_id) DO UPDATE SET
+      category         = excluded.category,
+      qty_base         = ROUND(qty_base + excluded.qty_base, 9),
+      spend            = ROUND(spend + excluded.spend, 9),
+      orders           = orders + excluded.orders,
+      paid             = ROUND(paid + excluded.paid, 9),
+      advance_applied  = ROUND(advance_applied + excluded.advance_applied, 9),
+      qty_returned     = ROUND(qty_returned + excluded.qty_returned, 9),
+      returns_value    = ROUND(returns_value + excluded.returns_value, 9),
+      payments_cleared = ROUND(payments_cleared + excluded.payments_cleared, 9);
+  DELETE FROM fact_purchases_daily
+   WHERE product_id = NEW.product_id AND day = NEW.day AND vendor_id = NEW.vendor_id
+     AND orders <= 0
+     AND ABS(qty_returned) < 0.000001 AND ABS(returns_value) < 0.000001
+     AND ABS(payments_cleared) < 0.000001;
+END;
+
+/* purchase header: order count, total, paid and advance applied (product_id 0) */
+DROP TRIGGER IF EXISTS trg_fact_purchases_ai;
+CREATE TRIGGER trg_fact_purchases_ai
+AFTER INSERT ON purchases
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(NEW.date), NEW.date), NEW.vendor_id, NULL, 0.0, CAST(NEW.total_amount AS REAL), 1,
+         CAST(NEW.paid_amount AS REAL), CAST(NEW.advance_payment_applied AS REAL), 0.0, 0.0, 0.0;
+END;
+
+/* header totals moved (edits, payment rollups): adjust the order-level row */
+DROP TRIGGER IF EXISTS trg_fact_purchases_au_totals;
+CREATE TRIGGER trg_fact_purchases_au_totals
+AFTER UPDATE OF total_amount, paid_amount, advance_payment_applied ON purchases
+FOR EACH ROW
+WHEN OLD.date IS NEW.date AND OLD.vendor_id IS NEW.vendor_id
+ AND (OLD.total_amount IS NOT NEW.total_amount OR OLD.paid_amount IS NOT NEW.paid_amount
+      OR OLD.advance_payment_applied IS NOT NEW.advance_payment_applied)
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), OLD.vendor_id, NULL, 0.0, -CAST(OLD.total_amount AS REAL), -1,
+         -CAST(OLD.paid_amount AS REAL), -CAST(OLD.advance_payment_applied AS REAL), 0.0, 0.0, 0.0;
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(NEW.date), NEW.date), NEW.vendor_id, NULL, 0.0, CAST(NEW.total_amount AS REAL), 1,
+         CAST(NEW.paid_amount AS REAL), CAST(NEW.advance_payment_applied AS REAL), 0.0, 0.0, 0.0;
+END;
+
+/* date or vendor changed: move the whole purchase (returns and payments keep their own days) */
+DROP TRIGGER IF EXISTS trg_fact_purchases_au_key;
+CREATE TRIGGER trg_fact_purchases_au_key
+AFTER UPDATE OF date, vendor_id ON purchases
+FOR EACH ROW
+WHEN OLD.date IS NOT NEW.date OR OLD.vendor_id IS NOT NEW.vendor_id
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), OLD.vendor_id, NULL, 0.0, -CAST(OLD.total_amount AS REAL), -1,
+         -CAST(OLD.paid_amount AS REAL), -CAST(OLD.advance_payment_applied AS REAL), 0.0, 0.0, 0.0;
+  INSERT INTO fact_purchases_delta
+  SELECT pi.product_id, COALESCE(DATE(OLD.date), OLD.date), OLD.vendor_id, pr.category,
+         -SUM(CAST(pi.quantity AS REAL)), -SUM(CAST(pi.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0))), -1,
+         0.0, 0.0, 0.0, 0.0, 0.0
+  FROM purchase_items pi
+  LEFT JOIN products pr ON pr.product_id = pi.product_id
+  WHERE pi.purchase_id = OLD.purchase_id
+  GROUP BY pi.product_id;
+  INSERT INTO fact_purchases_delta
+  SELECT it.product_id, COALESCE(DATE(it.date), it.date), OLD.vendor_id, pr.category,
+         0.0, 0.0, 0, 0.0, 0.0, -SUM(CAST(it.quantity AS REAL)), -SUM(CAST(it.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0))), 0.0
+  FROM inventory_transactions it
+  JOIN purchase_items pi ON pi.item_id = it.reference_item_id AND pi.purchase_id = it.reference_id
+  LEFT JOIN products pr ON pr.product_id = it.product_id
+  WHERE it.reference_id = OLD.purchase_id AND it.transaction_type = 'purchase_return'
+  GROUP BY it.product_id, COALESCE(DATE(it.date), it.date);
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(it.date), it.date), OLD.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, -SUM(CAST(it.quantity AS REAL)), -SUM(CAST(it.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0))), 0.0
+  FROM inventory_transactions it
+  JOIN purchase_items pi ON pi.item_id = it.reference_item_id AND pi.purchase_id = it.reference_id
+  WHERE it.reference_id = OLD.purchase_id AND it.transaction_type = 'purchase_return'
+  GROUP BY COALESCE(DATE(it.date), it.date);
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(pp.date), pp.date), OLD.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, -SUM(CAST(pp.amount AS REAL))
+  FROM purchase_payments pp
+  WHERE pp.purchase_id = OLD.purchase_id
+    AND pp.clearing_state = 'cleared' AND CAST(pp.amount AS REAL) > 0
+  GROUP BY COALESCE(DATE(pp.date), pp.date);
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(NEW.date), NEW.date), NEW.vendor_id, NULL, 0.0, CAST(NEW.total_amount AS REAL), 1,
+         CAST(NEW.paid_amount AS REAL), CAST(NEW.advance_payment_applied AS REAL), 0.0, 0.0, 0.0;
+  INSERT INTO fact_purchases_delta
+  SELECT pi.product_id, COALESCE(DATE(NEW.date), NEW.date), NEW.vendor_id, pr.category,
+         SUM(CAST(pi.quantity AS REAL)), SUM(CAST(pi.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0))), 1,
+         0.0, 0.0, 0.0, 0.0, 0.0
+  FROM purchase_items pi
+  LEFT JOIN products pr ON pr.product_id = pi.product_id
+  WHERE pi.purchase_id = NEW.purchase_id
+  GROUP BY pi.product_id;
+  INSERT INTO fact_purchases_delta
+  SELECT it.product_id, COALESCE(DATE(it.date), it.date), NEW.vendor_id, pr.category,
+         0.0, 0.0, 0, 0.0, 0.0, SUM(CAST(it.quantity AS REAL)), SUM(CAST(it.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0))), 0.0
+  FROM inventory_transactions it
+  JOIN purchase_items pi ON pi.item_id = it.reference_item_id AND pi.purchase_id = it.reference_id
+  LEFT JOIN products pr ON pr.product_id = it.product_id
+  WHERE it.reference_id = NEW.purchase_id AND it.transaction_type = 'purchase_return'
+  GROUP BY it.product_id, COALESCE(DATE(it.date), it.date);
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(it.date), it.date), NEW.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, SUM(CAST(it.quantity AS REAL)), SUM(CAST(it.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0))), 0.0
+  FROM inventory_transactions it
+  JOIN purchase_items pi ON pi.item_id = it.reference_item_id AND pi.purchase_id = it.reference_id
+  WHERE it.reference_id = NEW.purchase_id AND it.transaction_type = 'purchase_return'
+  GROUP BY COALESCE(DATE(it.date), it.date);
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(pp.date), pp.date), NEW.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, SUM(CAST(pp.amount AS REAL))
+  FROM purchase_payments pp
+  WHERE pp.purchase_id = NEW.purchase_id
+    AND pp.clearing_state = 'cleared' AND CAST(pp.amount AS REAL) > 0
+  GROUP BY COALESCE(DATE(pp.date), pp.date);
+END;
+
+/* BEFORE: rows removed by the cascade no longer find their purchase */
+DROP TRIGGER IF EXISTS trg_fact_purchases_bd;
+CREATE TRIGGER trg_fact_purchases_bd
+BEFORE DELETE ON purchases
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), OLD.vendor_id, NULL, 0.0, -CAST(OLD.total_amount AS REAL), -1,
+         -CAST(OLD.paid_amount AS REAL), -CAST(OLD.advance_payment_applied AS REAL), 0.0, 0.0, 0.0;
+  INSERT INTO fact_purchases_delta
+  SELECT pi.product_id, COALESCE(DATE(OLD.date), OLD.date), OLD.vendor_id, pr.category,
+         -SUM(CAST(pi.quantity AS REAL)), -SUM(CAST(pi.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0))), -1,
+         0.0, 0.0, 0.0, 0.0, 0.0
+  FROM purchase_items pi
+  LEFT JOIN products pr ON pr.product_id = pi.product_id
+  WHERE pi.purchase_id = OLD.purchase_id
+  GROUP BY pi.product_id;
+  INSERT INTO fact_purchases_delta
+  SELECT it.product_id, COALESCE(DATE(it.date), it.date), OLD.vendor_id, pr.category,
+         0.0, 0.0, 0, 0.0, 0.0, -SUM(CAST(it.quantity AS REAL)), -SUM(CAST(it.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0))), 0.0
+  FROM inventory_transactions it
+  JOIN purchase_items pi ON pi.item_id = it.reference_item_id AND pi.purchase_id = it.reference_id
+  LEFT JOIN products pr ON pr.product_id = it.product_id
+  WHERE it.reference_id = OLD.purchase_id AND it.transaction_type = 'purchase_return'
+  GROUP BY it.product_id, COALESCE(DATE(it.date), it.date);
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(it.date), it.date), OLD.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, -SUM(CAST(it.quantity AS REAL)), -SUM(CAST(it.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0))), 0.0
+  FROM inventory_transactions it
+  JOIN purchase_items pi ON pi.item_id = it.reference_item_id AND pi.purchase_id = it.reference_id
+  WHERE it.reference_id = OLD.purchase_id AND it.transaction_type = 'purchase_return'
+  GROUP BY COALESCE(DATE(it.date), it.date);
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(pp.date), pp.date), OLD.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, -SUM(CAST(pp.amount AS REAL))
+  FROM purchase_payments pp
+  WHERE pp.purchase_id = OLD.purchase_id
+    AND pp.clearing_state = 'cleared' AND CAST(pp.amount AS REAL) > 0
+  GROUP BY COALESCE(DATE(pp.date), pp.date);
+END;
+
+/* purchase lines: quantity and line spend; orders counts purchases per product.
+   Returns are valued at their line's price, so they follow line edits too. */
+DROP TRIGGER IF EXISTS trg_fact_purchase_items_ai;
+CREATE TRIGGER trg_fact_purchase_items_ai
+AFTER INSERT ON purchase_items
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT NEW.product_id, COALESCE(DATE(p.date), p.date), p.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = NEW.product_id),
+         CAST(NEW.quantity AS REAL), CAST(NEW.quantity AS REAL) * (CAST(NEW.purchase_price AS REAL) - COALESCE(CAST(NEW.item_discount AS REAL), 0)),
+         (NOT EXISTS (
+             SELECT 1 FROM purchase_items o
+             WHERE o.purchase_id = NEW.purchase_id AND o.product_id = NEW.product_id AND o.item_id <> NEW.item_id
+         )),
+         0.0, 0.0, 0.0, 0.0, 0.0
+  FROM purchases p
+  WHERE p.purchase_id = NEW.purchase_id;
+  INSERT INTO fact_purchases_delta
+  SELECT x.product_id, x.day, x.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = x.product_id), 0.0, 0.0, 0, 0.0, 0.0, x.qty, x.value, 0.0
+  FROM (
+      SELECT it.product_id, COALESCE(DATE(it.date), it.date) AS day, p.vendor_id,
+             SUM(CAST(it.quantity AS REAL)) AS qty,
+             SUM(CAST(it.quantity AS REAL) * (CAST(NEW.purchase_price AS REAL) - COALESCE(CAST(NEW.item_discount AS REAL), 0))) AS value
+      FROM inventory_transactions it
+      JOIN purchases p ON p.purchase_id = it.reference_id
+      WHERE it.reference_id = NEW.purchase_id AND it.reference_item_id = NEW.item_id
+        AND it.transaction_type = 'purchase_return'
+      GROUP BY it.product_id, COALESCE(DATE(it.date), it.date), p.vendor_id
+  ) x
+  UNION ALL
+  SELECT 0, x.day, x.vendor_id, NULL, 0.0, 0.0, 0, 0.0, 0.0, x.qty, x.value, 0.0
+  FROM (
+      SELECT COALESCE(DATE(it.date), it.date) AS day, p.vendor_id,
+             SUM(CAST(it.quantity AS REAL)) AS qty,
+             SUM(CAST(it.quantity AS REAL) * (CAST(NEW.purchase_price AS REAL) - COALESCE(CAST(NEW.item_discount AS REAL), 0))) AS value
+      FROM inventory_transactions it
+      JOIN purchases p ON p.purchase_id = it.reference_id
+      WHERE it.reference_id = NEW.purchase_id AND it.reference_item_id = NEW.item_id
+        AND it.transaction_type = 'purchase_return'
+      GROUP BY COALESCE(DATE(it.date), it.date), p.vendor_id
+  ) x;
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_purchase_items_au;
+CREATE TRIGGER trg_fact_purchase_items_au
+AFTER UPDATE OF purchase_id, product_id, quantity, purchase_price, item_discount ON purchase_items
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT OLD.product_id, COALESCE(DATE(p.date), p.date), p.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = OLD.product_id),
+         -CAST(OLD.quantity AS REAL), -CAST(OLD.quantity AS REAL) * (CAST(OLD.purchase_price AS REAL) - COALESCE(CAST(OLD.item_discount AS REAL), 0)),
+         -(NOT EXISTS (
+             SELECT 1 FROM purchase_items o
+             WHERE o.purchase_id = OLD.purchase_id AND o.product_id = OLD.product_id AND o.item_id <> OLD.item_id
+         )),
+         0.0, 0.0, 0.0, 0.0, 0.0
+  FROM purchases p
+  WHERE p.purchase_id = OLD.purchase_id;
+  INSERT INTO fact_purchases_delta
+  SELECT x.product_id, x.day, x.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = x.product_id), 0.0, 0.0, 0, 0.0, 0.0, -x.qty, -x.value, 0.0
+  FROM (
+      SELECT it.product_id, COALESCE(DATE(it.date), it.date) AS day, p.vendor_id,
+             SUM(CAST(it.quantity AS REAL)) AS qty,
+             SUM(CAST(it.quantity AS REAL) * (CAST(OLD.purchase_price AS REAL) - COALESCE(CAST(OLD.item_discount AS REAL), 0))) AS value
+      FROM inventory_transactions it
+      JOIN purchases p ON p.purchase_id = it.reference_id
+      WHERE it.reference_id = OLD.purchase_id AND it.reference_item_id = OLD.item_id
+        AND it.transaction_type = 'purchase_return'
+      GROUP BY it.product_id, COALESCE(DATE(it.date), it.date), p.vendor_id
+  ) x
+  UNION ALL
+  SELECT 0, x.day, x.vendor_id, NULL, 0.0, 0.0, 0, 0.0, 0.0, -x.qty, -x.value, 0.0
+  FROM (
+      SELECT COALESCE(DATE(it.date), it.date) AS day, p.vendor_id,
+             SUM(CAST(it.quantity AS REAL)) AS qty,
+             SUM(CAST(it.quantity AS REAL) * (CAST(OLD.purchase_price AS REAL) - COALESCE(CAST(OLD.item_discount AS REAL), 0))) AS value
+      FROM inventory_transactions it
+      JOIN purchases p ON p.purchase_id = it.reference_id
+      WHERE it.reference_id = OLD.purchase_id AND it.reference_item_id = OLD.item_id
+        AND it.transaction_type = 'purchase_return'
+      GROUP BY COALESCE(DATE(it.date), it.date), p.vendor_id
+  ) x;
+  INSERT INTO fact_purchases_delta
+  SELECT NEW.product_id, COALESCE(DATE(p.date), p.date), p.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = NEW.product_id),
+         CAST(NEW.quantity AS REAL), CAST(NEW.quantity AS REAL) * (CAST(NEW.purchase_price AS REAL) - COALESCE(CAST(NEW.item_discount AS REAL), 0)),
+         (NOT EXISTS (
+             SELECT 1 FROM purchase_items o
+             WHERE o.purchase_id = NEW.purchase_id AND o.product_id = NEW.product_id AND o.item_id <> NEW.item_id
+         )),
+         0.0, 0.0, 0.0, 0.0, 0.0
+  FROM purchases p
+  WHERE p.purchase_id = NEW.purchase_id;
+  INSERT INTO fact_purchases_delta
+  SELECT x.product_id, x.day, x.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = x.product_id), 0.0, 0.0, 0, 0.0, 0.0, x.qty, x.value, 0.0
+  FROM (
+      SELECT it.product_id, COALESCE(DATE(it.date), it.date) AS day, p.vendor_id,
+             SUM(CAST(it.quantity AS REAL)) AS qty,
+             SUM(CAST(it.quantity AS REAL) * (CAST(NEW.purchase_price AS REAL) - COALESCE(CAST(NEW.item_discount AS REAL), 0))) AS value
+      FROM inventory_transactions it
+      JOIN purchases p ON p.purchase_id = it.reference_id
+      WHERE it.reference_id = NEW.purchase_id AND it.reference_item_id = NEW.item_id
+        AND it.transaction_type = 'purchase_return'
+      GROUP BY it.product_id, COALESCE(DATE(it.date), it.date), p.vendor_id
+  ) x
+  UNION ALL
+  SELECT 0, x.day, x.vendor_id, NULL, 0.0, 0.0, 0, 0.0, 0.0, x.qty, x.value, 0.0
+  FROM (
+      SELECT COALESCE(DATE(it.date), it.date) AS day, p.vendor_id,
+             SUM(CAST(it.quantity AS REAL)) AS qty,
+             SUM(CAST(it.quantity AS REAL) * (CAST(NEW.purchase_price AS REAL) - COALESCE(CAST(NEW.item_discount AS REAL), 0))) AS value
+      FROM inventory_transactions it
+      JOIN purchases p ON p.purchase_id = it.reference_id
+      WHERE it.reference_id = NEW.purchase_id AND it.reference_item_id = NEW.item_id
+        AND it.transaction_type = 'purchase_return'
+      GROUP BY COALESCE(DATE(it.date), it.date), p.vendor_id
+  ) x;
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_purchase_items_ad;
+CREATE TRIGGER trg_fact_purchase_items_ad
+AFTER DELETE ON purchase_items
+FOR EACH ROW
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT OLD.product_id, COALESCE(DATE(p.date), p.date), p.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = OLD.product_id),
+         -CAST(OLD.quantity AS REAL), -CAST(OLD.quantity AS REAL) * (CAST(OLD.purchase_price AS REAL) - COALESCE(CAST(OLD.item_discount AS REAL), 0)),
+         -(NOT EXISTS (
+             SELECT 1 FROM purchase_items o
+             WHERE o.purchase_id = OLD.purchase_id AND o.product_id = OLD.product_id AND o.item_id <> OLD.item_id
+         )),
+         0.0, 0.0, 0.0, 0.0, 0.0
+  FROM purchases p
+  WHERE p.purchase_id = OLD.purchase_id;
+  INSERT INTO fact_purchases_delta
+  SELECT x.product_id, x.day, x.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = x.product_id), 0.0, 0.0, 0, 0.0, 0.0, -x.qty, -x.value, 0.0
+  FROM (
+      SELECT it.product_id, COALESCE(DATE(it.date), it.date) AS day, p.vendor_id,
+             SUM(CAST(it.quantity AS REAL)) AS qty,
+             SUM(CAST(it.quantity AS REAL) * (CAST(OLD.purchase_price AS REAL) - COALESCE(CAST(OLD.item_discount AS REAL), 0))) AS value
+      FROM inventory_transactions it
+      JOIN purchases p ON p.purchase_id = it.reference_id
+      WHERE it.reference_id = OLD.purchase_id AND it.reference_item_id = OLD.item_id
+        AND it.transaction_type = 'purchase_return'
+      GROUP BY it.product_id, COALESCE(DATE(it.date), it.date), p.vendor_id
+  ) x
+  UNION ALL
+  SELECT 0, x.day, x.vendor_id, NULL, 0.0, 0.0, 0, 0.0, 0.0, -x.qty, -x.value, 0.0
+  FROM (
+      SELECT COALESCE(DATE(it.date), it.date) AS day, p.vendor_id,
+             SUM(CAST(it.quantity AS REAL)) AS qty,
+             SUM(CAST(it.quantity AS REAL) * (CAST(OLD.purchase_price AS REAL) - COALESCE(CAST(OLD.item_discount AS REAL), 0))) AS value
+      FROM inventory_transactions it
+      JOIN purchases p ON p.purchase_id = it.reference_id
+      WHERE it.reference_id = OLD.purchase_id AND it.reference_item_id = OLD.item_id
+        AND it.transaction_type = 'purchase_return'
+      GROUP BY COALESCE(DATE(it.date), it.date), p.vendor_id
+  ) x;
+END;
+
+/* purchase returns: quantity and value on the return day */
+DROP TRIGGER IF EXISTS trg_fact_purchase_returns_ai;
+CREATE TRIGGER trg_fact_purchase_returns_ai
+AFTER INSERT ON inventory_transactions
+FOR EACH ROW
+WHEN NEW.transaction_type = 'purchase_return'
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT NEW.product_id, COALESCE(DATE(NEW.date), NEW.date), p.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = NEW.product_id),
+         0.0, 0.0, 0, 0.0, 0.0, CAST(NEW.quantity AS REAL), CAST(NEW.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0)), 0.0
+  FROM purchase_items pi
+  JOIN purchases p ON p.purchase_id = pi.purchase_id
+  WHERE pi.item_id = NEW.reference_item_id AND pi.purchase_id = NEW.reference_id
+  UNION ALL
+  SELECT 0, COALESCE(DATE(NEW.date), NEW.date), p.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, CAST(NEW.quantity AS REAL), CAST(NEW.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0)), 0.0
+  FROM purchase_items pi
+  JOIN purchases p ON p.purchase_id = pi.purchase_id
+  WHERE pi.item_id = NEW.reference_item_id AND pi.purchase_id = NEW.reference_id;
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_purchase_returns_au;
+CREATE TRIGGER trg_fact_purchase_returns_au
+AFTER UPDATE OF product_id, quantity, transaction_type, reference_id, reference_item_id, date ON inventory_transactions
+FOR EACH ROW
+WHEN OLD.transaction_type = 'purchase_return' OR NEW.transaction_type = 'purchase_return'
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT OLD.product_id, COALESCE(DATE(OLD.date), OLD.date), p.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = OLD.product_id),
+         0.0, 0.0, 0, 0.0, 0.0, -CAST(OLD.quantity AS REAL), -CAST(OLD.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0)), 0.0
+  FROM purchase_items pi
+  JOIN purchases p ON p.purchase_id = pi.purchase_id
+  WHERE OLD.transaction_type = 'purchase_return' AND pi.item_id = OLD.reference_item_id AND pi.purchase_id = OLD.reference_id
+  UNION ALL
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), p.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, -CAST(OLD.quantity AS REAL), -CAST(OLD.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0)), 0.0
+  FROM purchase_items pi
+  JOIN purchases p ON p.purchase_id = pi.purchase_id
+  WHERE OLD.transaction_type = 'purchase_return' AND pi.item_id = OLD.reference_item_id AND pi.purchase_id = OLD.reference_id;
+  INSERT INTO fact_purchases_delta
+  SELECT NEW.product_id, COALESCE(DATE(NEW.date), NEW.date), p.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = NEW.product_id),
+         0.0, 0.0, 0, 0.0, 0.0, CAST(NEW.quantity AS REAL), CAST(NEW.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0)), 0.0
+  FROM purchase_items pi
+  JOIN purchases p ON p.purchase_id = pi.purchase_id
+  WHERE NEW.transaction_type = 'purchase_return' AND pi.item_id = NEW.reference_item_id AND pi.purchase_id = NEW.reference_id
+  UNION ALL
+  SELECT 0, COALESCE(DATE(NEW.date), NEW.date), p.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, CAST(NEW.quantity AS REAL), CAST(NEW.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0)), 0.0
+  FROM purchase_items pi
+  JOIN purchases p ON p.purchase_id = pi.purchase_id
+  WHERE NEW.transaction_type = 'purchase_return' AND pi.item_id = NEW.reference_item_id AND pi.purchase_id = NEW.reference_id;
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_purchase_returns_ad;
+CREATE TRIGGER trg_fact_purchase_returns_ad
+AFTER DELETE ON inventory_transactions
+FOR EACH ROW
+WHEN OLD.transaction_type = 'purchase_return'
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT OLD.product_id, COALESCE(DATE(OLD.date), OLD.date), p.vendor_id, (SELECT pr.category FROM products pr WHERE pr.product_id = OLD.product_id),
+         0.0, 0.0, 0, 0.0, 0.0, -CAST(OLD.quantity AS REAL), -CAST(OLD.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0)), 0.0
+  FROM purchase_items pi
+  JOIN purchases p ON p.purchase_id = pi.purchase_id
+  WHERE pi.item_id = OLD.reference_item_id AND pi.purchase_id = OLD.reference_id
+  UNION ALL
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), p.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, -CAST(OLD.quantity AS REAL), -CAST(OLD.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0)), 0.0
+  FROM purchase_items pi
+  JOIN purchases p ON p.purchase_id = pi.purchase_id
+  WHERE pi.item_id = OLD.reference_item_id AND pi.purchase_id = OLD.reference_id;
+END;
+
+/* cleared outgoing payments on the payment day */
+DROP TRIGGER IF EXISTS trg_fact_purchase_payments_ai;
+CREATE TRIGGER trg_fact_purchase_payments_ai
+AFTER INSERT ON purchase_payments
+FOR EACH ROW
+WHEN NEW.clearing_state = 'cleared'
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(NEW.date), NEW.date), p.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, CAST(NEW.amount AS REAL)
+  FROM purchases p
+  WHERE p.purchase_id = NEW.purchase_id
+    AND NEW.clearing_state = 'cleared' AND CAST(NEW.amount AS REAL) > 0;
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_purchase_payments_au;
+CREATE TRIGGER trg_fact_purchase_payments_au
+AFTER UPDATE OF purchase_id, date, amount, clearing_state ON purchase_payments
+FOR EACH ROW
+WHEN OLD.clearing_state = 'cleared' OR NEW.clearing_state = 'cleared'
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), p.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, -CAST(OLD.amount AS REAL)
+  FROM purchases p
+  WHERE p.purchase_id = OLD.purchase_id
+    AND OLD.clearing_state = 'cleared' AND CAST(OLD.amount AS REAL) > 0;
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(NEW.date), NEW.date), p.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, CAST(NEW.amount AS REAL)
+  FROM purchases p
+  WHERE p.purchase_id = NEW.purchase_id
+    AND NEW.clearing_state = 'cleared' AND CAST(NEW.amount AS REAL) > 0;
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_purchase_payments_ad;
+CREATE TRIGGER trg_fact_purchase_payments_ad
+AFTER DELETE ON purchase_payments
+FOR EACH ROW
+WHEN OLD.clearing_state = 'cleared'
+BEGIN
+  INSERT INTO fact_purchases_delta
+  SELECT 0, COALESCE(DATE(OLD.date), OLD.date), p.vendor_id, NULL,
+         0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, -CAST(OLD.amount AS REAL)
+  FROM purchases p
+  WHERE p.purchase_id = OLD.purchase_id
+    AND OLD.clearing_state = 'cleared' AND CAST(OLD.amount AS REAL) > 0;
+END;
+
+DROP TRIGGER IF EXISTS trg_fact_purchases_product_category_au;
+CREATE TRIGGER trg_fact_purchases_product_category_au
+AFTER UPDATE OF category ON products
+FOR EACH ROW
+WHEN OLD.category IS NOT NEW.category
+BEGIN
+  UPDATE fact_purchases_daily SET category = NEW.category WHERE product_id = NEW.product_id;
+END;
+
+
 /* ======================== CREDIT / PAYMENT TRIGGERS ======================== */
 
-/* Guard: don’t allow applying more credit than available */
+/* Keep customer_credit_balance = Σ customer_advances.amount (per-row delta) */
+DROP TRIGGER IF EXISTS trg_customer_credit_balance_ai;
+DROP TRIGGER IF EXISTS trg_customer_credit_balance_au;
+DROP TRIGGER IF EXISTS trg_customer_credit_balance_ad;
+
+CREATE TRIGGER trg_customer_credit_balance_ai
+AFTER INSERT ON customer_advances
+FOR EACH ROW
+BEGIN
+  INSERT INTO customer_credit_balance (customer_id, balance, updated_at)
+  VALUES (NEW.customer_id, ROUND(CAST(NEW.amount AS REAL), 9), CURRENT_TIMESTAMP)
+  ON CONFLICT(customer_id) DO UPDATE SET
+    balance    = ROUND(CAST(customer_credit_balance.balance AS REAL) + excluded.balance, 9),
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER trg_customer_credit_balance_au
+AFTER UPDATE OF customer_id, amount ON customer_advances
+FOR EACH ROW
+BEGIN
+  UPDATE customer_credit_balance
+     SET balance    = ROUND(CAST(balance AS REAL) - CAST(OLD.amount AS REAL), 9),
+         updated_at = CURRENT_TIMESTAMP
+   WHERE customer_id = OLD.customer_id;
+  INSERT INTO customer_credit_balance (customer_id, balance, updated_at)
+  VALUES (NEW.customer_id, ROUND(CAST(NEW.amount AS REAL), 9), CURRENT_TIMESTAMP)
+  ON CONFLICT(customer_id) DO UPDATE SET
+    balance    = ROUND(CAST(customer_credit_balance.balance AS REAL) + excluded.balance, 9),
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER trg_customer_credit_balance_ad
+AFTER DELETE ON customer_advances
+FOR EACH ROW
+BEGIN
+  UPDATE customer_credit_balance
+     SET balance    = ROUND(CAST(balance AS REAL) - CAST(OLD.amount AS REAL), 9),
+         updated_at = CURRENT_TIMESTAMP
+   WHERE customer_id = OLD.customer_id;
+END;
+
+/* Guard: don’t allow applying more credit than available (cached balance; this
+   BEFORE trigger sees the balance without NEW) */
 DROP TRIGGER IF EXISTS trg_advances_no_overdraw;
 CREATE TRIGGER trg_advances_no_overdraw
 BEFORE INSERT ON customer_advances
@@ -1068,8 +2235,8 @@ WHEN NEW.source_type = 'applied_to_sale'
 BEGIN
   SELECT CASE
     WHEN (
-      COALESCE((SELECT SUM(CAST(amount AS REAL))
-                FROM customer_advances
+      COALESCE((SELECT CAST(balance AS REAL)
+                FROM customer_credit_balance
                 WHERE customer_id = NEW.customer_id), 0.0)
       + CAST(NEW.amount AS REAL)  -- NEW.amount negative when applying
     ) < -1e-9
@@ -1107,9 +2274,14 @@ BEGIN
   END;
 END;
 
-/* Roll up paid_amount & payment_status from sale_payments (clamped ≥ 0) */
+/* Roll up paid_amount & payment_status from sale_payments (clamped ≥ 0).
+   Incremental: the header moves by the payment's delta. paid_amount > 0 means the
+   stored value equals the unclamped sum, so adding the delta is exact; at 0 the sum
+   may be negative (refunds) and is recomputed for that one document. Results are
+   rounded to 9 places so float noise cannot leave a settled document 'partial'. */
 DROP TRIGGER IF EXISTS trg_paid_from_sale_payments_ai;
 DROP TRIGGER IF EXISTS trg_paid_from_sale_payments_au;
+DROP TRIGGER IF EXISTS trg_paid_from_sale_payments_au_move;
 DROP TRIGGER IF EXISTS trg_paid_from_sale_payments_ad;
 
 CREATE TRIGGER trg_paid_from_sale_payments_ai
@@ -1117,10 +2289,16 @@ AFTER INSERT ON sale_payments
 FOR EACH ROW
 BEGIN
   UPDATE sales
-     SET paid_amount = MAX(0.0, COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = NEW.sale_id), 0.0)),
-         payment_status = CASE
-            WHEN MAX(0.0, COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = NEW.sale_id),0.0)) >= CAST(total_amount AS REAL) THEN 'paid'
-            WHEN MAX(0.0, COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = NEW.sale_id),0.0)) > 0 THEN 'partial'
+     SET paid_amount = CASE
+           WHEN CAST(paid_amount AS REAL) > 0
+             THEN MAX(0.0, ROUND(CAST(paid_amount AS REAL) + (CAST(NEW.amount AS REAL)), 9))
+           ELSE MAX(0.0, ROUND(COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = NEW.sale_id), 0.0), 9))
+         END
+   WHERE sale_id = NEW.sale_id;
+  UPDATE sales
+     SET payment_status = CASE
+            WHEN CAST(paid_amount AS REAL) >= CAST(total_amount AS REAL) THEN 'paid'
+            WHEN CAST(paid_amount AS REAL) > 0 THEN 'partial'
             ELSE 'unpaid' END
    WHERE sale_id = NEW.sale_id;
 END;
@@ -1128,12 +2306,52 @@ END;
 CREATE TRIGGER trg_paid_from_sale_payments_au
 AFTER UPDATE ON sale_payments
 FOR EACH ROW
+WHEN NEW.sale_id = OLD.sale_id
 BEGIN
   UPDATE sales
-     SET paid_amount = MAX(0.0, COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = NEW.sale_id), 0.0)),
-         payment_status = CASE
-            WHEN MAX(0.0, COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = NEW.sale_id),0.0)) >= CAST(total_amount AS REAL) THEN 'paid'
-            WHEN MAX(0.0, COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = NEW.sale_id),0.0)) > 0 THEN 'partial'
+     SET paid_amount = CASE
+           WHEN CAST(paid_amount AS REAL) > 0
+             THEN MAX(0.0, ROUND(CAST(paid_amount AS REAL) + (CAST(NEW.amount AS REAL) - CAST(OLD.amount AS REAL)), 9))
+           ELSE MAX(0.0, ROUND(COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = NEW.sale_id), 0.0), 9))
+         END
+   WHERE sale_id = NEW.sale_id;
+  UPDATE sales
+     SET payment_status = CASE
+            WHEN CAST(paid_amount AS REAL) >= CAST(total_amount AS REAL) THEN 'paid'
+            WHEN CAST(paid_amount AS REAL) > 0 THEN 'partial'
+            ELSE 'unpaid' END
+   WHERE sale_id = NEW.sale_id;
+END;
+
+CREATE TRIGGER trg_paid_from_sale_payments_au_move
+AFTER UPDATE ON sale_payments
+FOR EACH ROW
+WHEN NEW.sale_id <> OLD.sale_id
+BEGIN
+  UPDATE sales
+     SET paid_amount = CASE
+           WHEN CAST(paid_amount AS REAL) > 0
+             THEN MAX(0.0, ROUND(CAST(paid_amount AS REAL) + (-CAST(OLD.amount AS REAL)), 9))
+           ELSE MAX(0.0, ROUND(COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = OLD.sale_id), 0.0), 9))
+         END
+   WHERE sale_id = OLD.sale_id;
+  UPDATE sales
+     SET payment_status = CASE
+            WHEN CAST(paid_amount AS REAL) >= CAST(total_amount AS REAL) THEN 'paid'
+            WHEN CAST(paid_amount AS REAL) > 0 THEN 'partial'
+            ELSE 'unpaid' END
+   WHERE sale_id = OLD.sale_id;
+  UPDATE sales
+     SET paid_amount = CASE
+           WHEN CAST(paid_amount AS REAL) > 0
+             THEN MAX(0.0, ROUND(CAST(paid_amount AS REAL) + (CAST(NEW.amount AS REAL)), 9))
+           ELSE MAX(0.0, ROUND(COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = NEW.sale_id), 0.0), 9))
+         END
+   WHERE sale_id = NEW.sale_id;
+  UPDATE sales
+     SET payment_status = CASE
+            WHEN CAST(paid_amount AS REAL) >= CAST(total_amount AS REAL) THEN 'paid'
+            WHEN CAST(paid_amount AS REAL) > 0 THEN 'partial'
             ELSE 'unpaid' END
    WHERE sale_id = NEW.sale_id;
 END;
@@ -1143,10 +2361,16 @@ AFTER DELETE ON sale_payments
 FOR EACH ROW
 BEGIN
   UPDATE sales
-     SET paid_amount = MAX(0.0, COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = OLD.sale_id), 0.0)),
-         payment_status = CASE
-            WHEN MAX(0.0, COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = OLD.sale_id),0.0)) >= CAST(total_amount AS REAL) THEN 'paid'
-            WHEN MAX(0.0, COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = OLD.sale_id),0.0)) > 0 THEN 'partial'
+     SET paid_amount = CASE
+           WHEN CAST(paid_amount AS REAL) > 0
+             THEN MAX(0.0, ROUND(CAST(paid_amount AS REAL) + (-CAST(OLD.amount AS REAL)), 9))
+           ELSE MAX(0.0, ROUND(COALESCE((SELECT SUM(CAST(amount AS REAL)) FROM sale_payments WHERE sale_id = OLD.sale_id), 0.0), 9))
+         END
+   WHERE sale_id = OLD.sale_id;
+  UPDATE sales
+     SET payment_status = CASE
+            WHEN CAST(paid_amount AS REAL) >= CAST(total_amount AS REAL) THEN 'paid'
+            WHEN CAST(paid_amount AS REAL) > 0 THEN 'partial'
             ELSE 'unpaid' END
    WHERE sale_id = OLD.sale_id;
 END;
@@ -1204,9 +2428,13 @@ BEGIN
    WHERE sale_id = OLD.source_id;
 END;
 
-/* Roll up paid_amount & payment_status from purchase_payments (clamped ≥ 0; cleared only) */
+/* Roll up paid_amount & payment_status from purchase_payments (clamped ≥ 0; cleared only).
+   Incremental like the sales rollup: a payment contributes its amount only while
+   clearing_state = 'cleared', so clearing / un-clearing / bouncing a cheque applies
+   +amount / -amount and edits apply the difference of the two contributions. */
 DROP TRIGGER IF EXISTS trg_paid_from_purchase_payments_ai;
 DROP TRIGGER IF EXISTS trg_paid_from_purchase_payments_au;
+DROP TRIGGER IF EXISTS trg_paid_from_purchase_payments_au_move;
 DROP TRIGGER IF EXISTS trg_paid_from_purchase_payments_ad;
 
 CREATE TRIGGER trg_paid_from_purchase_payments_ai
@@ -1214,28 +2442,21 @@ AFTER INSERT ON purchase_payments
 FOR EACH ROW
 BEGIN
   UPDATE purchases
-     SET paid_amount = MAX(
-           0.0,
-           COALESCE((
+     SET paid_amount = CASE
+           WHEN CAST(paid_amount AS REAL) > 0
+             THEN MAX(0.0, ROUND(CAST(paid_amount AS REAL) + ((CASE WHEN NEW.clearing_state = 'cleared' THEN CAST(NEW.amount AS REAL) ELSE 0.0 END)), 9))
+           ELSE MAX(0.0, ROUND(COALESCE((
              SELECT SUM(CAST(amount AS REAL))
              FROM purchase_payments
              WHERE purchase_id = NEW.purchase_id
                AND clearing_state = 'cleared'
-           ), 0.0)
-         ),
-         payment_status = CASE
-            WHEN MAX(0.0, COALESCE((
-                 SELECT SUM(CAST(amount AS REAL))
-                 FROM purchase_payments
-                 WHERE purchase_id = NEW.purchase_id
-                   AND clearing_state = 'cleared'
-               ), 0.0)) >= CAST(total_amount AS REAL) THEN 'paid'
-            WHEN MAX(0.0, COALESCE((
-                 SELECT SUM(CAST(amount AS REAL))
-                 FROM purchase_payments
-                 WHERE purchase_id = NEW.purchase_id
-                   AND clearing_state = 'cleared'
-               ), 0.0)) > 0 THEN 'partial'
+           ), 0.0), 9))
+         END
+   WHERE purchase_id = NEW.purchase_id;
+  UPDATE purchases
+     SET payment_status = CASE
+            WHEN CAST(paid_amount AS REAL) >= CAST(total_amount AS REAL) THEN 'paid'
+            WHEN CAST(paid_amount AS REAL) > 0 THEN 'partial'
             ELSE 'unpaid' END
    WHERE purchase_id = NEW.purchase_id;
 END;
@@ -1243,30 +2464,67 @@ END;
 CREATE TRIGGER trg_paid_from_purchase_payments_au
 AFTER UPDATE ON purchase_payments
 FOR EACH ROW
+WHEN NEW.purchase_id = OLD.purchase_id
 BEGIN
   UPDATE purchases
-     SET paid_amount = MAX(
-           0.0,
-           COALESCE((
+     SET paid_amount = CASE
+           WHEN CAST(paid_amount AS REAL) > 0
+             THEN MAX(0.0, ROUND(CAST(paid_amount AS REAL) + ((CASE WHEN NEW.clearing_state = 'cleared' THEN CAST(NEW.amount AS REAL) ELSE 0.0 END) - (CASE WHEN OLD.clearing_state = 'cleared' THEN CAST(OLD.amount AS REAL) ELSE 0.0 END)), 9))
+           ELSE MAX(0.0, ROUND(COALESCE((
              SELECT SUM(CAST(amount AS REAL))
              FROM purchase_payments
              WHERE purchase_id = NEW.purchase_id
                AND clearing_state = 'cleared'
-           ), 0.0)
-         ),
-         payment_status = CASE
-            WHEN MAX(0.0, COALESCE((
-                 SELECT SUM(CAST(amount AS REAL))
-                 FROM purchase_payments
-                 WHERE purchase_id = NEW.purchase_id
-                   AND clearing_state = 'cleared'
-               ), 0.0)) >= CAST(total_amount AS REAL) THEN 'paid'
-            WHEN MAX(0.0, COALESCE((
-                 SELECT SUM(CAST(amount AS REAL))
-                 FROM purchase_payments
-                 WHERE purchase_id = NEW.purchase_id
-                   AND clearing_state = 'cleared'
-               ), 0.0)) > 0 THEN 'partial'
+           ), 0.0), 9))
+         END
+   WHERE purchase_id = NEW.purchase_id;
+  UPDATE purchases
+     SET payment_status = CASE
+            WHEN CAST(paid_amount AS REAL) >= CAST(total_amount AS REAL) THEN 'paid'
+            WHEN CAST(paid_amount AS REAL) > 0 THEN 'partial'
+            ELSE 'unpaid' END
+   WHERE purchase_id = NEW.purchase_id;
+END;
+
+CREATE TRIGGER trg_paid_from_purchase_payments_au_move
+AFTER UPDATE ON purchase_payments
+FOR EACH ROW
+WHEN NEW.purchase_id <> OLD.purchase_id
+BEGIN
+  UPDATE purchases
+     SET paid_amount = CASE
+           WHEN CAST(paid_amount AS REAL) > 0
+             THEN MAX(0.0, ROUND(CAST(paid_amount AS REAL) + (-(CASE WHEN OLD.clearing_state = 'cleared' THEN CAST(OLD.amount AS REAL) ELSE 0.0 END)), 9))
+           ELSE MAX(0.0, ROUND(COALESCE((
+             SELECT SUM(CAST(amount AS REAL))
+             FROM purchase_payments
+             WHERE purchase_id = OLD.purchase_id
+               AND clearing_state = 'cleared'
+           ), 0.0), 9))
+         END
+   WHERE purchase_id = OLD.purchase_id;
+  UPDATE purchases
+     SET payment_status = CASE
+            WHEN CAST(paid_amount AS REAL) >= CAST(total_amount AS REAL) THEN 'paid'
+            WHEN CAST(paid_amount AS REAL) > 0 THEN 'partial'
+            ELSE 'unpaid' END
+   WHERE purchase_id = OLD.purchase_id;
+  UPDATE purchases
+     SET paid_amount = CASE
+           WHEN CAST(paid_amount AS REAL) > 0
+             THEN MAX(0.0, ROUND(CAST(paid_amount AS REAL) + ((CASE WHEN NEW.clearing_state = 'cleared' THEN CAST(NEW.amount AS REAL) ELSE 0.0 END)), 9))
+           ELSE MAX(0.0, ROUND(COALESCE((
+             SELECT SUM(CAST(amount AS REAL))
+             FROM purchase_payments
+             WHERE purchase_id = NEW.purchase_id
+               AND clearing_state = 'cleared'
+           ), 0.0), 9))
+         END
+   WHERE purchase_id = NEW.purchase_id;
+  UPDATE purchases
+     SET payment_status = CASE
+            WHEN CAST(paid_amount AS REAL) >= CAST(total_amount AS REAL) THEN 'paid'
+            WHEN CAST(paid_amount AS REAL) > 0 THEN 'partial'
             ELSE 'unpaid' END
    WHERE purchase_id = NEW.purchase_id;
 END;
@@ -1276,28 +2534,21 @@ AFTER DELETE ON purchase_payments
 FOR EACH ROW
 BEGIN
   UPDATE purchases
-     SET paid_amount = MAX(
-           0.0,
-           COALESCE((
+     SET paid_amount = CASE
+           WHEN CAST(paid_amount AS REAL) > 0
+             THEN MAX(0.0, ROUND(CAST(paid_amount AS REAL) + (-(CASE WHEN OLD.clearing_state = 'cleared' THEN CAST(OLD.amount AS REAL) ELSE 0.0 END)), 9))
+           ELSE MAX(0.0, ROUND(COALESCE((
              SELECT SUM(CAST(amount AS REAL))
              FROM purchase_payments
              WHERE purchase_id = OLD.purchase_id
                AND clearing_state = 'cleared'
-           ), 0.0)
-         ),
-         payment_status = CASE
-            WHEN MAX(0.0, COALESCE((
-                 SELECT SUM(CAST(amount AS REAL))
-                 FROM purchase_payments
-                 WHERE purchase_id = OLD.purchase_id
-                   AND clearing_state = 'cleared'
-               ), 0.0)) >= CAST(total_amount AS REAL) THEN 'paid'
-            WHEN MAX(0.0, COALESCE((
-                 SELECT SUM(CAST(amount AS REAL))
-                 FROM purchase_payments
-                 WHERE purchase_id = OLD.purchase_id
-                   AND clearing_state = 'cleared'
-               ), 0.0)) > 0 THEN 'partial'
+           ), 0.0), 9))
+         END
+   WHERE purchase_id = OLD.purchase_id;
+  UPDATE purchases
+     SET payment_status = CASE
+            WHEN CAST(paid_amount AS REAL) >= CAST(total_amount AS REAL) THEN 'paid'
+            WHEN CAST(paid_amount AS REAL) > 0 THEN 'partial'
             ELSE 'unpaid' END
    WHERE purchase_id = OLD.purchase_id;
 END;
@@ -1422,7 +2673,48 @@ BEGIN
 END;
 
 
-/* Guard: don’t allow applying more credit than available */
+/* Keep vendor_credit_balance = Σ vendor_advances.amount (per-row delta) */
+DROP TRIGGER IF EXISTS trg_vendor_credit_balance_ai;
+DROP TRIGGER IF EXISTS trg_vendor_credit_balance_au;
+DROP TRIGGER IF EXISTS trg_vendor_credit_balance_ad;
+
+CREATE TRIGGER trg_vendor_credit_balance_ai
+AFTER INSERT ON vendor_advances
+FOR EACH ROW
+BEGIN
+  INSERT INTO vendor_credit_balance (vendor_id, balance, updated_at)
+  VALUES (NEW.vendor_id, ROUND(CAST(NEW.amount AS REAL), 9), CURRENT_TIMESTAMP)
+  ON CONFLICT(vendor_id) DO UPDATE SET
+    balance    = ROUND(CAST(vendor_credit_balance.balance AS REAL) + excluded.balance, 9),
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER trg_vendor_credit_balance_au
+AFTER UPDATE OF vendor_id, amount ON vendor_advances
+FOR EACH ROW
+BEGIN
+  UPDATE vendor_credit_balance
+     SET balance    = ROUND(CAST(balance AS REAL) - CAST(OLD.amount AS REAL), 9),
+         updated_at = CURRENT_TIMESTAMP
+   WHERE vendor_id = OLD.vendor_id;
+  INSERT INTO vendor_credit_balance (vendor_id, balance, updated_at)
+  VALUES (NEW.vendor_id, ROUND(CAST(NEW.amount AS REAL), 9), CURRENT_TIMESTAMP)
+  ON CONFLICT(vendor_id) DO UPDATE SET
+    balance    = ROUND(CAST(vendor_credit_balance.balance AS REAL) + excluded.balance, 9),
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER trg_vendor_credit_balance_ad
+AFTER DELETE ON vendor_advances
+FOR EACH ROW
+BEGIN
+  UPDATE vendor_credit_balance
+     SET balance    = ROUND(CAST(balance AS REAL) - CAST(OLD.amount AS REAL), 9),
+         updated_at = CURRENT_TIMESTAMP
+   WHERE vendor_id = OLD.vendor_id;
+END;
+
+/* Guard: don’t allow applying more credit than available (cached balance) */
 DROP TRIGGER IF EXISTS trg_vendor_advances_no_overdraw;
 CREATE TRIGGER trg_vendor_advances_no_overdraw
 BEFORE INSERT ON vendor_advances
@@ -1431,8 +2723,8 @@ WHEN NEW.source_type = 'applied_to_purchase'
 BEGIN
   SELECT CASE
     WHEN (
-      COALESCE((SELECT SUM(CAST(amount AS REAL))
-                FROM vendor_advances
+      COALESCE((SELECT CAST(balance AS REAL)
+                FROM vendor_credit_balance
                 WHERE vendor_id = NEW.vendor_id), 0.0)
       + CAST(NEW.amount AS REAL)  -- NEW.amount negative when applying
     ) < -1e-9
@@ -1553,13 +2845,12 @@ BEGIN
    WHERE purchase_id = OLD.source_id;
 END;
 
-/* Quick balance view */
+/* Quick balance view (cached; see vendor_credit_balance) */
 DROP VIEW IF EXISTS v_vendor_advance_balance;
 CREATE VIEW v_vendor_advance_balance AS
 SELECT vendor_id,
-       COALESCE(SUM(CAST(amount AS REAL)), 0.0) AS balance
-FROM vendor_advances
-GROUP BY vendor_id;
+       CAST(balance AS REAL) AS balance
+FROM vendor_credit_balance;
 
 
 /* ======================== VIEWS ======================== */
@@ -1594,66 +2885,15 @@ SELECT p.purchase_id,
        ), 0.0) - CAST(p.order_discount AS REAL) AS calculated_total_amount
 FROM purchases p;
 
-/* On-hand stock (from latest valuation snapshot per product) */
+/* On-hand stock (from the running valuation state per product) */
 DROP VIEW IF EXISTS v_stock_on_hand;
 CREATE VIEW v_stock_on_hand AS
-WITH latest AS (
-  SELECT svh.product_id,
-         MAX(svh.valuation_id) AS last_vid
-  FROM stock_valuation_history svh
-  GROUP BY svh.product_id
-)
-SELECT l.product_id, svh.quantity AS qty_in_base, svh.unit_value, svh.total_value, svh.valuation_date
-FROM latest l
-JOIN stock_valuation_history svh ON svh.valuation_id = l.last_vid;
-
-/* COGS per sale item using running average at sale date (only for real sales) */
-DROP VIEW IF EXISTS sale_item_cogs;
-CREATE VIEW sale_item_cogs AS
-SELECT
-  si.item_id,
-  si.sale_id,
-  si.product_id,
-  -- convert sold quantity to base
-  (CAST(si.quantity AS REAL) * COALESCE((
-      SELECT CAST(pu.factor_to_base AS REAL)
-      FROM product_uoms pu
-      WHERE pu.product_id = si.product_id
-        AND pu.uom_id     = si.uom_id
-      LIMIT 1
-  ), 1.0)) AS qty_base,
-  -- unit cost at or before sale date
-  COALESCE((
-    SELECT svh.unit_value
-    FROM sales s2
-    JOIN stock_valuation_history svh
-      ON svh.product_id = si.product_id
-     AND DATE(svh.valuation_date) <= DATE(s2.date)
-    WHERE s2.sale_id = si.sale_id AND s2.doc_type = 'sale'
-    ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-    LIMIT 1
-  ), 0.0) AS unit_cost_base,
-  -- extended COGS
-  ((CAST(si.quantity AS REAL) * COALESCE((
-      SELECT CAST(pu.factor_to_base AS REAL)
-      FROM product_uoms pu
-      WHERE pu.product_id = si.product_id
-        AND pu.uom_id     = si.uom_id
-      LIMIT 1
-  ), 1.0)) *
-   COALESCE((
-    SELECT svh.unit_value
-    FROM sales s2
-    JOIN stock_valuation_history svh
-      ON svh.product_id = si.product_id
-     AND DATE(svh.valuation_date) <= DATE(s2.date)
-    WHERE s2.sale_id = si.sale_id AND s2.doc_type = 'sale'
-    ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
-    LIMIT 1
-  ), 0.0)
-  ) AS cogs_value
-FROM sale_items si
-JOIN sales s ON s.sale_id = si.sale_id AND s.doc_type = 'sale';
+SELECT s.product_id,
+       s.quantity            AS qty_in_base,
+       s.unit_value,
+       s.total_value,
+       s.last_valuation_date AS valuation_date
+FROM stock_valuation_state s;
 
 /* Monthly Profit & Loss — exclude quotations */
 DROP VIEW IF EXISTS profit_loss_view;
@@ -1698,13 +2938,12 @@ LEFT JOIN revenue  r ON p.period = r.period
 LEFT JOIN cogs     c ON p.period = c.period
 LEFT JOIN operating o ON p.period = o.period;
 
-/* Running balance per customer */
+/* Running balance per customer (cached; see customer_credit_balance) */
 DROP VIEW IF EXISTS v_customer_advance_balance;
 CREATE VIEW v_customer_advance_balance AS
 SELECT customer_id,
-       COALESCE(SUM(CAST(amount AS REAL)), 0.0) AS balance
-FROM customer_advances
-GROUP BY customer_id;
+       CAST(balance AS REAL) AS balance
+FROM customer_credit_balance;
 
 /* === Unified bank ledger: per company account, incoming vs outgoing === */
 DROP VIEW IF EXISTS v_bank_ledger;
@@ -2013,16 +3252,316 @@ def _ensure_customer_is_active(conn: sqlite3.Connection) -> None:
             "ADD COLUMN is_active INTEGER NOT NULL DEFAULT 1 CHECK (is_active IN (0,1));"
         )
 
+def _ensure_valuation_state(conn: sqlite3.Connection) -> None:
+    """
+    Safe migration for DBs created before `stock_valuation_state` existed.
+    Seeds the running state from the latest history row of every product that
+    has history but no state row. No-op once the state is populated.
+    """
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO stock_valuation_state
+            (product_id, quantity, unit_value, total_value, last_valuation_id, last_valuation_date)
+        SELECT product_id, quantity, unit_value, total_value, valuation_id, DATE(valuation_date)
+        FROM (
+            SELECT svh.*,
+                   ROW_NUMBER() OVER (
+                     PARTITION BY svh.product_id
+                     ORDER BY svh.valuation_date DESC, svh.valuation_id DESC
+                   ) AS rn
+            FROM stock_valuation_history svh
+            WHERE svh.product_id NOT IN (SELECT product_id FROM stock_valuation_state)
+        )
+        WHERE rn = 1;
+        """
+    )
+
+def _drop_legacy_sale_item_cogs_view(conn: sqlite3.Connection) -> None:
+    """
+    `sale_item_cogs` used to be a view. It is a table now; the old view has to go
+    before the script runs, or CREATE TABLE IF NOT EXISTS would silently skip.
+    """
+    row = conn.execute(
+        "SELECT type FROM sqlite_master WHERE name = 'sale_item_cogs'"
+    ).fetchone()
+    if row is not None and row[0] == "view":
+        conn.execute("DROP VIEW sale_item_cogs;")
+
+def _ensure_sale_item_cogs(conn: sqlite3.Connection) -> None:
+    """
+    Backfill sale_item_cogs for sold lines that have no row yet (existing DBs, or
+    lines posted outside SalesRepo). Cost is the unit value of the latest history
+    row on or before the sale date, as the old view computed it. No-op once filled.
+    """
+    conn.execute(
+        """
+        INSERT INTO sale_item_cogs
+            (item_id, sale_id, product_id, sale_date, qty_base, unit_cost_base, cogs_value)
+        SELECT item_id, sale_id, product_id, sale_date, qty_base, unit_cost_base,
+               qty_base * unit_cost_base
+        FROM (
+            SELECT si.item_id, si.sale_id, si.product_id, s.date AS sale_date,
+                   CAST(si.quantity AS REAL) * COALESCE(CAST(pu.factor_to_base AS REAL), 1.0) AS qty_base,
+                   COALESCE((
+                     SELECT CAST(svh.unit_value AS REAL)
+                     FROM stock_valuation_history svh
+                     WHERE svh.product_id = si.product_id
+                       AND DATE(svh.valuation_date) <= DATE(s.date)
+                     ORDER BY DATE(svh.valuation_date) DESC, svh.valuation_id DESC
+                     LIMIT 1
+                   ), 0.0) AS unit_cost_base
+            FROM sale_items si
+            JOIN sales s ON s.sale_id = si.sale_id AND s.doc_type = 'sale'
+            LEFT JOIN product_uoms pu
+                   ON pu.product_id = si.product_id AND pu.uom_id = si.uom_id
+            WHERE NOT EXISTS (SELECT 1 FROM sale_item_cogs c WHERE c.item_id = si.item_id)
+        );
+        """
+    )
+
+# Expected fact_sales_daily rows, grouped from the source tables (rebuild / verify)
+FACT_SALES_DAILY_SQL = """
+WITH s AS (
+    SELECT sale_id, COALESCE(DATE(date), date) AS day, customer_id, payment_status,
+           CAST(total_amount AS REAL) AS total
+    FROM sales
+    WHERE doc_type = 'sale'
+)
+SELECT f.product_id, f.day, f.customer_id, f.payment_status,
+       CASE WHEN f.product_id = 0 THEN NULL ELSE p.category END AS category,
+       ROUND(SUM(f.qty_base), 9) AS qty_base,
+       ROUND(SUM(f.revenue), 9)  AS revenue,
+       ROUND(SUM(f.cogs), 9)     AS cogs,
+       SUM(f.orders)             AS orders
+FROM (
+    SELECT 0 AS product_id, day, customer_id, payment_status,
+           0.0 AS qty_base, total AS revenue, 0.0 AS cogs, 1 AS orders
+    FROM s
+    UNION ALL
+    SELECT si.product_id, s.day, s.customer_id, s.payment_status,
+           CAST(si.quantity AS REAL) * COALESCE(CAST(pu.factor_to_base AS REAL), 1.0),
+           CAST(si.quantity AS REAL) * (CAST(si.unit_price AS REAL) - COALESCE(CAST(si.item_discount AS REAL), 0)),
+           0.0, 0
+    FROM s
+    JOIN sale_items si ON si.sale_id = s.sale_id
+    LEFT JOIN product_uoms pu ON pu.product_id = si.product_id AND pu.uom_id = si.uom_id
+    UNION ALL
+    SELECT d.product_id, s.day, s.customer_id, s.payment_status, 0.0, 0.0, 0.0, 1
+    FROM s
+    JOIN (SELECT DISTINCT sale_id, product_id FROM sale_items) d ON d.sale_id = s.sale_id
+    UNION ALL
+    SELECT c.product_id, s.day, s.customer_id, s.payment_status, 0.0, 0.0, CAST(c.cogs_value AS REAL), 0
+    FROM s
+    JOIN sale_item_cogs c ON c.sale_id = s.sale_id
+    UNION ALL
+    SELECT 0, s.day, s.customer_id, s.payment_status, 0.0, 0.0, CAST(c.cogs_value AS REAL), 0
+    FROM s
+    JOIN sale_item_cogs c ON c.sale_id = s.sale_id
+) f
+LEFT JOIN products p ON p.product_id = f.product_id
+GROUP BY f.product_id, f.day, f.customer_id, f.payment_status
+"""
+
+def _ensure_fact_sales_daily(conn: sqlite3.Connection) -> None:
+    """
+    (Re)build fact_sales_daily when its order count is out of step with
+    `sales` (DBs created before the table, or sales written with the triggers
+    absent). No-op when the counts match.
+    """
+    n_fact = conn.execute(
+        "SELECT COALESCE(SUM(orders), 0) FROM fact_sales_daily WHERE product_id = 0"
+    ).fetchone()[0]
+    n_sales = conn.execute("SELECT COUNT(*) FROM sales WHERE doc_type = 'sale'").fetchone()[0]
+    if n_fact == n_sales:
+        return
+    conn.execute("DELETE FROM fact_sales_daily")
+    conn.execute(
+        "INSERT INTO fact_sales_daily "
+        "(product_id, day, customer_id, payment_status, category, qty_base, revenue, cogs, orders) "
+        + FACT_SALES_DAILY_SQL
+    )
+
+# Expected fact_purchases_daily rows, grouped from the source tables (rebuild / verify)
+FACT_PURCHASES_DAILY_SQL = """
+WITH p AS (
+    SELECT purchase_id, COALESCE(DATE(date), date) AS day, vendor_id
+    FROM purchases
+),
+r AS (  -- purchase returns, valued as purchase_return_valuations
+    SELECT it.product_id, COALESCE(DATE(it.date), it.date) AS day, p.vendor_id,
+           CAST(it.quantity AS REAL) AS qty,
+           CAST(it.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0)) AS value
+    FROM inventory_transactions it
+    JOIN purchase_items pi ON pi.item_id = it.reference_item_id AND pi.purchase_id = it.reference_id
+    JOIN p ON p.purchase_id = it.reference_id
+    WHERE it.transaction_type = 'purchase_return'
+)
+SELECT f.product_id, f.day, f.vendor_id,
+       CASE WHEN f.product_id = 0 THEN NULL ELSE pr.category END AS category,
+       ROUND(SUM(f.qty_base), 9)         AS qty_base,
+       ROUND(SUM(f.spend), 9)            AS spend,
+       SUM(f.orders)                     AS orders,
+       ROUND(SUM(f.paid), 9)             AS paid,
+       ROUND(SUM(f.advance_applied), 9)  AS advance_applied,
+       ROUND(SUM(f.qty_returned), 9)     AS qty_returned,
+       ROUND(SUM(f.returns_value), 9)    AS returns_value,
+       ROUND(SUM(f.payments_cleared), 9) AS payments_cleared
+FROM (
+    SELECT 0 AS product_id, COALESCE(DATE(date), date) AS day, vendor_id,
+           0.0 AS qty_base, CAST(total_amount AS REAL) AS spend, 1 AS orders,
+           CAST(paid_amount AS REAL) AS paid, CAST(advance_payment_applied AS REAL) AS advance_applied,
+           0.0 AS qty_returned, 0.0 AS returns_value, 0.0 AS payments_cleared
+    FROM purchases
+    UNION ALL
+    SELECT pi.product_id, p.day, p.vendor_id,
+           CAST(pi.quantity AS REAL),
+           CAST(pi.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0)),
+           0, 0.0, 0.0, 0.0, 0.0, 0.0
+    FROM p
+    JOIN purchase_items pi ON pi.purchase_id = p.purchase_id
+    UNION ALL
+    SELECT d.product_id, p.day, p.vendor_id, 0.0, 0.0, 1, 0.0, 0.0, 0.0, 0.0, 0.0
+    FROM p
+    JOIN (SELECT DISTINCT purchase_id, product_id FROM purchase_items) d ON d.purchase_id = p.purchase_id
+    UNION ALL
+    SELECT product_id, day, vendor_id, 0.0, 0.0, 0, 0.0, 0.0, qty, value, 0.0
+    FROM r
+    UNION ALL
+    SELECT 0, day, vendor_id, 0.0, 0.0, 0, 0.0, 0.0, qty, value, 0.0
+    FROM r
+    UNION ALL
+    SELECT 0, COALESCE(DATE(pp.date), pp.date), p.vendor_id, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, CAST(pp.amount AS REAL)
+    FROM p
+    JOIN purchase_payments pp ON pp.purchase_id = p.purchase_id
+    WHERE pp.clearing_state = 'cleared' AND CAST(pp.amount AS REAL) > 0
+) f
+LEFT JOIN products pr ON pr.product_id = f.product_id
+GROUP BY f.product_id, f.day, f.vendor_id
+"""
+
+def _ensure_fact_purchases_daily(conn: sqlite3.Connection) -> None:
+    """
+    (Re)build fact_purchases_daily when its order count is out of step with
+    `purchases` (DBs created before the table). No-op when the counts match.
+    """
+    n_fact = conn.execute(
+        "SELECT COALESCE(SUM(orders), 0) FROM fact_purchases_daily WHERE product_id = 0"
+    ).fetchone()[0]
+    n_purchases = conn.execute("SELECT COUNT(*) FROM purchases").fetchone()[0]
+    if n_fact == n_purchases:
+        return
+    conn.execute("DELETE FROM fact_purchases_daily")
+    conn.execute(
+        "INSERT INTO fact_purchases_daily "
+        "(product_id, day, vendor_id, category, qty_base, spend, orders, paid, advance_applied, "
+        "qty_returned, returns_value, payments_cleared) "
+        + FACT_PURCHASES_DAILY_SQL
+    )
+
+def _ensure_credit_balances(conn: sqlite3.Connection) -> None:
+    """
+    Safe migration for DBs created before the cached credit balance tables.
+    Seeds a balance row for every customer/vendor that has ledger rows but no
+    cached balance yet. No-op once populated.
+    """
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO customer_credit_balance (customer_id, balance)
+        SELECT customer_id, ROUND(SUM(CAST(amount AS REAL)), 9)
+        FROM customer_advances
+        WHERE customer_id NOT IN (SELECT customer_id FROM customer_credit_balance)
+        GROUP BY customer_id;
+        """
+    )
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO vendor_credit_balance (vendor_id, balance)
+        SELECT vendor_id, ROUND(SUM(CAST(amount AS REAL)), 9)
+        FROM vendor_advances
+        WHERE vendor_id NOT IN (SELECT vendor_id FROM vendor_credit_balance)
+        GROUP BY vendor_id;
+        """
+    )
+
+def _ensure_purchases_fts(conn: sqlite3.Connection) -> None:
+    """
+    (Re)build the purchases search index when it is out of step with
+    `purchases` (DBs created before the index, or rows written with the
+    triggers absent). No-op when the row counts match.
+    """
+    n_fts = conn.execute("SELECT COUNT(*) FROM purchases_fts;").fetchone()[0]
+    n_rows = conn.execute("SELECT COUNT(*) FROM purchases;").fetchone()[0]
+    if n_fts == n_rows:
+        return
+    conn.execute("DELETE FROM purchases_fts;")
+    conn.execute(
+        """
+        INSERT INTO purchases_fts (rowid, purchase_id, date, vendor_name, payment_status, amounts)
+        SELECT p.rowid, p.purchase_id, p.date, v.name, p.payment_status,
+               CAST(p.total_amount AS TEXT) || ' ' || CAST(p.paid_amount AS TEXT)
+        FROM purchases p
+        LEFT JOIN vendors v ON v.vendor_id = p.vendor_id;
+        """
+    )
+
+def _ensure_entity_fts(conn: sqlite3.Connection) -> None:
+    """
+    Rebuild the customers/vendors/products search indexes when their document
+    count differs from the content table (DBs created before the indexes).
+    """
+    for table in ("customers", "vendors", "products"):
+        n_fts = conn.execute(f"SELECT COUNT(*) FROM {table}_fts_docsize;").fetchone()[0]
+        n_rows = conn.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0]
+        if n_fts != n_rows:
+            conn.execute(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild');")
+
+# Python-side migrations, run in order after the DDL script
+_MIGRATIONS = (
+    _ensure_customer_is_active,   # customers.is_active on old DBs
+    _ensure_valuation_state,      # running valuation state
+    _ensure_sale_item_cogs,       # COGS rows for sold lines without one
+    _ensure_credit_balances,      # cached credit balances for existing ledgers
+    _ensure_fact_sales_daily,     # daily sales facts for existing sales
+    _ensure_fact_purchases_daily, # daily purchase facts for existing purchases
+    _ensure_purchases_fts,        # purchases search index
+    _ensure_entity_fts,           # customers/vendors/products search indexes
+)
+
+
+def _schema_fingerprint(sql: str, migrations) -> str:
+    """Hash of the DDL script and the source of every migration, in order."""
+    h = hashlib.sha256(sql.encode("utf-8"))
+    for migrate in migrations:
+        try:
+            body = inspect.getsource(migrate)
+        except (OSError, TypeError):   # no source shipped: fall back to the bytecode
+            body = migrate.__name__ + migrate.__code__.co_code.hex() + repr(migrate.__code__.co_consts)
+        h.update(b"\0" + body.encode("utf-8"))
+    return h.hexdigest()
+
+
+# Identifies the DDL + migration set. Stored in the schema meta table by
+# database.upgrade so startup can skip re-applying an unchanged schema; editing
+# a migration's body changes it just like editing the DDL does.
+SCHEMA_FINGERPRINT = _schema_fingerprint(SQL, _MIGRATIONS)
+
+
+def apply_schema(conn: sqlite3.Connection) -> None:
+    """Apply the full (idempotent) DDL script and migrations on `conn`; no commit here."""
+    # sale_item_cogs: view -> table
+    _drop_legacy_sale_item_cogs_view(conn)
+    conn.executescript(SQL)
+    for migrate in _MIGRATIONS:
+        migrate(conn)
+
+
 def init_schema(db_path: Path | str = "myshop.db") -> None:
     db_path = Path(db_path)
     db_path.parent.mkdir(parents=True, exist_ok=True)
     with sqlite3.connect(db_path) as conn:
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA journal_mode=WAL;")
-        # Apply (idempotent) schema
-        conn.executescript(SQL)
-        # Backfill migration for existing DBs missing customers.is_active
-        _ensure_customer_is_active(conn)
+        apply_schema(conn)
         conn.commit()
     print(f"✓ DB applied to {db_path}")
 
@@ -0,0 +1,174 @@
+# inventory_management/database/search.py
+"""
+Ranked full-text search over customers, vendors and products.
+
+Backed by the external-content FTS5 tables customers_fts / vendors_fts /
+products_fts (schema.py; kept in sync by triggers). Each whitespace- or
+punctuation-separated token of the query is a prefix match, and all tokens
+must match ("jo sm" finds "John Smith"); when that finds nothing the tokens
+are OR-ed so partial matches still come back. Hits are ranked with bm25,
+weighting the name column highest. A purely numeric query also matches the
+row id exactly, ranked first.
+
+Databases without the FTS tables (older files, ad-hoc test schemas) fall
+back to LIKE '%term%' over the same columns, ordered by name.
+
+Used by CustomersRepo / VendorsRepo / ProductsRepo.search and
+widgets.searchable_combo.SearchableComboBox:
+
+    hits = EntitySearch(conn).search("customers", "jo sm", limit=20)
+    [(h.id, h.label, h.detail) for h in hits]
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class SearchEntity:
+    table: str
+    id_col: str
+    fts: str
+    columns: Tuple[str, ...]          # indexed columns, in FTS column order
+    weights: Tuple[float, ...]        # bm25 weight per column
+    label_col: str
+    detail_col: str
+    active_filter: Optional[str] = None   # SQL on alias t, applied when active_only
+
+
+ENTITIES: Dict[str, SearchEntity] = {
+    "customers": SearchEntity(
+        table="customers", id_col="customer_id", fts="customers_fts",
+        columns=("name", "contact_info", "address"), weights=(10.0, 4.0, 1.0),
+        label_col="name", detail_col="contact_info", active_filter="t.is_active = 1",
+    ),
+    "vendors": SearchEntity(
+        table="vendors", id_col="vendor_id", fts="vendors_fts",
+        columns=("name", "contact_info", "address"), weights=(10.0, 4.0, 1.0),
+        label_col="name", detail_col="contact_info",
+    ),
+    "products": SearchEntity(
+        table="products", id_col="product_id", fts="products_fts",
+        columns=("name", "category", "description"), weights=(10.0, 3.0, 1.0),
+        label_col="name", detail_col="category",
+    ),
+}
+
+DEFAULT_LIMIT = 50
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    id: int
+    label: str
+    detail: str
+    rank: float
+
+
+def fts_query(text: str, *, any_token: bool = False) -> Optional[str]:
+    """FTS5 MATCH expression: every token as a quoted prefix ("tok"*), AND-ed (or OR-ed)."""
+    tokens = _TOKEN_RE.findall(text or "")
+    if not tokens:
+        return None
+    joiner = " OR " if any_token else " "
+    return joiner.join(f'"{t}"*' for t in tokens)
+
+
+class EntitySearch:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    @staticmethod
+    def entity(name: str) -> SearchEntity:
+        try:
+            return ENTITIES[name]
+        except KeyError:
+            raise ValueError(f"Unknown search entity {name!r} (expected one of: {', '.join(ENTITIES)})") from None
+
+    def has_index(self, name: str) -> bool:
+        ent = self.entity(name)
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (ent.fts,)
+        ).fetchone() is not None
+
+    # ---- public API ----
+    def search(
+        self,
+        name: str,
+        text: str,
+        *,
+        limit: int = DEFAULT_LIMIT,
+        active_only: bool = True,
+    ) -> List[SearchHit]:
+        """Best `limit` matches for `text`, best first. Empty text -> []."""
+        return [
+            SearchHit(int(r[0]), r[1] or "", r[2] or "", float(r[3]))
+            for r in self._rows(name, text, limit, active_only)
+        ]
+
+    def ids(self, name: str, text: str, *, limit: int = DEFAULT_LIMIT, active_only: bool = True) -> List[int]:
+        """Matching row ids, best first."""
+        return [int(r[0]) for r in self._rows(name, text, limit, active_only)]
+
+    # ---- internals ----
+    def _rows(self, name: str, text: str, limit: int, active_only: bool) -> list:
+        ent = self.entity(name)
+        text = (text or "").strip()
+        if not text:
+            return []
+        active = f" AND {ent.active_filter}" if (active_only and ent.active_filter) else ""
+        if not self.has_index(name):
+            return self._like_rows(ent, text, limit, active)
+
+        exact: list = []
+        if text.isdigit():
+            exact = self.conn.execute(
+                f"SELECT t.{ent.id_col}, t.{ent.label_col}, t.{ent.detail_col}, -1e9 "
+                f"FROM {ent.table} t WHERE t.{ent.id_col} = ?{active}",
+                (int(text),),
+            ).fetchall()
+
+        weights = ", ".join(str(w) for w in ent.weights)
+        sql = (
+            f"SELECT t.{ent.id_col}, t.{ent.label_col}, t.{ent.detail_col}, "
+            f"       bm25({ent.fts}, {weights}) AS rank "
+            f"FROM {ent.fts} JOIN {ent.table} t ON t.{ent.id_col} = {ent.fts}.rowid "
+            f"WHERE {ent.fts} MATCH ?{active} "
+            f"ORDER BY rank LIMIT ?"
+        )
+        rows: list = []
+        for any_token in (False, True):
+            match = fts_query(text, any_token=any_token)
+            if match is None:
+                break
+            rows = self.conn.execute(sql, (match, int(limit))).fetchall()
+            if rows or len(_TOKEN_RE.findall(text)) < 2:
+                break
+
+        seen = {r[0] for r in exact}
+        return (exact + [r for r in rows if r[0] not in seen])[: int(limit)]
+
+    def _like_rows(self, ent: SearchEntity, text: str, limit: int, active: str) -> list:
+        cols = [f"CAST(t.{ent.id_col} AS TEXT)"] + [f"t.{c}" for c in ent.columns]
+        pattern = f"%{text}%"
+        return self.conn.execute(
+            f"SELECT t.{ent.id_col}, t.{ent.label_col}, t.{ent.detail_col}, 0.0 "
+            f"FROM {ent.table} t "
+            f"WHERE (" + " OR ".join(f"{c} LIKE ?" for c in cols) + f"){active} "
+            f"ORDER BY t.{ent.label_col} LIMIT ?",
+            [pattern] * len(cols) + [int(limit)],
+        ).fetchall()
+
+
+__all__ = [
+    "SearchEntity",
+    "SearchHit",
+    "ENTITIES",
+    "EntitySearch",
+    "fts_query",
+]
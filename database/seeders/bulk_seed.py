@@ -41,6 +41,9 @@ Other:
 - expenses: 3,200 across 16 categories
 - audit_logs: 120,000
 - error_logs: 400
+
+Run as a module so the package imports resolve:
+    python -m inventory_management.database.seeders.bulk_seed --db data/myshop.db
 """
 from __future__ import annotations
 
@@ -54,18 +57,14 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 from typing import List, Tuple, Dict, Any
 
+from ..report_cache import bump_versions
+from ..tuning import apply_profile
+
 # -----------------------------
 # Config
 # -----------------------------
 
 CONFIG = {
-    "PRAGMA": {
-        "journal_mode": "WAL",
-        "foreign_keys": 1,
-        "synchronous": "NORMAL",
-        "temp_store": "MEMORY",
-        "cache_size": -200000
-    },
     "COUNTS": {
         "users": 30,
         "uoms": 14,
@@ -162,9 +161,8 @@ CONFIG = {
 }
 
 def set_pragmas(conn: sqlite3.Connection):
-    cur = conn.cursor()
-    for k, v in CONFIG["PRAGMA"].items():
-        cur.execute(f"PRAGMA {k}={v}")
+    # the bulk_import tuning profile (database.tuning)
+    apply_profile(conn, "bulk_import")
     conn.commit()
 
 def random_date_within(days_back: int, rng: random.Random) -> str:
@@ -1464,6 +1462,10 @@ def main():
     # Logs
     seed_logs(conn, rng, users_ids, purchase_ids, sale_ids)
 
+    # one 'stock' bump for all seeded ledger rows (no per-row counter triggers)
+    bump_versions(conn, "stock")
+    conn.commit()
+
     # NEW: Calculate and print comprehensive summary
     print("=== DETAILED SEED SUMMARY ===")
     print(f"Purchases: {len(purchase_ids)}; Purchase lines: {po_lines}")
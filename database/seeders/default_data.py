@@ -1,5 +1,8 @@
 from ...utils.auth import hash_password
 
+# Bump when seed() changes so existing databases re-run it (database.upgrade)
+SEED_VERSION = 1
+
 def seed(conn):
     # if no users exist, create admin/admin and a demo cashier
     row = conn.execute("SELECT COUNT(*) AS n FROM users").fetchone()
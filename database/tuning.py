@@ -0,0 +1,247 @@
+# database/tuning.py
+"""
+Named SQLite tuning profiles.
+
+Each profile is an ordered set of PRAGMAs for one kind of workload:
+
+- interactive : data entry on the GUI connection (WAL, synchronous=NORMAL,
+                moderate page cache, short busy timeout)
+- reporting   : long read-mostly queries (large page cache, memory-mapped I/O)
+- bulk_import : seeders / imports (synchronous=OFF, very large cache; applied
+                by seeders.bulk_seed)
+- backup      : snapshot / VACUUM INTO source connections (small cache so a
+                full scan does not evict the app's working set, long timeout)
+
+Selection (first match wins):
+    env APP_DB_PROFILE / APP_DB_READER_PROFILE
+    config.DB_PROFILE  / config.DB_READER_PROFILE
+    "interactive"      / "reporting"
+
+`get_connection()` applies the writer profile; pooled writers and readers
+(database.connection_pool) apply the writer / reader profile. Read-only
+connections skip `journal_mode` (a file property set by writers) and add
+`query_only`.
+
+Profiles may also set connection limits (`Connection.setlimit`, Python 3.11+;
+skipped on older interpreters).
+
+Diagnostics: `effective_settings(conn)` reads the PRAGMAs back;
+`cache_summary(conn)` reports the page cache size and database size from
+PRAGMAs. Hit / miss counters (sqlite3_db_status) are not exposed by the
+sqlite3 module, so they are not shown.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import os
+import sqlite3
+from typing import Dict, Tuple
+
+Pragmas = Tuple[Tuple[str, object], ...]
+
+ENV_PROFILE = "APP_DB_PROFILE"
+ENV_READER_PROFILE = "APP_DB_READER_PROFILE"
+DEFAULT_PROFILE = "interactive"
+DEFAULT_READER_PROFILE = "reporting"
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TuningProfile:
+    name: str
+    description: str
+    pragmas: Pragmas
+    limits: Tuple[Tuple[str, int], ...] = ()    # (sqlite3.SQLITE_LIMIT_* name, value)
+
+    def pragmas_for(self, *, read_only: bool = False) -> Pragmas:
+        if not read_only:
+            return self.pragmas
+        kept = tuple((k, v) for k, v in self.pragmas if k not in ("journal_mode", "synchronous"))
+        return kept + (("query_only", "ON"),)
+
+
+PROFILES: Dict[str, TuningProfile] = {
+    p.name: p
+    for p in (
+        TuningProfile(
+            "interactive",
+            "GUI data entry: durable enough, low latency",
+            (
+                ("journal_mode", "WAL"),
+                ("foreign_keys", "ON"),
+                ("synchronous", "NORMAL"),
+                ("busy_timeout", 5000),
+                ("temp_store", "MEMORY"),
+                ("cache_size", -16000),          # KiB -> ~16 MB
+                ("mmap_size", 0),
+            ),
+        ),
+        TuningProfile(
+            "reporting",
+            "Long read queries: large cache + memory-mapped I/O",
+            (
+                ("journal_mode", "WAL"),
+                ("foreign_keys", "ON"),
+                ("synchronous", "NORMAL"),
+                ("busy_timeout", 30000),
+                ("temp_store", "MEMORY"),
+                ("cache_size", -131072),         # ~128 MB
+                ("mmap_size", 268435456),        # 256 MB
+            ),
+            (("SQLITE_LIMIT_WORKER_THREADS", 4),),   # helper threads for large sorts
+        ),
+        TuningProfile(
+            "bulk_import",
+            "Seeders / imports: throughput over crash durability",
+            (
+                ("journal_mode", "WAL"),
+                ("foreign_keys", "ON"),
+                ("synchronous", "OFF"),
+                ("busy_timeout", 60000),
+                ("temp_store", "MEMORY"),
+                ("cache_size", -200000),         # ~200 MB
+                ("mmap_size", 268435456),
+            ),
+        ),
+        TuningProfile(
+            "backup",
+            "Snapshot source: small cache, patient locking",
+            (
+                ("synchronous", "FULL"),
+                ("busy_timeout", 60000),
+                ("temp_store", "DEFAULT"),
+                ("cache_size", -8000),           # ~8 MB
+                ("mmap_size", 0),
+            ),
+        ),
+    )
+}
+
+
+def get_profile(name: str) -> TuningProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown tuning profile {name!r} (expected one of: {', '.join(PROFILES)})") from None
+
+
+def _configured(env_var: str, config_attr: str, default: str) -> str:
+    name = os.getenv(env_var)
+    if not name:
+        try:
+            from .. import config
+            name = getattr(config, config_attr, None)
+        except Exception:
+            name = None
+    name = (name or default).strip().lower()
+    if name not in PROFILES:
+        _log.warning("Unknown SQLite tuning profile %r; using %r", name, default)
+        return default
+    return name
+
+
+def active_profile_name() -> str:
+    """Profile for writer connections (GUI connection and pooled writers)."""
+    return _configured(ENV_PROFILE, "DB_PROFILE", DEFAULT_PROFILE)
+
+
+def reader_profile_name() -> str:
+    """Profile for pooled read-only reporting connections."""
+    return _configured(ENV_READER_PROFILE, "DB_READER_PROFILE", DEFAULT_READER_PROFILE)
+
+
+def apply_profile(
+    conn: sqlite3.Connection,
+    profile: str | TuningProfile,
+    *,
+    read_only: bool = False,
+) -> TuningProfile:
+    """Issue the profile's PRAGMAs and limits on `conn`; returns the profile applied."""
+    prof = profile if isinstance(profile, TuningProfile) else get_profile(profile)
+    for name, value in prof.pragmas_for(read_only=read_only):
+        conn.execute(f"PRAGMA {name} = {value};")
+    apply_limits(conn, prof.limits)
+    return prof
+
+
+def apply_limits(conn: sqlite3.Connection, limits: Tuple[Tuple[str, int], ...]) -> None:
+    """Set connection limits through Connection.setlimit (no-op before Python 3.11)."""
+    if not hasattr(conn, "setlimit"):
+        return
+    for name, value in limits:
+        category = getattr(sqlite3, name, None)
+        if category is not None:
+            conn.setlimit(category, int(value))
+
+
+# ---------------------------------------------------------------------------
+# Diagnostics
+# ---------------------------------------------------------------------------
+
+DIAGNOSTIC_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "foreign_keys",
+    "busy_timeout",
+    "temp_store",
+    "cache_size",
+    "mmap_size",
+    "query_only",
+    "page_size",
+    "wal_autocheckpoint",
+)
+
+
+def effective_settings(conn: sqlite3.Connection) -> Dict[str, object]:
+    """Current value of each DIAGNOSTIC_PRAGMAS entry as reported by SQLite."""
+    out: Dict[str, object] = {}
+    for name in DIAGNOSTIC_PRAGMAS:
+        try:
+            row = conn.execute(f"PRAGMA {name};").fetchone()
+            out[name] = row[0] if row is not None else None
+        except sqlite3.Error as e:
+            out[name] = f"error: {e}"
+    return out
+
+
+def cache_summary(conn: sqlite3.Connection) -> Dict[str, object]:
+    """
+    Page cache capacity and database size for `conn`, from PRAGMAs
+    (cache_size is pages when positive, KiB when negative).
+    """
+    def pragma(name: str) -> int:
+        row = conn.execute(f"PRAGMA {name};").fetchone()
+        return int(row[0]) if row is not None else 0
+
+    page_size = pragma("page_size")
+    cache_size = pragma("cache_size")
+    cache_bytes = cache_size * page_size if cache_size >= 0 else -cache_size * 1024
+    out: Dict[str, object] = {
+        "page_size": page_size,
+        "cache_capacity_bytes": cache_bytes,
+        "cache_capacity_pages": cache_bytes // page_size if page_size else 0,
+        "database_pages": pragma("page_count"),
+        "free_pages": pragma("freelist_count"),
+        "mmap_size": pragma("mmap_size"),
+    }
+    if hasattr(conn, "getlimit"):
+        out["worker_threads_limit"] = conn.getlimit(sqlite3.SQLITE_LIMIT_WORKER_THREADS)
+    return out
+
+
+__all__ = [
+    "TuningProfile",
+    "PROFILES",
+    "ENV_PROFILE",
+    "ENV_READER_PROFILE",
+    "get_profile",
+    "active_profile_name",
+    "reader_profile_name",
+    "apply_profile",
+    "apply_limits",
+    "DIAGNOSTIC_PRAGMAS",
+    "effective_settings",
+    "cache_summary",
+]
@@ -0,0 +1,174 @@
+# database/upgrade.py
+"""
+Schema / seed versioning.
+
+The schema meta table (constants.TABLE_SCHEMA_VERSION, one row id=1) records
+what was last applied to a database file:
+
+    version       SCHEMA_VERSION label
+    schema_hash   schema.SCHEMA_FINGERPRINT (DDL script + migration sources)
+    seed_version  seeders.default_data.SEED_VERSION
+    applied_at    timestamp of the last DDL application
+
+`ensure_current(conn)` compares those with the running code and only re-runs
+the DDL script / seeders when they differ, so an ordinary start (or reopen
+after a restore) costs one primary-key read instead of executing the full
+script. Changing the SQL, adding a migration, or bumping SEED_VERSION
+triggers the upgrade automatically on the next open.
+
+Explicit upgrade
+----------------
+    python -m inventory_management.database.upgrade [--db PATH] [--force]
+
+--force re-applies the DDL and seeds even when the fingerprint matches
+(e.g. after hand-editing objects in the database).
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+import sqlite3
+from typing import Optional, Sequence
+
+from ..constants import SCHEMA_VERSION, TABLE_SCHEMA_VERSION
+from ..utils import startup_profile
+from . import schema as schema_module
+from .seeders.default_data import SEED_VERSION, seed as seed_default_data
+from .tuning import active_profile_name, apply_profile
+
+
+@dataclass(frozen=True)
+class SchemaStatus:
+    version: Optional[str]
+    schema_hash: Optional[str]
+    seed_version: Optional[int]
+    applied_at: Optional[str]
+
+    @property
+    def schema_current(self) -> bool:
+        return self.schema_hash == schema_module.SCHEMA_FINGERPRINT
+
+    @property
+    def seed_current(self) -> bool:
+        return self.seed_version == SEED_VERSION
+
+
+_META_COLUMNS = {
+    "schema_hash": "TEXT",
+    "seed_version": "INTEGER",
+    "applied_at": "TEXT",
+}
+
+
+def _ensure_meta_table(conn: sqlite3.Connection) -> None:
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_SCHEMA_VERSION}(
+            id INTEGER PRIMARY KEY CHECK (id=1),
+            version TEXT NOT NULL
+        );
+    """)
+    # DBs created before fingerprinting only have (id, version)
+    have = {r[1] for r in conn.execute(f"PRAGMA table_info({TABLE_SCHEMA_VERSION});")}
+    for col, decl in _META_COLUMNS.items():
+        if col not in have:
+            conn.execute(f"ALTER TABLE {TABLE_SCHEMA_VERSION} ADD COLUMN {col} {decl};")
+    conn.execute(
+        f"INSERT OR IGNORE INTO {TABLE_SCHEMA_VERSION}(id, version) VALUES (1, ?);",
+        (SCHEMA_VERSION,),
+    )
+
+
+def schema_status(conn: sqlite3.Connection) -> SchemaStatus:
+    """What the database says was last applied (all None for a fresh file)."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?;",
+        (TABLE_SCHEMA_VERSION,),
+    ).fetchone()
+    if not exists:
+        return SchemaStatus(None, None, None, None)
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({TABLE_SCHEMA_VERSION});")}
+    if not set(_META_COLUMNS) <= cols:
+        row = conn.execute(f"SELECT version FROM {TABLE_SCHEMA_VERSION} WHERE id=1;").fetchone()
+        return SchemaStatus(row[0] if row else None, None, None, None)
+    row = conn.execute(
+        f"SELECT version, schema_hash, seed_version, applied_at FROM {TABLE_SCHEMA_VERSION} WHERE id=1;"
+    ).fetchone()
+    if row is None:
+        return SchemaStatus(None, None, None, None)
+    return SchemaStatus(row[0], row[1], None if row[2] is None else int(row[2]), row[3])
+
+
+def ensure_current(conn: sqlite3.Connection, *, force: bool = False) -> bool:
+    """
+    Apply DDL/migrations and seeds that are out of date (or all of them with
+    force=True) and record the new fingerprint. Commits when anything ran.
+    Returns True if the DDL script was applied.
+    """
+    status = schema_status(conn)
+    applied = False
+
+    if force or not status.schema_current:
+        with startup_profile.phase("db.apply_schema"):
+            schema_module.apply_schema(conn)
+        _ensure_meta_table(conn)
+        conn.execute(
+            f"""
+            UPDATE {TABLE_SCHEMA_VERSION}
+               SET version = ?, schema_hash = ?, applied_at = CURRENT_TIMESTAMP
+             WHERE id = 1;
+            """,
+            (SCHEMA_VERSION, schema_module.SCHEMA_FINGERPRINT),
+        )
+        applied = True
+
+    if force or applied or not status.seed_current:
+        # Seeders are idempotent; they are re-run after every DDL application.
+        with startup_profile.phase("db.seed"):
+            seed_default_data(conn)
+        _ensure_meta_table(conn)
+        conn.execute(
+            f"UPDATE {TABLE_SCHEMA_VERSION} SET seed_version = ? WHERE id = 1;",
+            (SEED_VERSION,),
+        )
+        conn.commit()
+    return applied
+
+
+def upgrade_database(db_path: Path | str, *, force: bool = False) -> bool:
+    """Open `db_path`, bring it up to date, close it. Returns True if DDL ran."""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(db_path)
+    try:
+        con.row_factory = sqlite3.Row
+        apply_profile(con, active_profile_name())
+        return ensure_current(con, force=force)
+    finally:
+        con.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from ..config import DB_PATH
+
+    parser = argparse.ArgumentParser(description="Apply pending schema / seed upgrades")
+    parser.add_argument("--db", default=str(DB_PATH), help="Path to SQLite DB")
+    parser.add_argument("--force", action="store_true", help="Re-apply DDL and seeds even if up to date")
+    args = parser.parse_args(argv)
+
+    applied = upgrade_database(args.db, force=args.force)
+    print(f"{args.db}: {'schema applied' if applied else 'schema up to date'} "
+          f"({schema_module.SCHEMA_FINGERPRINT[:12]}, seed v{SEED_VERSION})")
+    return 0
+
+
+__all__ = [
+    "SchemaStatus",
+    "schema_status",
+    "ensure_current",
+    "upgrade_database",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,376 @@
+# database/valuation.py
+"""
+Moving-average valuation engine.
+
+The authoritative posting path is the `trg_stock_valuation_after_transaction`
+trigger: it reads `stock_valuation_state` (one row per product) by primary key
+and appends the next `stock_valuation_history` row, so the cost of posting does
+not grow with history length.
+
+This module holds the same step function in Python for code that replays the
+ledger outside the trigger, a reader for the running state, and the repair
+path that drains `valuation_dirty` (back-dated postings, edits, deletes) by
+replaying only each product's impacted tail.
+
+Conventions:
+- Quantities are in BASE UoM.
+- `unit_cost` for a purchase is (purchase_price - item_discount) / factor_to_base.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+import sqlite3
+import time
+from typing import Callable, Optional
+
+from .report_cache import bump_versions
+
+INBOUND_TYPES = ("purchase", "sale_return", "adjustment")
+OUTBOUND_TYPES = ("sale", "purchase_return")
+
+
+@dataclass(frozen=True)
+class ValuationState:
+    product_id: int
+    quantity: float = 0.0
+    unit_value: float = 0.0
+    total_value: float = 0.0
+    last_valuation_id: Optional[int] = None
+    last_valuation_date: Optional[str] = None
+
+
+def direction(transaction_type: str) -> float:
+    """+1 for stock-in types, -1 for stock-out types, 0 otherwise."""
+    if transaction_type in INBOUND_TYPES:
+        return 1.0
+    if transaction_type in OUTBOUND_TYPES:
+        return -1.0
+    return 0.0
+
+
+def apply_transaction(
+    state: ValuationState,
+    *,
+    transaction_type: str,
+    qty_base: float,
+    unit_cost: Optional[float] = None,
+    date: Optional[str] = None,
+) -> ValuationState:
+    """
+    Return the state after applying one ledger row. Mirrors the trigger math:
+      - only purchases move the moving-average unit cost
+      - inbound rows never leave a negative total value
+    """
+    q0 = float(state.quantity)
+    uc0 = float(state.unit_value)
+    dq = float(qty_base)
+    sign = direction(transaction_type)
+
+    qty_new = q0 + sign * dq
+
+    if transaction_type == "purchase":
+        if q0 + dq > 0:
+            uc_new = (q0 * uc0 + dq * float(unit_cost or 0.0)) / (q0 + dq)
+        else:
+            uc_new = float(unit_cost) if unit_cost is not None else uc0
+    else:
+        uc_new = uc0
+
+    if sign > 0:
+        total_new = uc_new * qty_new if qty_new > 0 else 0.0
+    else:
+        total_new = uc_new * qty_new
+
+    frontier = state.last_valuation_date
+    if date is not None and (frontier is None or date > frontier):
+        frontier = date
+
+    return replace(
+        state,
+        quantity=qty_new,
+        unit_value=uc_new,
+        total_value=total_new,
+        last_valuation_date=frontier,
+    )
+
+
+def load_state(conn: sqlite3.Connection, product_id: int) -> ValuationState:
+    """Current running state for a product (zero state if it has no activity)."""
+    row = conn.execute(
+        """
+        SELECT product_id,
+               CAST(quantity    AS REAL) AS quantity,
+               CAST(unit_value  AS REAL) AS unit_value,
+               CAST(total_value AS REAL) AS total_value,
+               last_valuation_id,
+               last_valuation_date
+        FROM stock_valuation_state
+        WHERE product_id = ?
+        """,
+        (int(product_id),),
+    ).fetchone()
+    if row is None:
+        return ValuationState(product_id=int(product_id))
+    return ValuationState(
+        product_id=int(row[0]),
+        quantity=float(row[1] or 0.0),
+        unit_value=float(row[2] or 0.0),
+        total_value=float(row[3] or 0.0),
+        last_valuation_id=(None if row[4] is None else int(row[4])),
+        last_valuation_date=row[5],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tail replay (valuation_dirty consumer)
+# ---------------------------------------------------------------------------
+
+_LEDGER_TAIL_SQL = """
+    SELECT
+      it.transaction_type,
+      it.date,
+      it.reference_table,
+      it.reference_item_id,
+      CAST(it.quantity AS REAL) * COALESCE(CAST(pu.factor_to_base AS REAL), 1.0) AS qty_base,
+      CASE WHEN it.transaction_type = 'purchase' AND pi.item_id IS NOT NULL THEN
+        (CAST(pi.purchase_price AS REAL) - COALESCE(CAST(pi.item_discount AS REAL), 0.0))
+        / COALESCE(CAST(ppu.factor_to_base AS REAL), 1.0)
+      END AS unit_cost
+    FROM inventory_transactions it
+    LEFT JOIN product_uoms pu
+           ON pu.product_id = it.product_id AND pu.uom_id = it.uom_id
+    LEFT JOIN purchase_items pi
+           ON it.transaction_type = 'purchase' AND pi.item_id = it.reference_item_id
+    LEFT JOIN product_uoms ppu
+           ON ppu.product_id = pi.product_id AND ppu.uom_id = pi.uom_id
+    WHERE it.product_id = ?
+      AND it.date >= ?
+    ORDER BY it.date, it.txn_seq, it.posted_at, it.transaction_id
+"""
+
+
+def replay_product_tail(conn: sqlite3.Connection, product_id: int, from_date: str) -> int:
+    """
+    Rewrite stock_valuation_history for one product from `from_date` forward and
+    reset its running state. History before `from_date` is kept as the starting
+    point. Sold lines in the tail get their sale_item_cogs re-costed. No commit
+    here; caller controls the transaction boundary.
+
+    Returns the number of history rows written.
+    """
+    pid = int(product_id)
+    base = conn.execute(
+        """
+        SELECT CAST(quantity AS REAL), CAST(unit_value AS REAL), CAST(total_value AS REAL),
+               valuation_id, valuation_date
+        FROM stock_valuation_history
+        WHERE product_id = ? AND valuation_date < ?
+        ORDER BY valuation_date DESC, valuation_id DESC
+        LIMIT 1
+        """,
+        (pid, from_date),
+    ).fetchone()
+    if base is None:
+        state = ValuationState(product_id=pid)
+    else:
+        state = ValuationState(
+            product_id=pid,
+            quantity=float(base[0] or 0.0),
+            unit_value=float(base[1] or 0.0),
+            total_value=float(base[2] or 0.0),
+            last_valuation_id=int(base[3]),
+            last_valuation_date=base[4],
+        )
+
+    conn.execute(
+        "DELETE FROM stock_valuation_history WHERE product_id = ? AND valuation_date >= ?",
+        (pid, from_date),
+    )
+
+    rows: list[tuple] = []
+    cogs: list[tuple] = []
+    for txn_type, date, ref_table, ref_item, qty_base, unit_cost in conn.execute(
+        _LEDGER_TAIL_SQL, (pid, from_date)
+    ):
+        state = apply_transaction(
+            state,
+            transaction_type=txn_type,
+            qty_base=float(qty_base or 0.0),
+            unit_cost=(None if unit_cost is None else float(unit_cost)),
+            date=date,
+        )
+        rows.append((pid, date, state.quantity, state.unit_value, state.total_value))
+        if txn_type == "sale" and ref_table == "sales" and ref_item is not None:
+            q = float(qty_base or 0.0)
+            cogs.append((date, q, state.unit_value, q * state.unit_value, int(ref_item)))
+
+    if rows:
+        conn.executemany(
+            """
+            INSERT INTO stock_valuation_history
+                (product_id, valuation_date, quantity, unit_value, total_value, valuation_method)
+            VALUES (?, ?, ?, ?, ?, 'moving_average')
+            """,
+            rows,
+        )
+        last_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+        state = replace(state, last_valuation_id=last_id)
+    if cogs:
+        upsert_sale_item_cogs(conn, cogs)
+
+    conn.execute(
+        """
+        INSERT INTO stock_valuation_state
+            (product_id, quantity, unit_value, total_value, last_valuation_id, last_valuation_date, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(product_id) DO UPDATE SET
+            quantity            = excluded.quantity,
+            unit_value          = excluded.unit_value,
+            total_value         = excluded.total_value,
+            last_valuation_id   = excluded.last_valuation_id,
+            last_valuation_date = excluded.last_valuation_date,
+            updated_at          = CURRENT_TIMESTAMP
+        """,
+        (
+            pid, state.quantity, state.unit_value, state.total_value,
+            state.last_valuation_id, state.last_valuation_date,
+        ),
+    )
+    return len(rows)
+
+
+def upsert_sale_item_cogs(conn: sqlite3.Connection, rows) -> None:
+    """
+    Write sale_item_cogs for existing sale lines. Each row is
+    (sale_date, qty_base, unit_cost_base, cogs_value, item_id).
+    """
+    conn.executemany(
+        """
+        INSERT INTO sale_item_cogs
+            (item_id, sale_id, product_id, sale_date, qty_base, unit_cost_base, cogs_value)
+        SELECT si.item_id, si.sale_id, si.product_id, ?, ?, ?, ?
+        FROM sale_items si
+        WHERE si.item_id = ?
+        ON CONFLICT(item_id) DO UPDATE SET
+            sale_date      = excluded.sale_date,
+            qty_base       = excluded.qty_base,
+            unit_cost_base = excluded.unit_cost_base,
+            cogs_value     = excluded.cogs_value
+        """,
+        rows,
+    )
+
+
+@dataclass
+class RepairStats:
+    """Progress/throughput of a valuation_dirty drain."""
+    products_total: int = 0
+    products_done: int = 0
+    rows_written: int = 0
+    elapsed_s: float = 0.0
+    failed: dict = field(default_factory=dict)   # product_id -> error text
+
+    @property
+    def products_per_sec(self) -> float:
+        return self.products_done / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_written / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+def pending_repairs(conn: sqlite3.Connection) -> int:
+    """Number of products waiting in valuation_dirty."""
+    row = conn.execute("SELECT COUNT(*) FROM valuation_dirty").fetchone()
+    return int(row[0] if row else 0)
+
+
+def drain_dirty(
+    conn: sqlite3.Connection,
+    *,
+    batch_size: int = 50,
+    max_passes: int = 5,
+    on_progress: Optional[Callable[[RepairStats], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> RepairStats:
+    """
+    Consume valuation_dirty: replay each product's tail from earliest_impacted,
+    committing every `batch_size` products. Each batch holds the write lock
+    (BEGIN IMMEDIATE) while it re-reads and clears its queue entries, so a
+    posting cannot re-mark a product between the replay and the delete; products
+    marked after a batch commits are picked up by the next pass (up to
+    `max_passes`).
+
+    If the connection already has an open transaction, batches run inside it and
+    nothing is committed here.
+    """
+    stats = RepairStats()
+    t0 = time.perf_counter()
+    size = max(1, int(batch_size))
+    own_tx = not conn.in_transaction
+
+    for _ in range(max(1, int(max_passes))):
+        pending = [
+            int(r[0])
+            for r in conn.execute(
+                "SELECT product_id FROM valuation_dirty ORDER BY earliest_impacted, product_id"
+            )
+            if int(r[0]) not in stats.failed
+        ]
+        if not pending:
+            break
+        stats.products_total += len(pending)
+
+        for start in range(0, len(pending), size):
+            if should_stop is not None and should_stop():
+                stats.elapsed_s = time.perf_counter() - t0
+                return stats
+            batch = pending[start:start + size]
+            if own_tx:
+                conn.execute("BEGIN IMMEDIATE")
+            try:
+                for product_id in batch:
+                    row = conn.execute(
+                        "SELECT earliest_impacted FROM valuation_dirty WHERE product_id = ?",
+                        (product_id,),
+                    ).fetchone()
+                    if row is None:
+                        stats.products_done += 1
+                        continue
+                    conn.execute("SAVEPOINT repair_product")
+                    try:
+                        stats.rows_written += replay_product_tail(conn, product_id, row[0])
+                        conn.execute("DELETE FROM valuation_dirty WHERE product_id = ?", (product_id,))
+                        conn.execute("RELEASE SAVEPOINT repair_product")
+                    except sqlite3.Error as e:
+                        conn.execute("ROLLBACK TO SAVEPOINT repair_product")
+                        conn.execute("RELEASE SAVEPOINT repair_product")
+                        stats.failed[product_id] = str(e)
+                    stats.products_done += 1
+                bump_versions(conn, "stock")
+                if own_tx:
+                    conn.commit()
+            except Exception:
+                if own_tx:
+                    conn.rollback()
+                raise
+            stats.elapsed_s = time.perf_counter() - t0
+            if on_progress is not None:
+                on_progress(stats)
+
+    stats.elapsed_s = time.perf_counter() - t0
+    return stats
+
+__all__ = [
+    "ValuationState",
+    "INBOUND_TYPES",
+    "OUTBOUND_TYPES",
+    "direction",
+    "apply_transaction",
+    "load_state",
+    "replay_product_tail",
+    "upsert_sale_item_cogs",
+    "RepairStats",
+    "pending_repairs",
+    "drain_dirty",
+]
@@ -1,16 +1,19 @@
+from .utils import startup_profile  # first: its import time anchors the startup timeline
+
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
     QListWidget, QListWidgetItem, QStackedWidget, QMessageBox,
     QHBoxLayout, QMenu, QSizePolicy
 )
 from PySide6.QtGui import QAction
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, Slot
 from pathlib import Path
 import sys
 import traceback
 import os
 from importlib import import_module
 
+from .config import DATA_PATH, PREWARM_MODULES, PREWARM_DELAY_MS, PREWARM_STEP_MS
 from .constants import APP_NAME, STYLE_FILE
 from .database import get_connection
 from .modules.base_module import BaseModule
@@ -36,6 +39,23 @@ def _lazy_get(name: str, attr: str):
         raise ImportError(f"'{attr}' not found in module '{name}'.") from e
 
 
+# Left-nav modules in display order: (title, module path, controller class, needs current_user).
+# Backup & Restore is added separately (factory + File menu actions).
+MODULE_REGISTRY: tuple[tuple[str, str, str, bool], ...] = (
+    ("Dashboard", "inventory_management.modules.dashboard.controller", "DashboardController", False),
+    ("Products", "inventory_management.modules.product.controller", "ProductController", False),
+    ("Inventory", "inventory_management.modules.inventory.controller", "InventoryController", True),
+    ("Purchases", "inventory_management.modules.purchase.controller", "PurchaseController", True),
+    ("Sales", "inventory_management.modules.sales.controller", "SalesController", True),
+    ("Customers", "inventory_management.modules.customer.controller", "CustomerController", False),
+    ("Vendors", "inventory_management.modules.vendor.controller", "VendorController", False),
+    ("Expenses", "inventory_management.modules.expense.controller", "ExpenseController", False),
+    ("Reporting", "inventory_management.modules.reporting.controller", "ReportingController", True),
+    # SQLite tuning profile, cache counters, connection pools
+    ("Diagnostics", "inventory_management.modules.diagnostics.controller", "DiagnosticsController", False),
+)
+
+
 class MainWindow(QMainWindow):
     # -----------------------------
     # Lightweight DB manager shim
@@ -57,6 +77,21 @@ class MainWindow(QMainWindow):
             except Exception:
                 pass
 
+            # Pooled connections held by path-based repos/services
+            try:
+                from .database.connection_pool import close_all_pooled
+                close_all_pooled()
+            except Exception:
+                pass
+
+            # Cached report results and reference data belong to the database being replaced
+            try:
+                from .database import refdata, report_cache
+                report_cache.clear_all()
+                refdata.clear_all()
+            except Exception:
+                pass
+
             # Notify modules so they can drop cursors/prepare to rebind (optional)
             for _, mod in self._mw.modules:
                 if hasattr(mod, "on_db_closed"):
@@ -108,117 +143,31 @@ class MainWindow(QMainWindow):
         row_lay.addWidget(self.stack, 1)
         layout.addWidget(row, 1)
 
+        # Constructed modules only (title, controller); see _load_module
         self.modules: list[tuple[str, BaseModule]] = []
+        # One entry per nav row: title, registry spec (None for eager modules), controller
+        self._slots: list[dict] = []
+
+        # nav wiring: build the module behind a row the first time it is shown
+        self.nav.currentRowChanged.connect(self._on_nav_row_changed)
 
-        # nav wiring
-        self.nav.currentRowChanged.connect(self.stack.setCurrentIndex)
-
-        # Dashboard
-        self._add_module_safe(
-            "Dashboard",
-            "inventory_management.modules.dashboard.controller",
-            "DashboardController",
-            self.conn,
-            fallback_placeholder=True,
-        )
-
-        # Products
-        self._add_module_safe(
-            "Products",
-            "inventory_management.modules.product.controller",
-            "ProductController",
-            self.conn,
-            fallback_placeholder=True,
-        )
-
-        # Inventory
-        self._add_module_safe(
-            "Inventory",
-            "inventory_management.modules.inventory.controller",
-            "InventoryController",
-            self.conn,
-            current_user=self.user,
-            fallback_placeholder=True,
-        )
-
-        # Purchases
-        self._add_module_safe(
-            "Purchases",
-            "inventory_management.modules.purchase.controller",
-            "PurchaseController",
-            self.conn,
-            current_user=self.user,
-            fallback_placeholder=True,
-        )
-
-        # Sales
-        self._add_module_safe(
-            "Sales",
-            "inventory_management.modules.sales.controller",
-            "SalesController",
-            self.conn,
-            current_user=self.user,
-            fallback_placeholder=True,
-        )
-
-        # Customers
-        self._add_module_safe(
-            "Customers",
-            "inventory_management.modules.customer.controller",
-            "CustomerController",
-            self.conn,
-            fallback_placeholder=True,
-        )
-
-        # Vendors
-        self._add_module_safe(
-            "Vendors",
-            "inventory_management.modules.vendor.controller",
-            "VendorController",
-            self.conn,
-            fallback_placeholder=True,
-        )
-
-        # Expenses
-        self._add_module_safe(
-            "Expenses",
-            "inventory_management.modules.expense.controller",
-            "ExpenseController",
-            self.conn,
-            fallback_placeholder=True,
-        )
-
-        # Reporting (load actual module; if it fails we will print the exact error)
-        self._add_module_safe(
-            "Reporting",
-            "inventory_management.modules.reporting.controller",
-            "ReportingController",
-            self.conn,
-            current_user=self.user,
-            fallback_placeholder=True,
-        )
-
-        # # Payments (load actual module; not admin-gated)
-        # self._add_module_safe(
-        #     "Payments",
-        #     "inventory_management.modules.payments.controller",
-        #     "PaymentsController",
-        #     self.conn,
-        #     current_user=self.user,
-        #     fallback_placeholder=True,
-        # )
-
-        # Admin-only: System Logs
-        # if self.user and self.user.get("role") == "admin":
-        #     self.add_placeholder("System Logs")
+        # Nav rows come from MODULE_REGISTRY; controllers are imported and
+        # constructed on first selection (or during idle pre-warm).
+        for spec in MODULE_REGISTRY:
+            self._register_lazy(*spec)
 
         # ---- Backup & Restore (replace previous placeholder) ----
         self._add_backup_restore_module()
 
-        # Ensure first page is visible
+        # Ensure first page is visible (builds only that module)
         if self.nav.count():
             self.nav.setCurrentRow(0)
-            self.stack.setCurrentIndex(0)
+            self._on_nav_row_changed(0)
+
+        # Build the remaining modules one per idle tick once the window is up
+        self._prewarm_queue = [i for i, sl in enumerate(self._slots) if sl["controller"] is None]
+        if PREWARM_MODULES and self._prewarm_queue:
+            QTimer.singleShot(PREWARM_DELAY_MS, self._prewarm_next)
 
         # -------- Inventory menu anchored to left nav item (click to open) --------
         self.inventory_menu = QMenu(self)
@@ -279,7 +228,9 @@ class MainWindow(QMainWindow):
         self.nav.setCurrentRow(idx)
 
         # Ask controller (if it exposes a selector)
-        ctrl = self.modules[idx][1]
+        ctrl = self._load_module(idx)
+        if ctrl is None:
+            return
         if hasattr(ctrl, "select_tab"):
             try:
                 ctrl.select_tab(sub)
@@ -299,21 +250,74 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
 
-    # ---------- safe add helpers ----------
+    # ---------- lazy module host ----------
+    def _register_lazy(self, title: str, module_path: str, class_name: str, with_user: bool = False):
+        """Add a nav row for a module without importing it; an empty page holds its slot."""
+        self.nav.addItem(QListWidgetItem(title))
+        self.stack.addWidget(QWidget())
+        self._slots.append({
+            "title": title,
+            "spec": (module_path, class_name, with_user),
+            "controller": None,
+            "failed": False,
+        })
+
+    @Slot(int)
+    def _on_nav_row_changed(self, row: int):
+        if 0 <= row < len(self._slots):
+            self._load_module(row)
+        self.stack.setCurrentIndex(row)
+
+    def _load_module(self, index: int) -> BaseModule | None:
+        """Import and construct the controller behind nav row `index` (once)."""
+        slot = self._slots[index]
+        if slot["controller"] is not None or slot["failed"]:
+            return slot["controller"]
+        module_path, class_name, with_user = slot["spec"]
+        kwargs = {"current_user": self.user} if with_user else {}
+        page = self._add_module_safe(slot["title"], module_path, class_name, self.conn, **kwargs)
+        if page is None:
+            slot["failed"] = True
+            page = self._placeholder_page(slot["title"])
+        else:
+            slot["controller"] = page
+            page = page.get_widget()
+
+        # Swap the empty holder for the real page at the same index
+        current = self.stack.currentIndex()
+        holder = self.stack.widget(index)
+        self.stack.insertWidget(index, page)
+        self.stack.removeWidget(holder)
+        holder.deleteLater()
+        self.stack.setCurrentIndex(current)
+        return slot["controller"]
+
+    def _prewarm_next(self):
+        """Idle-time pre-warm: build one pending module per tick."""
+        while self._prewarm_queue:
+            idx = self._prewarm_queue.pop(0)
+            if self._slots[idx]["controller"] is None and not self._slots[idx]["failed"]:
+                self._load_module(idx)
+                break
+        if self._prewarm_queue:
+            QTimer.singleShot(PREWARM_STEP_MS, self._prewarm_next)
+
     def _add_module_safe(
         self,
         title: str,
         module_path: str,
         class_name: str,
         *args,
-        fallback_placeholder: bool = True,
         **kwargs
-    ):
-        """Import and instantiate a controller safely. On any error, add a placeholder silently."""
+    ) -> BaseModule | None:
+        """Import and instantiate a controller safely. Returns None on any error."""
         try:
-            Controller = _lazy_get(module_path, class_name)
-            controller = Controller(*args, **kwargs)
-            self.add_module(title, controller)
+            with startup_profile.module_build(title, self.conn) as build:
+                Controller = _lazy_get(module_path, class_name)
+                build.imported()
+                controller = Controller(*args, **kwargs)
+            self.modules.append((title, controller))
+            return controller
         except Exception as e:
             # === DEBUG Reporting only ===
             if title in ["Sales", "Dashboard"]:
@@ -321,8 +325,7 @@ class MainWindow(QMainWindow):
                 print(f"[{title}] failed to load:", e, file=_sys.stderr)
                 _tb.print_exc()
             # ============================
-            if fallback_placeholder:
-                self.add_placeholder(title)
+            return None
 
     def _add_backup_restore_module(self) -> None:
         """
@@ -335,7 +338,9 @@ class MainWindow(QMainWindow):
             create_module = getattr(backup_pkg, "create_module")
             module_title = getattr(backup_pkg, "MODULE_TITLE", "Backup & Restore")
 
-            controller = create_module()
+            with startup_profile.module_build(module_title) as build:
+                build.imported()
+                controller = create_module()
 
             # Attach the lightweight DB manager shim so restore can close/reopen the DB.
             setattr(controller, "_app_db_manager", MainWindow._AppDbManager(self))
@@ -354,40 +359,52 @@ class MainWindow(QMainWindow):
             self.add_placeholder("Backup & Restore")
 
     def add_module(self, title: str, module: BaseModule):
+        """Add an already-constructed module (not lazily loaded)."""
         page = module.get_widget()
         item = QListWidgetItem(title)
         self.nav.addItem(item)
         self.stack.addWidget(page)
         self.modules.append((title, module))
+        self._slots.append({"title": title, "spec": None, "controller": module, "failed": False})
 
-    def add_placeholder(self, title: str):
+    @staticmethod
+    def _placeholder_page(title: str) -> QWidget:
         from PySide6.QtWidgets import QLabel
         from .utils.ui_helpers import wrap_center
-        placeholder = wrap_center(QLabel(f"{title}\n\nComing soon..."))
+        return wrap_center(QLabel(f"{title}\n\nComing soon..."))
+
+    def add_placeholder(self, title: str):
         item = QListWidgetItem(title)
         self.nav.addItem(item)
-        self.stack.addWidget(placeholder)
+        self.stack.addWidget(self._placeholder_page(title))
+        self._slots.append({"title": title, "spec": None, "controller": None, "failed": True})
 
     def _find_module_index(self, title: str) -> int | None:
-        for i, (t, _m) in enumerate(self.modules):
-            if t == title:
+        """Nav row of a module by title (whether or not it has been built yet)."""
+        for i, slot in enumerate(self._slots):
+            if slot["title"] == title:
                 return i
         return None
 
+def main(argv: list[str] | None = None):
+    # Startup profiler: env APP_STARTUP_PROFILE / --profile-startup (see utils.startup_profile)
+    argv = startup_profile.configure_from(list(sys.argv if argv is None else argv), DATA_PATH)
+    startup_profile.mark("main.enter")
 
-def main():
     # Make sure no test-time env disables decorations when running the app
     import os
     os.environ.pop("QT_QPA_DISABLE_WINDOWDECORATION", None)
 
     # Check if QApplication already exists (for dev_launcher.py compatibility)
-    app = QApplication.instance()
-    if app is None:
-        app = QApplication(sys.argv)
-    app.setApplicationName(APP_NAME)
+    with startup_profile.phase("qt.application"):
+        app = QApplication.instance()
+        if app is None:
+            app = QApplication(argv)
+        app.setApplicationName(APP_NAME)
 
     # DB connection (ensure schema, etc.)
-    conn = get_connection()
+    with startup_profile.phase("db.get_connection"):
+        conn = get_connection()
 
     # ---- Login (lazy import to avoid circulars) ----
     # Commented out for development: bypass login during development
@@ -439,6 +456,7 @@ def main():
     #         return  # exit app
     
     # For development, create a mock user
+    startup_profile.mark("login.done", mode="dev_bypass")
     user = {
         "username": "dev_user", 
         "role": "admin", 
@@ -448,16 +466,27 @@ def main():
     }  # Mock user for development
 
     # Optional style
-    qss = load_qss()
-    if qss:
-        app.setStyleSheet(qss)
+    with startup_profile.phase("ui.stylesheet"):
+        qss = load_qss()
+        if qss:
+            app.setStyleSheet(qss)
 
     # Window
-    win = MainWindow(conn, current_user=user)
+    with startup_profile.phase("ui.main_window"):
+        win = MainWindow(conn, current_user=user)
 
     # Show UI (smaller default)
-    win.resize(900, 560)
-    win.show()
+    with startup_profile.phase("ui.show"):
+        win.resize(900, 560)
+        win.show()
+
+    if startup_profile.PROFILER.enabled:
+        def _first_idle():
+            startup_profile.mark("ui.first_idle")
+            startup_profile.PROFILER.write()
+
+        QTimer.singleShot(0, _first_idle)
+        app.aboutToQuit.connect(lambda: startup_profile.PROFILER.write(final=True))
     
     # Only call exec_ if we're running standalone (not under dev_launcher.py)
     # When running under dev_launcher.py, just return and let it handle the event loop
@@ -23,6 +23,7 @@ from __future__ import annotations
 import logging
 import os
 import sqlite3
+import time
 import traceback
 from dataclasses import dataclass
 from datetime import datetime
@@ -194,6 +195,9 @@ class RestoreJob(QObject):
     """
     Encapsulates the restore workflow and progress reporting.
     """
+    # How long a restore waits for report / valuation-repair jobs on the pool
+    DRAIN_TIMEOUT_S = 60.0
+
     def __init__(
         self,
         db_locator=None,
@@ -251,6 +255,8 @@ class RestoreJob(QObject):
             _safe_call(cb.phase, "Swapping database files")
             if self._app_db_manager is None:
                 raise RuntimeError("No database manager available to coordinate connections.")
+            if not self._wait_for_other_jobs():
+                _safe_call(cb.log, "Background jobs still running; their connections close when they finish.")
             self._app_db_manager.close_all()
             fsops.replace_db_with(str(imsdb), str(db_path))
             swapped = True
@@ -295,6 +301,7 @@ class RestoreJob(QObject):
                 try:
                     _safe_call(cb.log, "Attempting rollback from safety copy…")
                     if self._app_db_manager:
+                        self._wait_for_other_jobs()
                         self._app_db_manager.close_all()
                     # Safety dir contains original db + possible wal/shm
                     # Find the original DB file name by matching current db_path.name
@@ -317,6 +324,19 @@ class RestoreJob(QObject):
 
             _safe_call(cb.finished, False, _fmt_err("Restore failed.", exc), None)
 
+    def _wait_for_other_jobs(self) -> bool:
+        """
+        Wait until this restore is the only job on the thread pool, so no
+        report or repair worker is mid-statement on a pooled connection when
+        the connections are retired. Returns False on timeout.
+        """
+        deadline = time.monotonic() + self.DRAIN_TIMEOUT_S
+        while self._pool.activeThreadCount() > 1:       # this job runs on the pool too
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
     @staticmethod
     def _foreign_key_violations(db_path: str) -> list:
         """
@@ -132,6 +132,18 @@ def get_db_size_bytes(path: Optional[str] = None) -> int:
     return p.stat().st_size if p.exists() else 0
 
 
+def _apply_backup_profile(con: sqlite3.Connection) -> None:
+    """
+    Small page cache + long busy timeout for snapshot sources (database.tuning
+    'backup' profile). Best effort: this module also works outside the app.
+    """
+    try:
+        from ...database.tuning import apply_profile
+        apply_profile(con, "backup")
+    except Exception:
+        pass
+
+
 def _connect_ro(db_path: str) -> sqlite3.Connection:
     """
     Open a read-only connection via URI. This avoids creating -wal/-shm and is
@@ -235,6 +247,7 @@ def _try_backup_api(
              sqlite3.connect(dest_path, isolation_level=None, check_same_thread=False) as dst:
             src.row_factory = sqlite3.Row
             dst.row_factory = sqlite3.Row
+            _apply_backup_profile(src)
 
             # total_pages is provided in the progress callback for Python 3.11+
             def _progress(status: int, remaining: int, total: int) -> None:
@@ -261,6 +274,7 @@ def _vacuum_into(src_path: str, dest_path: str) -> None:
     # VACUUM INTO must run on a connection to the source DB
     with sqlite3.connect(src_path, isolation_level=None, check_same_thread=False) as con:
         con.row_factory = sqlite3.Row
+        _apply_backup_profile(con)
         # Ensure no pending transaction
         con.execute("PRAGMA wal_checkpoint(PASSIVE);")
         # Surround with a try to provide clearer error if SQLite is too old
@@ -3,15 +3,19 @@ from __future__ import annotations
 import sqlite3
 from typing import Any, Optional, Dict, List
 
-from PySide6.QtCore import Qt, QSortFilterProxyModel, QRegularExpression
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QWidget
 
 from ..base_module import BaseModule
 from .view import CustomerView
 from .form import CustomerForm
 from .model import CustomersTableModel
+from ...database import events
 from ...database.repositories.customers_repo import CustomersRepo
+from ...database.refdata import reference_data
 from ...utils.ui_helpers import info
+from ...widgets.change_listener import ChangeListener
+from ...widgets.columnar_model import sorting_proxy
 
 
 class CustomerController(BaseModule):
@@ -39,6 +43,9 @@ class CustomerController(BaseModule):
         self.view = CustomerView()
         self._wire()
         self._reload()
+        # Patch the list row by row when customers change (this screen or elsewhere)
+        self._changes = ChangeListener(("customers",), parent=self.view)
+        self._changes.changed.connect(self._on_customer_changed)
 
     # ------------------------------------------------------------------ #
     # BaseModule API
@@ -55,6 +62,10 @@ class CustomerController(BaseModule):
         self.view.btn_add.clicked.connect(self._add)
         self.view.btn_edit.clicked.connect(self._edit)
         # self.view.btn_del.clicked.connect(self._delete)
+        # Server-side search (customers_fts), debounced while typing
+        self._search_timer = QTimer(self.view)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.timeout.connect(self._perform_search)
         self.view.search.textChanged.connect(self._apply_filter)
 
         # Payments/credit/history actions
@@ -68,14 +79,10 @@ class CustomerController(BaseModule):
             self.view.btn_update_clearing.clicked.connect(self._on_update_clearing)
 
     def _build_model(self):
-        # Active-only by default
-        rows = self.repo.list_customers(active_only=True)
-        self.base = CustomersTableModel(rows)
-
-        self.proxy = QSortFilterProxyModel(self.view)
-        self.proxy.setSourceModel(self.base)
-        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        self.proxy.setFilterKeyColumn(-1)
+        # Active-only by default; keeps the current search across reloads
+        self.base = CustomersTableModel(self._rows_for(self.view.search.text()))
+
+        self.proxy = sorting_proxy(self.base, self.view)
         self.view.table.setModel(self.proxy)
         self.view.table.resizeColumnsToContents()
 
@@ -94,9 +101,36 @@ class CustomerController(BaseModule):
     # Helpers: selection & details
     # ------------------------------------------------------------------ #
 
+    def _rows_for(self, text: str):
+        text = (text or "").strip()
+        if not text:
+            return self.repo.list_customers(active_only=True)
+        return self.repo.search(text, active_only=True)
+
     def _apply_filter(self, text: str):
-        # Client-side filter (fast, preserves existing UX).
-        self.proxy.setFilterRegularExpression(QRegularExpression(text))
+        self._search_timer.start(300 if len(text) < 3 else 150)
+
+    def _perform_search(self):
+        self.base.replace(self._rows_for(self.view.search.text()))
+        if self.proxy.rowCount() > 0:
+            self.view.table.selectRow(0)
+        self._update_details()
+
+    def _on_customer_changed(self, event: events.ChangeEvent):
+        if self.view.search.text().strip():
+            self._perform_search()  # membership/rank may change; re-run the search
+            return
+        ref = None if event.kind == events.DELETE else reference_data(self.conn).customer(event.id)
+        # the list shows active customers only
+        self.base.patch_row(event.id, self.repo.get(event.id) if ref and ref.is_active else None)
+        if event.id == self._selected_id():
+            self._update_details()
+
+    def _select(self, cid: int):
+        pos = self.base.row_of(cid)
+        if pos is not None:
+            self.view.table.selectRow(self.proxy.mapFromSource(self.base.index(pos, 0)).row())
+        self._update_details()
 
     def _selected_id(self) -> int | None:
         idxs = self.view.table.selectionModel().selectedRows()
@@ -134,7 +168,7 @@ class CustomerController(BaseModule):
         """
         # credit balance
         bal_row = self.conn.execute(
-            "SELECT balance FROM v_customer_advance_balance WHERE customer_id=?",
+            "SELECT CAST(balance AS REAL) AS balance FROM customer_credit_balance WHERE customer_id=?",
             (customer_id,),
         ).fetchone()
         credit_balance = float(bal_row["balance"]) if bal_row else 0.0
@@ -292,7 +326,7 @@ class CustomerController(BaseModule):
             return
         cid = self.repo.create(**p)
         info(self.view, "Saved", f"Customer #{cid} created.")
-        self._reload()
+        self._select(cid)
 
     def _edit(self):
         cid = self._selected_id()
@@ -308,7 +342,7 @@ class CustomerController(BaseModule):
             return
         self.repo.update(cid, **p)
         info(self.view, "Saved", f"Customer #{cid} updated.")
-        self._reload()
+        self._select(cid)
 
     def _delete(self):
         cid = self._selected_id()
@@ -325,18 +359,9 @@ class CustomerController(BaseModule):
 
     def _list_company_bank_accounts(self) -> List[Dict[str, Any]]:
         """
-        Return active company bank accounts as [{id, name}].
+        Return active company bank accounts as [{id, name}] (reference cache).
         """
-        rows = self.conn.execute(
-            """
-            SELECT account_id AS id,
-                   COALESCE(label, bank_name || ' ' || account_no) AS name
-            FROM company_bank_accounts
-            WHERE is_active = 1
-            ORDER BY name ASC;
-            """
-        ).fetchall()
-        return [dict(r) for r in rows]
+        return reference_data(self.conn).bank_account_choices()
 
     def _list_sales_for_customer(self, customer_id: int) -> List[Dict[str, Any]]:
         """
@@ -479,7 +504,7 @@ class CustomerController(BaseModule):
             return
 
         info(self.view, "Saved", f"Payment #{result.id} recorded.")
-        self._reload()
+        self._update_details()
 
     # -- Record Advance (Deposit / Credit) --
 
@@ -512,7 +537,7 @@ class CustomerController(BaseModule):
             return
 
         info(self.view, "Saved", f"Advance #{result.id} recorded.")
-        self._reload()
+        self._update_details()
 
     # -- Apply Advance to a Sale --
 
@@ -564,7 +589,7 @@ class CustomerController(BaseModule):
             info(self.view, "Error", result.message)
             return
 
-        self._reload()  # Reload the UI to reflect changes
+        self._update_details()  # balances changed; the customer row did not
 
         # Show success confirmation to user
         success_msg = f"Advance applied successfully."
@@ -619,7 +644,7 @@ class CustomerController(BaseModule):
             return
 
         info(self.view, "Updated", result.message or "Receipt clearing updated.")
-        self._reload()
+        self._update_details()
 
     # -- Payment / Credit History --
 
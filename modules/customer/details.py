@@ -25,7 +25,7 @@ class CustomerDetails(QWidget):
         f_fin = QFormLayout(box_fin)
 
         self.lab_status = QLabel("-")             # Active / Inactive
-        self.lab_credit = QLabel("-")             # v_customer_advance_balance (Advance Paid)
+        self.lab_credit = QLabel("-")             # customer_credit_balance (Advance Paid)
         self.lab_last_sale = QLabel("-")          # last sale date
         self.lab_last_payment = QLabel("-")       # last payment date
         self.lab_outstanding = QLabel("-")        # sum of (total - paid - applied advances), provided by caller
@@ -4,6 +4,8 @@ import sqlite3
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from ...database.connection_pool import pooled_connection
+
 
 class CustomerHistoryService:
     """
@@ -12,23 +14,21 @@ class CustomerHistoryService:
     Pulls data from:
       - sales (doc_type='sale') + sale_items (+ products, uoms) and sale_detailed_totals view
       - sale_payments
-      - customer_advances (+ v_customer_advance_balance)
+      - customer_advances (+ customer_credit_balance)
 
     Returns structured dictionaries to keep the UI layer simple.
     """
 
-    def __init__(self, db_path: str | Path):
-        self.db_path = str(db_path)
+    def __init__(self, db_path: str | Path | sqlite3.Connection):
+        self._source = db_path if isinstance(db_path, sqlite3.Connection) else str(db_path)
+        self.db_path = self._source if isinstance(self._source, str) else None
 
     # --------------------------------------------------------------------- #
     # Internals
     # --------------------------------------------------------------------- #
 
     def _connect(self) -> sqlite3.Connection:
-        con = sqlite3.connect(self.db_path)
-        con.row_factory = sqlite3.Row
-        con.execute("PRAGMA foreign_keys=ON;")
-        return con
+        return pooled_connection(self._source)
 
     @staticmethod
     def _rowdict(row: sqlite3.Row | None) -> Dict[str, Any] | None:
@@ -168,7 +168,7 @@ class CustomerHistoryService:
         """
         Returns:
           - 'entries': the raw customer_advances entries for the customer
-          - 'balance': current balance from v_customer_advance_balance
+          - 'balance': current balance from customer_credit_balance
         """
         with self._connect() as con:
             entries = con.execute(
@@ -191,8 +191,8 @@ class CustomerHistoryService:
 
             bal_row = con.execute(
                 """
-                SELECT balance
-                FROM v_customer_advance_balance
+                SELECT CAST(balance AS REAL) AS balance
+                FROM customer_credit_balance
                 WHERE customer_id = ?;
                 """,
                 (customer_id,),
@@ -268,7 +268,7 @@ class CustomerHistoryService:
     def overview(self, customer_id: int) -> Dict[str, Any]:
         """
         High-level snapshot for the UI:
-          - balance (credit) from v_customer_advance_balance
+          - balance (credit) from customer_credit_balance
           - sales count & open due sum (based on calculated totals)
           - last activity dates
         """
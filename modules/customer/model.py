@@ -1,8 +1,9 @@
-from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
+from PySide6.QtCore import Qt
 from ...database.repositories.customers_repo import Customer
+from ...widgets.columnar_model import ColumnarTableModel
 
 
-class CustomersTableModel(QAbstractTableModel):
+class CustomersTableModel(ColumnarTableModel):
     """
     Table model for customers with an extra 'Active' column.
 
@@ -12,76 +13,48 @@ class CustomersTableModel(QAbstractTableModel):
 
     # Columns shown in the table
     HEADERS = ["ID", "Name", "Contact", "Address", "Active"]
+    ROW_ID = "customer_id"
 
     # Custom role to query active flag (int: 1 or 0)
     IS_ACTIVE_ROLE = Qt.UserRole + 1
 
-    def __init__(self, rows: list[Customer]):
-        super().__init__()
-        self._rows = rows
-
-    # --- Qt model basics ----------------------------------------------------
-
-    def rowCount(self, parent=QModelIndex()):
-        return len(self._rows)
-
-    def columnCount(self, parent=QModelIndex()):
-        return len(self.HEADERS)
-
     def _active_text(self, row_obj: Customer) -> str:
         """
         Produce human-friendly Active/Inactive text.
         Falls back to 'Active' when the attribute is missing (old dataclass).
         """
-        val = getattr(row_obj, "is_active", 1)
-        try:
-            is_active = bool(int(val))  # handles 1/0/'1'/'0'
-        except Exception:
-            is_active = bool(val)       # handles True/False
-        return "Active" if is_active else "Inactive"
+        return "Active" if self._active_flag(row_obj) else "Inactive"
 
     def _active_flag(self, row_obj: Customer) -> int:
         """Return 1 or 0 for active flag."""
         val = getattr(row_obj, "is_active", 1)
         try:
-            return 1 if int(val) != 0 else 0
+            return 1 if int(val) != 0 else 0   # handles 1/0/'1'/'0'
         except Exception:
-            return 1 if bool(val) else 0
+            return 1 if bool(val) else 0       # handles True/False
+
+    def display(self, r: Customer, c: int):
+        if c == 0:
+            return r.customer_id
+        if c == 1:
+            return r.name
+        if c == 2:
+            return r.contact_info
+        if c == 3:
+            return r.address or ""
+        return self._active_text(r)
+
+    def sort_value(self, r: Customer, c: int):
+        v = self.display(r, c)
+        return v.lower() if isinstance(v, str) else v
 
     def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid():
-            return None
-
-        r = self._rows[index.row()]
-        c = index.column()
-
-        if role in (Qt.DisplayRole, Qt.EditRole):
-            values = [
-                r.customer_id,
-                r.name,
-                r.contact_info,
-                (r.address or ""),
-                self._active_text(r),
-            ]
-            return values[c]
-
         # Expose raw active flag via a custom role for easy filtering/styling
-        if role == self.IS_ACTIVE_ROLE:
-            return self._active_flag(r)
-
-        return None
-
-    def headerData(self, section, orientation, role=Qt.DisplayRole):
-        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
-            return self.HEADERS[section]
-        return super().headerData(section, orientation, role)
+        if role == self.IS_ACTIVE_ROLE and index.isValid():
+            return self._active_flag(self._rows[index.row()])
+        return super().data(index, role)
 
     # --- helpers ------------------------------------------------------------
 
-    def at(self, row: int) -> Customer:
-        return self._rows[row]
-
     def replace(self, rows: list[Customer]):
-        self.beginResetModel()
-        self._rows = rows
-        self.endResetModel()
+        self.set_rows(rows)
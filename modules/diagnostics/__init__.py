@@ -0,0 +1 @@
+"""Database diagnostics page (tuning profile, cache counters, connection pools)."""
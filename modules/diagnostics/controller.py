@@ -0,0 +1,77 @@
+"""
+Controller for the database diagnostics page.
+
+Shows which tuning profile is active (database.tuning), the PRAGMA values
+SQLite actually reports for the app connection next to what the profile asks
+for, the page cache size and database size, the stats of every pooled
+connection provider and the report cache counters.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+from PySide6.QtWidgets import QWidget
+
+from ..base_module import BaseModule
+from .view import DiagnosticsView
+from ...database.connection_pool import pool_snapshot
+from ...database.report_cache import report_cache
+from ...database.tuning import (
+    DIAGNOSTIC_PRAGMAS,
+    active_profile_name,
+    cache_summary,
+    effective_settings,
+    get_profile,
+    reader_profile_name,
+)
+
+
+class DiagnosticsController(BaseModule):
+    def __init__(self, conn: sqlite3.Connection):
+        super().__init__()
+        self.conn = conn
+        self.view = DiagnosticsView()
+        self.view.btn_refresh.clicked.connect(self.refresh)
+        self.refresh()
+
+    def get_widget(self) -> QWidget:
+        return self.view
+
+    def refresh(self) -> None:
+        writer = get_profile(active_profile_name())
+        reader = reader_profile_name()
+        self.view.lbl_profile.setText(
+            f"Writer profile: <b>{writer.name}</b> ({writer.description}) &nbsp;·&nbsp; "
+            f"Reader profile: <b>{reader}</b>"
+        )
+
+        wanted = dict(writer.pragmas)
+        eff = effective_settings(self.conn)
+        self.view.fill(
+            self.view.tbl_settings,
+            [(name, eff.get(name), wanted.get(name, "")) for name in DIAGNOSTIC_PRAGMAS],
+        )
+
+        self.view.fill(self.view.tbl_cache, list(cache_summary(self.conn).items()))
+
+        self.view.fill(
+            self.view.tbl_pool,
+            [
+                (
+                    p.db_path, "reader" if p.read_only else "writer", p.profile_name or "",
+                    p.stats.open_now, p.stats.opened, p.stats.reused, p.stats.replaced, p.stats.closed,
+                )
+                for p in pool_snapshot()
+            ],
+        )
+
+        rc = report_cache(self.conn).stats()
+        self.view.fill(
+            self.view.tbl_reports,
+            [
+                ("hits", rc.hits), ("misses", rc.misses), ("hit ratio", f"{rc.hit_rate:.1%}"),
+                ("not cacheable", rc.bypassed), ("evictions", rc.evictions),
+                ("entries", rc.entries), ("approx. size", f"{rc.approx_bytes / 1024:.0f} KiB"),
+            ],
+        )
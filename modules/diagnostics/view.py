@@ -0,0 +1,70 @@
+"""
+View for the database diagnostics page: tuning profile, effective PRAGMAs,
+page-cache size, connection-pool and report-cache stats. Display only; the controller
+fills the tables.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QGroupBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+)
+
+
+def _table(headers: Sequence[str]) -> QTableWidget:
+    t = QTableWidget(0, len(headers))
+    t.setHorizontalHeaderLabels(list(headers))
+    t.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    t.setSelectionBehavior(QAbstractItemView.SelectRows)
+    t.verticalHeader().setVisible(False)
+    t.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+    t.horizontalHeader().setStretchLastSection(True)
+    return t
+
+
+class DiagnosticsView(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        root = QVBoxLayout(self)
+
+        bar = QHBoxLayout()
+        self.lbl_profile = QLabel()
+        bar.addWidget(self.lbl_profile, 1)
+        self.btn_refresh = QPushButton("Refresh")
+        bar.addWidget(self.btn_refresh)
+        root.addLayout(bar)
+
+        box = QGroupBox("Connection settings (effective vs. profile)")
+        lay = QVBoxLayout(box)
+        self.tbl_settings = _table(["PRAGMA", "Effective", "Profile"])
+        lay.addWidget(self.tbl_settings)
+        root.addWidget(box, 2)
+
+        box = QGroupBox("Page cache")
+        lay = QVBoxLayout(box)
+        self.tbl_cache = _table(["Setting", "Value"])
+        lay.addWidget(self.tbl_cache)
+        root.addWidget(box, 1)
+
+        box = QGroupBox("Pooled connections")
+        lay = QVBoxLayout(box)
+        self.tbl_pool = _table(["Database", "Kind", "Profile", "Open", "Opened", "Reused", "Replaced", "Closed"])
+        lay.addWidget(self.tbl_pool)
+        root.addWidget(box, 1)
+
+        box = QGroupBox("Report cache")
+        lay = QVBoxLayout(box)
+        self.tbl_reports = _table(["Counter", "Value"])
+        lay.addWidget(self.tbl_reports)
+        root.addWidget(box, 1)
+
+    @staticmethod
+    def fill(table: QTableWidget, rows: Iterable[Sequence[object]]) -> None:
+        rows = list(rows)
+        table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, val in enumerate(row):
+                table.setItem(r, c, QTableWidgetItem("" if val is None else str(val)))
@@ -12,10 +12,12 @@ from .model import TransactionsTableModel
 # Additional simple views you already have/added
 from .transactions import TransactionsView
 from .stock_valuation import StockValuationWidget
+from .valuation_repair import ValuationRepairJob, db_path_from_conn, repair_job_for
 
 # Repositories
 from ...database.repositories.inventory_repo import InventoryRepo
 from ...database.repositories.products_repo import ProductsRepo
+from ...database.valuation import pending_repairs
 
 # Utils
 from ...utils.ui_helpers import info, error
@@ -29,7 +31,7 @@ class InventoryController(BaseModule):
     Tabs:
       1) Adjustments & Recent  (existing InventoryView)
       2) Transactions          (recent list with adjustable LIMIT)
-      3) Stock Valuation       (per-product on-hand snapshot)
+      3) Stock Valuation       (per-product on-hand snapshot + valuation repair)
 
     This file replaces the need for a separate inventory_controller.py.
     """
@@ -64,6 +66,21 @@ class InventoryController(BaseModule):
         self._valuation_view = StockValuationWidget(conn)
         self.tabs.addTab(self._valuation_view, "Stock Valuation")
 
+        # Background replay of valuation_dirty (back-dated/edited postings)
+        self._repair_job: ValuationRepairJob | None = None
+        db_path = db_path_from_conn(conn)
+        if db_path:
+            # shared with other modules that schedule repairs (purchases)
+            self._repair_job = repair_job_for(db_path)
+            self._repair_job.progress.connect(self._on_repair_progress)
+            self._repair_job.throughput.connect(self._on_repair_throughput)
+            self._repair_job.finished.connect(self._on_repair_finished)
+            self._repair_job.error.connect(self._on_repair_error)
+            self._valuation_view.btn_repair.clicked.connect(self._start_repair)
+        else:
+            self._valuation_view.btn_repair.setEnabled(False)
+        self._show_pending_repairs()
+
     def get_widget(self) -> QWidget:
         return self._root
 
@@ -134,3 +151,47 @@ class InventoryController(BaseModule):
         )
         info(self.view, "Saved", "Adjustment recorded.")
         self._reload_recent()
+        if pending_repairs(self.conn):
+            self._start_repair()
+
+    # ========= Valuation repair (valuation_dirty queue) =========
+
+    def _show_pending_repairs(self):
+        try:
+            n = pending_repairs(self.conn)
+        except Exception:
+            return
+        self._valuation_view.set_repair_status(
+            f"{n} product(s) pending revaluation." if n else "Valuations up to date."
+        )
+
+    def _start_repair(self):
+        if self._repair_job is None:
+            return
+        if self._repair_job.start():
+            self._valuation_view.set_repair_status("Replaying pending valuations…", busy=True)
+
+    def _on_repair_progress(self, done: int, total: int):
+        self._repair_progress = f"Replaying… {done}/{total} products"
+        self._valuation_view.set_repair_status(self._repair_progress, busy=True)
+
+    def _on_repair_throughput(self, products_per_sec: float, rows_per_sec: float):
+        self._valuation_view.set_repair_status(
+            f"{getattr(self, '_repair_progress', 'Replaying…')} "
+            f"({products_per_sec:.1f} products/s, {rows_per_sec:.0f} rows/s)",
+            busy=True,
+        )
+
+    def _on_repair_finished(self, stats):
+        msg = (
+            f"Replayed {stats.products_done} product(s), {stats.rows_written} row(s) "
+            f"in {stats.elapsed_s:.2f}s — {stats.products_per_sec:.1f} products/s, "
+            f"{stats.rows_per_sec:.0f} rows/s"
+        )
+        if stats.failed:
+            msg += f"; {len(stats.failed)} failed"
+        self._valuation_view.set_repair_status(msg)
+        self._valuation_view.refresh()
+
+    def _on_repair_error(self, message: str):
+        self._valuation_view.set_repair_status(f"Repair failed: {message}")
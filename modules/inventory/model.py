@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from typing import List, Dict, Any, Optional
-from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
+from PySide6.QtCore import Qt, QModelIndex
 
+from ...widgets.columnar_model import ColumnarTableModel
 
-class TransactionsTableModel(QAbstractTableModel):
+
+class TransactionsTableModel(ColumnarTableModel):
     """
     Table model for inventory transactions.
 
@@ -29,62 +31,61 @@ class TransactionsTableModel(QAbstractTableModel):
       - notes
     """
     HEADERS: List[str] = ["ID", "Date", "Type", "Product", "Qty", "UoM", "Notes"]
+    ROW_ID = "transaction_id"
+
+    # column -> accepted keys, preferred first
+    _KEYS = (
+        ("transaction_id", "id"),
+        ("date",),
+        ("transaction_type", "type"),
+        ("product",),
+        ("quantity", "qty"),
+        ("unit_name", "uom"),
+        ("notes",),
+    )
 
     def __init__(self, rows: Optional[List[Dict[str, Any]]] = None) -> None:
-        super().__init__()
-        self._rows: List[Dict[str, Any]] = list(rows or [])
-
-    # ---------- Qt model basics ----------
-
-    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
-        return len(self._rows)
+        super().__init__(rows)
+
+    @staticmethod
+    def _get(r: Dict[str, Any], keys, default: Any = "") -> Any:
+        for k in keys:
+            if k in r and r[k] is not None:
+                return r[k]
+        return default
+
+    # ---------- column values (formatted once per row load) ----------
+
+    def display(self, r: Dict[str, Any], col: int) -> Any:
+        try:
+            if col == 4:  # Qty
+                q = self._get(r, self._KEYS[4], default=0)
+                try:
+                    return f"{float(q):g}"
+                except Exception:
+                    return str(q) if q is not None else ""
+            return self._get(r, self._KEYS[col])
+        except Exception:
+            return ""
+
+    def sort_value(self, r: Dict[str, Any], col: int) -> Any:
+        if col in (0, 4):  # ID, Qty sort numerically
+            try:
+                return float(self._get(r, self._KEYS[col], default=0))
+            except (TypeError, ValueError):
+                return None
+        return str(self.display(r, col)).lower()
 
-    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
-        return len(self.HEADERS)
+    def row_id(self, r: Dict[str, Any]) -> Any:
+        return self._get(r, self._KEYS[0], default=None)
 
     def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
-        if not index.isValid():
-            return None
-
-        r = self._rows[index.row()]
-        col = index.column()
-
-        def _get(*keys, default=""):
-            for k in keys:
-                if k in r and r[k] is not None:
-                    return r[k]
-            return default
-
-        # Display / Edit text
-        if role in (Qt.DisplayRole, Qt.EditRole):
-            try:
-                if col == 0:  # ID
-                    return _get("transaction_id", "id")
-                elif col == 1:  # Date
-                    return _get("date")
-                elif col == 2:  # Type
-                    return _get("transaction_type", "type")
-                elif col == 3:  # Product
-                    return _get("product")
-                elif col == 4:  # Qty
-                    q = _get("quantity", "qty", default=0)
-                    try:
-                        return f"{float(q):g}"
-                    except Exception:
-                        return str(q) if q is not None else ""
-                elif col == 5:  # UoM
-                    return _get("unit_name", "uom")
-                elif col == 6:  # Notes
-                    return _get("notes", default="")
-            except Exception:
-                return ""
-
         # Align numeric-ish columns (ID and Qty) to right for readability
-        if role == Qt.TextAlignmentRole:
-            if col in (0, 4):
+        if role == Qt.TextAlignmentRole and index.isValid():
+            if index.column() in (0, 4):
                 return int(Qt.AlignRight | Qt.AlignVCenter)
-
-        return None
+            return None
+        return super().data(index, role)
 
     def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
         if orientation == Qt.Horizontal and role == Qt.DisplayRole:
@@ -101,9 +102,7 @@ class TransactionsTableModel(QAbstractTableModel):
 
     def replace(self, rows: List[Dict[str, Any]]) -> None:
         """Replace all rows at once (keeps column schema unchanged)."""
-        self.beginResetModel()
-        self._rows = list(rows or [])
-        self.endResetModel()
+        self.set_rows(rows)
 
     def row_dict(self, row: int) -> Dict[str, Any]:
         """Return the raw dict for a given row (useful in tests/controllers)."""
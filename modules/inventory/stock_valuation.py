@@ -6,6 +6,8 @@ UI:
 - Top row:  Product combobox (with "(Select…)" default) + Refresh button
 - Card:     On Hand (qty + uom), Unit Value, Total Value
 - Footer:   Small note ("from v_stock_on_hand") for context
+- Repair:   "Replay pending" button + status line for the valuation_dirty queue
+            (the job itself is owned by InventoryController)
 
 Behavior:
 - On product change or Refresh -> query InventoryRepo.stock_on_hand(product_id)
@@ -119,6 +121,18 @@ class StockValuationWidget(QWidget):
 
         root.addWidget(self.grp_card, 0)
 
+        # ------------------------------------------------------------------
+        # Repair row: pending back-dated/edited postings
+        # ------------------------------------------------------------------
+        repair = QHBoxLayout()
+        repair.setSpacing(6)
+        self.btn_repair = QPushButton("Replay pending valuations")
+        repair.addWidget(self.btn_repair)
+        self.lbl_repair = QLabel("")
+        self.lbl_repair.setStyleSheet("color:#666; font-size:11px;")
+        repair.addWidget(self.lbl_repair, 1)
+        root.addLayout(repair)
+
         # ------------------------------------------------------------------
         # Signals
         # ------------------------------------------------------------------
@@ -178,13 +192,17 @@ class StockValuationWidget(QWidget):
             return
         self._load_product_snapshot(pid)
 
-    def _refresh_clicked(self) -> None:
+    def refresh(self) -> None:
+        """Reload the card for the selected product (e.g. after a valuation repair)."""
         pid = self._selected_product_id()
         if pid is None:
             self._clear_card()
             return
         self._load_product_snapshot(pid)
 
+    def _refresh_clicked(self) -> None:
+        self.refresh()
+
     # ----------------------------------------------------------------------
     # Helpers
     # ----------------------------------------------------------------------
@@ -195,6 +213,10 @@ class StockValuationWidget(QWidget):
         except Exception:
             return None
 
+    def set_repair_status(self, text: str, busy: bool = False) -> None:
+        self.lbl_repair.setText(text)
+        self.btn_repair.setEnabled(not busy)
+
     def _clear_card(self) -> None:
         self.val_on_hand.setText("—")
         self.val_unit_value.setText("—")
@@ -0,0 +1,127 @@
+"""
+modules/inventory/valuation_repair.py
+
+Purpose
+-------
+Drain the `valuation_dirty` queue off the UI thread. Back-dated postings, edits
+and deletes only mark a product as dirty; this job replays each marked product
+from its earliest impacted date forward (database.valuation.drain_dirty) in
+batched transactions on the global QThreadPool.
+
+Public interface
+----------------
+- ValuationRepairJob(db_path).start(batch_size=50) -> bool
+- repair_job_for(db_path) -> ValuationRepairJob  (one shared job per database file)
+- schedule_repair(conn) -> bool  (start the shared job when the queue has work)
+- Signals: progress(done, total), throughput(products_per_sec, rows_per_sec),
+           finished(RepairStats), error(str)
+
+The worker opens its own sqlite3 connection; SQLite connections must not be
+shared across threads.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import Callable, Dict, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from ...database.connection_pool import db_path_from_conn
+from ...database.valuation import RepairStats, drain_dirty, pending_repairs
+
+
+class _RepairRunnable(QRunnable):
+    def __init__(self, work: Callable[[], None]) -> None:
+        super().__init__()
+        self.setAutoDelete(True)
+        self._work = work
+
+    @Slot()
+    def run(self) -> None:  # type: ignore[override]
+        self._work()
+
+
+class ValuationRepairJob(QObject):
+    """
+    One repair run at a time; start() while a run is active is a no-op.
+    Signals are emitted from the worker thread and delivered queued to UI slots.
+    """
+    progress = Signal(int, int)            # products done, products total
+    throughput = Signal(float, float)      # products/sec, rows/sec
+    finished = Signal(object)              # RepairStats
+    error = Signal(str)
+
+    def __init__(self, db_path: str, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._db_path = db_path
+        self._pool = QThreadPool.globalInstance()
+        self._running = False
+        self._stop = threading.Event()
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def start(self, batch_size: int = 50) -> bool:
+        if self._running:
+            return False
+        self._running = True
+        self._stop.clear()
+        self._pool.start(_RepairRunnable(lambda: self._run(batch_size)))
+        return True
+
+    def cancel(self) -> None:
+        """Stop after the current batch commits."""
+        self._stop.set()
+
+    # ---- worker thread ----
+    def _run(self, batch_size: int) -> None:
+        con: Optional[sqlite3.Connection] = None
+        try:
+            con = sqlite3.connect(self._db_path, timeout=30)
+            con.execute("PRAGMA foreign_keys = ON;")
+            con.execute("PRAGMA busy_timeout = 30000;")
+            stats = drain_dirty(
+                con,
+                batch_size=batch_size,
+                on_progress=self._report,
+                should_stop=self._stop.is_set,
+            )
+            self.finished.emit(stats)
+        except Exception as e:
+            self.error.emit(f"{e.__class__.__name__}: {e}")
+        finally:
+            if con is not None:
+                con.close()
+            self._running = False
+
+    def _report(self, stats: RepairStats) -> None:
+        self.progress.emit(stats.products_done, stats.products_total)
+        self.throughput.emit(stats.products_per_sec, stats.rows_per_sec)
+
+
+_jobs: Dict[str, ValuationRepairJob] = {}
+
+
+def repair_job_for(db_path: str) -> ValuationRepairJob:
+    """The process-wide repair job for a database file (so runs never overlap)."""
+    job = _jobs.get(db_path)
+    if job is None:
+        job = _jobs[db_path] = ValuationRepairJob(db_path)
+    return job
+
+
+def schedule_repair(conn: sqlite3.Connection) -> bool:
+    """
+    Start the shared repair job for `conn`'s database if valuation_dirty has
+    work. Call after committing a write that posts inventory (adjustments,
+    sales, purchases, returns). Returns True when a run was started.
+    """
+    db_path = db_path_from_conn(conn)
+    if not db_path or not pending_repairs(conn):
+        return False
+    return repair_job_for(db_path).start()
+
+
+__all__ = ["ValuationRepairJob", "db_path_from_conn", "repair_job_for", "schedule_repair"]
@@ -1,12 +1,15 @@
-from PySide6.QtCore import Qt, QSortFilterProxyModel, QRegularExpression
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QWidget
 import sqlite3
 from ..base_module import BaseModule
 from .view import ProductView
 from .form import ProductForm
 from .model import ProductsTableModel
+from ...database import events
 from ...database.repositories.products_repo import ProductsRepo, DomainError
 from ...utils.ui_helpers import info, error
+from ...widgets.change_listener import ChangeListener
+from ...widgets.columnar_model import sorting_proxy
 
 
 class ProductController(BaseModule):
@@ -18,6 +21,9 @@ class ProductController(BaseModule):
         self._wired = False  # ensure signals are connected only once
         self._connect_signals()
         self._reload()
+        # Patch the list row by row when products change (this screen or elsewhere)
+        self._changes = ChangeListener(("products",), parent=self.view)
+        self._changes.changed.connect(self._on_product_changed)
 
     def get_widget(self) -> QWidget:
         return self.view
@@ -29,24 +35,43 @@ class ProductController(BaseModule):
         self.view.btn_add.clicked.connect(self._add)
         self.view.btn_edit.clicked.connect(self._delete)
         # self.view.btn_del.clicked.connect(self._delete)
+        # Server-side search (products_fts), debounced while typing
+        self._search_timer = QTimer(self.view)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.timeout.connect(self._perform_search)
         self.view.search.textChanged.connect(self._apply_filter)
         self._wired = True
 
     def _build_model(self):
-        rows = self.repo.list_products()
-        self.base_model = ProductsTableModel(rows)
-        self.proxy = QSortFilterProxyModel(self.view)
-        self.proxy.setSourceModel(self.base_model)
-        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        self.proxy.setFilterKeyColumn(-1)
+        self.base_model = ProductsTableModel(self._rows_for(self.view.search.text()))
+        self.proxy = sorting_proxy(self.base_model, self.view)
         self.view.table.setModel(self.proxy)
         self.view.table.resizeColumnsToContents()
 
     def _reload(self):
         self._build_model()
 
+    def _rows_for(self, text: str):
+        text = (text or "").strip()
+        return self.repo.search(text) if text else self.repo.list_products()
+
     def _apply_filter(self, text: str):
-        self.proxy.setFilterRegularExpression(QRegularExpression(text))
+        self._search_timer.start(300 if len(text) < 3 else 150)
+
+    def _perform_search(self):
+        self.base_model.replace(self._rows_for(self.view.search.text()))
+
+    def _on_product_changed(self, event: events.ChangeEvent):
+        if self.view.search.text().strip():
+            self._perform_search()  # membership/rank may change; re-run the search
+            return
+        row = None if event.kind == events.DELETE else self.repo.get_listed(event.id)
+        self.base_model.patch_row(event.id, row)
+
+    def _select(self, pid: int):
+        pos = self.base_model.row_of(pid)
+        if pos is not None:
+            self.view.table.selectRow(self.proxy.mapFromSource(self.base_model.index(pos, 0)).row())
 
     def _selected_id(self) -> int | None:
         idxs = self.view.table.selectionModel().selectedRows()
@@ -79,7 +104,7 @@ class ProductController(BaseModule):
         if len(roles) > 1:  # only persist roles if there were alternates
             self.repo.upsert_roles(pid, roles)
         info(self.view, "Saved", f"Product #{pid} created.")
-        self._reload()
+        self._select(pid)
 
     def _edit(self):
         pid = self._selected_id()
@@ -116,7 +141,7 @@ class ProductController(BaseModule):
         if len(roles_map) > 1:
             self.repo.upsert_roles(pid, roles_map)
         info(self.view, "Saved", f"Product #{pid} updated.")
-        self._reload()
+        self._select(pid)
 
     def _delete(self):
         """
@@ -135,4 +160,3 @@ class ProductController(BaseModule):
             error(self.view, "Blocked", str(de))
             return
         info(self.view, "Deleted", f"Product #{pid} deleted.")
-        self._reload()
@@ -1,49 +1,33 @@
-from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
 from ...database.repositories.products_repo import Product
+from ...widgets.columnar_model import ColumnarTableModel
 
-class ProductsTableModel(QAbstractTableModel):
+class ProductsTableModel(ColumnarTableModel):
     HEADERS = ["ID", "Name", "Category", "Min Stock", "Description", "Base UOM", "Alt UOM"]
-    
-    def __init__(self, rows: list[Product]):
-        super().__init__()
-        self._rows = rows
-        
-    # Qt model basics
-    def rowCount(self, parent=QModelIndex()): 
-        return len(self._rows)
-        
-    def columnCount(self, parent=QModelIndex()): 
-        return len(self.HEADERS)
-        
-    def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid(): 
-            return None
-        p = self._rows[index.row()]
-        if role in (Qt.DisplayRole, Qt.EditRole):
-            c = index.column()
-            return [
-                p.product_id,
-                p.name,
-                p.category or "",
-                f"{p.min_stock_level:g}",
-                p.description or "",
-                p.base_uom_name or "",
-                p.alt_uom_names or "",
-            ][c]
-        return None
-        
-    def headerData(self, section, orientation, role=Qt.DisplayRole):
-        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
-            return self.HEADERS[section]
-        return super().headerData(section, orientation, role)
-        
-    def at(self, row: int) -> Product:
-        return self._rows[row]
-        
+    ROW_ID = "product_id"
+
+    def display(self, p: Product, c: int):
+        if c == 0:
+            return p.product_id
+        if c == 1:
+            return p.name
+        if c == 2:
+            return p.category or ""
+        if c == 3:
+            return f"{p.min_stock_level:g}"
+        if c == 4:
+            return p.description or ""
+        if c == 5:
+            return p.base_uom_name or ""
+        return p.alt_uom_names or ""
+
+    def sort_value(self, p: Product, c: int):
+        if c == 3:
+            return float(p.min_stock_level or 0.0)
+        v = self.display(p, c)
+        return v.lower() if isinstance(v, str) else v
+
     def replace(self, rows: list[Product]):
-        self.beginResetModel()
-        self._rows = rows
-        self.endResetModel()
+        self.set_rows(rows)
         
     # helper for proxy filtering
     def row_as_text(self, row: int) -> str:
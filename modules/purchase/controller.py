@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import Qt, QSortFilterProxyModel, QRegularExpression, QTimer
+from PySide6.QtCore import Qt, QRegularExpression, QTimer
 import sqlite3, datetime
 from typing import Optional
 import logging
@@ -13,8 +13,11 @@ from .payments import PurchasePaymentDialog
 from ...database.repositories.purchases_repo import PurchasesRepo, PurchaseHeader, PurchaseItem
 from ...database.repositories.vendors_repo import VendorsRepo
 from ...database.repositories.products_repo import ProductsRepo
+from ...database import doc_numbers, events
+from ...database.refdata import reference_data
 from ...database.repositories.purchase_payments_repo import PurchasePaymentsRepo
 from ...database.repositories.vendor_advances_repo import VendorAdvancesRepo
+from ..inventory.valuation_repair import schedule_repair
 from ...utils.ui_helpers import info
 from ...utils.helpers import today_str
 
@@ -38,17 +41,11 @@ if not _log.handlers:
 
 
 def new_purchase_id(conn: sqlite3.Connection, date_str: str) -> str:
-    d = date_str.replace("-", "")
-    prefix = f"PO{d}-"
-    row = conn.execute("SELECT MAX(purchase_id) AS m FROM purchases WHERE purchase_id LIKE ?", (prefix + "%",)).fetchone()
-    if row and row["m"]:
-        try:
-            last = int(row["m"].split("-")[-1])
-        except Exception:
-            last = 0
-    else:
-        last = 0
-    return f"{prefix}{last+1:04d}"
+    """
+    Next purchase id (PO + yyyymmdd + -NNNN) from database.doc_numbers.
+    Allocates: call inside the posting transaction on the same connection.
+    """
+    return doc_numbers.allocate(conn, doc_numbers.PURCHASE, date_str)
 
 
 class PurchaseController(BaseModule):
@@ -62,6 +59,8 @@ class PurchaseController(BaseModule):
         self.vadv = VendorAdvancesRepo(conn)
         self.vendors = VendorsRepo(conn)
         self.products = ProductsRepo(conn)
+        self.base: PurchasesTableModel | None = None
+        self._search_text, self._search_field = "", "all"
         self._wire()
         self._reload()
 
@@ -88,15 +87,23 @@ class PurchaseController(BaseModule):
         self.view.rb_vendor.toggled.connect(self._apply_filter)
         self.view.rb_status.toggled.connect(self._apply_filter)
 
+    def _fetch_page(self, sort: str, descending: bool, after, limit: int) -> list:
+        """Keyset page for the applied search (server side)."""
+        return self.repo.page_purchases(
+            query=self._search_text,
+            field=self._search_field,
+            sort=sort,
+            descending=descending,
+            after=after,
+            limit=limit,
+        )
+
     def _build_model(self):
-        rows = self.repo.list_purchases()
-        self.base = PurchasesTableModel(rows)
-        self._original_rows = rows  # Cache the original data for fast searching
-        self.proxy = QSortFilterProxyModel(self.view)
-        self.proxy.setSourceModel(self.base)
-        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        self.proxy.setFilterKeyColumn(-1)
-        self.view.tbl.setModel(self.proxy)
+        # Rows are fetched page by page as the table scrolls; header clicks sort server side
+        self.base = PurchasesTableModel(self._fetch_page)
+        self.base.watch("purchases", self._fetch_rows)
+        self.view.tbl.setModel(self.base)
+        self.view.tbl.horizontalHeader().setSortIndicator(self.base.sort_column(), self.base.sort_order())
         self.view.tbl.resizeColumnsToContents()
         sel = self.view.tbl.selectionModel()
         try:
@@ -104,43 +111,45 @@ class PurchaseController(BaseModule):
         except (TypeError, RuntimeError):
             pass
         sel.selectionChanged.connect(self._sync_details)
+        # Every re-query (reload, search, header sort) resets the model
+        self.base.modelReset.connect(self._on_model_reset)
 
     def _reload(self):
-        # Preserve the current search state
-        current_search = self.view.search.text()
-        current_radio_button = None
-        if self.view.rb_all.isChecked():
-            current_radio_button = "all"
-        elif self.view.rb_id.isChecked():
-            current_radio_button = "id"
-        elif self.view.rb_vendor.isChecked():
-            current_radio_button = "vendor"
-        elif self.view.rb_status.isChecked():
-            current_radio_button = "status"
-        
-        self._build_model()
-        
-        # Restore the search after reloading the data
-        if current_search:
-            # Set flag to prevent double search execution
-            self._programmatically_setting_search = True
-            self.view.search.setText(current_search)
-            # Restore the radio button state
-            if current_radio_button == "all":
-                self.view.rb_all.setChecked(True)
-            elif current_radio_button == "id":
-                self.view.rb_id.setChecked(True)
-            elif current_radio_button == "vendor":
-                self.view.rb_vendor.setChecked(True)
-            elif current_radio_button == "status":
-                self.view.rb_status.setChecked(True)
-            
-            # Re-apply the search filter
-            self._perform_search()
-            # Reset the flag
-            self._programmatically_setting_search = False
-        
-        if self.proxy.rowCount() > 0:
+        # The search text / mode stay in the view; re-query with them from the first page
+        self._search_text, self._search_field = self._current_search()
+        if self.base is None:
+            self._build_model()
+            self._on_model_reset()
+        else:
+            self.base.reload()  # -> modelReset
+
+    def _fetch_rows(self, ids) -> list:
+        """Re-read changed rows for the live list (same columns and filter as the pages)."""
+        return self.repo.page_purchases(
+            query=self._search_text,
+            field=self._search_field,
+            ids=[str(i) for i in ids],
+            limit=max(len(ids), 1),
+        )
+
+    def _after_write(self, purchase_id: str | None = None):
+        """
+        The list patches itself from the change events delivered on commit, so
+        a save only needs to reselect the purchase and refresh the details.
+        Back-dated postings leave products in valuation_dirty; the shared
+        repair job replays them in the background, as after stock adjustments.
+        """
+        schedule_repair(self.conn)
+        if self.base is None:
+            self._reload()
+            return
+        pos = self.base.row_of(purchase_id) if purchase_id else None
+        if pos is not None:
+            self.view.tbl.selectRow(pos)
+        self._sync_details()
+
+    def _on_model_reset(self):
+        if self.base.rowCount() > 0:
             self.view.tbl.selectRow(0)
         else:
             self.view.details.set_data(None)
@@ -152,10 +161,6 @@ class PurchaseController(BaseModule):
 
     def _on_search_text_changed(self, text):
         """Handle search text changes with adaptive debouncing."""
-        # Skip processing if we're programmatically setting the text (avoid double search)
-        if hasattr(self, '_programmatically_setting_search') and self._programmatically_setting_search:
-            return
-        
         # Adjust debounce time based on search text length for better performance
         # Shorter searches get longer debounce to avoid rendering large result sets
         # Longer/more specific queries use shorter debounce since results are fewer
@@ -163,53 +168,25 @@ class PurchaseController(BaseModule):
         # Restart the timer for each keystroke
         self._search_timer.start(debounce_time)
 
-    def _perform_search(self):
-        """Actually perform the search after debounce delay."""
-        search_text = self.view.search.text()
-        
-        if not search_text.strip():
-            # If search is empty, show all rows
-            self.base.replace(self._original_rows)
-            return
-            
-        # Determine which column to search based on radio button selection
-        def safe_lower(value):
-            """Convert value to lowercase string, handling None values"""
-            if value is None:
-                return ""
-            return str(value).lower()
-        
-        if self.view.rb_all.isChecked():
-            # Search across all columns - filter in memory for better performance
-            filtered_rows = []
-            search_lower = search_text.lower()
-            for row in self._original_rows:
-                # Check each relevant field in the row
-                if (search_lower in safe_lower(row["purchase_id"]) or
-                    search_lower in safe_lower(row["date"]) or
-                    search_lower in safe_lower(row["vendor_name"]) or
-                    search_lower in safe_lower(row["total_amount"]) or
-                    search_lower in safe_lower(row["paid_amount"]) or
-                    search_lower in safe_lower(row["payment_status"])):
-                    filtered_rows.append(row)
-        elif self.view.rb_id.isChecked():
-            # Search only in PO ID column
-            search_lower = search_text.lower()
-            filtered_rows = [row for row in self._original_rows 
-                            if search_lower in safe_lower(row["purchase_id"])]
+    def _current_search(self) -> tuple[str, str]:
+        """(search text, field) from the view: field is 'all', 'id', 'vendor' or 'status'."""
+        if self.view.rb_id.isChecked():
+            field = "id"
         elif self.view.rb_vendor.isChecked():
-            # Search only in Vendor column
-            search_lower = search_text.lower()
-            filtered_rows = [row for row in self._original_rows 
-                            if search_lower in safe_lower(row["vendor_name"])]
+            field = "vendor"
         elif self.view.rb_status.isChecked():
-            # Search only in Status column
-            search_lower = search_text.lower()
-            filtered_rows = [row for row in self._original_rows 
-                            if search_lower in safe_lower(row["payment_status"])]
-        
-        # Update the model with filtered results
-        self.base.replace(filtered_rows)
+            field = "status"
+        else:
+            field = "all"
+        return self.view.search.text().strip(), field
+
+    def _perform_search(self):
+        """Actually perform the search after debounce delay (server side, first page)."""
+        search = self._current_search()
+        if search == (self._search_text, self._search_field):
+            return
+        self._search_text, self._search_field = search
+        self.base.reload()
 
     def _apply_filter(self, _=None):  # parameter can be text or checked state
         """Apply filter when radio button selection changes."""
@@ -220,8 +197,7 @@ class PurchaseController(BaseModule):
         idxs = self.view.tbl.selectionModel().selectedRows()
         if not idxs:
             return None
-        src = self.proxy.mapToSource(idxs[0])
-        r = self.base.at(src.row())
+        r = self.base.at(idxs[0].row())
         try:
             return r if isinstance(r, dict) else dict(r)
         except Exception:
@@ -324,7 +300,7 @@ class PurchaseController(BaseModule):
         # Generate purchase ID ahead of time so it can be displayed in the form
         from ...utils.helpers import today_str
         temp_date = today_str()  # Use today's date for initial ID generation
-        temp_pid = new_purchase_id(self.conn, temp_date)
+        temp_pid = doc_numbers.peek(self.conn, doc_numbers.PURCHASE, temp_date)  # preview only
 
         # Create initial data with the temp purchase ID for display
         initial_data = {
@@ -347,46 +323,47 @@ class PurchaseController(BaseModule):
         should_print_after_save = p.get('_should_print', False)
         should_export_pdf_after_save = p.get('_should_export_pdf', False)
 
-        # Use the actual date from the form to generate the final purchase ID
-        pid = new_purchase_id(self.conn, p["date"])
-
-        h = PurchaseHeader(
-            purchase_id=pid,
-            vendor_id=p["vendor_id"],
-            date=p["date"],
-            total_amount=p.get("total_amount", 0.0),
-            order_discount=p.get("order_discount", 0.0),
-            payment_status="unpaid",
-            paid_amount=0.0,
-            advance_payment_applied=0.0,
-            notes=p.get("notes"),
-            created_by=(self.user["user_id"] if self.user else None),
-        )
-        items = [
-            PurchaseItem(
-                None,
-                pid,
-                it["product_id"],
-                it["quantity"],
-                it["uom_id"],
-                it["purchase_price"],
-                it["sale_price"],
-                it["item_discount"],
-            )
-            for it in p["items"]
-        ]
-
+        pid = temp_pid  # for the error log until the real number is allocated
         try:
 
             self.conn.execute("BEGIN")
 
+            # Number the purchase inside the posting transaction (from the form's date)
+            pid = new_purchase_id(self.conn, p["date"])
+
+            h = PurchaseHeader(
+                purchase_id=pid,
+                vendor_id=p["vendor_id"],
+                date=p["date"],
+                total_amount=p.get("total_amount", 0.0),
+                order_discount=p.get("order_discount", 0.0),
+                payment_status="unpaid",
+                paid_amount=0.0,
+                advance_payment_applied=0.0,
+                notes=p.get("notes"),
+                created_by=(self.user["user_id"] if self.user else None),
+            )
+            items = [
+                PurchaseItem(
+                    None,
+                    pid,
+                    it["product_id"],
+                    it["quantity"],
+                    it["uom_id"],
+                    it["purchase_price"],
+                    it["sale_price"],
+                    it["item_discount"],
+                )
+                for it in p["items"]
+            ]
+
             self.repo.create_purchase(h, items)
 
             ip = p.get("initial_payment")
             if isinstance(ip, dict):
                 amt = float(ip.get("amount") or 0.0)
                 if amt < 0:
-                    self.conn.rollback()
+                    events.rollback(self.conn)
                     info(self.view, "Invalid amount", "Initial payment cannot be negative.")
                     return
                 if amt > 0:
@@ -422,7 +399,7 @@ class PurchaseController(BaseModule):
             else:
                 initial_paid = float(p.get("initial_payment") or 0.0)
                 if initial_paid < 0:
-                    self.conn.rollback()
+                    events.rollback(self.conn)
                     info(self.view, "Invalid amount", "Initial payment cannot be negative.")
                     return
                 if initial_paid > 0:
@@ -486,7 +463,7 @@ class PurchaseController(BaseModule):
                 credit_bal = self._vendor_credit_balance(int(p["vendor_id"]))
                 allowable = min(credit_bal, remaining)
                 if init_credit - allowable > _EPS:
-                    self.conn.rollback()
+                    events.rollback(self.conn)
                     info(self.view, "Credit not applied", f"Initial credit exceeds available credit or remaining due (max {allowable:.2f}).")
                     return
                 self.vadv.apply_credit_to_purchase(
@@ -525,12 +502,12 @@ class PurchaseController(BaseModule):
                     else:
                         raise
 
-            self.conn.commit()
+            events.commit(self.conn)
 
 
         except Exception as e:
             try:
-                self.conn.rollback()
+                events.rollback(self.conn)
             except Exception:
                 pass
             if OverpayPurchaseError and isinstance(e, OverpayPurchaseError):
@@ -550,7 +527,7 @@ class PurchaseController(BaseModule):
             return
 
         info(self.view, "Saved", f"Purchase {pid} created.")
-        self._reload()
+        self._after_write(pid)
         
         # Handle print or PDF export request after saving
         if should_print_after_save:
@@ -863,6 +840,7 @@ class PurchaseController(BaseModule):
                 else:
                     raise
 
+        events.commit(self.conn)
         info(self.view, "Saved", f"Purchase {pid} updated.")
         
         # Handle print or PDF export request after saving
@@ -871,7 +849,7 @@ class PurchaseController(BaseModule):
         elif should_export_pdf_after_save:
             self._export_purchase_invoice_to_pdf(pid)
         
-        self._reload()
+        self._after_write(pid)
 
     def _delete(self):
         row = self._selected_row_dict()
@@ -879,8 +857,9 @@ class PurchaseController(BaseModule):
             info(self.view, "Select", "Select a purchase to delete.")
             return
         self.repo.delete_purchase(row["purchase_id"])
+        events.commit(self.conn)
         info(self.view, "Deleted", f'Purchase {row["purchase_id"]} removed.')
-        self._reload()
+        self._after_write()
 
     def _return(self):
         row = self._selected_row_dict()
@@ -934,12 +913,14 @@ class PurchaseController(BaseModule):
             # Update the purchase header totals to reflect the return
             # This is important for purchase balance calculations
             self._recompute_header_totals_from_rows(pid)
+            events.commit(self.conn)
         except (ValueError, sqlite3.IntegrityError, sqlite3.OperationalError) as e:
+            events.rollback(self.conn)
             info(self.view, "Return not recorded", f"Could not record return:\n{e}")
             return
 
         info(self.view, "Saved", "Return recorded.")
-        self._reload()
+        self._after_write(pid)
 
     def apply_vendor_credit(self, *, amount: float, date: Optional[str] = None, notes: Optional[str] = None):
         row = self._selected_row_dict()
@@ -972,7 +953,9 @@ class PurchaseController(BaseModule):
                 notes=notes,
                 created_by=(self.user["user_id"] if self.user else None),
             )
+            events.commit(self.conn)    # delivers the purchase update to the list
         except Exception as e:
+            events.rollback(self.conn)
             if OverapplyVendorAdvanceError and isinstance(e, OverapplyVendorAdvanceError):
                 info(self.view, "Credit not applied", str(e))
                 return
@@ -983,7 +966,7 @@ class PurchaseController(BaseModule):
             return
 
         info(self.view, "Saved", f"Applied vendor credit of {amt:g} to {row['purchase_id']}.")
-        self._reload()
+        self._after_write(row["purchase_id"])
 
     def _payment(self):
         row = self._selected_row_dict()
@@ -1026,12 +1009,12 @@ class PurchaseController(BaseModule):
                     # Update the purchase header totals to reflect the new payment
                     self._recompute_header_totals_from_rows(purchase_id)
                     
-                    self.conn.commit()
+                    events.commit(self.conn)
                     info(self.view, "Saved", "Payment recorded successfully.")
-                    self._reload()
+                    self._after_write(purchase_id)
                 except Exception as e:
                     try:
-                        self.conn.rollback()
+                        events.rollback(self.conn)
                     except Exception:
                         pass
                     info(self.view, "Payment not recorded", f"Could not record payment: {str(e)}")
@@ -1054,7 +1037,7 @@ class PurchaseController(BaseModule):
                 cleared_date=when,
                 notes=notes,
             )
-            self.conn.commit()  # Commit the transaction to persist the changes
+            events.commit(self.conn)  # Commit the transaction to persist the changes
             if not changed:
                 info(self.view, "No change", "Payment was not updated.")
                 return
@@ -1063,7 +1046,7 @@ class PurchaseController(BaseModule):
             return
 
         info(self.view, "Saved", f"Payment #{payment_id} marked as cleared.")
-        self._reload()
+        self._after_write(pay.get("purchase_id"))
 
     def mark_payment_bounced(self, payment_id: int, *, notes: Optional[str] = None):
         pay = self._get_payment(payment_id)
@@ -1081,7 +1064,7 @@ class PurchaseController(BaseModule):
                 cleared_date=None,
                 notes=notes,
             )
-            self.conn.commit()  # Commit the transaction to persist the changes
+            events.commit(self.conn)  # Commit the transaction to persist the changes
             if not changed:
                 info(self.view, "No change", "Payment was not updated.")
                 return
@@ -1090,21 +1073,12 @@ class PurchaseController(BaseModule):
             return
 
         info(self.view, "Saved", f"Payment #{payment_id} marked as bounced.")
-        self._reload()
+        self._after_write(pay.get("purchase_id"))
 
     def _list_company_bank_accounts(self) -> list[dict]:
         try:
-            rows = self.conn.execute(
-                "SELECT account_id, label FROM company_bank_accounts WHERE is_active=1 ORDER BY account_id"
-            ).fetchall()
-            out = []
-            for r in rows:
-                _id = r["account_id"]
-                _name = r["label"]
-                if _id is not None and _name is not None:
-                    out.append({"id": int(_id), "name": str(_name)})
-            return out
-        except Exception:
+            return reference_data(self.conn).bank_account_choices()
+        except sqlite3.Error:
             return []
 
     def _list_vendor_bank_accounts(self, vendor_id: int) -> list[dict]:
@@ -1,38 +1,19 @@
 from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
 from ...utils.helpers import fmt_money
+from ...widgets.keyset_table_model import KeysetTableModel
 
-class PurchasesTableModel(QAbstractTableModel):
+class PurchasesTableModel(KeysetTableModel):
+    """Purchases list, loaded page by page from PurchasesRepo.page_purchases."""
     HEADERS = ["ID", "Date", "Vendor", "Total", "Paid", "Status"]  # removed Notes
-    def __init__(self, rows: list[dict]):
-        super().__init__()
-        self._rows = rows
-    def rowCount(self, parent=QModelIndex()): return len(self._rows)
-    def columnCount(self, parent=QModelIndex()): return len(self.HEADERS)
-    def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid(): return None
-        r = self._rows[index.row()]
-        if role in (Qt.DisplayRole, Qt.EditRole):
-            c = index.column()
-            mapping = [
-                r["purchase_id"], r["date"], r["vendor_name"],
-                fmt_money(r["total_amount"]), fmt_money(r["paid_amount"] + r["advance_payment_applied"]),
-                r["payment_status"]
-            ]
-            return mapping[c]
-        return None
-    def headerData(self, section, orientation, role=Qt.DisplayRole):
-        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
-            return self.HEADERS[section]
-        return super().headerData(section, orientation, role)
-    def at(self, row: int) -> dict:
-        return self._rows[row]
-    def replace(self, rows: list[dict]):
-        self.beginResetModel()
-        self._rows = rows
-        self.endResetModel()
-    def get_rows(self) -> list[dict]:
-        """Return all rows in the model."""
-        return self._rows.copy()
+    SORT_KEYS = ["purchase_id", "date", "vendor_name", "total_amount", "paid_total", "payment_status"]
+    ID_KEY = "purchase_id"
+    def display(self, r, c):
+        mapping = [
+            r["purchase_id"], r["date"], r["vendor_name"],
+            fmt_money(r["total_amount"]), fmt_money(r["paid_amount"] + r["advance_payment_applied"]),
+            r["payment_status"]
+        ]
+        return mapping[c]
 
 class PurchaseItemsModel(QAbstractTableModel):
     HEADERS = ["#", "Product", "Qty", "UoM", "Buy Price", "Sale Price", "Discount", "Line Total"]
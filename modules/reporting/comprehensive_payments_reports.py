@@ -29,6 +29,7 @@ except Exception:  # pragma: no cover
 
 # Reporting repo
 from ...database.repositories.reporting_repo import ReportingRepo
+from .report_runner import ReportRunner
 
 
 # ------------------------------ Data Models -----------------------------------
@@ -278,7 +279,12 @@ class ComprehensivePaymentReportsTab(QWidget):
         self._rows_summary: List[Dict] = []
         self._rows_unprocessed: List[Dict] = []
         self._rows_detailed: List[Dict] = []
-        
+
+        # Queries run on a reader connection off the UI thread; a date change
+        # cancels the running refresh
+        self._runner = ReportRunner(conn, parent=self)
+        self._runner.partial.connect(self._on_section)
+
         self._build_ui()
         self._wire_signals()
         self.refresh()
@@ -382,27 +388,33 @@ class ComprehensivePaymentReportsTab(QWidget):
     def refresh(self) -> None:
         date_from = self.dt_from.date().toString("yyyy-MM-dd")
         date_to = self.dt_to.date().toString("yyyy-MM-dd")
-        
-        # Load summary by status
-        self._rows_summary = self.logic.payments_summary_by_status(date_from, date_to)
-        self.model_summary.set_rows(self._rows_summary)
-        summary_total = sum(r.get("total_amount", 0.0) for r in self._rows_summary)
-        self.lbl_summary_total.setText(f"Summary Total: {fmt_money(summary_total)}")
-        
-        # Load unprocessed payments
-        self._rows_unprocessed = self.logic.unprocessed_payments(date_from, date_to)
-        self.model_unprocessed.set_rows(self._rows_unprocessed)
-        unprocessed_total = sum(r.get("amount", 0.0) for r in self._rows_unprocessed)
-        self.lbl_unprocessed_total.setText(f"Unprocessed Total: {fmt_money(unprocessed_total)}")
-        
-        # Load all payments
-        self._rows_detailed = self.logic.all_payments_detailed(date_from, date_to)
-        self.model_detailed.set_rows(self._rows_detailed)
-        
-        # Resize columns
-        self._resize_table(self.tbl_summary)
-        self._resize_table(self.tbl_unprocessed)
-        self._resize_table(self.tbl_detailed)
+
+        self._runner.submit_sections("payments", [
+            ("summary", lambda con: ComprehensivePaymentReports(con).payments_summary_by_status(date_from, date_to)),
+            ("unprocessed", lambda con: ComprehensivePaymentReports(con).unprocessed_payments(date_from, date_to)),
+            ("detailed", lambda con: ComprehensivePaymentReports(con).all_payments_detailed(date_from, date_to)),
+        ])
+
+    def _on_section(self, _key: str, name: str, rows: List[Dict]) -> None:
+        if name == "summary":
+            # Summary by status
+            self._rows_summary = rows
+            self.model_summary.set_rows(rows)
+            summary_total = sum(r.get("total_amount", 0.0) for r in rows)
+            self.lbl_summary_total.setText(f"Summary Total: {fmt_money(summary_total)}")
+            self._resize_table(self.tbl_summary)
+        elif name == "unprocessed":
+            # Unprocessed payments
+            self._rows_unprocessed = rows
+            self.model_unprocessed.set_rows(rows)
+            unprocessed_total = sum(r.get("amount", 0.0) for r in rows)
+            self.lbl_unprocessed_total.setText(f"Unprocessed Total: {fmt_money(unprocessed_total)}")
+            self._resize_table(self.tbl_unprocessed)
+        else:
+            # All payments
+            self._rows_detailed = rows
+            self.model_detailed.set_rows(rows)
+            self._resize_table(self.tbl_detailed)
     
     def _resize_table(self, table: QTableView) -> None:
         header = table.horizontalHeader()
@@ -3,12 +3,14 @@ from __future__ import annotations
 
 import logging
 import sqlite3
+import time
 from importlib import import_module
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
-from PySide6.QtCore import Slot
+from PySide6.QtCore import QEvent, QObject, Slot
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QTabWidget, QLabel
 
+from ...config import REPORT_TAB_STALE_S
 from ..base_module import BaseModule
 
 
@@ -42,6 +44,104 @@ def _safe_import_widget(
         return _placeholder_tab(f"{placeholder_msg}\n\n({module_path}.{class_name} failed to load)")
 
 
+class _PaymentsTab(QWidget):
+    """
+    Payments tab: the Summary report plus the sub-tabs of the Enhanced and
+    Comprehensive payment reports, flattened into one QTabWidget.
+
+    The source report widgets are kept alive (their models and queries drive
+    the moved sub-tab pages) so refresh() can reload all of them.
+    """
+
+    _ENHANCED_TITLES = {
+        "All Payments": "All Payment Records",
+        "By Status": "All Payments by Status",
+        "Uncleared": "Uncleared Payment Records",
+    }
+    _COMPREHENSIVE_TITLES = {
+        "By Status": "Payment Summary by Status",
+        "Unprocessed": "Unprocessed Payment Records",
+        "All Payments": "Detailed Payment Records",
+    }
+
+    def __init__(self, conn: sqlite3.Connection, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self._sources: List[QWidget] = []
+
+        layout = QVBoxLayout(self)
+        self.sub_tabs = QTabWidget()
+        layout.addWidget(self.sub_tabs)
+
+        # Each report loads itself in __init__.
+        try:
+            from inventory_management.modules.reporting.payment_reports import PaymentReportsTab
+            from inventory_management.modules.reporting.enhanced_payment_reports import EnhancedPaymentReportsTab
+            from inventory_management.modules.reporting.comprehensive_payments_reports import ComprehensivePaymentReportsTab
+
+            summary = PaymentReportsTab(conn)
+            self._sources.append(summary)
+            self.sub_tabs.addTab(summary, "Summary")
+            self._adopt_sub_tabs(EnhancedPaymentReportsTab(conn), self._ENHANCED_TITLES)
+            self._adopt_sub_tabs(ComprehensivePaymentReportsTab(conn), self._COMPREHENSIVE_TITLES)
+        except Exception:
+            # If individual sub-tab extraction fails, add the reports as whole tabs
+            self.sub_tabs.clear()
+            self._sources = []
+            for module_path, class_name, title, msg in (
+                ("inventory_management.modules.reporting.payment_reports",
+                 "PaymentReportsTab", "Summary",
+                 "Payment Reports tab not available yet."),
+                ("inventory_management.modules.reporting.enhanced_payment_reports",
+                 "EnhancedPaymentReportsTab", "Enhanced Payments",
+                 "Enhanced Payment Reports tab not available yet."),
+                ("inventory_management.modules.reporting.comprehensive_payments_reports",
+                 "ComprehensivePaymentReportsTab", "Comprehensive Payments",
+                 "Comprehensive Payment Reports tab not available yet."),
+            ):
+                widget = _safe_import_widget(module_path, class_name, conn, msg)
+                self._sources.append(widget)
+                self.sub_tabs.addTab(widget, title)
+
+    def _adopt_sub_tabs(self, report: QWidget, titles: Dict[str, str]) -> None:
+        """Move `report`'s sub-tab pages into our tab widget (unique titles)."""
+        self._sources.append(report)
+        pages = [(report.tabs.widget(i), report.tabs.tabText(i)) for i in range(report.tabs.count())]
+        for page, title in pages:
+            self.sub_tabs.addTab(page, titles.get(title, title))
+
+    def refresh(self) -> None:
+        for src in self._sources:
+            fn = getattr(src, "refresh", None)
+            if callable(fn):
+                fn()
+
+
+_PKG = "inventory_management.modules.reporting"
+
+# Tabs in display order:
+#   (key, title, module path, class name, placeholder message, loads itself in __init__)
+# Tabs whose constructor already runs the initial query are not refreshed again
+# right after being built.
+_TAB_SPECS: Tuple[Tuple[str, str, str, str, str, bool], ...] = (
+    ("vendor_aging", "Vendor Aging", f"{_PKG}.vendor_aging_reports", "VendorAgingTab",
+     "Vendor Aging tab failed to load.", True),
+    ("customer_aging", "Customer Aging", f"{_PKG}.customer_aging_reports", "CustomerAgingTab",
+     "Customer Aging tab failed to load.", False),
+    ("inventory", "Inventory", f"{_PKG}.inventory_reports", "InventoryReportsTab",
+     "Inventory Reports tab failed to load.", False),
+    ("expenses", "Expenses", f"{_PKG}.expense_reports", "ExpenseReportsTab",
+     "Expense Reports tab failed to load.", False),
+    ("financials", "Financials", f"{_PKG}.financial_reports", "FinancialReportsTab",
+     "Financial Reports tab failed to load.", True),
+    ("sales", "Sales", f"{_PKG}.sales_reports", "SalesReportsTab",
+     "Sales Reports tab not available yet.", True),
+    ("purchases", "Purchases", f"{_PKG}.purchase_reports", "PurchaseReportsTab",
+     "Purchase Reports tab not available yet.", True),
+    ("payments", "Payments", __name__, "_PaymentsTab",
+     "Payment Reports tab not available yet.", True),
+)
+
+
 class ReportingController(BaseModule):
     """
     Classic tabbed Reporting module.
@@ -54,10 +154,21 @@ class ReportingController(BaseModule):
       5) Financials (Income Statement)
       6) Sales Reports
       7) Purchase Reports
-      8) Payment Reports
+      8) Payment Reports (Summary / Enhanced / Comprehensive sub-tabs)
+
+    Tabs start as empty pages. A tab's report widget is imported, built and
+    loaded the first time the tab is shown; later visits re-query only when
+    the last load is older than `stale_after_s` (config.REPORT_TAB_STALE_S).
+    Each report's own Refresh button and filters still reload immediately.
     """
 
-    def __init__(self, conn: sqlite3.Connection, current_user: Optional[dict] = None) -> None:
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        current_user: Optional[dict] = None,
+        *,
+        stale_after_s: Optional[float] = None,
+    ) -> None:
         # Keep BaseModule MRO happy if it defines __init__
         try:
             super().__init__()
@@ -66,6 +177,7 @@ class ReportingController(BaseModule):
 
         self.conn = conn
         self.user = current_user
+        self.stale_after_s = REPORT_TAB_STALE_S if stale_after_s is None else stale_after_s
 
         self._root = QWidget()
         self._root.setObjectName("ReportingModuleRoot")
@@ -81,180 +193,63 @@ class ReportingController(BaseModule):
         self.tabs.setDocumentMode(True)
         layout.addWidget(self.tabs)
 
-        # ---- Existing, implemented tabs ----
-        vendor_widget = _safe_import_widget(
-            "inventory_management.modules.reporting.vendor_aging_reports",
-            "VendorAgingTab",
-            self.conn,
-            "Vendor Aging tab failed to load.",
-        )
-        customer_widget = _safe_import_widget(
-            "inventory_management.modules.reporting.customer_aging_reports",
-            "CustomerAgingTab",
-            self.conn,
-            "Customer Aging tab failed to load.",
-        )
-        inventory_widget = _safe_import_widget(
-            "inventory_management.modules.reporting.inventory_reports",
-            "InventoryReportsTab",
-            self.conn,
-            "Inventory Reports tab failed to load.",
-        )
-        expenses_widget = _safe_import_widget(
-            "inventory_management.modules.reporting.expense_reports",
-            "ExpenseReportsTab",
-            self.conn,
-            "Expense Reports tab failed to load.",
-        )
-        financials_widget = _safe_import_widget(
-            "inventory_management.modules.reporting.financial_reports",
-            "FinancialReportsTab",
-            self.conn,
-            "Financial Reports tab failed to load.",
-        )
-
-        # ---- Individual tabs for proper sub-tab structure ----
-        sales_widget = _safe_import_widget(
-            "inventory_management.modules.reporting.sales_reports",
-            "SalesReportsTab",
-            self.conn,
-            "Sales Reports tab not available yet.",
-        )
-        purchases_widget = _safe_import_widget(
-            "inventory_management.modules.reporting.purchase_reports",
-            "PurchaseReportsTab",
-            self.conn,
-            "Purchase Reports tab not available yet.",
-        )
-        payments_widget = _safe_import_widget(
-            "inventory_management.modules.reporting.payment_reports",
-            "PaymentReportsTab",
-            self.conn,
-            "Payment Reports tab not available yet.",
-        )
-        
-
-        
-        # Create a combined Payments tab with all individual sub-tabs
-        combined_payments_widget = QWidget()
-        combined_payments_layout = QVBoxLayout(combined_payments_widget)
-        
-        # Create a tab widget for all payment-related reports as direct sub-tabs
-        payments_sub_tabs = QTabWidget()
-        payments_sub_tabs.addTab(payments_widget, "Summary")
-        
-        # Since we cannot move widgets between parents in Qt, we'll need a different approach.
-        # The proper way is to create a custom combined payment tab that has all the functionality
-        # But for now, let's work with the existing system differently by creating new instances
-        
-        # For enhanced payments, we need to think differently about the approach
-        # Let's create a proper implementation that creates individual tabs
-        # This is complex, so we'll implement a simpler approach
-        
-        # Create individual report widgets to add as separate tabs
-        # This approach avoids the complexities of widget reparenting while still achieving the goal
-        try:
-            # Summary tab (from original payment_reports.py) - this shows cleared payments only
-            from inventory_management.modules.reporting.payment_reports import PaymentReportsTab
-            summary_widget = PaymentReportsTab(self.conn)
-            summary_widget.refresh()  # Ensure data is loaded
-            payments_sub_tabs.addTab(summary_widget, "Summary")
-            
-            # Enhanced payment report tabs (from enhanced_payment_reports.py)
-            from inventory_management.modules.reporting.enhanced_payment_reports import EnhancedPaymentReportsTab
-            enhanced_instance = EnhancedPaymentReportsTab(self.conn)
-            enhanced_instance.refresh()  # Ensure data is loaded
-            # Add each sub-tab from EnhancedPaymentReportsTab individually
-            for i in range(enhanced_instance.tabs.count()):
-                sub_widget = enhanced_instance.tabs.widget(i)
-                sub_title = enhanced_instance.tabs.tabText(i)
-                # Create unique names to avoid conflicts
-                if sub_title == "All Payments":
-                    unique_title = "All Payment Records"  
-                elif sub_title == "By Status":
-                    unique_title = "All Payments by Status"
-                elif sub_title == "Uncleared":
-                    unique_title = "Uncleared Payment Records"
-                else:
-                    unique_title = sub_title
-                payments_sub_tabs.addTab(sub_widget, unique_title)
-            
-            # Comprehensive payment report tabs (from comprehensive_payments_reports.py)
-            from inventory_management.modules.reporting.comprehensive_payments_reports import ComprehensivePaymentReportsTab
-            comp_instance = ComprehensivePaymentReportsTab(self.conn)
-            comp_instance.refresh()  # Ensure data is loaded
-            # Add each sub-tab from ComprehensivePaymentReportsTab individually
-            for i in range(comp_instance.tabs.count()):
-                sub_widget = comp_instance.tabs.widget(i)
-                sub_title = comp_instance.tabs.tabText(i)
-                # Create unique names to avoid conflicts
-                if sub_title == "By Status":
-                    unique_title = "Payment Summary by Status"
-                elif sub_title == "Unprocessed":
-                    unique_title = "Unprocessed Payment Records"
-                elif sub_title == "All Payments":
-                    unique_title = "Detailed Payment Records"
-                else:
-                    unique_title = sub_title
-                payments_sub_tabs.addTab(sub_widget, unique_title)
-                
-        except Exception as e:
-            # If individual sub-tab extraction fails, add fallback tabs
-            summary_widget = _safe_import_widget(
-                "inventory_management.modules.reporting.payment_reports",
-                "PaymentReportsTab",
-                self.conn,
-                "Payment Reports tab not available yet.",
-            )
-            enhanced_payments_widget = _safe_import_widget(
-                "inventory_management.modules.reporting.enhanced_payment_reports",
-                "EnhancedPaymentReportsTab",
-                self.conn,
-                "Enhanced Payment Reports tab not available yet.",
-            )
-            comprehensive_payments_widget = _safe_import_widget(
-                "inventory_management.modules.reporting.comprehensive_payments_reports",
-                "ComprehensivePaymentReportsTab",
-                self.conn,
-                "Comprehensive Payment Reports tab not available yet.",
-            )
-            payments_sub_tabs.addTab(summary_widget, "Summary")
-            payments_sub_tabs.addTab(enhanced_payments_widget, "Enhanced Payments")
-            payments_sub_tabs.addTab(comprehensive_payments_widget, "Comprehensive Payments")
-        
-        combined_payments_layout.addWidget(payments_sub_tabs)
-
-        # ---- Add tabs in the desired order ----
-        self.tabs.addTab(vendor_widget, "Vendor Aging")
-        self.tabs.addTab(customer_widget, "Customer Aging")
-        self.tabs.addTab(inventory_widget, "Inventory")
-        self.tabs.addTab(expenses_widget, "Expenses")
-        self.tabs.addTab(financials_widget, "Financials")
-        self.tabs.addTab(sales_widget, "Sales")
-        self.tabs.addTab(purchases_widget, "Purchases")
-        self.tabs.addTab(combined_payments_widget, "Payments")  # Payments with sub-tabs
+        # One page per tab: {spec, holder, widget, loaded_at}
+        self._pages: List[dict] = []
+        for spec in _TAB_SPECS:
+            holder = QWidget()
+            holder_layout = QVBoxLayout(holder)
+            holder_layout.setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(holder, spec[1])
+            self._pages.append({"spec": spec, "holder": holder, "widget": None, "loaded_at": None})
 
         # Map for programmatic navigation if other modules need to open a specific tab
-        self._key_to_index: Dict[str, int] = {
-            "vendor_aging": 0,
-            "customer_aging": 1,
-            "inventory": 2,
-            "expenses": 3,
-            "financials": 4,
-            "sales": 5,
-            "purchases": 6,
-            "payments": 7,  # Now refers to the combined payments tab
-        }
+        self._key_to_index: Dict[str, int] = {spec[0]: i for i, spec in enumerate(_TAB_SPECS)}
 
         self.tabs.currentChanged.connect(self._on_tab_changed)
-        self._safe_refresh(self.tabs.currentWidget())
+        # The current tab is loaded when the module is first shown, not when it is
+        # constructed (the main window may pre-build modules in the background).
+        self._root.installEventFilter(self)
 
     def get_widget(self) -> QWidget:
         return self._root
 
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:  # type: ignore[override]
+        if obj is self._root and event.type() == QEvent.Show:
+            self._activate(self.tabs.currentIndex())
+        return False
+
     @Slot(int)
     def _on_tab_changed(self, index: int) -> None:
-        self._safe_refresh(self.tabs.widget(index))
+        if self._root.isVisible():
+            self._activate(index)
+
+    def _activate(self, index: int) -> None:
+        """Build the tab's report on first use; otherwise refresh it if stale."""
+        if not 0 <= index < len(self._pages):
+            return
+        page = self._pages[index]
+        if page["widget"] is None:
+            _key, _title, module_path, class_name, msg, loads_itself = page["spec"]
+            widget = _safe_import_widget(module_path, class_name, self.conn, msg)
+            page["holder"].layout().addWidget(widget)
+            page["widget"] = widget
+            if not loads_itself:
+                self._safe_refresh(widget)
+            page["loaded_at"] = time.monotonic()
+            return
+        loaded_at = page["loaded_at"]
+        if loaded_at is not None and time.monotonic() - loaded_at < self.stale_after_s:
+            return  # recent enough; keep showing the last result
+        self._safe_refresh(page["widget"])
+        page["loaded_at"] = time.monotonic()
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Mark one tab (or all) stale so the next visit re-queries."""
+        for i, page in enumerate(self._pages):
+            if key is None or self._key_to_index.get(key) == i:
+                page["loaded_at"] = None
+        if self._root.isVisible():
+            self._activate(self.tabs.currentIndex())
 
     def _safe_refresh(self, widget: QWidget | None) -> None:
         if widget is None:
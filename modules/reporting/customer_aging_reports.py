@@ -7,7 +7,7 @@ from dataclasses import dataclass
 from datetime import date, datetime
 from typing import Iterable, List, Optional, Sequence, Tuple
 
-from PySide6.QtCore import Qt, QDate, QModelIndex, Slot, QThread, Signal
+from PySide6.QtCore import Qt, QDate, QModelIndex, Slot
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -32,7 +32,15 @@ from .model import (
     AgingSnapshotTableModel,
     OpenInvoicesTableModel,
 )
-from ...database.repositories.reporting_repo import ReportingRepo
+from ...database.repositories.reporting_repo import (
+    AGING_BUCKETS,
+    ReportingRepo,
+    aging_bucket_key,
+    aging_bucket_label,
+)
+from .report_runner import ReportRunner
+
+_STREAM_BATCH = 500  # snapshot rows appended to the model per batch
 
 # Try to reuse app-wide money formatter
 try:
@@ -78,109 +86,49 @@ class CustomerAgingReports:
         rows = self.repo.get_all_customers()
         return [_Customer(int(r["customer_id"]), str(r["name"])) for r in rows]
 
-    def compute_aging_snapshot(
+    def iter_aging_snapshot(
         self,
         as_of: str,
-        buckets: Tuple[Tuple[int, int], ...] = ((0, 30), (31, 60), (61, 90), (91, 10_000)),
+        buckets: Sequence[Tuple[int, Optional[int]]] = AGING_BUCKETS,
         include_credit_column: bool = True,
         customer_id: Optional[int] = None,
-    ) -> List[dict]:
+    ) -> Iterable[dict]:
         """
-        Returns one row per customer:
+        Yields one row per customer with an open balance, ordered by name:
           {
             "customer_id": int,
             "name": str,
             "total_due": float,
-            "b0_30": float,
-            "b31_60": float,
-            "b61_90": float,
-            "b91_plus": float,
+            "b_0_30": float, "b_31_60": float, ... (one per bucket, see aging_bucket_key),
+            "buckets": {"0-30": float, ...},
             "available_credit": float
           }
-        Only documents with positive remaining are considered.
-        
-        Performance optimization: This method addresses N+1 query pattern by fetching
-        all customer headers and credits in batch operations instead of individual queries.
-        Expected performance improvement: 10x+ with 1000+ customers.
+        Only documents with positive remaining are considered. Bucketing and
+        credit are computed by ReportingRepo.aging_snapshot_iter in one query,
+        so the cost doesn't grow with per-customer parameter lists.
         """
-        asof = _parse_iso(as_of)
-
-        # Resolve which customers to include
-        customers: List[_Customer]
-        if customer_id is not None:
-            # Fetch just the single customer (id + name)
-            self.conn.row_factory = sqlite3.Row
-            r = self.conn.execute("SELECT customer_id, name FROM customers WHERE customer_id = ?", (customer_id,)).fetchone()
-            if not r:
-                return []
-            customers = [_Customer(int(r["customer_id"]), str(r["name"]))]
-        else:
-            customers = self._list_customers()
-
-        # Performance optimization: Batch fetch all customer headers and credits to avoid N+1 queries
-        customer_ids = [cust.id for cust in customers]
-        customer_headers = self.repo.customer_headers_as_of_batch(customer_ids, as_of)
-        
-        # Organize headers by customer_id for efficient lookup
-        headers_by_customer = {}
-        for header in customer_headers:
-            cust_id = int(header["customer_id"])
-            if cust_id not in headers_by_customer:
-                headers_by_customer[cust_id] = []
-            headers_by_customer[cust_id].append(header)
-        
-        # Batch fetch all customer credits
-        customer_credits = {}
-        if include_credit_column:
-            customer_credits = self.repo.customer_credit_as_of_batch(customer_ids, as_of)
-
-        out: List[dict] = []
-        for cust in customers:
-            headers = headers_by_customer.get(cust.id, [])
-            b_totals = [0.0, 0.0, 0.0, 0.0]
-            total_due = 0.0
-
-            for h in headers:
-                doc_date = _parse_iso(str(h["date"]))
-                remaining = float(h["total_amount"] or 0.0) - float(h["paid_amount"] or 0.0) - float(
-                    h["advance_payment_applied"] or 0.0
-                )
-                # Only consider positive outstanding
-                if remaining <= 0.0:
-                    continue
-
-                age_days = (asof - doc_date).days
-                # Bucket by age
-                for i, (lo, hi) in enumerate(buckets):
-                    if lo <= age_days <= hi:
-                        b_totals[i] += remaining
-                        break
-                total_due += remaining
-
-            # Skip rows with no outstanding at all (common practice for aging)
-            if total_due <= 0.0:
-                continue
-
-            credit = 0.0
-            if include_credit_column:
-                credit = customer_credits.get(cust.id, 0.0)
+        labels = [(aging_bucket_label(lo, hi), aging_bucket_key(lo, hi)) for lo, hi in buckets]
+        for r in self.repo.aging_snapshot_iter("customer", as_of, buckets, customer_id):
+            amounts = [float(r[f"b{i}"] or 0.0) for i in range(len(labels))]
+            row = {
+                "customer_id": int(r["party_id"]),
+                "name": str(r["name"]),
+                "total_due": float(r["total_due"] or 0.0),
+            }
+            row.update({key: amount for (_label, key), amount in zip(labels, amounts)})
+            row["buckets"] = {label: amount for (label, _key), amount in zip(labels, amounts)}
+            row["available_credit"] = float(r["available_credit"] or 0.0) if include_credit_column else 0.0
+            yield row
 
-            out.append(
-                {
-                    "customer_id": cust.id,
-                    "name": cust.name,
-                    "total_due": total_due,
-                    "b0_30": b_totals[0],
-                    "b31_60": b_totals[1],
-                    "b61_90": b_totals[2],
-                    "b91_plus": b_totals[3],
-                    "available_credit": credit,
-                }
-            )
-
-        # Sort by Name ascending for stable presentation
-        out.sort(key=lambda r: r["name"].lower() if r.get("name") else "")
-        return out
+    def compute_aging_snapshot(
+        self,
+        as_of: str,
+        buckets: Sequence[Tuple[int, Optional[int]]] = AGING_BUCKETS,
+        include_credit_column: bool = True,
+        customer_id: Optional[int] = None,
+    ) -> List[dict]:
+        """List form of iter_aging_snapshot."""
+        return list(self.iter_aging_snapshot(as_of, buckets, include_credit_column, customer_id))
 
     def list_open_invoices(self, customer_id: int, as_of: str) -> List[dict]:
         """
@@ -223,38 +171,6 @@ class CustomerAgingReports:
         return rows
 
 
-# ------------------------------ Background Worker for UI thread -----------------
-
-class CustomerAgingWorker(QThread):
-    """
-    Background worker thread for computing customer aging reports
-    to prevent UI freezing during large dataset processing.
-    """
-    finished = Signal(object)  # Signal to send results back to main thread
-    error = Signal(str)        # Signal to send error messages back to main thread
-    
-    def __init__(self, logic: CustomerAgingReports, as_of: str, buckets: Tuple[Tuple[int, int], ...], 
-                 include_credit_column: bool, customer_id: Optional[int]):
-        super().__init__()
-        self.logic = logic
-        self.as_of = as_of
-        self.buckets = buckets
-        self.include_credit_column = include_credit_column
-        self.customer_id = customer_id
-
-    def run(self):
-        try:
-            results = self.logic.compute_aging_snapshot(
-                self.as_of,
-                self.buckets,
-                self.include_credit_column,
-                self.customer_id
-            )
-            self.finished.emit(results)
-        except Exception as e:
-            self.error.emit(str(e))
-
-
 # ------------------------------ UI Tab --------------------------------------
 
 
@@ -376,8 +292,11 @@ class CustomerAgingTab(QWidget):
         self._rows_snapshot: List[dict] = []  # keep raw rows for selection drill-down
         self._rows_invoices: List[dict] = []
 
-        # Background worker for report generation
-        self._worker: Optional[CustomerAgingWorker] = None
+        # Snapshot streams in from a reader connection off the UI thread
+        self._runner = ReportRunner(conn, parent=self)
+        self._runner.partial.connect(lambda _key, _name, batch: self._on_snapshot_rows(batch))
+        self._runner.finished.connect(lambda _key, _count: self._on_snapshot_computed())
+        self._runner.error.connect(lambda _key, msg: self._on_worker_error(msg))
 
         self._build_ui()
         self._wire_signals()
@@ -387,34 +306,28 @@ class CustomerAgingTab(QWidget):
 
     @Slot()
     def refresh(self) -> None:
-        # Cancel any existing worker
-        if self._worker and self._worker.isRunning():
-            self._worker.quit()
-            self._worker.wait()
-
         as_of = self.dt_asof.date().toString("yyyy-MM-dd")
         cust_id = self.cmb_customer.currentData()
-        
-        # Create and start background worker for the snapshot computation
-        self._worker = CustomerAgingWorker(
-            self.logic,
-            as_of,
-            ((0, 30), (31, 60), (61, 90), (91, 10_000)),
-            True,
-            cust_id if isinstance(cust_id, int) else None
+        cust_id = cust_id if isinstance(cust_id, int) else None
+        buckets = AGING_BUCKETS
+
+        # Rows are appended in batches as the query yields them; a newer submit
+        # cancels a running one and only its rows land
+        self._rows_snapshot = []
+        self.model_snapshot.set_rows([])
+        self._runner.submit_job(
+            "snapshot",
+            lambda con, job: job.stream(
+                "rows", CustomerAgingReports(con).iter_aging_snapshot(as_of, buckets, True, cust_id), _STREAM_BATCH
+            ),
         )
-        
-        # Connect signals
-        self._worker.finished.connect(self._on_snapshot_computed)
-        self._worker.error.connect(self._on_worker_error)
-        
-        # Start the background computation
-        self._worker.start()
-
-    def _on_snapshot_computed(self, results: List[dict]) -> None:
-        """Called when background worker finishes computing the snapshot."""
-        self._rows_snapshot = results
-        self.model_snapshot.set_rows(self._rows_snapshot)
+
+    def _on_snapshot_rows(self, batch: List[dict]) -> None:
+        self._rows_snapshot.extend(batch)
+        self.model_snapshot.append_rows(batch)
+
+    def _on_snapshot_computed(self) -> None:
+        """Called when the background report job has streamed the whole snapshot."""
         self._autosize(self.tbl_snapshot)
 
         # If a single customer is selected in the combo, pre-fill invoices
@@ -435,11 +348,7 @@ class CustomerAgingTab(QWidget):
             self._load_invoices_for_row(0)
     
     def _on_worker_error(self, error_msg: str) -> None:
-        """Handle errors from the background worker."""
-        # Cleanup the worker
-        if self._worker:
-            self._worker = None
-        # Show error message
+        """Handle errors from the background report job."""
         QMessageBox.warning(self, "Error", f"Error computing report: {error_msg}")
 
     def _autosize(self, tv: QTableView) -> None:
@@ -535,14 +444,3 @@ class CustomerAgingTab(QWidget):
         self._rows_invoices = self.logic.list_open_invoices(int(cust_id), as_of)
         self.model_invoices.set_rows(self._rows_invoices)
         self._autosize(self.tbl_invoices)
-
-    # Public hook the controller calls on tab change
-    @Slot()
-    def refresh(self) -> None:
-        self.refresh.__wrapped__(self) if hasattr(self.refresh, "__wrapped__") else self._refresh_impl()
-
-    # Keep actual logic separate (helps if decorators are added later)
-    def _refresh_impl(self) -> None:
-        # Idempotent implementation
-        pass
-
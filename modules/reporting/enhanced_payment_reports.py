@@ -36,6 +36,7 @@ except Exception:  # pragma: no cover
             return "0.00"
 
 from ...database.repositories.reporting_repo import ReportingRepo
+from .report_runner import ReportRunner
 
 
 # ------------------------------ Small model: Date | Amount | Status -------------------
@@ -120,6 +121,11 @@ class EnhancedPaymentReportsTab(QWidget):
         self._rows_by_status: List[dict] = []
         self._rows_uncleared: List[dict] = []
 
+        # Queries run on a reader connection off the UI thread; a date change
+        # cancels the running refresh
+        self._runner = ReportRunner(conn, parent=self)
+        self._runner.finished.connect(lambda _key, rows: self._show_payments(rows))
+
         self._build_ui()
         self._wire_signals()
         self.refresh()  # initial load
@@ -234,11 +240,20 @@ class EnhancedPaymentReportsTab(QWidget):
         date_from = self.dt_from.date().toString("yyyy-MM-dd")
         date_to = self.dt_to.date().toString("yyyy-MM-dd")
 
-        # Get all payments (collections and disbursements)
+        # Titles follow the requested period
+        self.lbl_all_title.setText(f"<b>All Payments</b> — {date_from} to {date_to}")
+        self.lbl_status_title.setText(f"<b>Payments by Status</b> — {date_from} to {date_to}")
+        self.lbl_uncleared_title.setText(f"<b>Uncleared Payments</b> — {date_from} to {date_to}")
+
+        self._runner.submit("payments", lambda con: self._load_payments(con, date_from, date_to))
+
+    @staticmethod
+    def _load_payments(con: sqlite3.Connection, date_from: str, date_to: str) -> List[dict]:
+        """Run on the worker thread: collections and disbursements in one list."""
         all_rows = []
-        
+
         # Collections (sale payments)
-        for r in self.repo.conn.execute("""
+        for r in con.execute("""
             SELECT sp.date, sp.cleared_date, sp.amount, sp.clearing_state as state
             FROM sale_payments sp
             WHERE sp.date >= ? AND sp.date <= ?
@@ -252,7 +267,7 @@ class EnhancedPaymentReportsTab(QWidget):
             })
 
         # Disbursements (purchase payments)
-        for r in self.repo.conn.execute("""
+        for r in con.execute("""
             SELECT pp.date, pp.cleared_date, pp.amount, pp.clearing_state as state
             FROM purchase_payments pp
             WHERE pp.date >= ? AND pp.date <= ?
@@ -264,7 +279,9 @@ class EnhancedPaymentReportsTab(QWidget):
                 "status": str(r["state"]),
                 "type": "Disbursement"
             })
+        return all_rows
 
+    def _show_payments(self, all_rows: List[dict]) -> None:
         # All payments table
         self._rows_all_payments = all_rows
         self.model_all.set_rows(all_rows)
@@ -277,20 +294,13 @@ class EnhancedPaymentReportsTab(QWidget):
         # Update UI
         self.lbl_all_total.setText(f"Total: {fmt_money(all_total)}")
         self.lbl_uncleared_total.setText(f"Uncleared: {fmt_money(uncleared_total)}")
-        
-        # All payments title
-        self.lbl_all_title.setText(f"<b>All Payments</b> — {date_from} to {date_to}")
-        
+
         # By status table (same as all, but we could group differently)
         self.model_status.set_rows(all_rows)
         
         # Uncleared table
         self._rows_uncleared = uncleared_rows
         self.model_uncleared.set_rows(uncleared_rows)
-        
-        # Update titles
-        self.lbl_status_title.setText(f"<b>Payments by Status</b> — {date_from} to {date_to}")
-        self.lbl_uncleared_title.setText(f"<b>Uncleared Payments</b> — {date_from} to {date_to}")
 
         # Auto-size tables
         self._autosize(self.tbl_all)
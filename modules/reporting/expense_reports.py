@@ -40,6 +40,7 @@ except Exception:  # pragma: no cover
 
 # Reporting repo consolidates the SQL
 from ...database.repositories.reporting_repo import ReportingRepo
+from .report_runner import ReportRunner
 
 
 # ------------------------------ Logic ---------------------------------------
@@ -125,6 +126,11 @@ class ExpenseReportsTab(QWidget):
         self._rows_summary: List[dict] = []
         self._rows_lines: List[dict] = []
 
+        # Queries run on a reader connection off the UI thread; a filter change
+        # cancels the running refresh
+        self._runner = ReportRunner(conn, parent=self)
+        self._runner.partial.connect(self._on_section)
+
         self._build_ui()
         self._wire_signals()
         self._reload_categories()
@@ -240,19 +246,26 @@ class ExpenseReportsTab(QWidget):
         category_id = self.cmb_category.currentData()
         cat_id = int(category_id) if isinstance(category_id, int) else None
 
-        # Top: summary
-        self._rows_summary = self.logic.summary_by_category(date_from, date_to, cat_id)
-        self.model_summary.set_rows(self._rows_summary)
-        self._autosize(self.tbl_summary)
-
-        # Bottom: lines
-        self._rows_lines = self.logic.list_expenses(date_from, date_to, cat_id)
-        self.model_lines.set_rows(self._rows_lines)
-        self._autosize(self.tbl_lines)
-
-        # Footer total (sum of summary)
-        grand_total = sum(float(r.get("total_amount") or 0.0) for r in self._rows_summary)
-        self.lbl_total.setText(f"Total: {fmt_money(grand_total)}")
+        self._runner.submit_sections("expenses", [
+            ("summary", lambda con: ExpenseReports(con).summary_by_category(date_from, date_to, cat_id)),
+            ("lines", lambda con: ExpenseReports(con).list_expenses(date_from, date_to, cat_id)),
+        ])
+
+    def _on_section(self, _key: str, name: str, rows: List[dict]) -> None:
+        if name == "summary":
+            # Top: summary
+            self._rows_summary = rows
+            self.model_summary.set_rows(rows)
+            self._autosize(self.tbl_summary)
+
+            # Footer total (sum of summary)
+            grand_total = sum(float(r.get("total_amount") or 0.0) for r in rows)
+            self.lbl_total.setText(f"Total: {fmt_money(grand_total)}")
+        else:
+            # Bottom: lines
+            self._rows_lines = rows
+            self.model_lines.set_rows(rows)
+            self._autosize(self.tbl_lines)
 
     def _autosize(self, tv: QTableView) -> None:
         tv.resizeColumnsToContents()
@@ -339,12 +352,3 @@ class ExpenseReportsTab(QWidget):
     @Slot()
     def refresh_tab(self) -> None:
         self.refresh()
-
-    # The controller expects a generic `refresh()` (for consistency with other tabs).
-    @Slot()
-    def refresh(self) -> None:
-        self.refresh.__wrapped__(self) if hasattr(self.refresh, "__wrapped__") else self._refresh_impl()
-
-    def _refresh_impl(self) -> None:
-        # Idempotent implementation
-        pass
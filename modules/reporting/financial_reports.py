@@ -37,6 +37,7 @@ except Exception:  # pragma: no cover
 
 from .model import FinancialStatementTableModel
 from ...database.repositories.reporting_repo import ReportingRepo
+from .report_runner import ReportRunner
 
 
 # ------------------------------ Logic ---------------------------------------
@@ -79,42 +80,11 @@ class FinancialReports:
 
     def ar_ap_snapshot_as_of(self, as_of: str) -> dict:
         """
-        AR/AP snapshot as of a given date.
-        
-        Performance optimization: This method addresses N+1 query pattern by fetching
-        all customer and vendor headers in batch operations instead of individual queries.
-        Expected performance improvement: 10x+ with 1000+ customers/vendors.
+        AR/AP snapshot as of a given date: Σ positive remaining due of customer
+        sales and of vendor purchases, each summed in SQL.
         """
-        # AR = customers; AP = vendors. Use correct PKs from schema.
-        ar_total = 0.0
-        ap_total = 0.0
-
-        # Performance optimization: Get all customer IDs and fetch headers in a single batch
-        customer_rows = self.repo.get_all_customers()
-        customer_ids = [int(row["customer_id"]) for row in customer_rows]
-        customer_headers = self.repo.customer_headers_as_of_batch(customer_ids, as_of)
-        
-        # Calculate AR total from batch data
-        for h in customer_headers:
-            remaining = float(h["total_amount"] or 0.0) - float(h["paid_amount"] or 0.0) - float(
-                h["advance_payment_applied"] or 0.0
-            )
-            if remaining > 0:
-                ar_total += remaining
-
-        # Performance optimization: Get all vendor IDs and fetch headers in a single batch  
-        vendor_rows = self.repo.get_all_vendors()
-        vendor_ids = [int(row["vendor_id"]) for row in vendor_rows]
-        vendor_headers = self.repo.vendor_headers_as_of_batch(vendor_ids, as_of)
-        
-        # Calculate AP total from batch data
-        for h in vendor_headers:
-            remaining = float(h["total_amount"] or 0.0) - float(h["paid_amount"] or 0.0) - float(
-                h["advance_payment_applied"] or 0.0
-            )
-            if remaining > 0:
-                ap_total += remaining
-
+        ar_total = self.repo.open_due_total_as_of("customer", as_of)
+        ap_total = self.repo.open_due_total_as_of("vendor", as_of)
         return {"AR_total_due": ar_total, "AP_total_due": ap_total}
 
     # ---- Income Statement ----
@@ -262,6 +232,11 @@ class FinancialReportsTab(QWidget):
         self._rows_collect: List[dict] = []
         self._rows_disb: List[dict] = []
 
+        # Each section queries a reader connection off the UI thread; changing a
+        # section's dates cancels its running query
+        self._runner = ReportRunner(conn, parent=self)
+        self._runner.finished.connect(self._on_report)
+
         self._build_ui()
         self._wire_signals()
         self.refresh()  # initial load
@@ -439,7 +414,9 @@ class FinancialReportsTab(QWidget):
     @Slot()
     def refresh_ar_ap(self) -> None:
         as_of = self.dt_asof.date().toString("yyyy-MM-dd")
-        snap = self.logic.ar_ap_snapshot_as_of(as_of)
+        self._runner.submit("ar_ap", lambda con: FinancialReports(con).ar_ap_snapshot_as_of(as_of))
+
+    def _show_ar_ap(self, snap: dict) -> None:
         rows = [
             {"line_item": "Accounts Receivable (AR)", "amount": snap["AR_total_due"], "is_total": True},
             {"line_item": "Accounts Payable (AP)", "amount": snap["AP_total_due"], "is_total": True},
@@ -452,8 +429,9 @@ class FinancialReportsTab(QWidget):
     def refresh_stmt(self) -> None:
         date_from = self.dt_stmt_from.date().toString("yyyy-MM-dd")
         date_to = self.dt_stmt_to.date().toString("yyyy-MM-dd")
-        stmt = self.logic.income_statement(date_from, date_to)
+        self._runner.submit("stmt", lambda con: FinancialReports(con).income_statement(date_from, date_to))
 
+    def _show_stmt(self, stmt: Dict) -> None:
         rows: List[dict] = []
         # Main lines
         rows.append({"line_item": "Revenue", "amount": stmt["Revenue"]})
@@ -477,9 +455,11 @@ class FinancialReportsTab(QWidget):
     def refresh_cash(self) -> None:
         date_from = self.dt_cash_from.date().toString("yyyy-MM-dd")
         date_to = self.dt_cash_to.date().toString("yyyy-MM-dd")
+        self._runner.submit(
+            "cash", lambda con: FinancialReports(con).cash_collections_disbursements(date_from, date_to)
+        )
 
-        data = self.logic.cash_collections_disbursements(date_from, date_to)
-
+    def _show_cash(self, data: Dict) -> None:
         self._rows_collect = data["collections"]
         self._rows_disb = data["disbursements"]
 
@@ -494,6 +474,10 @@ class FinancialReportsTab(QWidget):
         self._autosize(self.tbl_collect)
         self._autosize(self.tbl_disb)
 
+    def _on_report(self, key: str, result: Dict) -> None:
+        """Show a finished section (UI thread)."""
+        {"ar_ap": self._show_ar_ap, "stmt": self._show_stmt, "cash": self._show_cash}[key](result)
+
     # ---- Printing / PDF ----
 
     def _on_print_ar_ap(self) -> None:
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import sqlite3
-import threading
 from typing import List, Optional
 
 from PySide6.QtCore import Qt, QDate, QModelIndex, Slot, QAbstractTableModel
@@ -42,7 +41,9 @@ from .model import (
     InventoryStockOnHandTableModel,
     InventoryTransactionsTableModel,
 )
+from ...database.refdata import reference_data
 from ...database.repositories.reporting_repo import ReportingRepo
+from .report_runner import ReportRunner
 
 
 # ------------------------------ Logic ---------------------------------------
@@ -53,11 +54,6 @@ class InventoryReports:
     Thin logic layer built on ReportingRepo for inventory reporting.
     """
 
-    # Module-level cache for static reference data with thread-safe access
-    _product_cache: dict[int, str] = {}
-    _cache_lock = threading.Lock()
-    _cache_initialized = False
-
     def __init__(self, conn: sqlite3.Connection) -> None:
         self.conn = conn
         self.repo = ReportingRepo(conn)
@@ -196,38 +192,18 @@ class InventoryReports:
     # Helpers
     def list_products(self) -> List[tuple[int, str]]:
         """
-        Read products for pickers.
-        Expected table: products(product_id, name)
+        Products for pickers as (product_id, name), by name.
+        Served from the shared reference cache (database.refdata).
         """
-        rows = list(self.conn.execute(
-            "SELECT product_id, name FROM products ORDER BY name COLLATE NOCASE"
-        ))
-        return [(int(r["product_id"]), str(r["name"])) for r in rows]
-
-    @classmethod
-    def _ensure_product_cache(cls, conn: sqlite3.Connection) -> None:
-        """
-        Ensure the product cache is initialized in a thread-safe manner.
-        This prevents repeated database queries for product names in large datasets.
-        """
-        with cls._cache_lock:
-            if not cls._cache_initialized:
-                # Fetch all products in a single query for the cache
-                rows = list(conn.execute(
-                    "SELECT product_id, name FROM products ORDER BY name COLLATE NOCASE"
-                ))
-                cls._product_cache = {int(r["product_id"]): str(r["name"]) for r in rows}
-                cls._cache_initialized = True
+        products = reference_data(self.conn).products()
+        return [(p.product_id, p.name) for p in sorted(products, key=lambda p: p.name.lower())]
 
     def _product_name_map(self) -> dict[int, str]:
         """
         Return a mapping of product_id to product name for efficient lookups.
-        This prevents repeated database queries for product names in large datasets.
+        Built from the shared reference cache, which reloads after product writes.
         """
-        # Initialize cache if needed (thread-safe)
-        self._ensure_product_cache(self.conn)
-        # Return a copy of the cached data to avoid external modifications
-        return self._product_cache.copy()
+        return reference_data(self.conn).product_names()
 
 
 # ------------------------------ Local model (Valuation History) -------------
@@ -312,6 +288,11 @@ class InventoryReportsTab(QWidget):
         self._rows_txns: List[dict] = []
         self._rows_valhist: List[dict] = []
 
+        # Each sub-tab's query runs on a reader connection off the UI thread;
+        # changing a sub-tab's filters cancels its running query
+        self._runner = ReportRunner(conn, parent=self)
+        self._runner.finished.connect(self._on_report)
+
         self._build_ui()
         self._wire_signals()
         self._load_products()
@@ -516,13 +497,10 @@ class InventoryReportsTab(QWidget):
     @Slot()
     def refresh_stock(self) -> None:
         if self.rad_stock_current.isChecked():
-            self._rows_stock = self.logic.stock_on_hand_current()
+            self._runner.submit("stock", lambda con: InventoryReports(con).stock_on_hand_current())
         else:
             as_of = self.dt_stock_asof.date().toString("yyyy-MM-dd")
-            self._rows_stock = self.logic.stock_on_hand_as_of(as_of)
-
-        self.model_stock.set_rows(self._rows_stock)
-        self._autosize(self.tbl_stock)
+            self._runner.submit("stock", lambda con: InventoryReports(con).stock_on_hand_as_of(as_of))
 
     def _on_print_stock(self) -> None:
         fn, _ = QFileDialog.getSaveFileName(self, "Export Stock to PDF", "stock_on_hand.pdf", "PDF Files (*.pdf)")
@@ -550,9 +528,9 @@ class InventoryReportsTab(QWidget):
         pid = self.cmb_txn_product.currentData()
         product_id = int(pid) if isinstance(pid, int) else None
 
-        self._rows_txns = self.logic.transactions(date_from, date_to, product_id)
-        self.model_txn.set_rows(self._rows_txns)
-        self._autosize(self.tbl_txn)
+        self._runner.submit(
+            "txn", lambda con: InventoryReports(con).transactions(date_from, date_to, product_id)
+        )
 
     def _on_print_txn(self) -> None:
         fn, _ = QFileDialog.getSaveFileName(self, "Export Transactions to PDF", "inventory_transactions.pdf", "PDF Files (*.pdf)")
@@ -578,14 +556,12 @@ class InventoryReportsTab(QWidget):
     def refresh_val(self) -> None:
         pid = self.cmb_val_product.currentData()
         if not isinstance(pid, int):
-            self.model_val.set_rows([])
-            self._autosize(self.tbl_val)
+            self._runner.cancel("val")
+            self._on_report("val", [])
             return
 
         lim = int(self.cmb_val_limit.currentText() or "100")
-        self._rows_valhist = self.logic.valuation_history(pid, lim)
-        self.model_val.set_rows(self._rows_valhist)
-        self._autosize(self.tbl_val)
+        self._runner.submit("val", lambda con: InventoryReports(con).valuation_history(pid, lim))
 
     def _on_print_val(self) -> None:
         fn, _ = QFileDialog.getSaveFileName(self, "Export Valuation History to PDF", "valuation_history.pdf", "PDF Files (*.pdf)")
@@ -605,6 +581,21 @@ class InventoryReportsTab(QWidget):
 
     # ---- Shared helpers ----
 
+    def _on_report(self, key: str, rows: List[dict]) -> None:
+        """Show a finished sub-tab query (UI thread)."""
+        if key == "stock":
+            self._rows_stock = rows
+            self.model_stock.set_rows(rows)
+            self._autosize(self.tbl_stock)
+        elif key == "txn":
+            self._rows_txns = rows
+            self.model_txn.set_rows(rows)
+            self._autosize(self.tbl_txn)
+        elif key == "val":
+            self._rows_valhist = rows
+            self.model_val.set_rows(rows)
+            self._autosize(self.tbl_val)
+
     def _autosize(self, tv: QTableView) -> None:
         tv.resizeColumnsToContents()
         tv.horizontalHeader().setStretchLastSection(True)
@@ -31,6 +31,15 @@ class AgingSnapshotTableModel(QAbstractTableModel):
         self._rows = rows or []
         self.endResetModel()
 
+    def append_rows(self, rows: List[dict]) -> None:
+        """Append a batch (rows streamed from the aging query)."""
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
     def rowCount(self, parent=QModelIndex()) -> int:  # type: ignore[override]
         return 0 if parent.isValid() else len(self._rows)
 
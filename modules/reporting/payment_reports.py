@@ -35,6 +35,7 @@ except Exception:  # pragma: no cover
             return "0.00"
 
 from ...database.repositories.reporting_repo import ReportingRepo
+from .report_runner import ReportRunner
 
 
 # ------------------------------ Small model: Date | Amount -------------------
@@ -104,6 +105,11 @@ class PaymentReportsTab(QWidget):
         self._rows_collect: List[dict] = []
         self._rows_disb: List[dict] = []
 
+        # Queries run on a reader connection off the UI thread; a date change
+        # cancels the running refresh
+        self._runner = ReportRunner(conn, parent=self)
+        self._runner.partial.connect(self._on_section)
+
         self._build_ui()
         self._wire_signals()
         self.refresh()  # initial load
@@ -229,34 +235,30 @@ class PaymentReportsTab(QWidget):
         date_from = self.dt_from.date().toString("yyyy-MM-dd")
         date_to = self.dt_to.date().toString("yyyy-MM-dd")
 
-        # Collections
-        rows_c = []
-        total_c = 0.0
-        for r in self.repo.sale_collections_by_day(date_from, date_to):
-            amt = float(r["amount"] or 0.0)
-            rows_c.append({"date": str(r["date"]), "amount": amt})
-            total_c += amt
-        self._rows_collect = rows_c
-        self.model_collect.set_rows(rows_c)
-
-        # Disbursements
-        rows_d = []
-        total_d = 0.0
-        for r in self.repo.purchase_disbursements_by_day(date_from, date_to):
-            amt = float(r["amount"] or 0.0)
-            rows_d.append({"date": str(r["date"]), "amount": amt})
-            total_d += amt
-        self._rows_disb = rows_d
-        self.model_disb.set_rows(rows_d)
-
-        # Totals + titles
-        self.lbl_collect_total.setText(f"Collections: {fmt_money(total_c)}")
-        self.lbl_disb_total.setText(f"Disbursements: {fmt_money(total_d)}")
         self.lbl_collect_title.setText(f"<b>Collections (cleared)</b> — {date_from} to {date_to}")
         self.lbl_disb_title.setText(f"<b>Disbursements (cleared)</b> — {date_from} to {date_to}")
 
-        self._autosize(self.tbl_collect)
-        self._autosize(self.tbl_disb)
+        def by_day(con: sqlite3.Connection, method: str) -> List[dict]:
+            rows = getattr(ReportingRepo(con), method)(date_from, date_to)
+            return [{"date": str(r["date"]), "amount": float(r["amount"] or 0.0)} for r in rows]
+
+        self._runner.submit_sections("payments", [
+            ("collections", lambda con: by_day(con, "sale_collections_by_day")),
+            ("disbursements", lambda con: by_day(con, "purchase_disbursements_by_day")),
+        ])
+
+    def _on_section(self, _key: str, name: str, rows: List[dict]) -> None:
+        total = sum(r["amount"] for r in rows)
+        if name == "collections":
+            self._rows_collect = rows
+            self.model_collect.set_rows(rows)
+            self.lbl_collect_total.setText(f"Collections: {fmt_money(total)}")
+            self._autosize(self.tbl_collect)
+        else:
+            self._rows_disb = rows
+            self.model_disb.set_rows(rows)
+            self.lbl_disb_total.setText(f"Disbursements: {fmt_money(total)}")
+            self._autosize(self.tbl_disb)
 
     # ---- Export helpers ----
     def _on_export_pdf(self) -> None:
@@ -27,6 +27,8 @@ except Exception:  # pragma: no cover
         except Exception:
             return "0.00"
 
+from .report_runner import ReportRunner
+
 
 # ------------------------------ Simple model ------------------------------
 class _SimpleTableModel(QAbstractTableModel):
@@ -107,6 +109,9 @@ class PurchaseReportsTab(QWidget):
         self.conn = conn
         self.conn.row_factory = sqlite3.Row
 
+        self._runner = ReportRunner(conn, parent=self)
+        self._runner.partial.connect(lambda _key, name, rows: self._set_rows(name, rows))
+
         self._build_ui()
         self._wire()
         self._load_categories()
@@ -337,253 +342,269 @@ class PurchaseReportsTab(QWidget):
         product_id = self._product_id()
         category = self._category_value()
 
-        # Small helper to execute & load into a table
-        def set_rows(key: str, rows: List[Dict[str, Any]]) -> None:
-            tv = self._tables[key]
-            model: _SimpleTableModel = tv.model()  # type: ignore
-            model.set_rows(rows)
-            tv.resizeColumnsToContents()
-            tv.horizontalHeader().setStretchLastSection(True)
+        # Sections 1-7 and 11 read fact_purchases_daily (schema.py): product_id 0
+        # rows hold order totals / counts, returns and cleared payments; product
+        # rows hold line spend and quantity. With a product or category filter the
+        # order-level sections sum the matching product rows instead.
+        def fact_where(order_level: bool, filtered: bool = True) -> tuple[str, List[Any]]:
+            params: List[Any] = [df, dt]
+            where = "f.day >= ? AND f.day <= ?"
+            if filtered and vendor_id:
+                where += " AND f.vendor_id = ?"
+                params.append(vendor_id)
+            if order_level and not (filtered and (product_id or category)):
+                return where + " AND f.product_id = 0", params
+            where += " AND f.product_id > 0"
+            if filtered and product_id:
+                where += " AND f.product_id = ?"
+                params.append(product_id)
+            if filtered and category:
+                where += " AND f.category = ?"
+                params.append(category)
+            return where, params
 
         # ---- 1) Purchases by Period ----
-        fmt = {"daily": "%Y-%m-%d", "monthly": "%Y-%m", "yearly": "%Y"}[gran]
-        sql = f"""
-            SELECT strftime('{fmt}', p.date) AS period,
-                   COUNT(*) AS order_count,
-                   SUM(CAST(p.total_amount AS REAL)) AS spend
-            FROM purchases p
-            LEFT JOIN vendors v ON v.vendor_id = p.vendor_id
-            WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
-              {"AND p.vendor_id = ?" if vendor_id else ""}
-              {"AND EXISTS (SELECT 1 FROM purchase_items pi WHERE pi.purchase_id = p.purchase_id AND pi.product_id = ?)" if product_id else ""}
-              {"AND EXISTS (SELECT 1 FROM purchase_items pi JOIN products pr ON pr.product_id = pi.product_id WHERE pi.purchase_id = p.purchase_id AND pr.category = ?)" if category else ""}
-            GROUP BY strftime('{fmt}', p.date)
-            ORDER BY period
-        """
-        params: List[Any] = [df, dt]
-        if vendor_id: params.append(vendor_id)
-        if product_id: params.append(product_id)
-        if category: params.append(category)
-        rows = []
-        for r in self.conn.execute(sql, params):
-            rows.append({"period": r["period"], "order_count": int(r["order_count"] or 0), "spend": float(r["spend"] or 0.0)})
-        set_rows("purch_by_period", rows)
+        def by_period(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            fmt = {"daily": "%Y-%m-%d", "monthly": "%Y-%m", "yearly": "%Y"}[gran]
+            where, params = fact_where(order_level=True)
+            sql = f"""
+                SELECT strftime('{fmt}', f.day) AS period,
+                       SUM(f.orders) AS order_count,
+                       SUM(f.spend) AS spend
+                FROM fact_purchases_daily f
+                WHERE {where}
+                GROUP BY strftime('{fmt}', f.day)
+                HAVING SUM(f.orders) > 0
+                ORDER BY period
+            """
+            rows = []
+            for r in con.execute(sql, params):
+                rows.append({"period": r["period"], "order_count": int(r["order_count"] or 0), "spend": float(r["spend"] or 0.0)})
+            return rows
 
         # ---- 2) Purchases by Vendor ----
-        sql = """
-            SELECT v.name AS vendor_name,
-                   COUNT(*) AS order_count,
-                   SUM(CAST(p.total_amount AS REAL)) AS spend
-            FROM purchases p
-            JOIN vendors v ON v.vendor_id = p.vendor_id
-            WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
-              {vend}
-              {prod}
-              {cat}
-            GROUP BY v.vendor_id, v.name
-            ORDER BY spend DESC, vendor_name
-        """.format(
-            vend="AND p.vendor_id = ?" if vendor_id else "",
-            prod="AND EXISTS (SELECT 1 FROM purchase_items pi WHERE pi.purchase_id = p.purchase_id AND pi.product_id = ?)" if product_id else "",
-            cat ="AND EXISTS (SELECT 1 FROM purchase_items pi JOIN products pr ON pr.product_id = pi.product_id WHERE pi.purchase_id = p.purchase_id AND pr.category = ?)" if category else "",
-        )
-        params = [df, dt]
-        if vendor_id: params.append(vendor_id)
-        if product_id: params.append(product_id)
-        if category: params.append(category)
-        rows = [{"vendor_name": r["vendor_name"],
-                 "order_count": int(r["order_count"] or 0),
-                 "spend": float(r["spend"] or 0.0)} for r in self.conn.execute(sql, params)]
-        set_rows("purch_by_vendor", rows)
+        def by_vendor(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            where, params = fact_where(order_level=True)
+            sql = f"""
+                SELECT v.name AS vendor_name, t.order_count, t.spend
+                FROM (
+                    SELECT f.vendor_id, SUM(f.orders) AS order_count, SUM(f.spend) AS spend
+                    FROM fact_purchases_daily f
+                    WHERE {where}
+                    GROUP BY f.vendor_id
+                    HAVING SUM(f.orders) > 0
+                ) t
+                JOIN vendors v ON v.vendor_id = t.vendor_id
+                ORDER BY t.spend DESC, vendor_name
+            """
+            rows = [{"vendor_name": r["vendor_name"],
+                     "order_count": int(r["order_count"] or 0),
+                     "spend": float(r["spend"] or 0.0)} for r in con.execute(sql, params)]
+            return rows
 
         # ---- 3) Purchases by Product ----
-        sql = """
-            SELECT pr.name AS product_name,
-                   SUM(CAST(pi.quantity AS REAL)) AS qty_base,
-                   SUM(CAST(pi.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - CAST(pi.item_discount AS REAL))) AS spend
-            FROM purchases p
-            JOIN purchase_items pi ON pi.purchase_id = p.purchase_id
-            JOIN products pr       ON pr.product_id   = pi.product_id
-            WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
-              {vend}
-              {prod}
-              {cat}
-            GROUP BY pr.product_id, pr.name
-            ORDER BY spend DESC, product_name
-        """.format(
-            vend="AND p.vendor_id = ?" if vendor_id else "",
-            prod="AND pi.product_id = ?" if product_id else "",
-            cat ="AND pr.category = ?" if category else "",
-        )
-        params = [df, dt]
-        if vendor_id: params.append(vendor_id)
-        if product_id: params.append(product_id)
-        if category: params.append(category)
-        rows = [{"product_name": r["product_name"],
-                 "qty_base": float(r["qty_base"] or 0.0),
-                 "spend": float(r["spend"] or 0.0)} for r in self.conn.execute(sql, params)]
-        set_rows("purch_by_product", rows)
+        def by_product(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            where, params = fact_where(order_level=False)
+            sql = f"""
+                SELECT pr.name AS product_name, t.qty_base, t.spend
+                FROM (
+                    SELECT f.product_id, SUM(f.qty_base) AS qty_base, SUM(f.spend) AS spend
+                    FROM fact_purchases_daily f
+                    WHERE {where}
+                    GROUP BY f.product_id
+                    HAVING SUM(f.orders) > 0
+                ) t
+                JOIN products pr ON pr.product_id = t.product_id
+                ORDER BY t.spend DESC, product_name
+            """
+            rows = [{"product_name": r["product_name"],
+                     "qty_base": float(r["qty_base"] or 0.0),
+                     "spend": float(r["spend"] or 0.0)} for r in con.execute(sql, params)]
+            return rows
 
         # ---- 4) Purchases by Category ----
-        sql = """
-            SELECT pr.category AS category,
-                   SUM(CAST(pi.quantity AS REAL)) AS qty_base,
-                   SUM(CAST(pi.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - CAST(pi.item_discount AS REAL))) AS spend
-            FROM purchases p
-            JOIN purchase_items pi ON pi.purchase_id = p.purchase_id
-            JOIN products pr       ON pr.product_id   = pi.product_id
-            WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
-              {vend}
-              {prod}
-              {cat_any}
-            GROUP BY pr.category
-            ORDER BY spend DESC, category
-        """.format(
-            vend="AND p.vendor_id = ?" if vendor_id else "",
-            prod="AND pi.product_id = ?" if product_id else "",
-            cat_any="AND pr.category = ?" if category else "",
-        )
-        params = [df, dt]
-        if vendor_id: params.append(vendor_id)
-        if product_id: params.append(product_id)
-        if category: params.append(category)
-        rows = [{"category": r["category"] if r["category"] is not None else "",
-                 "qty_base": float(r["qty_base"] or 0.0),
-                 "spend": float(r["spend"] or 0.0)} for r in self.conn.execute(sql, params)]
-        set_rows("purch_by_category", rows)
+        def by_category(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            where, params = fact_where(order_level=False)
+            sql = f"""
+                SELECT f.category AS category,
+                       SUM(f.qty_base) AS qty_base,
+                       SUM(f.spend) AS spend
+                FROM fact_purchases_daily f
+                WHERE {where}
+                GROUP BY f.category
+                HAVING SUM(f.orders) > 0
+                ORDER BY spend DESC, category
+            """
+            rows = [{"category": r["category"] if r["category"] is not None else "",
+                     "qty_base": float(r["qty_base"] or 0.0),
+                     "spend": float(r["spend"] or 0.0)} for r in con.execute(sql, params)]
+            return rows
 
         # ---- 5) Top Vendors ----
-        sql = """
-            SELECT v.name AS vendor_name,
-                   COUNT(*) AS order_count,
-                   SUM(CAST(p.total_amount AS REAL)) AS spend
-            FROM purchases p
-            JOIN vendors v ON v.vendor_id = p.vendor_id
-            WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
-            GROUP BY v.vendor_id, v.name
-            ORDER BY spend DESC
-            LIMIT ?
-        """
-        rows = [{"vendor_name": r["vendor_name"],
-                 "order_count": int(r["order_count"] or 0),
-                 "spend": float(r["spend"] or 0.0)}
-                for r in self.conn.execute(sql, (df, dt, topn))]
-        set_rows("top_vendors", rows)
+        def top_vendors(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            where, params = fact_where(order_level=True, filtered=False)
+            sql = f"""
+                SELECT v.name AS vendor_name, t.order_count, t.spend
+                FROM (
+                    SELECT f.vendor_id, SUM(f.orders) AS order_count, SUM(f.spend) AS spend
+                    FROM fact_purchases_daily f
+                    WHERE {where}
+                    GROUP BY f.vendor_id
+                    HAVING SUM(f.orders) > 0
+                ) t
+                JOIN vendors v ON v.vendor_id = t.vendor_id
+                ORDER BY t.spend DESC
+                LIMIT ?
+            """
+            rows = [{"vendor_name": r["vendor_name"],
+                     "order_count": int(r["order_count"] or 0),
+                     "spend": float(r["spend"] or 0.0)}
+                    for r in con.execute(sql, params + [topn])]
+            return rows
 
         # ---- 6) Top Products ----
-        sql = """
-            SELECT pr.name AS product_name,
-                   SUM(CAST(pi.quantity AS REAL)) AS qty_base,
-                   SUM(CAST(pi.quantity AS REAL) * (CAST(pi.purchase_price AS REAL) - CAST(pi.item_discount AS REAL))) AS spend
-            FROM purchases p
-            JOIN purchase_items pi ON pi.purchase_id = p.purchase_id
-            JOIN products pr       ON pr.product_id   = pi.product_id
-            WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
-            GROUP BY pr.product_id, pr.name
-            ORDER BY spend DESC
-            LIMIT ?
-        """
-        rows = [{"product_name": r["product_name"],
-                 "qty_base": float(r["qty_base"] or 0.0),
-                 "spend": float(r["spend"] or 0.0)}
-                for r in self.conn.execute(sql, (df, dt, topn))]
-        set_rows("top_products", rows)
+        def top_products(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            where, params = fact_where(order_level=False, filtered=False)
+            sql = f"""
+                SELECT pr.name AS product_name, t.qty_base, t.spend
+                FROM (
+                    SELECT f.product_id, SUM(f.qty_base) AS qty_base, SUM(f.spend) AS spend
+                    FROM fact_purchases_daily f
+                    WHERE {where}
+                    GROUP BY f.product_id
+                    HAVING SUM(f.orders) > 0
+                ) t
+                JOIN products pr ON pr.product_id = t.product_id
+                ORDER BY t.spend DESC
+                LIMIT ?
+            """
+            rows = [{"product_name": r["product_name"],
+                     "qty_base": float(r["qty_base"] or 0.0),
+                     "spend": float(r["spend"] or 0.0)}
+                    for r in con.execute(sql, params + [topn])]
+            return rows
 
         # ---- 7) Returns Summary ----
-        # Prefer the prebuilt view if present; else graceful degrade.
-        rows: List[Dict[str, Any]] = []
-        try:
-            # purchase_return_valuations: transaction_id, purchase_id, item_id, product_id, qty_returned, unit_buy_price, unit_discount, return_value
-            sql = """
-                SELECT
-                  SUM(CAST(qty_returned AS REAL)) AS qty_returned,
-                  SUM(CAST(return_value AS REAL)) AS return_value
-                FROM purchase_return_valuations prv
-                JOIN inventory_transactions it ON it.transaction_id = prv.transaction_id
-                WHERE DATE(it.date) BETWEEN DATE(?) AND DATE(?)
-            """
-            r = self.conn.execute(sql, (df, dt)).fetchone()
-            qty = float((r or {}).get("qty_returned", 0.0) or 0.0)
-            val = float((r or {}).get("return_value", 0.0) or 0.0)
-            rows = [{"metric": "Returned Qty (base)", "value": qty},
-                    {"metric": "Return Value", "value": val}]
-        except Exception:
-            rows = [{"metric": "Info", "value": "purchase_return_valuations view not found"}]
-        set_rows("returns_summary", rows)
+        def returns_summary(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            # Returned quantity / value (as purchase_return_valuations) on the return date
+            where, params = fact_where(order_level=True, filtered=False)
+            r = con.execute(
+                f"""
+                SELECT SUM(f.qty_returned) AS qty_returned,
+                       SUM(f.returns_value) AS return_value
+                FROM fact_purchases_daily f
+                WHERE {where}
+                """,
+                params,
+            ).fetchone()
+            rows = [{"metric": "Returned Qty (base)", "value": float(r["qty_returned"] or 0.0)},
+                    {"metric": "Return Value", "value": float(r["return_value"] or 0.0)}]
+            return rows
 
         # ---- 8) Status Breakdown ----
-        sql = """
-            SELECT p.payment_status,
-                   COUNT(*) AS order_count,
-                   SUM(CAST(p.total_amount AS REAL)) AS spend
-            FROM purchases p
-            WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
-            GROUP BY p.payment_status
-            ORDER BY spend DESC
-        """
-        rows = [{"payment_status": r["payment_status"],
-                 "order_count": int(r["order_count"] or 0),
-                 "spend": float(r["spend"] or 0.0)} for r in self.conn.execute(sql, (df, dt))]
-        set_rows("status_breakdown", rows)
+        def status_breakdown(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            sql = """
+                SELECT p.payment_status,
+                       COUNT(*) AS order_count,
+                       SUM(CAST(p.total_amount AS REAL)) AS spend
+                FROM purchases p
+                WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
+                GROUP BY p.payment_status
+                ORDER BY spend DESC
+            """
+            rows = [{"payment_status": r["payment_status"],
+                     "order_count": int(r["order_count"] or 0),
+                     "spend": float(r["spend"] or 0.0)} for r in con.execute(sql, (df, dt))]
+            return rows
 
         # ---- 9) Open Purchases ----
-        sql = """
-            SELECT p.purchase_id, p.date, v.name AS vendor_name,
-                   CAST(p.total_amount AS REAL) AS total_amount,
-                   CAST(p.paid_amount  AS REAL) AS paid_amount,
-                   CAST(p.advance_payment_applied AS REAL) AS adv,
-                   (CAST(p.total_amount AS REAL) - CAST(p.paid_amount AS REAL) - CAST(p.advance_payment_applied AS REAL)) AS remaining
-            FROM purchases p
-            JOIN vendors v ON v.vendor_id = p.vendor_id
-            WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
-              AND (CAST(p.total_amount AS REAL) - CAST(p.paid_amount AS REAL) - CAST(p.advance_payment_applied AS REAL)) > 1e-9
-            ORDER BY DATE(p.date) DESC, p.purchase_id DESC
-        """
-        rows = [{k: (float(r[k]) if k in ("total_amount", "paid_amount", "adv", "remaining") else r[k])
-                 for k in r.keys()} for r in self.conn.execute(sql, (df, dt))]
-        set_rows("open_purchases", rows)
+        def open_purchases(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            sql = """
+                SELECT p.purchase_id, p.date, v.name AS vendor_name,
+                       CAST(p.total_amount AS REAL) AS total_amount,
+                       CAST(p.paid_amount  AS REAL) AS paid_amount,
+                       CAST(p.advance_payment_applied AS REAL) AS adv,
+                       (CAST(p.total_amount AS REAL) - CAST(p.paid_amount AS REAL) - CAST(p.advance_payment_applied AS REAL)) AS remaining
+                FROM purchases p
+                JOIN vendors v ON v.vendor_id = p.vendor_id
+                WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
+                  AND (CAST(p.total_amount AS REAL) - CAST(p.paid_amount AS REAL) - CAST(p.advance_payment_applied AS REAL)) > 1e-9
+                ORDER BY DATE(p.date) DESC, p.purchase_id DESC
+            """
+            rows = [{k: (float(r[k]) if k in ("total_amount", "paid_amount", "adv", "remaining") else r[k])
+                     for k in r.keys()} for r in con.execute(sql, (df, dt))]
+            return rows
 
         # ---- 10) Drill-down Purchases (matching filters) ----
-        sql = """
-            SELECT p.purchase_id, p.date, v.name AS vendor_name, p.payment_status,
-                   CAST(p.total_amount AS REAL) AS total_amount,
-                   CAST(p.paid_amount  AS REAL) AS paid_amount,
-                   CAST(p.advance_payment_applied AS REAL) AS adv,
-                   (CAST(p.total_amount AS REAL) - CAST(p.paid_amount AS REAL) - CAST(p.advance_payment_applied AS REAL)) AS remaining
-            FROM purchases p
-            JOIN vendors v ON v.vendor_id = p.vendor_id
-            WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
-              {vend}
-              {prod}
-              {cat}
-            ORDER BY DATE(p.date) DESC, p.purchase_id DESC
-        """.format(
-            vend="AND p.vendor_id = ?" if vendor_id else "",
-            prod="AND EXISTS (SELECT 1 FROM purchase_items pi WHERE pi.purchase_id = p.purchase_id AND pi.product_id = ?)" if product_id else "",
-            cat ="AND EXISTS (SELECT 1 FROM purchase_items pi JOIN products pr ON pr.product_id = pi.product_id WHERE pi.purchase_id = p.purchase_id AND pr.category = ?)" if category else "",
-        )
-        params = [df, dt]
-        if vendor_id: params.append(vendor_id)
-        if product_id: params.append(product_id)
-        if category: params.append(category)
-        rows = [{k: (float(r[k]) if k in ("total_amount", "paid_amount", "adv", "remaining") else r[k])
-                 for k in r.keys()} for r in self.conn.execute(sql, params)]
-        set_rows("drilldown", rows)
+        def drilldown(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            sql = """
+                SELECT p.purchase_id, p.date, v.name AS vendor_name, p.payment_status,
+                       CAST(p.total_amount AS REAL) AS total_amount,
+                       CAST(p.paid_amount  AS REAL) AS paid_amount,
+                       CAST(p.advance_payment_applied AS REAL) AS adv,
+                       (CAST(p.total_amount AS REAL) - CAST(p.paid_amount AS REAL) - CAST(p.advance_payment_applied AS REAL)) AS remaining
+                FROM purchases p
+                JOIN vendors v ON v.vendor_id = p.vendor_id
+                WHERE DATE(p.date) BETWEEN DATE(?) AND DATE(?)
+                  {vend}
+                  {prod}
+                  {cat}
+                ORDER BY DATE(p.date) DESC, p.purchase_id DESC
+            """.format(
+                vend="AND p.vendor_id = ?" if vendor_id else "",
+                prod="AND EXISTS (SELECT 1 FROM purchase_items pi WHERE pi.purchase_id = p.purchase_id AND pi.product_id = ?)" if product_id else "",
+                cat ="AND EXISTS (SELECT 1 FROM purchase_items pi JOIN products pr ON pr.product_id = pi.product_id WHERE pi.purchase_id = p.purchase_id AND pr.category = ?)" if category else "",
+            )
+            params = [df, dt]
+            if vendor_id: params.append(vendor_id)
+            if product_id: params.append(product_id)
+            if category: params.append(category)
+            rows = [{k: (float(r[k]) if k in ("total_amount", "paid_amount", "adv", "remaining") else r[k])
+                     for k in r.keys()} for r in con.execute(sql, params)]
+            return rows
 
         # ---- 11) Payments Timeline (cleared outflow by date) ----
-        # Uses purchase_payments with clearing_state='cleared'
-        sql = """
-            SELECT date AS date,
-                   SUM(CASE WHEN CAST(amount AS REAL) > 0 THEN CAST(amount AS REAL) ELSE 0.0 END) AS amount_out
-            FROM purchase_payments
-            WHERE DATE(date) BETWEEN DATE(?) AND DATE(?)
-              AND clearing_state = 'cleared'
-            GROUP BY date
-            ORDER BY DATE(date)
-        """
-        rows = [{"date": r["date"], "amount_out": float(r["amount_out"] or 0.0)}
-                for r in self.conn.execute(sql, (df, dt))]
-        set_rows("payments_timeline", rows)
+        def payments_timeline(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            # Cleared outgoing purchase_payments, by payment date
+            where, params = fact_where(order_level=True, filtered=False)
+            sql = f"""
+                SELECT f.day AS date,
+                       SUM(f.payments_cleared) AS amount_out
+                FROM fact_purchases_daily f
+                WHERE {where}
+                  AND f.payments_cleared > 0
+                GROUP BY f.day
+                ORDER BY f.day
+            """
+            rows = [{"date": r["date"], "amount_out": float(r["amount_out"] or 0.0)}
+                    for r in con.execute(sql, params)]
+            return rows
+
+        # All sections read one snapshot on a reader connection off the UI thread;
+        # each table fills in as its query completes, and a newer refresh cancels
+        # the running one
+        self._runner.submit_sections("purchases", [
+            ("purch_by_period", by_period),
+            ("purch_by_vendor", by_vendor),
+            ("purch_by_product", by_product),
+            ("purch_by_category", by_category),
+            ("top_vendors", top_vendors),
+            ("top_products", top_products),
+            ("returns_summary", returns_summary),
+            ("status_breakdown", status_breakdown),
+            ("open_purchases", open_purchases),
+            ("drilldown", drilldown),
+            ("payments_timeline", payments_timeline),
+        ])
+
+    def _set_rows(self, key: str, rows: List[Dict[str, Any]]) -> None:
+        tv = self._tables.get(key)
+        if tv is None:
+            return
+        model: _SimpleTableModel = tv.model()  # type: ignore
+        model.set_rows(rows)
+        tv.resizeColumnsToContents()
+        tv.horizontalHeader().setStretchLastSection(True)
 
     # ------------------------------ Export ------------------------------
     def _active_table(self) -> Optional[_BaseTableView]:
@@ -0,0 +1,274 @@
+# inventory_management/modules/reporting/report_runner.py
+"""
+Run report queries on the global QThreadPool against read-only connections.
+
+Each submitted job gets the worker thread's pooled reader connection
+(database.connection_pool.read_snapshot) inside a single read transaction, so
+all queries of one report see the same snapshot and the UI thread stays free.
+
+Jobs are keyed (e.g. "snapshot", "sales"); submitting a key again supersedes
+the earlier job for that key: the old job is cancelled and only the newest
+job's progress, partial results and result are delivered.
+
+Usage
+-----
+    self._runner = ReportRunner(conn, parent=self)
+    self._runner.finished.connect(self._on_report)       # (key, result)
+    self._runner.error.connect(self._on_report_error)    # (key, message)
+    self._runner.submit("snapshot", lambda con: Logic(con).compute(...))
+
+Reports made of independent sections hand over (name, fn) pairs instead; each
+section's result is delivered as soon as it is ready, followed by progress:
+
+    self._runner.partial.connect(self._on_section)       # (key, name, result)
+    self._runner.progress.connect(self._on_progress)     # (key, done, total, text)
+    self._runner.submit_sections("purchases", [("by_vendor", fn1), ("top", fn2)])
+
+`submit_job(key, fn)` calls `fn(con, job)` for jobs that report progress or
+stream partial results themselves (see ReportJob), e.g. rows in batches:
+
+    self._runner.submit_job("snapshot", lambda con, job: job.stream("rows", Logic(con).iter_rows()))
+
+Cancellation
+------------
+`cancel(key)` (or a superseding submit) flags the job and interrupts its
+reader connection (`sqlite3.Connection.interrupt()`). While a job runs, a
+progress handler on that connection aborts any statement the job starts
+afterwards, and `ReportJob.check()` stops it between sections. Cancelled jobs
+deliver nothing; an explicit `cancel()` emits `cancelled(key)`.
+
+`fn` receives a sqlite3.Connection and must not touch widgets. When the app
+connection has no file behind it (:memory:), jobs run inline on that
+connection instead (and cannot be interrupted).
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+import itertools
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from ...database.connection_pool import db_path_from_conn, read_snapshot
+
+ReportFn = Callable[[sqlite3.Connection], Any]
+Section = Tuple[str, ReportFn]
+
+
+class ReportCancelled(Exception):
+    """Raised inside a job that was cancelled or superseded."""
+
+
+class ReportJob:
+    """
+    Handle a running job uses to report back. `progress()` and `partial()`
+    raise ReportCancelled once the job is cancelled, so loops over sections
+    or row batches stop at the next report.
+    """
+
+    # SQLite VM instructions between cancellation checks of a running statement
+    CHECK_EVERY_OPS = 10_000
+
+    def __init__(self, runner: "ReportRunner", key: str, ticket: int) -> None:
+        self.key = key
+        self.ticket = ticket
+        self._runner = runner
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self) -> None:
+        if self._cancel.is_set():
+            raise ReportCancelled(self.key)
+
+    def progress(self, done: int, total: int, text: str = "") -> None:
+        self.check()
+        self._runner._emit(self._runner._progressed, self.key, self.ticket, int(done), int(total), text)
+
+    def partial(self, name: str, result: Any) -> None:
+        self.check()
+        self._runner._emit(self._runner._partial_ready, self.key, self.ticket, name, result)
+
+    def stream(self, name: str, rows: Iterable[Any], batch_size: int = 500) -> int:
+        """Deliver `rows` as partial(name, [row, ...]) batches; returns the row count."""
+        batch: List[Any] = []
+        count = 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                count += len(batch)
+                self.partial(name, batch)
+                batch = []
+        if batch:
+            count += len(batch)
+            self.partial(name, batch)
+        return count
+
+    def cancel(self) -> None:
+        """Flag the job and abort its running statement (any thread)."""
+        self._cancel.set()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    @contextmanager
+    def _bound(self, con: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        """Make `con` interruptible by cancel() for the duration of the job."""
+        with self._lock:
+            self._conn = con
+        con.set_progress_handler(lambda: 1 if self._cancel.is_set() else 0, self.CHECK_EVERY_OPS)
+        try:
+            yield con
+        finally:
+            con.set_progress_handler(None, 0)
+            with self._lock:
+                self._conn = None     # the pooled connection outlives the job
+
+
+class _ReportRunnable(QRunnable):
+    def __init__(self, work: Callable[[], None]) -> None:
+        super().__init__()
+        self.setAutoDelete(True)
+        self._work = work
+
+    @Slot()
+    def run(self) -> None:  # type: ignore[override]
+        self._work()
+
+
+class ReportRunner(QObject):
+    finished = Signal(str, object)          # key, result
+    error = Signal(str, str)                # key, message
+    progress = Signal(str, int, int, str)   # key, done, total, text
+    partial = Signal(str, str, object)      # key, section name, result
+    cancelled = Signal(str)                 # key (explicit cancel() only)
+
+    # worker -> UI thread (queued); carry the ticket so stale jobs can be dropped
+    _done = Signal(str, int, object)
+    _failed = Signal(str, int, str)
+    _progressed = Signal(str, int, int, int, str)
+    _partial_ready = Signal(str, int, str, object)
+
+    def __init__(self, conn: sqlite3.Connection, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._conn = conn
+        self._db_path: Optional[str] = db_path_from_conn(conn)
+        self._pool = QThreadPool.globalInstance()
+        self._tickets = itertools.count(1)
+        self._latest: Dict[str, ReportJob] = {}
+        self._done.connect(self._deliver)
+        self._failed.connect(self._deliver_error)
+        self._progressed.connect(self._deliver_progress)
+        self._partial_ready.connect(self._deliver_partial)
+        # a closed tab stops its queries too (the closure outlives the runner)
+        latest = self._latest
+        self.destroyed.connect(lambda *_: [job.cancel() for job in list(latest.values())])
+
+    def submit(self, key: str, fn: ReportFn) -> int:
+        """Queue `fn(conn)`; returns its ticket. Supersedes any pending job for `key`."""
+        return self.submit_job(key, lambda con, _job: fn(con))
+
+    def submit_job(self, key: str, fn: Callable[[sqlite3.Connection, ReportJob], Any]) -> int:
+        """Queue `fn(conn, job)`; returns its ticket. Supersedes any pending job for `key`."""
+        job = ReportJob(self, key, next(self._tickets))
+        old = self._latest.get(key)
+        self._latest[key] = job
+        if old is not None:
+            old.cancel()
+        if self._db_path is None:
+            self._run(job, fn)
+        else:
+            self._pool.start(_ReportRunnable(lambda: self._run(job, fn)))
+        return job.ticket
+
+    def submit_sections(self, key: str, sections: Sequence[Section]) -> int:
+        """
+        Queue independent report sections, run in order on one snapshot. Each
+        result is delivered through `partial` as it completes; `finished`
+        carries {name: result} for all of them.
+        """
+        sections = list(sections)
+
+        def run(con: sqlite3.Connection, job: ReportJob) -> Dict[str, Any]:
+            results: Dict[str, Any] = {}
+            for i, (name, fn) in enumerate(sections, start=1):
+                job.check()
+                results[name] = fn(con)
+                job.partial(name, results[name])
+                job.progress(i, len(sections), name)
+            return results
+
+        return self.submit_job(key, run)
+
+    def cancel(self, key: Optional[str] = None) -> None:
+        """Abandon the pending job for `key` (every pending job when None)."""
+        keys = list(self._latest) if key is None else [key]
+        for k in keys:
+            job = self._latest.pop(k, None)
+            if job is not None:
+                job.cancel()
+                self.cancelled.emit(k)
+
+    def is_pending(self, key: str) -> bool:
+        return key in self._latest
+
+    # ---- worker thread ----
+    def _run(self, job: ReportJob, fn: Callable[[sqlite3.Connection, ReportJob], Any]) -> None:
+        if job.cancelled:
+            return  # superseded while still queued
+        try:
+            if self._db_path is None:
+                result = fn(self._conn, job)
+            else:
+                with read_snapshot(self._db_path) as con, job._bound(con):
+                    result = fn(con, job)
+        except Exception as e:
+            if not job.cancelled:   # an interrupted query surfaces as OperationalError
+                self._emit(self._failed, job.key, job.ticket, f"{e.__class__.__name__}: {e}")
+            return
+        self._emit(self._done, job.key, job.ticket, result)
+
+    @staticmethod
+    def _emit(signal, *args) -> None:
+        try:
+            signal.emit(*args)
+        except RuntimeError:
+            pass  # runner (and its tab) deleted while the job was running
+
+    # ---- UI thread ----
+    def _current(self, key: str, ticket: int) -> bool:
+        job = self._latest.get(key)
+        return job is not None and job.ticket == ticket
+
+    @Slot(str, int, object)
+    def _deliver(self, key: str, ticket: int, result: object) -> None:
+        if not self._current(key, ticket):
+            return  # superseded or cancelled
+        del self._latest[key]
+        self.finished.emit(key, result)
+
+    @Slot(str, int, str)
+    def _deliver_error(self, key: str, ticket: int, message: str) -> None:
+        if not self._current(key, ticket):
+            return
+        del self._latest[key]
+        self.error.emit(key, message)
+
+    @Slot(str, int, int, int, str)
+    def _deliver_progress(self, key: str, ticket: int, done: int, total: int, text: str) -> None:
+        if self._current(key, ticket):
+            self.progress.emit(key, done, total, text)
+
+    @Slot(str, int, str, object)
+    def _deliver_partial(self, key: str, ticket: int, name: str, result: object) -> None:
+        if self._current(key, ticket):
+            self.partial.emit(key, name, result)
+
+
+__all__ = ["ReportCancelled", "ReportJob", "ReportRunner"]
@@ -28,6 +28,7 @@ except Exception:  # pragma: no cover
             return "0.00"
 
 from ...database.repositories.reporting_repo import ReportingRepo
+from .report_runner import ReportRunner
 
 from PySide6.QtCore import QAbstractTableModel
 
@@ -100,6 +101,10 @@ class SalesReportsTab(QWidget):
         self.conn.row_factory = sqlite3.Row
         self.repo = ReportingRepo(conn)
 
+        # All report queries run on a reader connection off the UI thread
+        self._runner = ReportRunner(conn, parent=self)
+        self._runner.partial.connect(lambda _key, name, rows: self._apply_results({name: rows}))
+
         self._build_ui()
         self._wire()
         self._load_categories()
@@ -388,19 +393,44 @@ class SalesReportsTab(QWidget):
         category = self._category_value()
         top_n = int(self.spn_topn.value())
 
-        def load_into(key: str, repo_method: str, *args) -> None:
-            tv = self._tables[key]
-            model: _SimpleTableModel = tv.model()  # type: ignore
+        filt = (statuses, customer_id, product_id, category)
+        jobs = [
+            ("sales_by_day", "sales_by_period", (date_from, date_to, gran, *filt)),
+            ("sales_by_customer", "sales_by_customer", (date_from, date_to, *filt)),
+            ("sales_by_product", "sales_by_product", (date_from, date_to, *filt)),
+            ("sales_by_category", "sales_by_category", (date_from, date_to, *filt)),
+            ("margin_by_day", "margin_by_period", (date_from, date_to, gran, *filt)),
+            ("margin_by_customer", "margin_by_customer", (date_from, date_to, *filt)),
+            ("margin_by_product", "margin_by_product", (date_from, date_to, *filt)),
+            ("margin_by_category", "margin_by_category", (date_from, date_to, *filt)),
+            ("top_customers", "top_customers", (date_from, date_to, statuses, int(top_n))),
+            ("top_products", "top_products", (date_from, date_to, statuses, int(top_n))),
+            ("returns_summary", "returns_summary", (date_from, date_to)),
+            ("status_breakdown", "status_breakdown", (date_from, date_to, customer_id, product_id, category)),
+            ("drilldown", "drilldown_sales", (date_from, date_to, *filt)),
+        ]
+        # One read snapshot for every sub-report; each table fills in as its query
+        # completes, and a newer refresh cancels this one
+        self._runner.submit_sections(
+            "sales",
+            [(key, self._section(key, repo_method, args)) for key, repo_method, args in jobs],
+        )
+
+    @staticmethod
+    def _section(key: str, repo_method: str, args: tuple):
+        """A worker-thread job for one sub-report: repo call + row shaping only, no widgets."""
+        def run(con: sqlite3.Connection) -> List[Dict[str, Any]]:
+            repo = ReportingRepo(con)
             try:
-                fn = getattr(self.repo, repo_method)
+                fn = getattr(repo, repo_method)
             except AttributeError:
-                model.set_rows([{"metric": "Info", "value": f"Repo method '{repo_method}' not implemented."}] if key == "returns_summary" else [])
-                return
+                if key == "returns_summary":
+                    return [{"metric": "Info", "value": "Repo.returns_summary not implemented"}]
+                return []
             try:
                 rows = fn(*args)
             except Exception as e:
-                model.set_rows([{"metric": "Error", "value": str(e)}] if key == "returns_summary" else [])
-                return
+                return [{"metric": "Error", "value": str(e)}] if key == "returns_summary" else []
 
             out: List[Dict[str, Any]] = []
             for r in rows or []:
@@ -420,47 +450,20 @@ class SalesReportsTab(QWidget):
                     paid = float(row.get("paid_amount") or 0.0)
                     adv = float(row.get("advance_payment_applied") or 0.0)
                     row["remaining"] = total - paid - adv
+            return out
 
-            model.set_rows(out)
+        return run
+
+    def _apply_results(self, results: Dict[str, List[Dict[str, Any]]]) -> None:
+        for key, rows in results.items():
+            tv = self._tables.get(key)
+            if tv is None:
+                continue
+            model: _SimpleTableModel = tv.model()  # type: ignore
+            model.set_rows(rows)
             tv.resizeColumnsToContents()
             tv.horizontalHeader().setStretchLastSection(True)
 
-        load_into("sales_by_day", "sales_by_period",
-                  date_from, date_to, gran, statuses, customer_id, product_id, category)
-        load_into("sales_by_customer", "sales_by_customer",
-                  date_from, date_to, statuses, customer_id, product_id, category)
-        load_into("sales_by_product", "sales_by_product",
-                  date_from, date_to, statuses, customer_id, product_id, category)
-        load_into("sales_by_category", "sales_by_category",
-                  date_from, date_to, statuses, customer_id, product_id, category)
-        load_into("margin_by_day", "margin_by_period",
-                  date_from, date_to, gran, statuses, customer_id, product_id, category)
-        load_into("margin_by_customer", "margin_by_customer",
-                  date_from, date_to, statuses, customer_id, product_id, category)
-        load_into("margin_by_product", "margin_by_product",
-                  date_from, date_to, statuses, customer_id, product_id, category)
-        load_into("margin_by_category", "margin_by_category",
-                  date_from, date_to, statuses, customer_id, product_id, category)
-        load_into("top_customers", "top_customers",
-                  date_from, date_to, statuses, int(top_n))
-        load_into("top_products", "top_products",
-                  date_from, date_to, statuses, int(top_n))
-
-        try:
-            fn = getattr(self.repo, "returns_summary")
-            rows = fn(date_from, date_to)
-        except Exception:
-            rows = [{"metric": "Info", "value": "Repo.returns_summary not implemented"}]
-        model_rs: _SimpleTableModel = self._tables["returns_summary"].model()  # type: ignore
-        model_rs.set_rows([dict(r) if hasattr(r, "keys") else dict(r) for r in rows or []])
-        self._tables["returns_summary"].resizeColumnsToContents()
-        self._tables["returns_summary"].horizontalHeader().setStretchLastSection(True)
-
-        load_into("status_breakdown", "status_breakdown",
-                  date_from, date_to, customer_id, product_id, category)
-        load_into("drilldown", "drilldown_sales",
-                  date_from, date_to, statuses, customer_id, product_id, category)
-
     # -------------- Export helpers --------------
     def _active_table(self) -> Optional[_BaseTableView]:
         idx = self.tabs.currentIndex()
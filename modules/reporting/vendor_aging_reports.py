@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import sqlite3
 from datetime import datetime, date
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from PySide6.QtCore import Qt, QDate, QModelIndex, Slot
 from PySide6.QtWidgets import (
@@ -36,10 +36,17 @@ except Exception:  # pragma: no cover
             return "0.00"
 
 from .model import AgingSnapshotTableModel, OpenInvoicesTableModel
-from ...database.repositories.reporting_repo import ReportingRepo
+from .report_runner import ReportRunner
+from ...database.repositories.reporting_repo import (
+    AGING_BUCKETS,
+    ReportingRepo,
+    aging_bucket_key,
+    aging_bucket_label,
+)
 
 
 _EPS = 1e-9  # guard for tiny float noise when comparing remaining due
+_STREAM_BATCH = 500  # snapshot rows appended to the model per batch
 
 
 def _days_between(older_yyyy_mm_dd: str, asof_yyyy_mm_dd: str) -> int:
@@ -52,6 +59,51 @@ def _days_between(older_yyyy_mm_dd: str, asof_yyyy_mm_dd: str) -> int:
         return 0
 
 
+class VendorAgingReports:
+    """
+    Pure computation for Vendor Aging built on top of ReportingRepo.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.repo = ReportingRepo(conn)
+
+    def iter_aging_snapshot(
+        self,
+        as_of: str,
+        buckets: Sequence[Tuple[int, Optional[int]]] = AGING_BUCKETS,
+        vendor_id: Optional[int] = None,
+    ) -> Iterable[Dict]:
+        """
+        Yields one row per vendor with an open balance, ordered by name:
+          vendor_id, name, total_due, b_0_30 ... (one per bucket),
+          buckets {"0-30": ...}, available_credit
+        Remaining due uses the trigger math (total - paid - advance applied) and
+        is computed, bucketed and summed per vendor in SQL
+        (ReportingRepo.aging_snapshot_iter).
+        """
+        labels = [(aging_bucket_label(lo, hi), aging_bucket_key(lo, hi)) for lo, hi in buckets]
+        for r in self.repo.aging_snapshot_iter("vendor", as_of, buckets, vendor_id):
+            amounts = [float(r[f"b{i}"] or 0.0) for i in range(len(labels))]
+            row = {
+                "vendor_id": int(r["party_id"]),   # keep internal id for drill-down
+                "name": str(r["name"] or r["party_id"]),
+                "total_due": float(r["total_due"] or 0.0),
+            }
+            row.update({key: amount for (_label, key), amount in zip(labels, amounts)})
+            row["buckets"] = {label: amount for (label, _key), amount in zip(labels, amounts)}
+            row["available_credit"] = float(r["available_credit"] or 0.0)
+            yield row
+
+    def compute_aging_snapshot(
+        self,
+        as_of: str,
+        buckets: Sequence[Tuple[int, Optional[int]]] = AGING_BUCKETS,
+        vendor_id: Optional[int] = None,
+    ) -> List[Dict]:
+        return list(self.iter_aging_snapshot(as_of, buckets, vendor_id))
+
+
 class VendorAgingTab(QWidget):
     """
     Vendor Aging:
@@ -71,11 +123,18 @@ class VendorAgingTab(QWidget):
         super().__init__(parent)
         self.conn = conn
         self.repo = ReportingRepo(conn)
+        self.logic = VendorAgingReports(conn)
 
         # Keep raw rows for export/drilldown
         self._aging_rows: List[Dict] = []
         self._open_rows: List[Dict] = []
 
+        # The snapshot streams in from a reader connection off the UI thread;
+        # changing the as-of date cancels the running query
+        self._runner = ReportRunner(conn, parent=self)
+        self._runner.partial.connect(lambda _key, _name, batch: self._append_aging_rows(batch))
+        self._runner.finished.connect(lambda _key, _count: self._on_aging_loaded())
+
         self._build_ui()
         self._wire()
         self.refresh()
@@ -150,8 +209,20 @@ class VendorAgingTab(QWidget):
     def refresh(self) -> None:
         """Rebuild the aging snapshot and re-bind selection."""
         as_of = self.dt_asof.date().toString("yyyy-MM-dd")
-        self._aging_rows = self._build_vendor_aging(as_of)
-        self.model_aging.set_rows(self._aging_rows)
+        # Stream the snapshot into the model in batches as the query yields rows
+        self._aging_rows = []
+        self.model_aging.set_rows([])
+        self._runner.submit_job(
+            "snapshot",
+            lambda con, job: job.stream("rows", VendorAgingReports(con).iter_aging_snapshot(as_of), _STREAM_BATCH),
+        )
+
+    def _append_aging_rows(self, batch: List[Dict]) -> None:
+        self._aging_rows.extend(batch)
+        self.model_aging.append_rows(batch)
+
+    def _on_aging_loaded(self) -> None:
+        as_of = self.dt_asof.date().toString("yyyy-MM-dd")
         self._autosize(self.tbl_aging)
 
         # (Re)connect selection listener safely
@@ -171,88 +242,6 @@ class VendorAgingTab(QWidget):
             self.model_open.set_rows([])
             self._autosize(self.tbl_open)
 
-    def _build_vendor_aging(self, as_of: str) -> List[Dict]:
-        """
-        Build rows for AgingSnapshotTableModel:
-          keys: name, total_due, b_0_30, b_31_60, b_61_90, b_91_plus, available_credit
-          
-        Performance optimization: This method addresses N+1 query pattern by fetching
-        all vendor headers and credits in batch operations instead of individual queries.
-        Expected performance improvement: 10x+ with 1000+ vendors.
-        """
-        rows: List[Dict] = []
-        
-        # Performance optimization: Fetch all vendors in a single query to avoid individual lookups
-        vendors = self.repo.get_all_vendors()
-        vendor_ids = [int(v["vendor_id"]) for v in vendors]
-        
-        # Performance optimization: Batch fetch all vendor headers to avoid N+1 queries
-        vendor_headers = self.repo.vendor_headers_as_of_batch(vendor_ids, as_of)
-        
-        # Organize headers by vendor_id for efficient lookup
-        headers_by_vendor = {}
-        for header in vendor_headers:
-            vid = int(header["vendor_id"])
-            if vid not in headers_by_vendor:
-                headers_by_vendor[vid] = []
-            headers_by_vendor[vid].append(header)
-        
-        # Performance optimization: Batch fetch all vendor credits to avoid N+1 queries
-        vendor_credits = self.repo.vendor_credit_as_of_batch(vendor_ids, as_of)
-
-        for v in vendors:
-            vid = int(v["vendor_id"])
-            vname = str(v["name"] or vid)
-
-            total_due = 0.0
-            b_0_30 = b_31_60 = b_61_90 = b_91_plus = 0.0
-
-            # Use header roll-ups as of the selected date; these reflect trigger math:
-            # remaining = total_amount - paid_amount - advance_payment_applied
-            headers = headers_by_vendor.get(vid, [])  # Get headers from the pre-fetched batch
-            for h in headers:
-                total_amount = float(h["total_amount"] or 0.0)
-                paid_amount = float(h["paid_amount"] or 0.0)
-                adv_applied = float(h["advance_payment_applied"] or 0.0)
-                raw_remaining = total_amount - paid_amount - adv_applied
-                remaining = raw_remaining if raw_remaining > _EPS else 0.0
-                if remaining <= 0.0:
-                    continue
-
-                days = _days_between(str(h["date"]), as_of)
-                total_due += remaining
-                if days <= 30:
-                    b_0_30 += remaining
-                elif days <= 60:
-                    b_31_60 += remaining
-                elif days <= 90:
-                    b_61_90 += remaining
-                else:
-                    b_91_plus += remaining
-
-            if total_due == 0.0:
-                # Keep list concise; remove vendors with no outstanding balance.
-                continue
-
-            # Show available credit separately; not part of remaining due computation.
-            # Get credit from the pre-fetched batch instead of individual query
-            avail_credit = vendor_credits.get(vid, 0.0)
-
-            rows.append({
-                "vendor_id": vid,          # keep internal id for drill-down
-                "name": vname,
-                "total_due": total_due,
-                "b_0_30": b_0_30,
-                "b_31_60": b_31_60,
-                "b_61_90": b_61_90,
-                "b_91_plus": b_91_plus,
-                "available_credit": avail_credit,
-            })
-
-        # Sort by name ASC (model sorts visually too; keep deterministic data order)
-        rows.sort(key=lambda r: r["name"].lower())
-        return rows
-
     def _load_open_for_row(self, row_index: int, as_of: str) -> None:
         """Populate bottom table with open purchases for the selected vendor."""
         if row_index < 0 or row_index >= len(self._aging_rows):
@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import Qt, QSortFilterProxyModel
+from PySide6.QtCore import Qt
 import sqlite3
 
 from ..base_module import BaseModule
@@ -10,33 +10,26 @@ from .return_form import SaleReturnForm
 from ...database.repositories.sales_repo import SalesRepo, SaleHeader, SaleItem
 from ...database.repositories.customers_repo import CustomersRepo
 from ...database.repositories.products_repo import ProductsRepo
+from ...database import doc_numbers
+from ...database.refdata import reference_data
+from ..inventory.valuation_repair import schedule_repair
 from ...utils.ui_helpers import info
 from ...utils.helpers import today_str, fmt_money
 
 
 def new_sale_id(conn: sqlite3.Connection, date_str: str) -> str:
-    d = date_str.replace("-", "")
-    prefix = f"SO{d}-"
-    row = conn.execute(
-        "SELECT MAX(sale_id) AS m FROM sales WHERE sale_id LIKE ?",
-        (prefix + "%",),
-    ).fetchone()
-    last = int(row["m"].split("-")[-1]) if row and row["m"] else 0
-    return f"{prefix}{last+1:04d}"
+    """
+    Next sale id (SO + yyyymmdd + -NNNN) from database.doc_numbers.
+    Allocates: call right before posting the sale on the same connection.
+    """
+    return doc_numbers.allocate(conn, doc_numbers.SALE, date_str)
 
 
 def new_quotation_id(conn: sqlite3.Connection, date_str: str) -> str:
     """
     Quotation IDs use prefix QO + yyyymmdd + -NNNN
     """
-    d = date_str.replace("-", "")
-    prefix = f"QO{d}-"
-    row = conn.execute(
-        "SELECT MAX(sale_id) AS m FROM sales WHERE sale_id LIKE ?",
-        (prefix + "%",),
-    ).fetchone()
-    last = int(row["m"].split("-")[-1]) if row and row["m"] else 0
-    return f"{prefix}{last+1:04d}"
+    return doc_numbers.allocate(conn, doc_numbers.QUOTATION, date_str)
 
 
 class SalesController(BaseModule):
@@ -49,6 +42,7 @@ class SalesController(BaseModule):
         # Controller-level state
         self._doc_type: str = "sale"   # 'sale' | 'quotation' (mirrors view toggle)
         self._search_text: str = ""    # current server-side search string
+        self.base: SalesTableModel | None = None
 
         # Repos using the shared connection
         self.repo = SalesRepo(conn)
@@ -121,8 +115,6 @@ class SalesController(BaseModule):
     def _on_mode_changed(self, mode: str):
         mode = (mode or "sale").lower()
         self._doc_type = "quotation" if mode == "quotation" else "sale"
-        # Let the model update its headers for the new document type
-        self.base.set_doc_type(self._doc_type)
         # Let the details widget know (if it supports this)
         try:
             if hasattr(self.view, "details") and hasattr(self.view.details, "set_mode"):
@@ -165,66 +157,69 @@ class SalesController(BaseModule):
         if hasattr(self.view, "btn_convert"):
             self.view.btn_convert.setEnabled(allow_convert)
 
+    def _fetch_page(self, sort: str, descending: bool, after, limit: int) -> list:
+        """Keyset page for the current mode and search text (server side)."""
+        return self.repo.page_sales(
+            doc_type=self._doc_type,
+            query=self._search_text,
+            sort=sort,
+            descending=descending,
+            after=after,
+            limit=limit,
+        )
+
     def _build_model(self):
         """
-        Build the table model using server-side search (preferred).
-        Falls back to list_* if search API is unavailable.
+        Build the paged table model (first page only; later pages are fetched
+        as the table is scrolled, header clicks re-query in that order).
         """
-        # Try repo.search_sales(query, doc_type=...)
-        rows_to_use = None
-        try:
-            if hasattr(self.repo, "search_sales"):
-                rows_to_use = list(self.repo.search_sales(self._search_text, doc_type=self._doc_type))
-        except TypeError:
-            # some implementations might have different signature; try (query, doc_type) kw-agnostic
-            try:
-                rows_to_use = list(self.repo.search_sales(self._search_text, self._doc_type))
-            except Exception:
-                rows_to_use = None
-        except Exception:
-            rows_to_use = None
-
-        # Fallback behavior if search_sales is not available
-        if rows_to_use is None:
-            if self._doc_type == "quotation":
-                try:
-                    rows_to_use = list(self.repo.list_quotations())
-                except Exception:
-                    rows_to_use = []
-            else:
-                rows_to_use = list(self.repo.list_sales())
-
-        # Normalize quotations to keep table happy (no payments; show quotation_status or em dash)
-        if self._doc_type == "quotation":
-            norm = []
-            for r in rows_to_use:
-                d = dict(r)
-                # Ensure all required fields exist for quotations
-                d.setdefault("paid_amount", 0.0)
-                d.setdefault("customer_id", 0)
-                d.setdefault("order_discount", 0.0)
-                d.setdefault("payment_status", "—")  # Default status for quotations
-                qstat = d.get("quotation_status") or d.get("payment_status") or "—"
-                d["payment_status"] = qstat
-                norm.append(d)
-            rows_to_use = norm
-
-        # Build model & wire to view
-        self.base = SalesTableModel(rows_to_use, doc_type=self._doc_type)
-        self.proxy = QSortFilterProxyModel(self.view)
-        self.proxy.setSourceModel(self.base)
-        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        self.proxy.setFilterKeyColumn(-1)  # no client-side filtering; server-side fetch above
-        self.view.tbl.setModel(self.proxy)
+        self.base = SalesTableModel(self._fetch_page, doc_type=self._doc_type)
+        self.base.watch("sales", self._fetch_rows)
+        self.view.tbl.setModel(self.base)
+        self.view.tbl.horizontalHeader().setSortIndicator(self.base.sort_column(), self.base.sort_order())
         self.view.tbl.resizeColumnsToContents()
 
-        # Selection model is recreated with each setModel; connect handlers every time
+        # Selection model is recreated with each setModel; connect handlers once
         sel = self.view.tbl.selectionModel()
         sel.selectionChanged.connect(self._on_selection_changed)
+        # Every re-query (reload, mode switch, header sort) resets the model
+        self.base.modelReset.connect(self._on_model_reset)
 
     def _reload(self):
-        self._build_model()
-        if self.proxy.rowCount() > 0:
+        if self.base is None:
+            self._build_model()
+            self._on_model_reset()
+        else:
+            self.base.set_doc_type(self._doc_type)  # re-queries -> modelReset
+
+    def _fetch_rows(self, ids) -> list:
+        """Re-read changed rows for the live list (same columns and filter as the pages)."""
+        return self.repo.page_sales(
+            doc_type=self._doc_type,
+            query=self._search_text,
+            ids=[str(i) for i in ids],
+            limit=max(len(ids), 1),
+        )
+
+    def _after_write(self, doc_id: str | None = None):
+        """
+        The list patches itself from the repository's change events, so a save
+        only needs to reselect the document and refresh the details pane.
+        Back-dated or edited sales and returns leave products in
+        valuation_dirty; the shared repair job replays them in the background.
+        """
+        schedule_repair(self.conn)
+        if self.base is None:
+            self._reload()
+            return
+        pos = self.base.row_of(doc_id) if doc_id else None
+        if pos is not None:
+            self.view.tbl.selectRow(pos)
+        self._update_action_states()
+        self._sync_details()
+
+    def _on_model_reset(self):
+        if self.base.rowCount() > 0:
             self.view.tbl.selectRow(0)
         # Ensure buttons are correctly enabled/disabled and details are fresh
         self._update_action_states()
@@ -237,8 +232,7 @@ class SalesController(BaseModule):
             return None
         if not idxs:
             return None
-        src = self.proxy.mapToSource(idxs[0])
-        row_data = self.base.at(src.row())
+        row_data = self.base.at(idxs[0].row())
 
         # Convert to dict to ensure setdefault method is available
         if row_data:
@@ -248,6 +242,10 @@ class SalesController(BaseModule):
             row_data.setdefault("date", "")
             row_data.setdefault("order_discount", 0.0)
             row_data.setdefault("total_amount", 0.0)
+            if self._doc_type == "quotation":
+                # Quotations carry no payments; show quotation_status (or em dash) as status
+                row_data["paid_amount"] = 0.0
+                row_data["payment_status"] = row_data.get("quotation_status") or "—"
 
         return row_data
 
@@ -422,28 +420,13 @@ class SalesController(BaseModule):
 
     def _list_company_bank_accounts(self) -> list[dict]:
         """
-        Adapter used by customer.money dialog. Tries common repo shapes; returns list of {id, name}.
+        Adapter used by customer.money dialog: active company accounts as [{id, name}],
+        from the shared reference cache.
         """
-        # Try repo methods if present
         try:
-            if self.bank_accounts:
-                for attr in ("list_accounts", "list", "list_all", "all"):
-                    if hasattr(self.bank_accounts, attr):
-                        rows = list(getattr(self.bank_accounts, attr)())
-                        # Try to normalize to {id, name}
-                        norm = []
-                        for r in rows:
-                            d = dict(r)
-                            _id = d.get("id") or d.get("account_id") or d.get("bank_account_id")
-                            _name = d.get("name") or d.get("account_name") or d.get("title")
-                            if _id is not None and _name is not None:
-                                norm.append({"id": int(_id), "name": str(_name)})
-                        if norm:
-                            return norm
-        except Exception:
-            pass
-        # Fallback empty list
-        return []
+            return reference_data(self.conn).bank_account_choices()
+        except sqlite3.Error:
+            return []
 
     def _list_sales_for_customer(self, customer_id: int) -> list[dict]:
         """
@@ -567,8 +550,7 @@ class SalesController(BaseModule):
                 info(self.view, "Saved", f"Quotation {qid} created.")
             except Exception as e:
                 info(self.view, "Error", f"Could not create quotation: {e}")
-            self._reload()
-            self._sync_details()
+            self._after_write(qid)
             return
 
         # --- sale path ---
@@ -637,8 +619,7 @@ class SalesController(BaseModule):
         else:
             info(self.view, "Saved", f"Sale {sid} created.")
 
-        self._reload()
-        self._sync_details()
+        self._after_write(sid)
 
     def _edit(self):
         r = self._selected_row()
@@ -716,8 +697,7 @@ class SalesController(BaseModule):
             else:
                 info(self.view, "Not available",
                      "Updating quotations requires SalesRepo.update_quotation(...).")
-            self._reload()
-            self._sync_details()
+            self._after_write(sid)
             return
 
         # --- sale path ---
@@ -747,8 +727,7 @@ class SalesController(BaseModule):
         ]
         self.repo.update_sale(h, items)
         info(self.view, "Saved", f"Sale {sid} updated.")
-        self._reload()
-        self._sync_details()
+        self._after_write(sid)
 
     def _delete(self):
         r = self._selected_row()
@@ -757,8 +736,7 @@ class SalesController(BaseModule):
             return
         self.repo.delete_sale(r["sale_id"])
         info(self.view, "Deleted", f"{r['sale_id']} removed.")
-        self._reload()
-        self._sync_details()
+        self._after_write()
 
     # ---- Convert to Sale (from quotation mode) ----------------------------
 
@@ -788,8 +766,7 @@ class SalesController(BaseModule):
         except Exception as e:
             info(self.view, "Error", f"Conversion failed: {e}")
 
-        self._reload()
-        self._sync_details()
+        self._after_write()
 
     # ---- Payments / Printing ---------------------------------------------
 
@@ -835,8 +812,7 @@ class SalesController(BaseModule):
                     with_ui=False,
                     form_defaults=payload,
                 )
-                self._reload()
-                self._sync_details()
+                self._after_write(sale_id)
                 return
         except Exception:
             info(
@@ -959,8 +935,7 @@ class SalesController(BaseModule):
                     },
                 )
                 info(self.view, "Saved", "Credit application recorded.")
-                self._reload()
-                self._sync_details()
+                self._after_write(sale_id)
                 return
         except Exception:
             info(
@@ -1113,5 +1088,4 @@ class SalesController(BaseModule):
         else:
             info(self.view, "Saved", f"Return recorded. {fmt_money(refund_amount)} added to customer credit.")
 
-        self._reload()
-        self._sync_details()
+        self._after_write(sid)
@@ -41,7 +41,7 @@
 
 #   * `subtotal_before_order_discount` = Σ(qty × unit\_price − item\_discount) across lines
 #   * `calculated_total_amount` = that subtotal − `order_discount`
-# * **`sale_item_cogs`**: COGS for each sale item using running-average at sale date (UoM-aware).
+# * **`sale_item_cogs`** (table): COGS for each sale item at the running-average cost it posted at (UoM-aware).
 # * **`profit_loss_view`**: month buckets = sales revenue − COGS − expenses.
 
 # ---
@@ -1,70 +1,45 @@
 from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
 from ...utils.helpers import fmt_money
+from ...widgets.keyset_table_model import KeysetTableModel, PageFetcher
 
-class SalesTableModel(QAbstractTableModel):
-    def __init__(self, rows: list, doc_type: str = "sale"):
-        super().__init__()
-        self._rows = rows
+class SalesTableModel(KeysetTableModel):
+    """
+    Sales / quotations list, loaded page by page from SalesRepo.page_sales
+    (see widgets.keyset_table_model). `fetch_page(sort, descending, after, limit)`
+    is bound by the controller to the current doc type and search text.
+    """
+    ID_KEY = "sale_id"
+
+    def __init__(self, fetch_page: PageFetcher, doc_type: str = "sale"):
         self._doc_type = doc_type
         self._update_headers()
+        super().__init__(fetch_page)
 
     def _update_headers(self):
         if self._doc_type == "quotation":
             self.HEADERS = ["ID", "Date", "Customer", "Total"]
+            self.SORT_KEYS = ["sale_id", "date", "customer_name", "total_amount"]
         else:  # sale
             self.HEADERS = ["ID", "Date", "Customer", "Total", "Paid", "Status"]
+            self.SORT_KEYS = ["sale_id", "date", "customer_name", "total_amount", "paid_amount", "payment_status"]
 
     def set_doc_type(self, doc_type: str):
-        """Update document type and refresh headers."""
+        """Update document type (headers + sort keys) and reload from the first page."""
         if self._doc_type != doc_type:
             self._doc_type = doc_type
             self._update_headers()
-            self.headerDataChanged.emit(Qt.Horizontal, 0, len(self.HEADERS) - 1)
+            if self._sort_key not in self.SORT_KEYS:
+                self._sort_key, self._descending = "date", True
+        self.reload()
 
-    def rowCount(self, parent=QModelIndex()):
-        return len(self._rows)
+    _MONEY_KEYS = ("total_amount", "paid_amount")
 
-    def columnCount(self, parent=QModelIndex()):
-        return len(self.HEADERS)
-
-    def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid():
+    def display(self, r, c):
+        # Columns follow SORT_KEYS (which depend on the document type)
+        if c >= len(self.SORT_KEYS):
             return None
-        r = self._rows[index.row()]
-        if role in (Qt.DisplayRole, Qt.EditRole):
-            c = index.column()
-            # Mapping depends on document type
-            if self._doc_type == "quotation":
-                mapping = [
-                    r["sale_id"],
-                    r["date"],
-                    r["customer_name"],
-                    fmt_money(r["total_amount"])
-                ]
-            else:  # sale
-                mapping = [
-                    r["sale_id"],
-                    r["date"],
-                    r["customer_name"],
-                    fmt_money(r["total_amount"]),
-                    fmt_money(r["paid_amount"]),
-                    r["payment_status"]
-                ]
-            return mapping[c] if c < len(mapping) else None
-        return None
-
-    def headerData(self, section, orientation, role=Qt.DisplayRole):
-        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
-            return self.HEADERS[section] if section < len(self.HEADERS) else None
-        return super().headerData(section, orientation, role)
-
-    def at(self, row: int) -> dict:
-        return self._rows[row]
-
-    def replace(self, rows: list):
-        self.beginResetModel()
-        self._rows = rows
-        self.endResetModel()
+        key = self.SORT_KEYS[c]
+        return fmt_money(r[key]) if key in self._MONEY_KEYS else r[key]
 
 
 class SaleItemsModel(QAbstractTableModel):
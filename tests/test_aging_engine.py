@@ -0,0 +1,102 @@
+# tests/test_aging_engine.py
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from inventory_management.database import schema
+from inventory_management.database.repositories.reporting_repo import AGING_BUCKETS, ReportingRepo
+
+AS_OF = "2031-06-30"
+
+
+@pytest.fixture()
+def db(tmp_path):
+    con = sqlite3.connect(tmp_path / "aging.db")
+    con.row_factory = sqlite3.Row
+    schema.apply_schema(con)
+    con.commit()
+    yield con
+    con.close()
+
+
+def _sale(con, sale_id, cid, day, total, paid=0.0):
+    con.execute(
+        """
+        INSERT INTO sales(sale_id, customer_id, date, total_amount, payment_status, paid_amount)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (sale_id, cid, day, total, "partial" if paid else "unpaid", paid),
+    )
+
+
+def _ago(days: int) -> str:
+    return (date.fromisoformat(AS_OF) - timedelta(days=days)).isoformat()
+
+
+def test_buckets_credit_and_cutoff(db):
+    a = db.execute("INSERT INTO customers(name, contact_info) VALUES ('Alpha', 'x')").lastrowid
+    b = db.execute("INSERT INTO customers(name, contact_info) VALUES ('beta', 'x')").lastrowid
+    db.execute("INSERT INTO customers(name, contact_info) VALUES ('Settled', 'x')")
+    _sale(db, "S1", a, _ago(0), 100.0)
+    _sale(db, "S2", a, _ago(30), 50.0, paid=20.0)
+    _sale(db, "S3", a, _ago(31), 10.0)
+    _sale(db, "S4", a, _ago(400), 7.0)
+    _sale(db, "S5", a, "2031-07-01", 999.0)       # after the cutoff
+    _sale(db, "S6", b, _ago(75), 40.0)
+    db.execute(
+        "INSERT INTO customer_advances(customer_id, tx_date, amount, source_type) VALUES (?, ?, 25, 'deposit')",
+        (b, _ago(5)),
+    )
+    db.commit()
+
+    rows = list(ReportingRepo(db).aging_snapshot_iter("customer", AS_OF))
+    assert [r["name"] for r in rows] == ["Alpha", "beta"]
+    alpha, beta = rows
+    assert [alpha[f"b{i}"] for i in range(4)] == [pytest.approx(130.0), pytest.approx(10.0), 0.0, pytest.approx(7.0)]
+    assert alpha["total_due"] == pytest.approx(147.0)
+    assert (beta["b2"], beta["available_credit"]) == (pytest.approx(40.0), pytest.approx(25.0))
+
+    # configurable boundaries; single-party mode
+    [only] = ReportingRepo(db).aging_snapshot_iter("customer", AS_OF, ((0, 60), (61, None)), party_id=a)
+    assert (only["b0"], only["b1"]) == (pytest.approx(140.0), pytest.approx(7.0))
+
+    totals = ReportingRepo(db).open_due_total_as_of("customer", AS_OF)
+    assert totals == pytest.approx(187.0)
+
+
+def test_overlapping_buckets_count_each_document_once(db):
+    a = db.execute("INSERT INTO customers(name, contact_info) VALUES ('Alpha', 'x')").lastrowid
+    _sale(db, "S1", a, _ago(10), 100.0)
+    _sale(db, "S2", a, _ago(45), 30.0)
+    db.commit()
+
+    # 0-60 and 30+ overlap: the first matching bucket takes the document
+    [row] = ReportingRepo(db).aging_snapshot_iter("customer", AS_OF, ((0, 60), (30, None)))
+    assert (row["b0"], row["b1"]) == (pytest.approx(130.0), 0.0)
+    assert row["b0"] + row["b1"] == pytest.approx(row["total_due"])
+
+
+def test_many_parties_use_a_fixed_parameter_count(db):
+    n = 33_000      # past SQLite's default host-parameter limit (32766)
+    db.executemany(
+        "INSERT INTO vendors(vendor_id, name, contact_info) VALUES (?, ?, 'x')",
+        ((i, f"V{i:05d}") for i in range(1, n + 1)),
+    )
+    db.executemany(
+        """
+        INSERT INTO purchases(purchase_id, vendor_id, date, total_amount, payment_status)
+        VALUES (?, ?, ?, ?, 'unpaid')
+        """,
+        ((f"P{i}", i, _ago(i % 120), float(i % 7 + 1)) for i in range(1, n + 1)),
+    )
+    db.commit()
+
+    rows = ReportingRepo(db).aging_snapshot_iter("vendor", AS_OF, AGING_BUCKETS)
+    count = total = 0.0
+    for r in rows:
+        count += 1
+        total += r["total_due"]
+        assert r["total_due"] == pytest.approx(sum(r[f"b{i}"] for i in range(len(AGING_BUCKETS))))
+    assert count == n
+    assert total == pytest.approx(sum(float(i % 7 + 1) for i in range(1, n + 1)))
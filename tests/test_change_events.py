@@ -0,0 +1,146 @@
+# tests/test_change_events.py
+from __future__ import annotations
+
+import gc
+import sqlite3
+
+from inventory_management.database import events
+from inventory_management.database.events import ChangeBus, ChangeEvent
+
+
+def _open(tmp_path) -> sqlite3.Connection:
+    con = sqlite3.connect(tmp_path / "events.db")
+    con.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    con.commit()
+    return con
+
+
+def test_delivery_waits_for_commit(tmp_path):
+    con = _open(tmp_path)
+    bus, seen = ChangeBus(), []
+    bus.subscribe(seen.append, ("t",))
+    try:
+        con.execute("INSERT INTO t (v) VALUES ('a')")          # opens a transaction
+        bus.publish(con, ChangeEvent("t", 1, events.INSERT))
+        bus.publish(con, ChangeEvent("other", 1))               # filtered out
+        assert seen == []
+        con.commit()
+        bus.committed(con)
+        assert seen == [ChangeEvent("t", 1, events.INSERT)]
+
+        bus.publish(con, ChangeEvent("t", 1, events.DELETE))    # autocommit: at once
+        assert seen[-1].kind == events.DELETE
+    finally:
+        con.close()
+
+
+def test_rollback_drops_held_events(tmp_path):
+    con = _open(tmp_path)
+    bus, seen = ChangeBus(), []
+    bus.subscribe(seen.append)
+    try:
+        con.execute("INSERT INTO t (v) VALUES ('a')")
+        bus.publish(con, ChangeEvent("t", 1, events.INSERT))
+        con.rollback()
+        bus.discard(con)
+        bus.committed(con)
+        assert seen == []
+    finally:
+        con.close()
+
+
+class _Sink:
+    def __init__(self):
+        self.seen = []
+
+    def on(self, ev):
+        self.seen.append(ev)
+
+
+def test_bound_subscribers_are_weak():
+    bus = ChangeBus()
+    sink = _Sink()
+    bus.subscribe(sink.on)
+    bus.publish(None, ChangeEvent("t", 7))
+    assert sink.seen == [ChangeEvent("t", 7)]
+
+    del sink
+    gc.collect()
+    bus.publish(None, ChangeEvent("t", 8))
+    assert bus._subs == []
+
+
+def test_failing_subscriber_does_not_stop_delivery():
+    bus, sink = ChangeBus(), _Sink()
+
+    def broken(ev):
+        raise RuntimeError("boom")
+
+    bus.subscribe(broken)
+    bus.subscribe(sink.on)
+    bus.publish(None, ChangeEvent("t", 7))
+    assert sink.seen == [ChangeEvent("t", 7)]
+
+
+def test_repositories_publish_after_commit(tmp_path):
+    from inventory_management.database import schema
+    from inventory_management.database.repositories.customers_repo import CustomersRepo
+    from inventory_management.database.repositories.products_repo import ProductsRepo
+
+    con = sqlite3.connect(tmp_path / "repo.db")
+    con.row_factory = sqlite3.Row
+    seen = []
+    unsubscribe = events.bus.subscribe(seen.append, ("products", "customers"))
+    try:
+        schema.apply_schema(con)
+        con.commit()
+        pid = ProductsRepo(con).create("Widget", None, None, 0)
+        cid = CustomersRepo(con).create("Ali", "0300", None)
+        ProductsRepo(con).update(pid, "Widget 2", None, None, 0)
+        assert seen == [
+            ChangeEvent("products", pid, events.INSERT),
+            ChangeEvent("customers", cid, events.INSERT),
+            ChangeEvent("products", pid, events.UPDATE),
+        ]
+    finally:
+        unsubscribe()
+        con.close()
+
+
+def test_vendor_credit_commits_and_patches_purchase_list(qtbot, tmp_path):
+    from inventory_management.database import schema
+    from inventory_management.database.repositories.purchases_repo import (
+        PurchasesRepo, PurchaseHeader, PurchaseItem,
+    )
+    from inventory_management.database.repositories.vendor_advances_repo import VendorAdvancesRepo
+    from inventory_management.modules.purchase.controller import PurchaseController
+
+    con = sqlite3.connect(tmp_path / "credit.db")
+    con.row_factory = sqlite3.Row
+    schema.apply_schema(con)
+    vid = con.execute("INSERT INTO vendors(name, contact_info) VALUES ('Credit Vendor', 'n/a')").lastrowid
+    uom = con.execute("INSERT INTO uoms(unit_name) VALUES ('credit-each')").lastrowid
+    prod = con.execute("INSERT INTO products(name) VALUES ('Credit Widget')").lastrowid
+    con.execute("INSERT INTO product_uoms(product_id, uom_id, is_base, factor_to_base) VALUES (?, ?, 1, 1)",
+                (prod, uom))
+    PurchasesRepo(con).create_purchase(
+        PurchaseHeader(purchase_id="PO-CR-1", vendor_id=vid, date="2034-02-01", total_amount=0.0,
+                       order_discount=0.0, payment_status="unpaid", paid_amount=0.0,
+                       advance_payment_applied=0.0, notes=None, created_by=None),
+        [PurchaseItem(None, "PO-CR-1", prod, 10, uom, 10.0, 10.0, 0.0)],
+    )
+    VendorAdvancesRepo(con).grant_credit(vid, 50.0, date="2034-02-01", notes=None, created_by=None)
+    con.commit()
+
+    ctl = PurchaseController(con, None)
+    qtbot.addWidget(ctl.view)
+    try:
+        ctl.view.tbl.selectRow(ctl.base.row_of("PO-CR-1"))
+        ctl.apply_vendor_credit(amount=30.0)
+
+        assert not con.in_transaction
+        row = ctl.base.at(ctl.base.row_of("PO-CR-1"))
+        assert float(row["advance_payment_applied"]) == 30.0
+    finally:
+        ctl.base._listener.close()      # the list outlives this database
+        con.close()
@@ -0,0 +1,65 @@
+# tests/test_columnar_model.py
+from __future__ import annotations
+
+from PySide6.QtCore import Qt
+
+from inventory_management.modules.inventory.model import TransactionsTableModel
+from inventory_management.widgets.columnar_model import ColumnarTableModel, sorting_proxy
+
+
+class _Amounts(ColumnarTableModel):
+    HEADERS = ["ID", "Amount"]
+    ROW_ID = "id"
+
+    def __init__(self, rows):
+        self.formatted = 0
+        super().__init__(rows)
+
+    def display(self, r, c):
+        self.formatted += 1
+        return r["id"] if c == 0 else f"{r['amount']:,.2f}"
+
+    def sort_value(self, r, c):
+        return r["amount"] if c == 1 else r["id"]
+
+
+def _rows():
+    return [{"id": 1, "amount": 5.0}, {"id": 2, "amount": 1000.0}, {"id": 3, "amount": 20.0}]
+
+
+def test_cells_are_formatted_once_and_patched_per_row(qtbot):
+    m = _Amounts(_rows())
+    assert m.formatted == 6
+    for _ in range(50):
+        assert m.index(1, 1).data() == "1,000.00"
+    assert m.formatted == 6
+
+    m.patch_row(2, {"id": 2, "amount": 7.5})
+    assert m.formatted == 8                      # only the touched row
+    assert m.index(1, 1).data() == "7.50"
+    m.patch_row(4, {"id": 4, "amount": 1.0})     # new rows go on top
+    assert m.row_of(4) == 0 and m.rowCount() == 4
+    m.patch_row(1)
+    assert m.row_of(1) is None and m.rowCount() == 3
+
+
+def test_sort_role_orders_numbers_not_text(qtbot):
+    m = _Amounts(_rows())
+    proxy = sorting_proxy(m)
+    proxy.sort(1, Qt.AscendingOrder)
+    # as text "1,000.00" < "20.00" < "5.00"
+    assert [proxy.index(i, 0).data() for i in range(3)] == [1, 3, 2]
+
+    m.sort(1, Qt.DescendingOrder)                # in memory, no proxy
+    assert [m.index(i, 0).data() for i in range(3)] == [2, 3, 1]
+
+
+def test_transactions_model_sorts_quantities_numerically(qtbot):
+    m = TransactionsTableModel([
+        {"transaction_id": 1, "date": "2024-01-01", "transaction_type": "adjustment",
+         "product": "A", "quantity": 10, "unit_name": "Each", "notes": ""},
+        {"transaction_id": 2, "date": "2024-01-02", "transaction_type": "adjustment",
+         "product": "B", "quantity": 9, "unit_name": "Each", "notes": ""},
+    ])
+    m.sort(4, Qt.AscendingOrder)
+    assert [m.index(i, 4).data() for i in range(2)] == ["9", "10"]
@@ -0,0 +1,117 @@
+# tests/test_connection_pool.py
+import sqlite3
+import threading
+
+from inventory_management.database.connection_pool import (
+    ConnectionProvider, get_provider, pooled_connection,
+)
+from inventory_management.database.repositories.customer_advances_repo import CustomerAdvancesRepo
+
+
+def _db(tmp_path):
+    path = tmp_path / "pool.db"
+    with sqlite3.connect(path) as con:
+        con.execute("CREATE TABLE t(x INTEGER)")
+    return path
+
+
+def test_same_thread_reuses_configured_connection(tmp_path):
+    prov = ConnectionProvider(_db(tmp_path))
+    a = prov.connection()
+    b = prov.connection()
+    assert a is b
+    assert a.row_factory is sqlite3.Row
+    assert a.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    assert a.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert (prov.stats.opened, prov.stats.reused) == (1, 1)
+    prov.close_all()
+
+
+def test_threads_get_their_own_connection(tmp_path):
+    prov = ConnectionProvider(_db(tmp_path))
+    mine = prov.connection()
+    seen = []
+    t = threading.Thread(target=lambda: seen.append(prov.connection()))
+    t.start()
+    t.join()
+    assert seen and seen[0] is not mine
+    assert prov.prune() == 1
+    assert prov.stats.open_now == 1
+    prov.close_all()
+
+
+def test_broken_connection_is_replaced(tmp_path):
+    prov = ConnectionProvider(_db(tmp_path), check_interval_s=0)
+    first = prov.connection()
+    first.close()
+    second = prov.connection()
+    assert second is not first
+    assert second.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    assert prov.stats.replaced == 1
+    prov.close_all()
+
+
+def test_registry_and_borrowed_connection(tmp_path, conn):
+    path = _db(tmp_path)
+    assert get_provider(path) is get_provider(str(path))
+    assert pooled_connection(path) is pooled_connection(path)
+    get_provider(path).close_all()
+
+    # a repo handed an open connection works inside the caller's transaction
+    repo = CustomerAdvancesRepo(conn)
+    assert repo._connect() is conn
+    assert repo.db_path is None
+
+
+def test_nested_blocks_share_one_transaction(tmp_path):
+    prov = ConnectionProvider(_db(tmp_path))
+    con = prov.connection()
+    try:
+        with con:
+            con.execute("INSERT INTO t VALUES (1)")
+            with con:                       # e.g. a nested repo on the same thread
+                con.execute("INSERT INTO t VALUES (2)")
+            assert con.in_transaction       # the inner block did not commit
+            raise RuntimeError("outer fails after the inner block succeeded")
+    except RuntimeError:
+        pass
+    assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    with con:
+        con.execute("INSERT INTO t VALUES (1)")
+        try:
+            with con:
+                con.execute("INSERT INTO t VALUES (2)")
+                raise ValueError("inner fails")
+        except ValueError:
+            pass
+    assert [r[0] for r in con.execute("SELECT x FROM t")] == [1]
+    prov.close_all()
+
+
+def test_close_all_leaves_busy_connections_to_their_thread(tmp_path):
+    prov = ConnectionProvider(_db(tmp_path))
+    busy, done = threading.Event(), threading.Event()
+    seen = {}
+
+    def worker():
+        con = prov.connection()
+        with con:
+            con.execute("INSERT INTO t VALUES (1)")
+            busy.set()
+            done.wait(5)
+            # still usable: close_all() only marked it stale
+            seen["rows"] = con.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+        seen["fresh"] = prov.connection() is not con
+        seen["closed"] = not ConnectionProvider._healthy(con)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    assert busy.wait(5)
+    prov.connection()                       # idle connection of this thread
+    assert prov.close_all() == 1
+    done.set()
+    t.join()
+    assert seen == {"rows": 1, "fresh": True, "closed": True}
+    prov.prune()
+    assert prov.stats.open_now == 0
@@ -0,0 +1,61 @@
+# tests/test_credit_balances.py
+import sqlite3
+
+import pytest
+
+from inventory_management.database.repositories.vendor_advances_repo import VendorAdvancesRepo
+from inventory_management.database.reconcile import (
+    rebuild_credit_balances, verify_credit_balances
+)
+
+
+def _vadv(conn, vendor_id: int, amount: float, source_type: str = "deposit", source_id=None) -> int:
+    return conn.execute(
+        "INSERT INTO vendor_advances(vendor_id, amount, source_type, source_id) VALUES (?, ?, ?, ?)",
+        (vendor_id, amount, source_type, source_id),
+    ).lastrowid
+
+
+def _ledger_sum(conn, vendor_id: int) -> float:
+    return float(conn.execute(
+        "SELECT COALESCE(SUM(CAST(amount AS REAL)), 0.0) FROM vendor_advances WHERE vendor_id=?",
+        (vendor_id,),
+    ).fetchone()[0])
+
+
+def test_vendor_balance_tracks_ledger(conn, ids):
+    vid = ids["vendor_id"]
+    repo = VendorAdvancesRepo(conn)
+    start = repo.get_balance(vid)
+
+    t1 = _vadv(conn, vid, 120.0)
+    t2 = _vadv(conn, vid, 30.5, source_type="return_credit")
+    assert repo.get_balance(vid) == pytest.approx(start + 150.5)
+
+    conn.execute("UPDATE vendor_advances SET amount=20 WHERE tx_id=?", (t1,))
+    assert repo.get_balance(vid) == pytest.approx(start + 50.5)
+
+    conn.execute("DELETE FROM vendor_advances WHERE tx_id=?", (t2,))
+    assert repo.get_balance(vid) == pytest.approx(start + 20.0)
+    assert repo.get_balance(vid) == pytest.approx(_ledger_sum(conn, vid))
+
+
+def test_overdraw_guard_uses_cached_balance(conn, ids):
+    vid = ids["vendor_id"]
+    available = VendorAdvancesRepo(conn).get_balance(vid)
+    with pytest.raises(sqlite3.IntegrityError):
+        _vadv(conn, vid, -(available + 1000.0), source_type="applied_to_purchase", source_id="NOPE")
+
+
+def test_checker_reports_and_rebuilds(conn, ids):
+    vid = ids["vendor_id"]
+    _vadv(conn, vid, 10.0)
+    conn.execute("UPDATE vendor_credit_balance SET balance = balance + 5 WHERE vendor_id=?", (vid,))
+
+    drift = [d for d in verify_credit_balances(conn) if d.party_type == "vendor" and d.party_id == vid]
+    assert len(drift) == 1
+    assert drift[0].stored_balance - drift[0].expected_balance == pytest.approx(5.0)
+
+    rebuild_credit_balances(conn)
+    assert verify_credit_balances(conn) == []
+    assert VendorAdvancesRepo(conn).get_balance(vid) == pytest.approx(_ledger_sum(conn, vid))
@@ -0,0 +1,64 @@
+# tests/test_doc_numbers.py
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from inventory_management.database import doc_numbers, schema
+
+
+def _db(tmp_path) -> str:
+    path = str(tmp_path / "docs.db")
+    con = sqlite3.connect(path)
+    schema.apply_schema(con)
+    con.commit()
+    con.close()
+    return path
+
+
+def test_numbers_continue_after_existing_documents_and_rollbacks(tmp_path):
+    con = sqlite3.connect(_db(tmp_path))
+    try:
+        con.execute("INSERT INTO customers (name, contact_info) VALUES ('Seq', '1')")
+        con.execute(
+            "INSERT INTO sales (sale_id, customer_id, date, total_amount, order_discount, "
+            "payment_status, paid_amount, doc_type) "
+            "VALUES ('SO20261016-0007', 1, '2026-10-16', 10, 0, 'unpaid', 0, 'sale')"
+        )
+        con.commit()
+
+        assert doc_numbers.peek(con, doc_numbers.SALE, "2026-10-16") == "SO20261016-0008"
+        assert doc_numbers.allocate(con, doc_numbers.SALE, "2026-10-16") == "SO20261016-0008"
+        con.rollback()                                   # the save failed: number returns
+        assert doc_numbers.allocate(con, doc_numbers.SALE, "2026-10-16") == "SO20261016-0008"
+        assert doc_numbers.allocate(con, doc_numbers.QUOTATION, "2026-10-16") == "QO20261016-0001"
+        con.commit()
+        assert doc_numbers.allocate(con, doc_numbers.SALE, "2026-10-16") == "SO20261016-0009"
+    finally:
+        con.close()
+
+
+def test_concurrent_terminals_never_share_a_number(tmp_path):
+    path = _db(tmp_path)
+    issued: list[str] = []
+    lock = threading.Lock()
+
+    def terminal():
+        con = sqlite3.connect(path, timeout=30)
+        try:
+            for _ in range(25):
+                pid = doc_numbers.allocate(con, doc_numbers.PURCHASE, "2026-10-17")
+                con.commit()
+                with lock:
+                    issued.append(pid)
+        finally:
+            con.close()
+
+    threads = [threading.Thread(target=terminal) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(issued)) == 100
+    assert max(issued) == "PO20261017-0100"
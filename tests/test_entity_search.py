@@ -0,0 +1,79 @@
+# tests/test_entity_search.py
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from inventory_management.database.repositories.customers_repo import CustomersRepo
+from inventory_management.database.repositories.products_repo import ProductsRepo
+from inventory_management.database.repositories.vendors_repo import VendorsRepo
+from inventory_management.database.search import EntitySearch, fts_query
+
+
+def _customer(conn: sqlite3.Connection, name: str, contact: str = "0300-0000000", address: str = "Nowhere") -> int:
+    cur = conn.execute(
+        "INSERT INTO customers (name, contact_info, address) VALUES (?, ?, ?)",
+        (name, contact, address),
+    )
+    return int(cur.lastrowid)
+
+
+def test_fts_query_prefixes_every_token():
+    assert fts_query("jo  sm") == '"jo"* "sm"*'
+    assert fts_query("jo-sm", any_token=True) == '"jo"* OR "sm"*'
+    assert fts_query("  ") is None
+
+
+def test_customer_prefix_multi_token_and_ranking(conn):
+    exact = _customer(conn, "Zephyrine Quarkwell", address="Lahore")
+    other = _customer(conn, "Bilal Traders", address="Zephyrine Road")
+
+    repo = CustomersRepo(conn)
+    assert [c.customer_id for c in repo.search("zeph qua")] == [exact]
+    # name hits outrank address hits
+    ids = [c.customer_id for c in repo.search("zephyr")]
+    assert ids[:2] == [exact, other]
+    # exact id comes first
+    assert repo.search(str(other))[0].customer_id == other
+
+
+def test_customer_index_follows_updates_and_active_flag(conn):
+    cid = _customer(conn, "Oldnamexyz Store")
+    repo = CustomersRepo(conn)
+
+    conn.execute("UPDATE customers SET name = 'Newnamexyz Store' WHERE customer_id = ?", (cid,))
+    assert repo.search("oldnamexyz") == []
+    assert [c.customer_id for c in repo.search("newnamexyz")] == [cid]
+
+    conn.execute("UPDATE customers SET is_active = 0 WHERE customer_id = ?", (cid,))
+    assert repo.search("newnamexyz") == []
+    assert [c.customer_id for c in repo.search("newnamexyz", active_only=False)] == [cid]
+
+
+def test_partial_match_falls_back_to_any_token(conn):
+    cid = _customer(conn, "Kestrelbyte Supplies")
+    hits = EntitySearch(conn).search("customers", "kestrelbyte nosuchword")
+    assert [h.id for h in hits] == [cid]
+
+
+def test_vendor_and_product_search(conn):
+    vid = int(conn.execute(
+        "INSERT INTO vendors (name, contact_info, address) VALUES ('Marlowquill Imports', 'x', 'y')"
+    ).lastrowid)
+    assert [v.vendor_id for v in VendorsRepo(conn).search("marlow")] == [vid]
+
+    pid = int(conn.execute(
+        "INSERT INTO products (name, description, category, min_stock_level) "
+        "VALUES ('Thornvale Widget', 'blue', 'Gizmoquip', 0)"
+    ).lastrowid)
+    repo = ProductsRepo(conn)
+    assert [p.product_id for p in repo.search("gizmoq")] == [pid]
+
+    conn.execute("DELETE FROM products WHERE product_id = ?", (pid,))
+    assert repo.search("thornvale") == []
+
+
+def test_unknown_entity_is_rejected(conn):
+    with pytest.raises(ValueError):
+        EntitySearch(conn).search("sales", "x")
@@ -0,0 +1,120 @@
+# tests/test_keyset_pagination.py
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from inventory_management.database.keyset import page_query
+from inventory_management.database.repositories.purchases_repo import PurchasesRepo
+from inventory_management.modules.purchase.model import PurchasesTableModel
+
+
+def _insert_purchases(conn: sqlite3.Connection, vendor_id: int) -> list[str]:
+    ids = []
+    for i in range(11):
+        pid = f"POKS{i:04d}"
+        date = f"2031-01-{1 + i % 3:02d}"   # several rows per date -> id tiebreak matters
+        conn.execute(
+            """INSERT INTO purchases (purchase_id, vendor_id, date, total_amount, order_discount,
+                                      payment_status, paid_amount, advance_payment_applied)
+               VALUES (?, ?, ?, ?, 0, 'unpaid', 0, 0)""",
+            (pid, vendor_id, date, 100 + (i * 7) % 5),
+        )
+        ids.append(pid)
+    return ids
+
+
+def _walk(repo: PurchasesRepo, sort: str, descending: bool, limit: int) -> list[str]:
+    out, after = [], None
+    while True:
+        page = repo.page_purchases(query="POKS", field="id", sort=sort,
+                                   descending=descending, after=after, limit=limit)
+        if not page:
+            return out
+        out += [r["purchase_id"] for r in page]
+        after = (page[-1][sort], page[-1]["purchase_id"])
+
+
+@pytest.mark.parametrize("sort,descending", [("date", True), ("total_amount", False), ("vendor_name", True)])
+def test_keyset_walk_matches_full_ordering(conn, ids, sort, descending):
+    _insert_purchases(conn, ids["vendor_id"])
+    repo = PurchasesRepo(conn)
+    expr = repo.PAGE_SORT_KEYS[sort]
+    direction = "DESC" if descending else "ASC"
+    expected = [r[0] for r in conn.execute(
+        f"""SELECT p.purchase_id FROM purchases p JOIN vendors v ON v.vendor_id = p.vendor_id
+            WHERE p.purchase_id LIKE 'POKS%' ORDER BY {expr} {direction}, p.purchase_id {direction}"""
+    )]
+    assert len(expected) == 11
+    assert _walk(repo, sort, descending, limit=4) == expected
+
+
+def test_seek_uses_index_range(conn):
+    sql, args = page_query(
+        "SELECT s.sale_id FROM sales s JOIN customers c ON c.customer_id = s.customer_id",
+        ["s.doc_type = ?"], ["sale"],
+        sort_expr="s.date", id_expr="s.sale_id", descending=True,
+        after=("2031-01-02", "SO-0100"), limit=50,
+    )
+    plan = " | ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, args))
+    # the whole cursor is part of the index range, not just doc_type
+    assert "idx_sales_doc_type_date_id (doc_type=? AND (date,sale_id)<(?,?))" in plan
+
+
+def test_unknown_sort_key_is_rejected(conn):
+    with pytest.raises(ValueError):
+        PurchasesRepo(conn).page_purchases(sort="notes; DROP TABLE purchases")
+
+
+def test_model_fetches_more_and_sorts_server_side(qtbot, conn, ids):
+    from PySide6.QtCore import Qt
+
+    _insert_purchases(conn, ids["vendor_id"])
+    repo = PurchasesRepo(conn)
+
+    def fetch(sort, descending, after, limit):
+        return repo.page_purchases(query="POKS", field="id", sort=sort,
+                                   descending=descending, after=after, limit=limit)
+
+    model = PurchasesTableModel(fetch, page_size=5)
+    assert model.rowCount() == 5 and model.canFetchMore()
+    model.fetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 11 and not model.canFetchMore()
+
+    model.sort(PurchasesTableModel.SORT_KEYS.index("purchase_id"), Qt.AscendingOrder)
+    assert model.rowCount() == 5
+    assert [model.at(i)["purchase_id"] for i in range(5)] == [f"POKS{i:04d}" for i in range(5)]
+
+
+def test_model_applies_change_events_without_reset(qtbot, conn, ids):
+    from inventory_management.database import events
+
+    _insert_purchases(conn, ids["vendor_id"])
+    repo = PurchasesRepo(conn)
+
+    def fetch(sort, descending, after, limit):
+        return repo.page_purchases(query="POKS", field="id", sort=sort,
+                                   descending=descending, after=after, limit=limit)
+
+    def fetch_rows(row_ids):
+        return repo.page_purchases(query="POKS", field="id", ids=list(row_ids), limit=len(row_ids))
+
+    model = PurchasesTableModel(fetch, page_size=50)
+    model.watch("purchases", fetch_rows)
+    resets = []
+    model.modelReset.connect(lambda: resets.append(True))
+
+    conn.execute("UPDATE purchases SET notes = 'checked' WHERE purchase_id = 'POKS0003'")
+    model.apply_change(events.ChangeEvent("purchases", "POKS0003", events.UPDATE))
+    assert model.at(model.row_of("POKS0003"))["notes"] == "checked"
+
+    conn.execute("UPDATE purchases SET date = '2031-02-01' WHERE purchase_id = 'POKS0005'")
+    model.apply_change(events.ChangeEvent("purchases", "POKS0005", events.UPDATE))
+    assert model.row_of("POKS0005") == 0        # newest date sorts first
+
+    conn.execute("DELETE FROM purchases WHERE purchase_id = 'POKS0007'")
+    model.apply_change(events.ChangeEvent("purchases", "POKS0007", events.DELETE))
+    assert model.row_of("POKS0007") is None and model.rowCount() == 10
+    assert resets == []
@@ -0,0 +1,116 @@
+# tests/test_payment_rollups.py
+import pytest
+
+from inventory_management.database.repositories.purchases_repo import (
+    PurchasesRepo, PurchaseHeader, PurchaseItem
+)
+from inventory_management.database.reconcile import verify_payment_rollups
+
+
+def _purchase(conn, ids, pid: str, qty: float = 10, price: float = 10.0) -> None:
+    PurchasesRepo(conn).create_purchase(
+        PurchaseHeader(
+            purchase_id=pid, vendor_id=ids["vendor_id"], date="2034-01-01",
+            total_amount=0.0, order_discount=0.0, payment_status="unpaid",
+            paid_amount=0.0, advance_payment_applied=0.0, notes=None, created_by=None,
+        ),
+        [PurchaseItem(None, pid, ids["prod_A"], qty, ids["uom_piece"], price, price, 0.0)],
+    )
+
+
+def _pay(conn, pid: str, amount: float, state: str = "cleared") -> int:
+    return conn.execute(
+        "INSERT INTO purchase_payments(purchase_id, amount, method, clearing_state) "
+        "VALUES (?, ?, 'Cash', ?)",
+        (pid, amount, state),
+    ).lastrowid
+
+
+def _header(conn, pid: str):
+    r = conn.execute(
+        "SELECT CAST(paid_amount AS REAL) AS paid, payment_status FROM purchases WHERE purchase_id=?",
+        (pid,),
+    ).fetchone()
+    return float(r["paid"]), r["payment_status"]
+
+
+def test_purchase_rollup_follows_clearing_transitions(conn, ids):
+    _purchase(conn, ids, "PO-RU-0001")                     # total 100
+    p1 = _pay(conn, "PO-RU-0001", 40.0)
+    p2 = _pay(conn, "PO-RU-0001", 60.0, state="pending")
+    assert _header(conn, "PO-RU-0001") == (pytest.approx(40.0), "partial")
+
+    conn.execute("UPDATE purchase_payments SET clearing_state='cleared' WHERE payment_id=?", (p2,))
+    assert _header(conn, "PO-RU-0001") == (pytest.approx(100.0), "paid")
+
+    conn.execute("UPDATE purchase_payments SET clearing_state='bounced' WHERE payment_id=?", (p2,))
+    assert _header(conn, "PO-RU-0001") == (pytest.approx(40.0), "partial")
+
+    conn.execute("UPDATE purchase_payments SET amount=25 WHERE payment_id=?", (p1,))
+    assert _header(conn, "PO-RU-0001") == (pytest.approx(25.0), "partial")
+
+    conn.execute("DELETE FROM purchase_payments WHERE payment_id=?", (p1,))
+    assert _header(conn, "PO-RU-0001") == (pytest.approx(0.0), "unpaid")
+
+
+def test_refund_below_zero_clamps_then_recovers(conn, ids):
+    _purchase(conn, ids, "PO-RU-0002")
+    _pay(conn, "PO-RU-0002", 10.0)
+    _pay(conn, "PO-RU-0002", -30.0)
+    assert _header(conn, "PO-RU-0002")[0] == pytest.approx(0.0)
+    _pay(conn, "PO-RU-0002", 50.0)                          # raw sum = 30
+    assert _header(conn, "PO-RU-0002") == (pytest.approx(30.0), "partial")
+
+
+def test_verify_reports_and_fixes_drift(conn, ids):
+    _purchase(conn, ids, "PO-RU-0003")
+    _pay(conn, "PO-RU-0003", 30.0)
+    conn.execute("UPDATE purchases SET paid_amount=75 WHERE purchase_id='PO-RU-0003'")
+
+    drift = [d for d in verify_payment_rollups(conn) if d.doc_id == "PO-RU-0003"]
+    assert len(drift) == 1
+    assert drift[0].stored_paid == pytest.approx(75.0)
+    assert drift[0].expected_paid == pytest.approx(30.0)
+
+    verify_payment_rollups(conn, fix=True)
+    assert _header(conn, "PO-RU-0003") == (pytest.approx(30.0), "partial")
+    assert not [d for d in verify_payment_rollups(conn) if d.doc_id == "PO-RU-0003"]
+
+
+def test_editing_paid_sale_keeps_paid_amount(tmp_path):
+    # update_sale() commits, so this runs on its own database
+    import sqlite3
+    from inventory_management.database import schema
+    from inventory_management.database.repositories.sales_repo import SalesRepo, SaleHeader, SaleItem
+
+    con = sqlite3.connect(tmp_path / "edit.db")
+    con.row_factory = sqlite3.Row
+    schema.apply_schema(con)
+    cid = con.execute("INSERT INTO customers(name, contact_info) VALUES ('Rollup', 'n/a')").lastrowid
+    uom = con.execute("INSERT INTO uoms(unit_name) VALUES ('rollup-each')").lastrowid
+    prod = con.execute("INSERT INTO products(name) VALUES ('Rollup Widget')").lastrowid
+    con.execute("INSERT INTO product_uoms(product_id, uom_id, is_base, factor_to_base) VALUES (?, ?, 1, 1)",
+                (prod, uom))
+
+    def header(total: float, paid: float) -> SaleHeader:
+        return SaleHeader(
+            sale_id="SO-RU-0001", customer_id=cid, date="2034-01-01", total_amount=total,
+            order_discount=0.0, payment_status="unpaid", paid_amount=paid,
+            advance_payment_applied=0.0, notes=None, created_by=None,
+        )
+
+    repo = SalesRepo(con)
+    repo.create_sale(header(100.0, 0.0), [SaleItem(None, "", prod, 10, uom, 10.0, 0.0)])
+    con.execute("INSERT INTO sale_payments(sale_id, amount, method) VALUES ('SO-RU-0001', 40, 'Cash')")
+    con.commit()
+
+    # the form hands back a stale paid_amount; the rollup must keep the real one
+    repo.update_sale(header(120.0, 10.0), [SaleItem(None, "", prod, 12, uom, 10.0, 0.0)])
+    paid = con.execute("SELECT CAST(paid_amount AS REAL) FROM sales WHERE sale_id='SO-RU-0001'").fetchone()[0]
+    assert paid == pytest.approx(40.0)
+
+    con.execute("INSERT INTO sale_payments(sale_id, amount, method) VALUES ('SO-RU-0001', 80, 'Cash')")
+    assert tuple(con.execute(
+        "SELECT CAST(paid_amount AS REAL), payment_status FROM sales WHERE sale_id='SO-RU-0001'"
+    ).fetchone()) == (pytest.approx(120.0), "paid")
+    con.close()
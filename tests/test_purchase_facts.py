@@ -0,0 +1,115 @@
+# tests/test_purchase_facts.py
+import pytest
+
+from inventory_management.database.reconcile import rebuild_purchase_facts, verify_purchase_facts
+from inventory_management.database.repositories.purchase_payments_repo import PurchasePaymentsRepo
+from inventory_management.database.repositories.purchases_repo import (
+    PurchaseHeader, PurchaseItem, PurchasesRepo
+)
+
+DAY = "2031-04-07"
+
+
+def _setup(conn):
+    vid = conn.execute(
+        "INSERT INTO vendors(name, contact_info) VALUES ('Facts Vendor', 'n/a')"
+    ).lastrowid
+    uom = conn.execute("INSERT INTO uoms(unit_name) VALUES ('facts-box')").lastrowid
+    pids = []
+    for name, category in (("Facts Nail", "Facts Hardware"), ("Facts Tape", None)):
+        pid = conn.execute(
+            "INSERT INTO products(name, category) VALUES (?, ?)", (name, category)
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO product_uoms(product_id, uom_id, is_base, factor_to_base) VALUES (?, ?, 1, 1)",
+            (pid, uom),
+        )
+        pids.append(pid)
+    return vid, uom, pids
+
+
+def _header(pid, vid, date=DAY):
+    return PurchaseHeader(pid, vid, date, 0.0, 0.0, "unpaid", 0.0, 0.0, None, None)
+
+
+def _item(product_id, uom, qty, price):
+    return PurchaseItem(None, "", product_id, qty, uom, price, price * 1.5, 0.0)
+
+
+def _order_row(conn, vid, day=DAY):
+    return conn.execute(
+        "SELECT * FROM fact_purchases_daily WHERE product_id = 0 AND vendor_id = ? AND day = ?",
+        (vid, day),
+    ).fetchone()
+
+
+def _pay(conn, purchase_id, amount, state):
+    return PurchasePaymentsRepo(conn).record_payment(
+        purchase_id, amount=amount, method="Cash", bank_account_id=None, vendor_bank_account_id=None,
+        instrument_type=None, instrument_no=None, instrument_date=None, deposited_date=None,
+        cleared_date=None, clearing_state=state, ref_no=None, notes=None, date="2031-04-09",
+        created_by=None,
+    )
+
+
+def test_facts_follow_purchase_lifecycle(conn):
+    vid, uom, (nail, tape) = _setup(conn)
+    repo = PurchasesRepo(conn)
+
+    repo.create_purchase(_header("PO-FACTS-1", vid), [_item(nail, uom, 10, 3.0), _item(tape, uom, 2, 5.0)])
+    row = _order_row(conn, vid)
+    assert (row["orders"], row["spend"]) == (1, pytest.approx(40.0))
+
+    repo.update_purchase(_header("PO-FACTS-1", vid), [_item(nail, uom, 20, 3.0)])
+    assert _order_row(conn, vid)["spend"] == pytest.approx(60.0)
+    assert conn.execute(
+        "SELECT COUNT(*) FROM fact_purchases_daily WHERE product_id = ?", (tape,)
+    ).fetchone()[0] == 0
+
+    # cleared outgoing payments land on the payment day; pending ones do not count yet
+    pay_id = _pay(conn, "PO-FACTS-1", 25.0, "pending")
+    assert _order_row(conn, vid, "2031-04-09") is None
+    PurchasePaymentsRepo(conn).update_clearing_state(pay_id, clearing_state="cleared")
+    assert _order_row(conn, vid, "2031-04-09")["payments_cleared"] == pytest.approx(25.0)
+    assert _order_row(conn, vid)["paid"] == pytest.approx(25.0)
+
+    item_id = repo.list_items("PO-FACTS-1")[0]["item_id"]
+    repo.record_return(pid="PO-FACTS-1", date="2031-04-10", created_by=None,
+                       lines=[{"item_id": item_id, "qty_return": 4}], notes=None)
+    ret = _order_row(conn, vid, "2031-04-10")
+    assert (ret["qty_returned"], ret["returns_value"]) == (pytest.approx(4.0), pytest.approx(12.0))
+    assert verify_purchase_facts(conn) == []
+
+    # moving the purchase to another vendor moves returns and payments with it
+    other = conn.execute("INSERT INTO vendors(name, contact_info) VALUES ('Facts Vendor 2', 'n/a')").lastrowid
+    conn.execute("UPDATE purchases SET vendor_id = ? WHERE purchase_id = 'PO-FACTS-1'", (other,))
+    assert _order_row(conn, vid, "2031-04-10") is None
+    assert _order_row(conn, other, "2031-04-10")["returns_value"] == pytest.approx(12.0)
+    assert verify_purchase_facts(conn) == []
+
+    repo.delete_purchase("PO-FACTS-1")
+    assert conn.execute(
+        "SELECT COUNT(*) FROM fact_purchases_daily WHERE vendor_id IN (?, ?)", (vid, other)
+    ).fetchone()[0] == 0
+    assert verify_purchase_facts(conn) == []
+
+
+def test_checker_reports_and_rebuilds(conn):
+    vid, uom, (nail, _tape) = _setup(conn)
+    repo = PurchasesRepo(conn)
+    repo.create_purchase(_header("PO-FACTS-2", vid), [_item(nail, uom, 5, 2.0)])
+    assert repo.get_purchase_totals_for_vendor(vid, "2031-04-01", "2031-04-30")["purchases_total"] == pytest.approx(10.0)
+    assert repo.get_purchase_totals_for_vendor(vid, "2031-05-01")["purchases_total"] == 0.0
+
+    conn.execute("UPDATE products SET category = 'Facts Fasteners' WHERE product_id = ?", (nail,))
+    assert conn.execute(
+        "SELECT category FROM fact_purchases_daily WHERE product_id = ?", (nail,)
+    ).fetchone()[0] == "Facts Fasteners"
+
+    conn.execute("UPDATE fact_purchases_daily SET spend = spend + 3 WHERE product_id = 0 AND vendor_id = ?", (vid,))
+    drift = verify_purchase_facts(conn)
+    assert len(drift) == 1
+    assert drift[0].stored_spend - drift[0].expected_spend == pytest.approx(3.0)
+
+    rebuild_purchase_facts(conn)
+    assert verify_purchase_facts(conn) == []
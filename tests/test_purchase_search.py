@@ -0,0 +1,85 @@
+# tests/test_purchase_search.py
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from inventory_management.database.repositories.purchases_repo import PurchasesRepo
+
+
+def _add(conn: sqlite3.Connection, pid: str, vendor_id: int, status: str = "unpaid", total: float = 100.0) -> None:
+    conn.execute(
+        """INSERT INTO purchases (purchase_id, vendor_id, date, total_amount, order_discount,
+                                  payment_status, paid_amount, advance_payment_applied)
+           VALUES (?, ?, '2031-02-01', ?, 0, ?, 0, 0)""",
+        (pid, vendor_id, total, status),
+    )
+
+
+def _ids(rows) -> set[str]:
+    return {r["purchase_id"] for r in rows}
+
+
+@pytest.fixture()
+def repo(conn, ids):
+    _add(conn, "POSRCH-0001", ids["vendor_id"], total=4321.0)
+    _add(conn, "POSRCH-0002", ids["vendor_id"], status="partial")
+    return PurchasesRepo(conn)
+
+
+def test_index_follows_inserts_and_updates(conn, ids, repo):
+    assert _ids(repo.page_purchases(query="srch-0001", field="id")) == {"POSRCH-0001"}
+    assert "POSRCH-0001" in _ids(repo.page_purchases(query="4321"))
+
+    conn.execute("UPDATE purchases SET purchase_id = 'POSRCH-0099' WHERE purchase_id = 'POSRCH-0001'")
+    assert _ids(repo.page_purchases(query="SRCH-0001", field="id")) == set()
+    assert _ids(repo.page_purchases(query="SRCH-0099", field="id")) == {"POSRCH-0099"}
+
+    conn.execute("UPDATE vendors SET name = 'Quuxvendor Ltd' WHERE vendor_id = ?", (ids["vendor_id"],))
+    assert {"POSRCH-0099", "POSRCH-0002"} <= _ids(repo.page_purchases(query="quuxvendor", field="vendor"))
+
+    conn.execute("DELETE FROM purchases WHERE purchase_id = 'POSRCH-0002'")
+    assert "POSRCH-0002" not in _ids(repo.page_purchases(query="quuxvendor", field="vendor"))
+
+
+def test_field_modes_restrict_columns(repo):
+    assert _ids(repo.page_purchases(query="POSRCH", field="status")) == set()
+    assert "POSRCH-0002" in _ids(repo.page_purchases(query="partial", field="status"))
+    assert "POSRCH-0001" not in _ids(repo.page_purchases(query="partial", field="status"))
+
+
+def test_short_and_dense_queries_fall_back_to_like(monkeypatch, repo):
+    clause, _ = repo.search_filter("PO", "id")
+    assert "LIKE" in clause
+    clause, _ = repo.search_filter("POSRCH", "id")
+    assert "purchases_fts" in clause
+
+    expected = _ids(repo.page_purchases(query="POSRCH", field="id"))
+    monkeypatch.setattr(PurchasesRepo, "_FTS_DENSE_MATCHES", 1)
+    clause, _ = repo.search_filter("POSRCH", "id")
+    assert "LIKE" in clause
+    assert _ids(repo.page_purchases(query="POSRCH", field="id")) == expected == {"POSRCH-0001", "POSRCH-0002"}
+
+
+def test_filter_worked_out_once_per_query(monkeypatch, conn, ids, repo):
+    for i in range(3, 9):
+        _add(conn, f"POSRCH-{i:04d}", ids["vendor_id"])
+    calls = []
+    original = PurchasesRepo.search_filter
+    monkeypatch.setattr(PurchasesRepo, "search_filter",
+                        lambda self, *a: calls.append(a) or original(self, *a))
+
+    seen, after = [], None
+    while True:
+        page = repo.page_purchases(query="POSRCH", field="id", sort="purchase_id",
+                                   descending=False, after=after, limit=3)
+        if not page:
+            break
+        seen += [r["purchase_id"] for r in page]
+        after = (page[-1]["purchase_id"], page[-1]["purchase_id"])
+    repo.page_purchases(query="POSRCH", field="id", ids=["POSRCH-0003"], limit=1)
+    assert len(seen) == 8 and len(calls) == 1
+
+    repo.page_purchases(query="POSRCH-0003", field="id")       # a new query probes again
+    assert len(calls) == 2
@@ -0,0 +1,155 @@
+# tests/test_refdata.py
+from __future__ import annotations
+
+import sqlite3
+
+from inventory_management.database.refdata import reference_data
+from inventory_management.database.repositories.customers_repo import CustomersRepo
+from inventory_management.database.repositories.products_repo import ProductsRepo
+from inventory_management.database.repositories.vendors_repo import VendorsRepo
+
+
+class _Counting:
+    """Trace callback counting table queries (PRAGMAs excluded)."""
+
+    def __init__(self) -> None:
+        self.selects = 0
+
+    def __call__(self, sql: str) -> None:
+        if sql.lstrip().upper().startswith("SELECT"):
+            self.selects += 1
+
+
+def test_repeat_reads_hit_memory_outside_transactions(tmp_path):
+    from inventory_management.database import schema
+
+    con = sqlite3.connect(tmp_path / "ref.db")
+    con.row_factory = sqlite3.Row
+    try:
+        schema.apply_schema(con)
+        con.execute("INSERT INTO uoms (unit_name) VALUES ('Box')")
+        con.execute("INSERT INTO products (name, min_stock_level) VALUES ('Crate', 0)")
+        con.commit()
+
+        repo = ProductsRepo(con)
+        assert [u["unit_name"] for u in repo.list_uoms()] == ["Box"]
+
+        counter = _Counting()
+        con.set_trace_callback(counter)
+        for _ in range(5):
+            repo.list_uoms()
+            repo.list_products()
+        con.set_trace_callback(None)
+        # products/product_uoms load once; uoms are already cached
+        assert counter.selects == 2
+    finally:
+        con.close()
+
+
+def test_repository_writes_invalidate(conn):
+    ref = reference_data(conn)
+    repo = ProductsRepo(conn)
+    uom_id = int(conn.execute("INSERT INTO uoms (unit_name) VALUES ('Refdatabox')").lastrowid)
+    assert ref.uom_by_name("refdatabox").uom_id == uom_id
+
+    conn.execute("UPDATE uoms SET unit_name = 'Refdatacrate' WHERE uom_id = ?", (uom_id,))
+    assert ref.uom_by_name("refdatabox") is None
+    assert repo.uom_by_id(uom_id)["unit_name"] == "Refdatacrate"
+
+    pid = int(conn.execute(
+        "INSERT INTO products (name, description, category, min_stock_level) "
+        "VALUES ('Refdata Widget', NULL, 'Misc', 0)"
+    ).lastrowid)
+    assert repo.get(pid).name == "Refdata Widget"
+    assert repo.get_base_uom(pid) is None
+
+    conn.execute(
+        "INSERT INTO product_uoms (product_id, uom_id, is_base, factor_to_base) VALUES (?, ?, 1, 1)",
+        (pid, uom_id),
+    )
+    assert repo.get_base_uom(pid) == {"uom_id": uom_id, "unit_name": "Refdatacrate"}
+    listed = next(p for p in repo.list_products() if p.product_id == pid)
+    assert listed.base_uom_name == "Refdatacrate"
+
+
+def test_parties_and_rollback(conn):
+    customers, vendors = CustomersRepo(conn), VendorsRepo(conn)
+    cid = customers.create(name="Refdata Customer", contact_info="0300", address=None)
+    assert customers.list_customers()[0].customer_id == cid
+    assert reference_data(conn).customer_by_name("refdata customer").id == cid
+
+    conn.execute("SAVEPOINT refdata_sp")
+    vid = int(conn.execute(
+        "INSERT INTO vendors (name, contact_info, address) VALUES ('Refdata Vendor', 'x', NULL)"
+    ).lastrowid)
+    assert vendors.get(vid) is not None
+    conn.execute("ROLLBACK TO refdata_sp")
+    conn.execute("RELEASE refdata_sp")
+    assert vendors.get(vid) is None
+
+
+def test_rolled_back_reads_are_not_cached(tmp_path):
+    # versions read inside a rolled-back transaction come back after the next commit
+    from inventory_management.database import schema
+
+    con = sqlite3.connect(tmp_path / "aba.db")
+    con.row_factory = sqlite3.Row
+    try:
+        schema.apply_schema(con)
+        con.commit()
+        ref = reference_data(con)
+        assert ref.vendors() == ()
+
+        con.execute("INSERT INTO vendors (name, contact_info) VALUES ('Ghost', 'x')")
+        assert [v.name for v in ref.vendors()] == ["Ghost"]
+        con.rollback()
+
+        con.execute("INSERT INTO vendors (name, contact_info) VALUES ('Real', 'x')")
+        con.commit()
+        assert [v.name for v in ref.vendors()] == ["Real"]
+    finally:
+        con.close()
+
+
+def test_registry_does_not_keep_connections_alive():
+    import gc
+    import weakref
+
+    from inventory_management.database import AppConnection
+
+    con = sqlite3.connect(":memory:", factory=AppConnection)
+    assert reference_data(con) is reference_data(con)
+    alive = weakref.ref(con)
+    con.close()
+    del con
+    gc.collect()
+    assert alive() is None
+
+
+def test_connections_to_one_file_share_sections(tmp_path):
+    from inventory_management.database import schema
+    from inventory_management.database.connection_pool import get_provider
+
+    path = tmp_path / "shared.db"
+    con = sqlite3.connect(path)
+    other = sqlite3.connect(path)
+    try:
+        schema.apply_schema(con)
+        con.execute("INSERT INTO vendors (name, contact_info) VALUES ('Shared', 'x')")
+        con.commit()
+        first = reference_data(con).vendors()
+
+        counter = _Counting()
+        other.set_trace_callback(counter)
+        assert reference_data(other).vendors() is first      # no second copy, no table query
+        assert counter.selects == 1                             # the counter check only
+        pooled = get_provider(path).connection()
+        assert reference_data(pooled).vendors() is first
+
+        other.execute("INSERT INTO vendors (name, contact_info) VALUES ('Later', 'x')")
+        other.commit()
+        assert [v.name for v in reference_data(con).vendors()] == ["Later", "Shared"]
+    finally:
+        get_provider(path).close_all()
+        con.close()
+        other.close()
@@ -0,0 +1,132 @@
+# tests/test_report_cache.py
+from __future__ import annotations
+
+import sqlite3
+
+from inventory_management.database.report_cache import ReportCache, report_cache
+from inventory_management.database.repositories.dashboard_repo import DashboardRepo
+
+
+def _open(path) -> sqlite3.Connection:
+    con = sqlite3.connect(path)
+    con.row_factory = sqlite3.Row
+    return con
+
+
+def _report_selects(con: sqlite3.Connection) -> list:
+    """Start tracing SELECTs other than the cache's version check."""
+    seen: list = []
+
+    def trace(sql: str) -> None:
+        if sql.lstrip().upper().startswith("SELECT") and "ref_data_version" not in sql:
+            seen.append(sql)
+
+    con.set_trace_callback(trace)
+    return seen
+
+
+def test_dashboard_results_cached_until_a_write(tmp_path):
+    from inventory_management.database import schema
+
+    db = tmp_path / "reports.db"
+    con = _open(db)
+    other = _open(db)
+    try:
+        schema.apply_schema(con)
+        con.execute("INSERT INTO expense_categories (name) VALUES ('Rent')")
+        con.execute("INSERT INTO expenses (description, amount, date, category_id) VALUES ('May', 100, '2026-05-01', 1)")
+        con.commit()
+
+        repo = DashboardRepo(con)
+        stats0 = report_cache(con).stats()
+        assert repo.expenses_total("2026-05-01", "2026-05-31") == 100.0
+
+        seen = _report_selects(con)
+        for _ in range(3):
+            assert repo.expenses_total("2026-05-01", "2026-05-31") == 100.0
+        assert seen == []
+        assert report_cache(con).stats().hits - stats0.hits == 3
+
+        # a commit from another connection invalidates through the trigger counters
+        other.execute("INSERT INTO expenses (description, amount, date, category_id) VALUES ('May b', 50, '2026-05-02', 1)")
+        other.commit()
+        assert repo.expenses_total("2026-05-01", "2026-05-31") == 150.0
+        assert len(seen) == 1
+
+        # inside an open write transaction nothing is served from (or stored in) the cache
+        con.execute("INSERT INTO expenses (description, amount, date, category_id) VALUES ('May c', 25, '2026-05-03', 1)")
+        assert repo.expenses_total("2026-05-01", "2026-05-31") == 175.0
+        con.rollback()
+        assert repo.expenses_total("2026-05-01", "2026-05-31") == 150.0
+        assert report_cache(con).stats().bypassed - stats0.bypassed == 1
+    finally:
+        con.set_trace_callback(None)
+        con.close()
+        other.close()
+
+
+def test_lru_eviction_and_parameter_normalization():
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE ref_data_version (table_name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)")
+    con.execute("INSERT INTO ref_data_version (table_name) VALUES ('sales')")
+    con.commit()
+    cache = ReportCache(max_entries=2)
+    calls: list = []
+
+    def run(report_id, params):
+        return cache.get_or_compute(con, report_id, params, lambda: calls.append(report_id) or report_id)
+
+    run("a", {"to": "2026-01-31", "from": "2026-01-01"})
+    run("a", {"from": "2026-01-01 ", "to": "2026-01-31"})     # same parameters
+    run("b", [1, 2])
+    run("a", {"from": "2026-01-01", "to": "2026-01-31"})      # a is now most recent
+    run("c", None)                                            # evicts b
+    run("b", (1, 2))
+    assert calls == ["a", "b", "c", "b"]
+
+    s = cache.stats()
+    assert (s.hits, s.misses, s.evictions, s.entries) == (2, 4, 2, 2)
+    con.close()
+
+
+def test_reports_follow_only_their_tables_and_hand_out_copies(tmp_path):
+    from inventory_management.database import schema
+    from inventory_management.database.repositories.inventory_repo import InventoryRepo
+    from inventory_management.database.repositories.reporting_repo import ReportingRepo
+
+    con = _open(tmp_path / "tables.db")
+    try:
+        schema.apply_schema(con)
+        con.execute("INSERT INTO expense_categories (name) VALUES ('Rent')")
+        con.execute("INSERT INTO expenses (description, amount, date, category_id) VALUES ('May', 100, '2026-05-01', 1)")
+        con.commit()
+        repo = ReportingRepo(con)
+        rows = repo.expenses_by_category("2026-05-01", "2026-05-31")
+
+        # callers may sort or extend what they get without touching the cache
+        rows.append("junk")
+        seen = _report_selects(con)
+        again = repo.expenses_by_category("2026-05-01", "2026-05-31")
+        assert len(again) == 1 and seen == []
+
+        # a write to a table the report does not read keeps it cached
+        con.execute("INSERT INTO customers (name, contact_info) VALUES ('Alpha', 'x')")
+        con.commit()
+        repo.expenses_by_category("2026-05-01", "2026-05-31")
+        assert seen == []
+
+        # ledger rows carry no counter triggers; 'stock' moves once per write
+        version = lambda: con.execute("SELECT version FROM ref_data_version WHERE table_name = 'stock'").fetchone()[0]
+        assert not con.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'inventory_transactions' AND name LIKE '%refver%'"
+        ).fetchall()
+        con.execute("INSERT INTO products (product_id, name) VALUES (1, 'Widget')")
+        con.execute("INSERT INTO uoms (uom_id, unit_name) VALUES (1, 'pcs')")
+        con.execute("INSERT INTO product_uoms (product_id, uom_id, is_base, factor_to_base) VALUES (1, 1, 1, 1)")
+        con.commit()
+        before = version()
+        InventoryRepo(con).add_adjustment(product_id=1, uom_id=1, quantity=5, date="2026-05-02")
+        assert version() == before + 1
+    finally:
+        con.set_trace_callback(None)
+        con.close()
@@ -0,0 +1,114 @@
+# tests/test_report_runner.py
+import sqlite3
+import time
+
+import pytest
+
+from inventory_management.database.connection_pool import get_provider, read_snapshot
+from inventory_management.modules.reporting.report_runner import ReportRunner
+
+
+@pytest.fixture()
+def db(tmp_path):
+    path = tmp_path / "reports.db"
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA journal_mode = WAL")
+    con.execute("CREATE TABLE t(x INTEGER)")
+    con.execute("INSERT INTO t VALUES (1)")
+    con.commit()
+    yield path, con
+    con.close()
+    get_provider(path, read_only=True).close_all()
+
+
+def test_reader_is_read_only_and_snapshot_is_stable(db):
+    path, writer = db
+    with read_snapshot(path) as con:
+        assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        writer.execute("INSERT INTO t VALUES (2)")
+        writer.commit()
+        # same read transaction -> same snapshot
+        assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            con.execute("INSERT INTO t VALUES (3)")
+    with read_snapshot(path) as con:
+        assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+
+
+def test_runner_delivers_only_latest_result(qtbot, db):
+    path, writer = db
+    runner = ReportRunner(writer)
+    got = []
+    runner.finished.connect(lambda key, result: got.append((key, result)))
+
+    def slow(con):
+        time.sleep(0.2)
+        return "stale"
+
+    runner.submit("t", slow)
+    with qtbot.waitSignal(runner.finished, timeout=5000):
+        runner.submit("t", lambda con: con.execute("SELECT COUNT(*) FROM t").fetchone()[0])
+    qtbot.wait(400)
+    assert got == [("t", 1)]
+    assert not runner.is_pending("t")
+
+
+def test_runner_reports_errors(qtbot, db):
+    _path, writer = db
+    runner = ReportRunner(writer)
+    with qtbot.waitSignal(runner.error, timeout=5000) as blocker:
+        runner.submit("bad", lambda con: con.execute("SELECT * FROM missing_table").fetchall())
+    assert blocker.args[0] == "bad"
+    assert "missing_table" in blocker.args[1]
+
+
+ENDLESS = "WITH RECURSIVE c(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM c) SELECT MAX(n) FROM c"
+
+
+def test_superseded_query_is_interrupted(qtbot, db):
+    _path, writer = db
+    runner = ReportRunner(writer)
+    got, outcome = [], []
+    runner.finished.connect(lambda key, result: got.append(result))
+    runner.error.connect(lambda key, message: got.append(message))
+
+    def endless(con):
+        try:
+            return con.execute(ENDLESS).fetchone()
+        except sqlite3.OperationalError as e:
+            outcome.append(str(e))
+            raise
+
+    runner.submit("t", endless)
+    qtbot.wait(200)
+    with qtbot.waitSignal(runner.finished, timeout=5000):
+        runner.submit("t", lambda con: con.execute("SELECT COUNT(*) FROM t").fetchone()[0])
+    assert outcome == ["interrupted"]
+    assert got == [1]
+
+
+def test_sections_stream_partials_until_cancelled(qtbot, db):
+    _path, writer = db
+    runner = ReportRunner(writer)
+    partials, progress = [], []
+    runner.partial.connect(lambda key, name, result: partials.append((name, result)))
+    runner.progress.connect(lambda key, done, total, text: progress.append((done, total, text)))
+
+    count = lambda con: con.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+    with qtbot.waitSignal(runner.finished, timeout=5000) as blocker:
+        runner.submit_sections("s", [("a", count), ("b", lambda con: "two")])
+    assert partials == [("a", 1), ("b", "two")]
+    assert progress == [(1, 2, "a"), (2, 2, "b")]
+    assert blocker.args == ["s", {"a": 1, "b": "two"}]
+
+    partials.clear()
+    runner.submit_sections("s", [("a", count), ("slow", lambda con: con.execute(ENDLESS).fetchone())])
+    qtbot.waitUntil(lambda: partials == [("a", 1)], timeout=5000)
+    with qtbot.waitSignal(runner.cancelled, timeout=1000):
+        runner.cancel("s")
+    assert not runner.is_pending("s")
+    # the interrupted reader connection is released for the next job
+    with qtbot.waitSignal(runner.finished, timeout=5000) as blocker:
+        runner.submit("t", count)
+    assert blocker.args == ["t", 1]
+    assert partials == [("a", 1)]
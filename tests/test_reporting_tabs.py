@@ -0,0 +1,88 @@
+# tests/test_reporting_tabs.py
+from __future__ import annotations
+
+from datetime import date
+from importlib import import_module
+import sqlite3
+
+import pytest
+
+from inventory_management.database.connection_pool import get_provider
+from inventory_management.modules.reporting.controller import _TAB_SPECS, ReportingController
+
+
+def _built(ctrl: ReportingController) -> list[bool]:
+    return [p["widget"] is not None for p in ctrl._pages]
+
+
+def test_tabs_are_built_on_first_activation(qtbot, conn):
+    ctrl = ReportingController(conn)
+    root = ctrl.get_widget()
+    qtbot.addWidget(root)
+    assert not any(_built(ctrl))
+
+    root.show()
+    assert _built(ctrl)[0] and not any(_built(ctrl)[1:])
+
+    ctrl.open_sub("customer_aging")
+    assert _built(ctrl)[:2] == [True, True]
+    assert not any(_built(ctrl)[2:])
+
+
+def test_revisits_within_staleness_window_skip_refresh(qtbot, conn):
+    ctrl = ReportingController(conn, stale_after_s=3600)
+    root = ctrl.get_widget()
+    qtbot.addWidget(root)
+    root.show()
+
+    calls = []
+    widget = ctrl._pages[0]["widget"]
+    widget.refresh = lambda: calls.append("refresh")
+
+    ctrl.open_sub("customer_aging")
+    ctrl.open_sub("vendor_aging")
+    assert calls == []
+
+    ctrl.invalidate("vendor_aging")
+    assert calls == ["refresh"]
+
+    ctrl.stale_after_s = 0
+    ctrl.open_sub("customer_aging")
+    ctrl.open_sub("vendor_aging")
+    assert calls == ["refresh", "refresh"]
+
+
+@pytest.fixture()
+def report_db(tmp_path):
+    from inventory_management.database import schema
+
+    path = tmp_path / "reports.db"
+    con = sqlite3.connect(path)
+    con.row_factory = sqlite3.Row
+    schema.apply_schema(con)
+    con.execute("INSERT INTO expense_categories (name) VALUES ('Rent')")
+    con.execute(
+        "INSERT INTO expenses (description, amount, date, category_id) VALUES ('Office', 120, ?, 1)",
+        (date.today().isoformat(),),
+    )
+    con.commit()
+    yield con
+    con.close()
+    get_provider(path, read_only=True).close_all()
+
+
+@pytest.mark.parametrize("spec", _TAB_SPECS, ids=lambda s: s[0])
+def test_tabs_load_through_the_report_runner(qtbot, report_db, spec):
+    _key, _title, module_path, class_name, _msg, _loads_itself = spec
+    tab = getattr(import_module(module_path), class_name)(report_db)
+    qtbot.addWidget(tab)
+    runners = [w._runner for w in getattr(tab, "_sources", [tab])]
+    errors = []
+    for runner in runners:
+        runner.error.connect(lambda key, message: errors.append((key, message)))
+    tab.refresh()
+    qtbot.waitUntil(lambda: not any(r._latest for r in runners), timeout=5000)
+    assert errors == []
+    if class_name == "ExpenseReportsTab":
+        assert tab.model_summary.rowCount() == 1
+        assert tab.lbl_total.text().endswith("120.00")
@@ -0,0 +1,120 @@
+# tests/test_sales_facts.py
+import pytest
+
+from inventory_management.database.reconcile import rebuild_sales_facts, verify_sales_facts
+from inventory_management.database.repositories.reporting_repo import ReportingRepo
+
+DAY = "2031-03-05"
+RANGE = ("2031-03-01", "2031-03-31")
+
+
+def _setup(conn):
+    cid = conn.execute(
+        "INSERT INTO customers(name, contact_info) VALUES ('Facts Customer', 'n/a')"
+    ).lastrowid
+    uom = conn.execute("INSERT INTO uoms(unit_name) VALUES ('facts-each')").lastrowid
+    pids = []
+    for name, category in (("Facts Bolt", "Facts Hardware"), ("Facts Glue", None)):
+        pid = conn.execute(
+            "INSERT INTO products(name, category) VALUES (?, ?)", (name, category)
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO product_uoms(product_id, uom_id, is_base, factor_to_base) VALUES (?, ?, 1, 1)",
+            (pid, uom),
+        )
+        pids.append(pid)
+    return cid, uom, pids
+
+
+def _sale(conn, sale_id, cid, total, *, discount=0.0, doc_type="sale"):
+    conn.execute(
+        """
+        INSERT INTO sales(sale_id, customer_id, date, total_amount, order_discount,
+                          payment_status, doc_type, quotation_status)
+        VALUES (?, ?, ?, ?, ?, 'unpaid', ?, ?)
+        """,
+        (sale_id, cid, DAY, total, discount, doc_type, "draft" if doc_type == "quotation" else None),
+    )
+
+
+def _item(conn, sale_id, pid, uom, qty, price, cost=None):
+    item_id = conn.execute(
+        "INSERT INTO sale_items(sale_id, product_id, quantity, uom_id, unit_price) VALUES (?, ?, ?, ?, ?)",
+        (sale_id, pid, qty, uom, price),
+    ).lastrowid
+    if cost is not None:
+        conn.execute(
+            """
+            INSERT INTO sale_item_cogs(item_id, sale_id, product_id, sale_date, qty_base, unit_cost_base, cogs_value)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (item_id, sale_id, pid, DAY, qty, cost, qty * cost),
+        )
+    return item_id
+
+
+def test_facts_follow_sale_writes(conn):
+    cid, uom, (bolt, glue) = _setup(conn)
+    repo = ReportingRepo(conn)
+
+    _sale(conn, "SO-FACTS-1", cid, 90.0, discount=10.0)
+    _item(conn, "SO-FACTS-1", bolt, uom, 4, 20.0, cost=12.0)
+    glue_item = _item(conn, "SO-FACTS-1", glue, uom, 1, 20.0, cost=5.0)
+    _sale(conn, "QO-FACTS-1", cid, 40.0, doc_type="quotation")
+    _item(conn, "QO-FACTS-1", bolt, uom, 2, 20.0)
+    assert verify_sales_facts(conn) == []
+
+    [row] = repo.sales_by_customer(*RANGE, None, cid, None, None)
+    assert (row["order_count"], row["revenue"], row["cogs"]) == (1, pytest.approx(90.0), pytest.approx(53.0))
+    [row] = repo.sales_by_period(*RANGE, "monthly", None, cid, None, None)
+    assert (row["period"], row["order_count"]) == ("2031-03", 1)
+
+    # product / category filters report the matching lines
+    [row] = repo.sales_by_period(*RANGE, "daily", None, cid, bolt, None)
+    assert row["revenue"] == pytest.approx(80.0)
+    [row] = repo.margin_by_period(*RANGE, "daily", None, cid, None, "Facts Hardware")
+    assert row["cogs"] == pytest.approx(48.0)
+
+    # payment status is a report filter, so status changes move the rows
+    conn.execute("UPDATE sales SET payment_status='paid', paid_amount=90 WHERE sale_id='SO-FACTS-1'")
+    assert repo.sales_by_customer(*RANGE, ["unpaid"], cid, None, None) == []
+    assert len(repo.sales_by_customer(*RANGE, ["paid"], cid, None, None)) == 1
+
+    # line edits, quotation conversion and deletion
+    conn.execute("DELETE FROM sale_items WHERE item_id=?", (glue_item,))
+    conn.execute("DELETE FROM sale_item_cogs WHERE item_id=?", (glue_item,))
+    conn.execute(
+        "UPDATE sales SET doc_type='sale', quotation_status=NULL WHERE sale_id='QO-FACTS-1'"
+    )
+    assert verify_sales_facts(conn) == []
+    products = {r["product_name"]: r for r in repo.sales_by_product(*RANGE, None, cid, None, None)}
+    assert set(products) == {"Facts Bolt"}
+    assert products["Facts Bolt"]["qty_base"] == pytest.approx(6.0)
+
+    conn.execute("DELETE FROM sale_item_cogs WHERE sale_id='SO-FACTS-1'")
+    conn.execute("DELETE FROM sales WHERE sale_id='SO-FACTS-1'")
+    assert verify_sales_facts(conn) == []
+    [row] = repo.sales_by_customer(*RANGE, None, cid, None, None)
+    assert (row["order_count"], row["revenue"]) == (1, pytest.approx(40.0))
+
+
+def test_category_change_and_rebuild(conn):
+    cid, uom, (bolt, _glue) = _setup(conn)
+    _sale(conn, "SO-FACTS-2", cid, 60.0)
+    _item(conn, "SO-FACTS-2", bolt, uom, 3, 20.0, cost=10.0)
+
+    conn.execute("UPDATE products SET category='Facts Fasteners' WHERE product_id=?", (bolt,))
+    repo = ReportingRepo(conn)
+    cats = [r["category"] for r in repo.sales_by_category(*RANGE, None, cid, None, None)]
+    assert cats == ["Facts Fasteners"]
+
+    conn.execute(
+        "UPDATE fact_sales_daily SET revenue = revenue + 7 WHERE product_id=? AND customer_id=?",
+        (bolt, cid),
+    )
+    drift = verify_sales_facts(conn)
+    assert len(drift) == 1
+    assert drift[0].stored_revenue - drift[0].expected_revenue == pytest.approx(7.0)
+
+    rebuild_sales_facts(conn)
+    assert verify_sales_facts(conn) == []
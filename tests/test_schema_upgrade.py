@@ -0,0 +1,73 @@
+# tests/test_schema_upgrade.py
+import sqlite3
+
+from inventory_management.constants import TABLE_SCHEMA_VERSION
+from inventory_management.database import schema
+from inventory_management.database.seeders.default_data import SEED_VERSION
+from inventory_management.database.upgrade import ensure_current, schema_status
+
+
+def _open(path):
+    con = sqlite3.connect(path)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA foreign_keys = ON;")
+    return con
+
+
+def test_fresh_db_applied_once_then_skipped(tmp_path):
+    con = _open(tmp_path / "fresh.db")
+    try:
+        assert ensure_current(con) is True
+        status = schema_status(con)
+        assert status.schema_hash == schema.SCHEMA_FINGERPRINT
+        assert status.seed_version == SEED_VERSION
+        assert con.execute("SELECT COUNT(*) FROM users").fetchone()[0] > 0
+
+        assert ensure_current(con) is False
+        assert ensure_current(con, force=True) is True
+    finally:
+        con.close()
+
+
+def test_stale_fingerprint_or_seed_triggers_upgrade(tmp_path):
+    con = _open(tmp_path / "stale.db")
+    try:
+        ensure_current(con)
+        con.execute(f"UPDATE {TABLE_SCHEMA_VERSION} SET schema_hash = 'old' WHERE id = 1")
+        con.commit()
+        assert ensure_current(con) is True
+        assert schema_status(con).schema_current
+
+        con.execute("DELETE FROM users")
+        con.execute(f"UPDATE {TABLE_SCHEMA_VERSION} SET seed_version = 0 WHERE id = 1")
+        con.commit()
+        assert ensure_current(con) is False          # DDL untouched, seeds re-run
+        assert con.execute("SELECT COUNT(*) FROM users").fetchone()[0] > 0
+        assert schema_status(con).seed_current
+    finally:
+        con.close()
+
+
+def test_legacy_meta_table_is_upgraded(tmp_path):
+    con = _open(tmp_path / "legacy.db")
+    try:
+        con.execute(f"CREATE TABLE {TABLE_SCHEMA_VERSION}(id INTEGER PRIMARY KEY CHECK (id=1), version TEXT NOT NULL)")
+        con.execute(f"INSERT INTO {TABLE_SCHEMA_VERSION}(id, version) VALUES (1, 'v3')")
+        con.commit()
+        assert schema_status(con).schema_hash is None
+        assert ensure_current(con) is True
+        assert schema_status(con).schema_current
+    finally:
+        con.close()
+
+
+def test_fingerprint_tracks_migration_bodies():
+    def _ensure_example(conn):
+        conn.execute("SELECT 1")
+
+    before = schema._schema_fingerprint("CREATE TABLE x(a);", [_ensure_example])
+
+    def _ensure_example(conn):  # noqa: F811 - same name, edited body
+        conn.execute("SELECT 2")
+
+    assert schema._schema_fingerprint("CREATE TABLE x(a);", [_ensure_example]) != before
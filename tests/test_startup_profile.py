@@ -0,0 +1,53 @@
+# tests/test_startup_profile.py
+from __future__ import annotations
+
+import json
+import sqlite3
+
+from inventory_management.utils import startup_profile
+from inventory_management.utils.startup_profile import StartupProfiler
+
+
+def test_disabled_profiler_records_nothing():
+    prof = StartupProfiler()
+    with prof.phase("x"):
+        pass
+    with prof.module_build("M") as build:
+        build.imported()
+    prof.mark("y")
+    assert prof.events == []
+    assert prof.write() is None
+
+
+def test_module_build_splits_import_construct_and_first_query(tmp_path):
+    prof = StartupProfiler()
+    prof.enable(tmp_path / "timeline.json")
+    con = sqlite3.connect(":memory:")
+    with prof.module_build("Sales", con) as build:
+        build.imported()
+        con.execute("SELECT 1").fetchone()
+        con.execute("SELECT 2").fetchone()
+    with prof.phase("db.connect", note="n"):
+        pass
+
+    module, phase = prof.events
+    assert module["kind"] == "module" and module["name"] == "Sales" and module["ok"]
+    assert module["queries"] == 2
+    assert module["first_query_ms"] is not None and module["first_query_ms"] <= module["construct_ms"]
+    assert phase["name"] == "db.connect" and phase["note"] == "n"
+
+    path = prof.write(final=True)
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["final"] is True
+    assert [e["name"] for e in data["events"]] == ["Sales", "db.connect"]
+
+
+def test_configure_from_strips_flags(monkeypatch, tmp_path):
+    monkeypatch.delenv(startup_profile.ENV_PROFILE, raising=False)
+    monkeypatch.delenv(startup_profile.ENV_CPROFILE, raising=False)
+    monkeypatch.setattr(startup_profile, "PROFILER", StartupProfiler())
+    target = tmp_path / "out.json"
+    rest = startup_profile.configure_from(["app", f"--profile-startup={target}", "-style", "fusion"], tmp_path)
+    assert rest == ["app", "-style", "fusion"]
+    assert startup_profile.PROFILER.enabled
+    assert startup_profile.PROFILER.path == target
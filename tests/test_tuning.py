@@ -0,0 +1,54 @@
+# tests/test_tuning.py
+import sqlite3
+
+import pytest
+
+from inventory_management.database import tuning
+
+
+def test_apply_profile_sets_pragmas(tmp_path):
+    con = sqlite3.connect(tmp_path / "t.db")
+    try:
+        tuning.apply_profile(con, "reporting")
+        eff = tuning.effective_settings(con)
+        assert eff["journal_mode"] == "wal"
+        assert eff["cache_size"] == -131072
+        assert eff["temp_store"] == 2          # MEMORY
+        assert eff["foreign_keys"] == 1
+    finally:
+        con.close()
+
+
+def test_read_only_variant_skips_journal_mode_and_adds_query_only():
+    pragmas = dict(tuning.get_profile("reporting").pragmas_for(read_only=True))
+    assert "journal_mode" not in pragmas
+    assert pragmas["query_only"] == "ON"
+
+
+def test_profile_selection_env_and_fallback(monkeypatch):
+    monkeypatch.setenv(tuning.ENV_PROFILE, "bulk_import")
+    assert tuning.active_profile_name() == "bulk_import"
+    monkeypatch.setenv(tuning.ENV_PROFILE, "no-such-profile")
+    assert tuning.active_profile_name() == tuning.DEFAULT_PROFILE
+    monkeypatch.delenv(tuning.ENV_PROFILE)
+    assert tuning.reader_profile_name() == "reporting"
+    with pytest.raises(ValueError):
+        tuning.get_profile("nope")
+
+
+def test_cache_summary_and_limits(tmp_path):
+    con = sqlite3.connect(tmp_path / "c.db")
+    try:
+        con.execute("CREATE TABLE t(x)")
+        con.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(1000)])
+        con.commit()
+        tuning.apply_profile(con, "reporting")
+        summary = tuning.cache_summary(con)
+        assert summary["cache_capacity_bytes"] == 131072 * 1024
+        assert summary["database_pages"] > 0
+        if not hasattr(con, "getlimit"):
+            pytest.skip("Connection.setlimit needs Python 3.11+")
+        assert summary["worker_threads_limit"] == con.getlimit(sqlite3.SQLITE_LIMIT_WORKER_THREADS)
+        assert 0 < summary["worker_threads_limit"] <= 4
+    finally:
+        con.close()
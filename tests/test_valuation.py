@@ -0,0 +1,332 @@
+# tests/test_valuation.py
+import pytest
+
+from inventory_management.database.repositories.purchases_repo import (
+    PurchasesRepo, PurchaseHeader, PurchaseItem
+)
+from inventory_management.database.repositories.sales_repo import (
+    SalesRepo, SaleHeader, SaleItem
+)
+from inventory_management.database.valuation import (
+    ValuationState, apply_transaction, load_state,
+    drain_dirty, pending_repairs, replay_product_tail,
+)
+
+
+def _header(pid: str, vendor_id: int, date: str) -> PurchaseHeader:
+    return PurchaseHeader(
+        purchase_id=pid, vendor_id=vendor_id, date=date,
+        total_amount=0.0, order_discount=0.0, payment_status="unpaid",
+        paid_amount=0.0, advance_payment_applied=0.0, notes=None, created_by=None,
+    )
+
+
+def _purchase(conn, ids, pid: str, date: str, qty: float, price: float, product_key="prod_A"):
+    PurchasesRepo(conn).create_purchase(
+        _header(pid, ids["vendor_id"], date),
+        [PurchaseItem(None, pid, ids[product_key], qty, ids["uom_piece"], price, price, 0.0)],
+    )
+
+
+def _sale(conn, ids, sid: str, date: str, qty: float) -> int:
+    # posts through SalesRepo internals: create_sale() commits, the fixture must roll back
+    repo = SalesRepo(conn)
+    customer_id = conn.execute(
+        "INSERT INTO customers(name, contact_info) VALUES ('Valuation Test', 'n/a')"
+    ).lastrowid
+    repo._insert_header(SaleHeader(
+        sale_id=sid, customer_id=customer_id, date=date, total_amount=0.0,
+        order_discount=0.0, payment_status="unpaid", paid_amount=0.0,
+        advance_payment_applied=0.0, notes=None, created_by=None,
+    ))
+    item_id = repo._insert_item(SaleItem(None, sid, ids["prod_A"], qty, ids["uom_piece"], 1.0, 0.0))
+    repo._insert_inventory_sale(
+        item_id=item_id, product_id=ids["prod_A"], uom_id=ids["uom_piece"], qty=qty,
+        sid=sid, date=date, created_by=None, notes=None,
+    )
+    return item_id
+
+
+def _adjust(conn, ids, date: str, qty: float, uom_key="uom_piece"):
+    conn.execute(
+        """
+        INSERT INTO inventory_transactions(product_id, quantity, uom_id, transaction_type, date)
+        VALUES (?, ?, ?, 'adjustment', ?)
+        """,
+        (ids["prod_A"], qty, ids[uom_key], date),
+    )
+
+
+def test_state_tracks_moving_average(conn, ids):
+    before = load_state(conn, ids["prod_A"])
+    _purchase(conn, ids, "PO-VAL-0001", "2031-01-05", 10, 100.0)
+    _purchase(conn, ids, "PO-VAL-0002", "2031-01-06", 10, 200.0)
+
+    expected = before
+    for qty, price, date in ((10, 100.0, "2031-01-05"), (10, 200.0, "2031-01-06")):
+        expected = apply_transaction(
+            expected, transaction_type="purchase", qty_base=qty, unit_cost=price, date=date
+        )
+
+    state = load_state(conn, ids["prod_A"])
+    assert state.quantity == pytest.approx(expected.quantity)
+    assert state.unit_value == pytest.approx(expected.unit_value)
+    assert state.total_value == pytest.approx(expected.total_value)
+    assert state.last_valuation_date == "2031-01-06"
+
+    # state points at the history row it was produced from
+    last = conn.execute(
+        "SELECT valuation_id, CAST(quantity AS REAL) AS q FROM stock_valuation_history "
+        "WHERE product_id=? ORDER BY valuation_id DESC LIMIT 1",
+        (ids["prod_A"],),
+    ).fetchone()
+    assert state.last_valuation_id == last["valuation_id"]
+    assert state.quantity == pytest.approx(last["q"])
+
+
+def test_alternate_uom_converted_to_base(conn, ids):
+    before = load_state(conn, ids["prod_A"])
+    _adjust(conn, ids, "2031-02-01", 2, uom_key="uom_box")  # Box = 10 pieces
+    assert load_state(conn, ids["prod_A"]).quantity == pytest.approx(before.quantity + 20.0)
+
+
+def test_backdated_insert_marks_dirty_and_keeps_frontier(conn, ids):
+    _purchase(conn, ids, "PO-VAL-0003", "2031-03-20", 5, 50.0)
+    _purchase(conn, ids, "PO-VAL-0004", "2031-03-10", 5, 70.0)
+
+    dirty = conn.execute(
+        "SELECT earliest_impacted FROM valuation_dirty WHERE product_id=?", (ids["prod_A"],)
+    ).fetchone()
+    assert dirty is not None and dirty["earliest_impacted"] <= "2031-03-10"
+    assert load_state(conn, ids["prod_A"]).last_valuation_date == "2031-03-20"
+
+
+def test_delete_reverses_on_hand_quantity(conn, ids):
+    before = load_state(conn, ids["prod_A"])
+    _purchase(conn, ids, "PO-VAL-0005", "2031-04-01", 8, 10.0)
+    PurchasesRepo(conn).delete_purchase("PO-VAL-0005")
+    assert load_state(conn, ids["prod_A"]).quantity == pytest.approx(before.quantity)
+
+
+def test_apply_transaction_outbound_keeps_unit_cost():
+    s = ValuationState(product_id=1, quantity=10.0, unit_value=5.0, total_value=50.0)
+    s2 = apply_transaction(s, transaction_type="sale", qty_base=4)
+    assert (s2.quantity, s2.unit_value, s2.total_value) == (6.0, 5.0, 30.0)
+
+
+def _history(conn, product_id):
+    return [
+        (r[0], round(r[1], 6), round(r[2], 6))
+        for r in conn.execute(
+            "SELECT valuation_date, CAST(quantity AS REAL), CAST(unit_value AS REAL) "
+            "FROM stock_valuation_history WHERE product_id=? "
+            "ORDER BY valuation_date, valuation_id",
+            (product_id,),
+        )
+    ]
+
+
+def test_drain_dirty_replays_backdated_tail(conn, ids):
+    pid = ids["prod_A"]
+    _purchase(conn, ids, "PO-VAL-0006", "2032-01-20", 10, 30.0)
+    _adjust(conn, ids, "2032-01-25", -4)
+    _purchase(conn, ids, "PO-VAL-0007", "2032-01-10", 10, 10.0)   # back-dated
+    assert pending_repairs(conn) >= 1
+
+    prior = conn.execute(
+        "SELECT CAST(quantity AS REAL), CAST(unit_value AS REAL), CAST(total_value AS REAL) "
+        "FROM stock_valuation_history WHERE product_id=? AND valuation_date < '2032-01-10' "
+        "ORDER BY valuation_date DESC, valuation_id DESC LIMIT 1",
+        (pid,),
+    ).fetchone()
+    expected = ValuationState(product_id=pid)
+    if prior is not None:
+        expected = ValuationState(pid, prior[0], prior[1], prior[2])
+    for ttype, qty, cost, date in (
+        ("purchase", 10, 10.0, "2032-01-10"),
+        ("purchase", 10, 30.0, "2032-01-20"),
+        ("adjustment", -4, None, "2032-01-25"),
+    ):
+        expected = apply_transaction(expected, transaction_type=ttype, qty_base=qty,
+                                     unit_cost=cost, date=date)
+
+    seen = []
+    stats = drain_dirty(conn, batch_size=1, on_progress=lambda s: seen.append(s.products_done))
+    assert pending_repairs(conn) == 0
+    assert stats.products_done >= 1 and stats.rows_written >= 3 and not stats.failed
+    assert seen and seen[-1] == stats.products_done
+
+    state = load_state(conn, pid)
+    assert state.quantity == pytest.approx(expected.quantity)
+    assert state.unit_value == pytest.approx(expected.unit_value)
+    assert state.last_valuation_date == "2032-01-25"
+
+    tail = [h for h in _history(conn, pid) if h[0] >= "2032-01-10"]
+    assert [h[0] for h in tail] == ["2032-01-10", "2032-01-20", "2032-01-25"]
+    assert tail[-1][1] == pytest.approx(expected.quantity)
+    assert tail[-1][2] == pytest.approx(expected.unit_value)
+
+
+def test_replay_product_tail_is_idempotent(conn, ids):
+    pid = ids["prod_A"]
+    _purchase(conn, ids, "PO-VAL-0008", "2032-02-01", 3, 12.0)
+    replay_product_tail(conn, pid, "2032-02-01")
+    first = _history(conn, pid)
+    replay_product_tail(conn, pid, "2032-02-01")
+    assert _history(conn, pid) == first
+
+
+def test_vectorized_rebuild_matches_step_function():
+    np = pytest.importorskip("numpy")
+    from inventory_management.modules.inventory.valuation_rebuild import compute_valuation
+
+    ledger_rows = [
+        (1, "2033-01-01", "purchase", 10.0, 5.0),
+        (1, "2033-01-02", "sale", 4.0, None),
+        (1, "2033-01-03", "purchase", 6.0, 8.0),
+        (1, "2033-01-04", "sale", 20.0, None),      # goes negative
+        (1, "2033-01-05", "purchase", 2.0, 9.0),    # q0+dq <= 0 -> cost resets
+        (2, "2033-01-01", "adjustment", 3.0, None),
+        (2, "2033-01-02", "purchase", 1.0, 4.0),
+    ]
+    pid, date, ttype, qty, cost = zip(*ledger_rows)
+    out = compute_valuation({
+        "product_id": np.asarray(pid, dtype=np.int64),
+        "date": np.asarray(date, dtype=object),
+        "transaction_type": np.asarray(ttype, dtype=object),
+        "qty_base": np.asarray(qty, dtype=np.float64),
+        "unit_cost": np.asarray([np.nan if c is None else c for c in cost], dtype=np.float64),
+    })
+
+    states = {}
+    for i, (p, d, t, q, c) in enumerate(ledger_rows):
+        s = apply_transaction(states.get(p, ValuationState(product_id=p)),
+                              transaction_type=t, qty_base=q, unit_cost=c, date=d)
+        states[p] = s
+        assert out["quantity"][i] == pytest.approx(s.quantity)
+        assert out["unit_value"][i] == pytest.approx(s.unit_value)
+        assert out["total_value"][i] == pytest.approx(s.total_value)
+
+
+def test_vectorized_rebuild_matches_python_path_exactly():
+    np = pytest.importorskip("numpy")
+    import random
+    from inventory_management.modules.inventory.valuation_rebuild import (
+        _compute_valuation_py, compute_valuation,
+    )
+
+    rng = random.Random(7)
+    rows = []
+    for p in range(1, 6):                       # fractional quantities, products back to back
+        on_hand = 0.0
+        for _ in range(300):
+            if on_hand > 0 and rng.random() < 0.5:
+                q = on_hand if rng.random() < 0.2 else round(rng.uniform(0.1, on_hand), 3)
+                rows.append((p, "sale", q, None))
+                on_hand -= q
+            else:
+                q = round(rng.uniform(0.1, 3.0), 3)
+                rows.append((p, "purchase", q, round(rng.uniform(1.0, 20.0), 2)))
+                on_hand += q
+    pid, ttype, qty, cost = zip(*rows)
+    ledger = {
+        "product_id": np.asarray(pid, dtype=np.int64),
+        "transaction_type": np.asarray(ttype, dtype=object),
+        "qty_base": np.asarray(qty, dtype=np.float64),
+        "unit_cost": np.asarray([np.nan if c is None else c for c in cost], dtype=np.float64),
+    }
+
+    fast, slow = compute_valuation(ledger), _compute_valuation_py(ledger)
+    for k in ("quantity", "unit_value", "total_value"):
+        assert fast[k].tolist() == slow[k]
+
+
+def test_sale_item_cogs_posted_and_recosted_by_repair(conn, ids):
+    _purchase(conn, ids, "PO-VAL-0009", "2033-05-01", 10, 100.0)
+    item_id = _sale(conn, ids, "SO-VAL-0001", "2033-05-10", 4)
+
+    row = conn.execute("SELECT * FROM sale_item_cogs WHERE item_id=?", (item_id,)).fetchone()
+    unit = load_state(conn, ids["prod_A"]).unit_value
+    assert row["qty_base"] == pytest.approx(4.0)
+    assert row["unit_cost_base"] == pytest.approx(unit)
+    assert row["cogs_value"] == pytest.approx(4.0 * unit)
+
+    # back-dated purchase before the sale moves its cost once the tail is replayed
+    _purchase(conn, ids, "PO-VAL-0010", "2033-05-05", 10, 300.0)
+    drain_dirty(conn)
+    at_sale = conn.execute(
+        "SELECT CAST(unit_value AS REAL) FROM stock_valuation_history "
+        "WHERE product_id=? AND valuation_date <= '2033-05-10' "
+        "ORDER BY valuation_date DESC, valuation_id DESC LIMIT 1",
+        (ids["prod_A"],),
+    ).fetchone()[0]
+    row = conn.execute("SELECT * FROM sale_item_cogs WHERE item_id=?", (item_id,)).fetchone()
+    assert row["unit_cost_base"] == pytest.approx(at_sale)
+    assert row["unit_cost_base"] > unit
+
+    conn.execute("DELETE FROM inventory_transactions WHERE reference_table='sales' AND reference_id='SO-VAL-0001'")
+    conn.execute("DELETE FROM sale_items WHERE sale_id='SO-VAL-0001'")
+    assert conn.execute("SELECT 1 FROM sale_item_cogs WHERE item_id=?", (item_id,)).fetchone() is None
+
+
+def _file_db(path):
+    """Fresh schema in a file DB (for work that commits or runs on other connections)."""
+    import sqlite3
+    from inventory_management.database import schema
+
+    con = sqlite3.connect(path)
+    con.row_factory = sqlite3.Row
+    schema.apply_schema(con)
+    vid = con.execute("INSERT INTO vendors(name, contact_info) VALUES ('Repair Vendor', 'n/a')").lastrowid
+    uom = con.execute("INSERT INTO uoms(unit_name) VALUES ('repair-each')").lastrowid
+    prod = con.execute("INSERT INTO products(name) VALUES ('Repair Widget')").lastrowid
+    con.execute(
+        "INSERT INTO product_uoms(product_id, uom_id, is_base, factor_to_base) VALUES (?, ?, 1, 1)", (prod, uom)
+    )
+    return con, {"vendor_id": vid, "uom_piece": uom, "prod_A": prod}
+
+
+def test_rebuild_without_numpy_matches_posted_history(monkeypatch, tmp_path):
+    from inventory_management.modules.inventory import valuation_rebuild
+
+    path = tmp_path / "rebuild.db"
+    con, ids = _file_db(path)
+    prod = ids["prod_A"]
+    _purchase(con, ids, "PO-RB-1", "2033-03-01", 10, 5.0)
+    item_id = _sale(con, ids, "SO-RB-1", "2033-03-02", 4)
+    _purchase(con, ids, "PO-RB-2", "2033-03-03", 6, 8.0)
+    _adjust(con, ids, "2033-03-04", 2)
+    con.commit()
+    posted = _history(con, prod)
+    cogs = con.execute("SELECT unit_cost_base FROM sale_item_cogs WHERE item_id=?", (item_id,)).fetchone()[0]
+
+    monkeypatch.setattr(valuation_rebuild, "np", None)
+    stats = valuation_rebuild.rebuild_valuation(path)
+
+    assert stats.rows == len(posted) == 4
+    assert _history(con, prod) == posted
+    assert load_state(con, prod).quantity == pytest.approx(14.0)
+    assert con.execute(
+        "SELECT unit_cost_base FROM sale_item_cogs WHERE item_id=?", (item_id,)
+    ).fetchone()[0] == pytest.approx(cogs)
+    con.close()
+
+
+def test_backdated_purchase_schedules_background_repair(qtbot, tmp_path):
+    from inventory_management.modules.inventory.valuation_repair import repair_job_for, schedule_repair
+
+    path = tmp_path / "repair.db"
+    con, ids = _file_db(path)
+    prod = ids["prod_A"]
+    _purchase(con, ids, "PO-REP-1", "2032-02-20", 5, 20.0)
+    con.commit()
+    assert not schedule_repair(con)            # nothing pending
+
+    _purchase(con, ids, "PO-REP-2", "2032-02-10", 5, 10.0)   # back-dated
+    con.commit()
+    job = repair_job_for(str(path))
+    with qtbot.waitSignal(job.finished, timeout=10000):
+        assert schedule_repair(con)
+    assert pending_repairs(con) == 0
+    assert load_state(con, prod).unit_value == pytest.approx(15.0)
+    con.close()
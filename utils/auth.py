@@ -6,6 +6,8 @@ import hmac
 import hashlib
 from typing import Union, Tuple, Optional, Callable
 
+from . import startup_profile
+
 try:
     import bcrypt  # optional but recommended
 except Exception:  # pragma: no cover
@@ -150,10 +152,12 @@ def verify_password(password: str, stored_hash: Union[str, bytes]) -> bool:
 
     # Route by prefix
     if stored_hash.startswith(_PBKDF2_PREFIX):
-        return _verify_pbkdf2(password, stored_hash)
+        with startup_profile.phase("auth.verify", scheme="pbkdf2"):
+            return _verify_pbkdf2(password, stored_hash)
 
     if stored_hash.startswith("$2a$") or stored_hash.startswith("$2b$") or stored_hash.startswith("$2y$"):
-        return _verify_bcrypt(password, stored_hash)
+        with startup_profile.phase("auth.verify", scheme="bcrypt"):
+            return _verify_bcrypt(password, stored_hash)
 
     # Unknown scheme
     return False
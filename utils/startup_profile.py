@@ -0,0 +1,239 @@
+# inventory_management/utils/startup_profile.py
+"""
+Startup timeline profiler.
+
+Off by default. Enable with env APP_STARTUP_PROFILE=1 (or a file path) or the
+`--profile-startup[=PATH]` flag on main.main(); add APP_STARTUP_CPROFILE=1 /
+`--profile-startup-cprofile` for a cProfile dump of the same window.
+
+Events are monotonic offsets (ms) from when this module was first imported,
+which main.py does before anything else:
+
+    phase   : {"kind": "phase", "name", "start_ms", "dur_ms", ...}
+    mark    : {"kind": "mark", "name", "t_ms", ...}
+    module  : {"kind": "module", "name", "start_ms", "import_ms",
+               "construct_ms", "first_query_ms", "queries", "ok"}
+
+`first_query_ms` is the offset of the first SQL statement the controller ran
+while being constructed (from the start of construction), via the
+connection's trace callback; `queries` is how many statements it ran.
+
+When disabled every hook is a flag check (phase() hands back a shared null
+context), so the calls can stay in place. When enabled the cost is one dict
+per event; the JSON is written on first idle and again at exit so lazily
+built and pre-warmed modules show up too.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+ENV_PROFILE = "APP_STARTUP_PROFILE"
+ENV_CPROFILE = "APP_STARTUP_CPROFILE"
+FLAG_PROFILE = "--profile-startup"
+FLAG_CPROFILE = "--profile-startup-cprofile"
+DEFAULT_FILE_NAME = "startup_profile.json"
+MAX_EVENTS = 5000
+
+_T0 = time.monotonic()
+_NULL = nullcontext()
+
+
+def _ms(t: float) -> float:
+    return round((t - _T0) * 1000.0, 3)
+
+
+class _ModuleBuild:
+    """Handle yielded by StartupProfiler.module_build()."""
+
+    __slots__ = ("imported_at", "first_query_at", "queries")
+
+    def __init__(self) -> None:
+        self.imported_at: Optional[float] = None
+        self.first_query_at: Optional[float] = None
+        self.queries = 0
+
+    def imported(self) -> None:
+        self.imported_at = time.monotonic()
+
+    def _trace(self, _statement: str) -> None:
+        if self.first_query_at is None:
+            self.first_query_at = time.monotonic()
+        self.queries += 1
+
+
+class _NullBuild:
+    __slots__ = ()
+
+    def imported(self) -> None:
+        pass
+
+
+_NULL_BUILD = _NullBuild()
+
+
+class StartupProfiler:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.path: Optional[Path] = None
+        self.cprofile_path: Optional[Path] = None
+        self.events: List[dict] = []
+        self._cprofile = None
+
+    # ---- control ----
+    def enable(self, path: Path | str, *, cprofile: bool = False) -> None:
+        self.enabled = True
+        self.path = Path(path)
+        if cprofile and self._cprofile is None:
+            import cProfile
+
+            self.cprofile_path = self.path.with_suffix(".prof")
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def _add(self, event: dict) -> None:
+        if len(self.events) < MAX_EVENTS:
+            self.events.append(event)
+
+    # ---- hooks ----
+    def mark(self, name: str, **fields) -> None:
+        if self.enabled:
+            self._add({"kind": "mark", "name": name, "t_ms": _ms(time.monotonic()), **fields})
+
+    def phase(self, name: str, **fields):
+        """Context manager timing one startup phase."""
+        if not self.enabled:
+            return _NULL
+        return self._phase(name, fields)
+
+    @contextmanager
+    def _phase(self, name: str, fields: dict) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+            self._add({
+                "kind": "phase", "name": name, "start_ms": _ms(start),
+                "dur_ms": round((end - start) * 1000.0, 3), **fields,
+            })
+
+    @contextmanager
+    def module_build(self, title: str, conn: Optional[sqlite3.Connection] = None):
+        """
+        Time one module build. Call `.imported()` on the yielded handle between
+        importing the controller class and constructing it.
+        """
+        if not self.enabled:
+            yield _NULL_BUILD
+            return
+        build = _ModuleBuild()
+        traced = isinstance(conn, sqlite3.Connection)
+        if traced:
+            conn.set_trace_callback(build._trace)
+        start = time.monotonic()
+        ok = False
+        try:
+            yield build
+            ok = True
+        finally:
+            end = time.monotonic()
+            if traced:
+                conn.set_trace_callback(None)
+            imported = build.imported_at or end
+            self._add({
+                "kind": "module",
+                "name": title,
+                "start_ms": _ms(start),
+                "import_ms": round((imported - start) * 1000.0, 3),
+                "construct_ms": round((end - imported) * 1000.0, 3),
+                "first_query_ms": (
+                    round((build.first_query_at - imported) * 1000.0, 3)
+                    if build.first_query_at is not None and build.first_query_at >= imported
+                    else None
+                ),
+                "queries": build.queries,
+                "ok": ok,
+            })
+
+    # ---- output ----
+    def write(self, *, final: bool = False) -> Optional[Path]:
+        """Write the JSON timeline (and the cProfile dump, once). Never raises."""
+        if not self.enabled or self.path is None:
+            return None
+        try:
+            if self._cprofile is not None:
+                self._cprofile.disable()
+                self._cprofile.dump_stats(str(self.cprofile_path))
+                self._cprofile = None
+            payload = {
+                "written_at": datetime.now().isoformat(timespec="seconds"),
+                "final": final,
+                "elapsed_ms": _ms(time.monotonic()),
+                "pid": os.getpid(),
+                "python": sys.version.split()[0],
+                "argv": sys.argv,
+                "cprofile": str(self.cprofile_path) if self.cprofile_path else None,
+                "events": self.events,
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+            return self.path
+        except Exception as e:
+            print(f"[startup_profile] could not write {self.path}: {e}", file=sys.stderr)
+            return None
+
+
+PROFILER = StartupProfiler()
+
+# Module-level shortcuts used at the instrumentation points
+mark = PROFILER.mark
+phase = PROFILER.phase
+module_build = PROFILER.module_build
+
+
+def configure_from(argv: List[str], default_dir: Path) -> List[str]:
+    """
+    Enable the profiler from env / command-line flags. Returns `argv` without
+    the profiler flags (so they are not handed to QApplication).
+    """
+    env_value = os.getenv(ENV_PROFILE, "").strip()
+    target: Optional[str] = None
+    if env_value and env_value != "0":
+        target = "" if env_value.lower() in ("1", "true", "yes", "on") else env_value
+    cprofile = os.getenv(ENV_CPROFILE, "").strip() not in ("", "0")
+
+    rest: List[str] = []
+    for arg in argv:
+        if arg == FLAG_CPROFILE:
+            cprofile = True
+            target = target if target is not None else ""
+        elif arg == FLAG_PROFILE:
+            target = target if target is not None else ""
+        elif arg.startswith(FLAG_PROFILE + "="):
+            target = arg.split("=", 1)[1]
+        else:
+            rest.append(arg)
+
+    if target is not None:
+        PROFILER.enable(target or (default_dir / DEFAULT_FILE_NAME), cprofile=cprofile)
+    return rest
+
+
+__all__ = [
+    "StartupProfiler",
+    "PROFILER",
+    "mark",
+    "phase",
+    "module_build",
+    "configure_from",
+    "ENV_PROFILE",
+    "ENV_CPROFILE",
+]
@@ -0,0 +1,39 @@
+# inventory_management/widgets/change_listener.py
+"""
+Qt bridge for database.events: re-emits change events as a Qt signal.
+
+Repositories may publish from worker threads; the signal is delivered on the
+thread the listener lives in (the GUI thread), so slots can touch models and
+views directly. The bus subscription is weak and ends with the listener.
+
+    self._changes = ChangeListener(("products",), parent=self.view)
+    self._changes.changed.connect(self._on_product_changed)
+
+List models built on widgets.columnar_model apply such a change with
+patch_row(id, row).
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from ..database import events
+
+
+class ChangeListener(QObject):
+    changed = Signal(object)   # events.ChangeEvent
+
+    def __init__(self, entities: Optional[Iterable[str]] = None, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._unsubscribe = events.bus.subscribe(self._on_event, entities)
+
+    def _on_event(self, event: events.ChangeEvent) -> None:
+        self.changed.emit(event)
+
+    def close(self) -> None:
+        """Stop listening."""
+        self._unsubscribe()
+
+
+__all__ = ["ChangeListener"]
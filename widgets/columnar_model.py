@@ -0,0 +1,200 @@
+# inventory_management/widgets/columnar_model.py
+"""
+Table model base that formats each row once and serves cells from columns.
+
+QTableView calls data() for every visible cell on every repaint. Models that
+rebuild a row's whole value list there (fmt_money included) make scrolling
+and resizing spend their time in Python. ColumnarTableModel formats when rows
+are loaded instead, keeping one list of display values per column, and
+re-formats only the rows that change; data() is a list lookup.
+
+Subclasses set HEADERS (and ROW_ID, the row attribute/key used by row_of /
+patch_row) and implement:
+    display(row, column)      value shown in the cell
+    sort_value(row, column)   typed sort key (default: the display value)
+
+SORT_ROLE returns the sort key, so a QSortFilterProxyModel with
+setSortRole(SORT_ROLE) -- see sorting_proxy() -- orders amounts, quantities
+and ids as numbers rather than text. Sort keys are built per column on first use. Models used on a
+view without a proxy sort in memory by the same keys (sort()).
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable, List, Optional, Sequence
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, QSortFilterProxyModel, Qt
+
+SORT_ROLE = Qt.UserRole + 64
+
+
+def _none_first(key: Any) -> tuple:
+    return (key is not None, key)
+
+
+class ColumnarTableModel(QAbstractTableModel):
+    HEADERS: List[str] = []
+    ROW_ID: str = "id"
+
+    def __init__(self, rows: Optional[Iterable[Any]] = None, parent=None) -> None:
+        super().__init__(parent)
+        self._rows: List[Any] = list(rows or [])
+        self._text: List[List[Any]] = []
+        self._keys: List[Optional[List[Any]]] = []
+        self._format_all()
+
+    # ---- subclass hooks ----
+    def display(self, row: Any, column: int) -> Any:
+        raise NotImplementedError
+
+    def sort_value(self, row: Any, column: int) -> Any:
+        return self.display(row, column)
+
+    def row_id(self, row: Any) -> Any:
+        if isinstance(row, dict):
+            return row.get(self.ROW_ID)
+        return getattr(row, self.ROW_ID)
+
+    # ---- column buffers ----
+    def _format_all(self) -> None:
+        rows = self._rows
+        self._text = [[self.display(r, c) for r in rows] for c in range(len(self.HEADERS))]
+        self._keys = [None] * len(self.HEADERS)
+
+    def _format_row(self, row: Any) -> List[Any]:
+        return [self.display(row, c) for c in range(len(self.HEADERS))]
+
+    def _sort_keys(self, column: int) -> List[Any]:
+        keys = self._keys[column]
+        if keys is None:
+            keys = self._keys[column] = [self.sort_value(r, column) for r in self._rows]
+        return keys
+
+    # ---- row updates ----
+    def set_rows(self, rows: Iterable[Any]) -> None:
+        """Replace all rows (model reset)."""
+        self.beginResetModel()
+        self._rows = list(rows or [])
+        self._format_all()
+        self.endResetModel()
+
+    def append_rows(self, rows: Sequence[Any]) -> None:
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        for c, col in enumerate(self._text):
+            col.extend(self.display(r, c) for r in rows)
+        for c, keys in enumerate(self._keys):
+            if keys is not None:
+                keys.extend(self.sort_value(r, c) for r in rows)
+        self.endInsertRows()
+
+    def insert_row(self, pos: int, row: Any) -> None:
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._rows.insert(pos, row)
+        for col, text in zip(self._text, self._format_row(row)):
+            col.insert(pos, text)
+        for c, keys in enumerate(self._keys):
+            if keys is not None:
+                keys.insert(pos, self.sort_value(row, c))
+        self.endInsertRows()
+
+    def remove_row(self, pos: int) -> None:
+        self.beginRemoveRows(QModelIndex(), pos, pos)
+        del self._rows[pos]
+        for col in self._text:
+            del col[pos]
+        for keys in self._keys:
+            if keys is not None:
+                del keys[pos]
+        self.endRemoveRows()
+
+    def replace_row(self, pos: int, row: Any) -> None:
+        """Swap in a new version of one row and re-format just that row."""
+        self._rows[pos] = row
+        for col, text in zip(self._text, self._format_row(row)):
+            col[pos] = text
+        for c, keys in enumerate(self._keys):
+            if keys is not None:
+                keys[pos] = self.sort_value(row, c)
+        self.dataChanged.emit(self.index(pos, 0), self.index(pos, self.columnCount() - 1))
+
+    def row_of(self, row_id: Any) -> Optional[int]:
+        """Position of the row with ROW_ID == row_id, or None."""
+        for i, r in enumerate(self._rows):
+            if self.row_id(r) == row_id:
+                return i
+        return None
+
+    def patch_row(self, row_id: Any, row: Any = None) -> None:
+        """Replace the row with `row_id`, insert it at the top (new), or remove it (row=None)."""
+        pos = self.row_of(row_id)
+        if row is None:
+            if pos is not None:
+                self.remove_row(pos)
+        elif pos is None:
+            self.insert_row(0, row)
+        else:
+            self.replace_row(pos, row)
+
+    # ---- in-memory sort (views without a proxy) ----
+    def sort(self, column: int, order=Qt.AscendingOrder) -> None:  # type: ignore[override]
+        if not 0 <= column < len(self.HEADERS) or not self._rows:
+            return
+        keys = self._sort_keys(column)
+        perm = sorted(
+            range(len(self._rows)),
+            key=lambda i: _none_first(keys[i]),
+            reverse=order == Qt.DescendingOrder,
+        )
+        self.layoutAboutToBeChanged.emit()
+        old = self.persistentIndexList()
+        self._rows = [self._rows[i] for i in perm]
+        self._text = [[col[i] for i in perm] for col in self._text]
+        self._keys = [None if k is None else [k[i] for i in perm] for k in self._keys]
+        new_pos = {old_i: new_i for new_i, old_i in enumerate(perm)}
+        self.changePersistentIndexList(old, [self.index(new_pos[i.row()], i.column()) for i in old])
+        self.layoutChanged.emit()
+
+    # ---- Qt model API ----
+    def rowCount(self, parent=QModelIndex()) -> int:  # type: ignore[override]
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:  # type: ignore[override]
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):  # type: ignore[override]
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section] if 0 <= section < len(self.HEADERS) else None
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):  # type: ignore[override]
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self._text[index.column()][index.row()]
+        if role == SORT_ROLE:
+            return self._sort_keys(index.column())[index.row()]
+        return None
+
+    # ---- row access ----
+    def at(self, row: int) -> Any:
+        return self._rows[row]
+
+
+def sorting_proxy(model: ColumnarTableModel, parent: Optional[QObject] = None) -> QSortFilterProxyModel:
+    """
+    Proxy for a list view over `model`: case-insensitive filtering on every
+    column, and header sorts on SORT_ROLE, i.e. on the typed sort keys, so
+    ids and amounts sort as numbers instead of as display text.
+    """
+    proxy = QSortFilterProxyModel(parent)
+    proxy.setSourceModel(model)
+    proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+    proxy.setFilterKeyColumn(-1)
+    proxy.setSortRole(SORT_ROLE)
+    return proxy
+
+
+__all__ = ["ColumnarTableModel", "SORT_ROLE", "sorting_proxy"]
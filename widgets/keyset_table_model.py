@@ -0,0 +1,183 @@
+# inventory_management/widgets/keyset_table_model.py
+"""
+Read-only table model backed by a keyset-paginated repository query.
+
+Only the first page is loaded up front; the view pulls further pages through
+canFetchMore()/fetchMore() as the user scrolls. Sorting is done server side:
+clicking a header re-queries with that column's repo sort key instead of
+sorting rows in memory, so it works the same for 100 or 100k rows.
+
+Subclasses set:
+    HEADERS    column titles
+    SORT_KEYS  repo sort key per column (None = column not sortable)
+    ID_KEY     row key of the unique tiebreaker (e.g. "sale_id")
+and implement display(row, column). Cells are formatted once per loaded row
+(widgets.columnar_model); SORT_ROLE gives the raw SORT_KEYS value.
+
+`fetch_page(sort, descending, after, limit)` returns a list of rows (mapping
+access by column name); `after` is (row[sort], row[ID_KEY]) of the last row
+loaded, or None for the first page (see database.keyset).
+
+Use the model directly on the view (no QSortFilterProxyModel in between, or
+header clicks sort only the loaded rows).
+
+Live updates: `watch(entity, fetch_rows)` subscribes to database.events.
+For each change the model re-reads that one row through
+`fetch_rows(ids)` (same columns and filter as the pages; missing = no longer
+listed) and updates, moves, inserts or removes it in place, so a save does
+not reset the model, the selection or the scroll position. A row that sorts
+after the loaded window is left for fetchMore().
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, List, Optional, Sequence
+
+from PySide6.QtCore import QModelIndex, Qt
+
+from ..database import events
+from .change_listener import ChangeListener
+from .columnar_model import ColumnarTableModel
+
+PageFetcher = Callable[[str, bool, Optional[tuple], int], Sequence[Any]]
+RowFetcher = Callable[[Sequence[Any]], Sequence[Any]]
+
+
+class KeysetTableModel(ColumnarTableModel):
+    HEADERS: List[str] = []
+    SORT_KEYS: List[Optional[str]] = []
+    ID_KEY: str = "id"
+    PAGE_SIZE = 200
+
+    def __init__(
+        self,
+        fetch_page: PageFetcher,
+        *,
+        sort_key: str = "date",
+        descending: bool = True,
+        page_size: int | None = None,
+        parent=None,
+    ) -> None:
+        super().__init__(parent=parent)
+        self._fetch_page = fetch_page
+        self._sort_key = sort_key
+        self._descending = descending
+        self._page_size = int(page_size or self.PAGE_SIZE)
+        self._exhausted = False
+        self._fetch_rows: Optional[RowFetcher] = None
+        self._listener: Optional[ChangeListener] = None
+        self.reload()
+
+    # ---- loading ----
+    def _fetch(self, after: Optional[tuple]) -> List[Any]:
+        return list(self._fetch_page(self._sort_key, self._descending, after, self._page_size))
+
+    def reload(self) -> None:
+        """Drop loaded rows and fetch the first page again."""
+        rows = self._fetch(None)
+        self._exhausted = len(rows) < self._page_size
+        self.set_rows(rows)
+
+    def set_fetcher(self, fetch_page: PageFetcher) -> None:
+        """Swap the query (e.g. new search text) and reload from the first page."""
+        self._fetch_page = fetch_page
+        self.reload()
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:  # type: ignore[override]
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()) -> None:  # type: ignore[override]
+        if parent.isValid() or self._exhausted:
+            return
+        after = self.cursor_of(self._rows[-1]) if self._rows else None
+        rows = self._fetch(after)
+        if len(rows) < self._page_size:
+            self._exhausted = True
+        self.append_rows(rows)
+
+    def cursor_of(self, row: Any) -> tuple:
+        return (row[self._sort_key], row[self.ID_KEY])
+
+    # ---- live updates ----
+    def watch(self, entity: str, fetch_rows: RowFetcher) -> None:
+        """Apply database.events changes of `entity` row by row (see module doc)."""
+        self._fetch_rows = fetch_rows
+        if self._listener is None:
+            self._listener = ChangeListener((entity,), parent=self)
+            self._listener.changed.connect(self.apply_change)
+
+    def apply_change(self, event: events.ChangeEvent) -> None:
+        row = None
+        if event.kind != events.DELETE and self._fetch_rows is not None:
+            found = list(self._fetch_rows([event.id]))
+            row = found[0] if found else None
+
+        pos = self.row_of(event.id)
+        if pos is not None:
+            if row is not None and self.cursor_of(row) == self.cursor_of(self._rows[pos]):
+                self.replace_row(pos, row)
+                return
+            self.remove_row(pos)
+        if row is None:
+            return
+
+        at = self._insert_position(row)
+        if at is not None:
+            self.insert_row(at, row)
+
+    def _insert_position(self, row: Any) -> Optional[int]:
+        """Index keeping (sort, id) order; None if it sorts past the loaded window."""
+        key = self.cursor_of(row)
+        lo, hi = 0, len(self._rows)
+        try:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                k = self.cursor_of(self._rows[mid])
+                if (k > key) if self._descending else (k < key):
+                    lo = mid + 1
+                else:
+                    hi = mid
+        except TypeError:       # mixed types in the sort column; show it first
+            return 0
+        if lo == len(self._rows) and not self._exhausted:
+            return None
+        return lo
+
+    # ---- server-side sort ----
+    def sort(self, column: int, order=Qt.AscendingOrder) -> None:  # type: ignore[override]
+        key = self.SORT_KEYS[column] if 0 <= column < len(self.SORT_KEYS) else None
+        if not key:
+            return
+        descending = order == Qt.DescendingOrder
+        if key == self._sort_key and descending == self._descending:
+            return
+        self._sort_key = key
+        self._descending = descending
+        self.reload()
+
+    def sort_column(self) -> int:
+        """Column currently sorted on (-1 if the sort key has no column)."""
+        try:
+            return self.SORT_KEYS.index(self._sort_key)
+        except ValueError:
+            return -1
+
+    def sort_order(self) -> Qt.SortOrder:
+        return Qt.DescendingOrder if self._descending else Qt.AscendingOrder
+
+    def sort_value(self, row: Any, column: int) -> Any:
+        key = self.SORT_KEYS[column] if 0 <= column < len(self.SORT_KEYS) else None
+        return row[key] if key else self.display(row, column)
+
+    # ---- row access ----
+    def row_id(self, row: Any) -> Any:
+        return row[self.ID_KEY]
+
+    def get_rows(self) -> list:
+        """Rows loaded so far."""
+        return list(self._rows)
+
+    def is_exhausted(self) -> bool:
+        return self._exhausted
+
+
+__all__ = ["KeysetTableModel", "PageFetcher", "RowFetcher"]
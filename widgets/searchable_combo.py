@@ -0,0 +1,115 @@
+# inventory_management/widgets/searchable_combo.py
+"""
+Editable combo box that looks up customers, vendors or products as you type.
+
+The popup is filled from database.search.EntitySearch (the *_fts indexes)
+after a short debounce, so it stays fast with tens of thousands of rows and
+never loads the whole table. Each item's userData is the entity id:
+
+    combo = SearchableComboBox(conn, "customers")
+    combo.entitySelected.connect(lambda cid: ...)
+    combo.set_current_id(42)
+    combo.current_id()   # -> 42 or None
+"""
+from __future__ import annotations
+
+import sqlite3
+from typing import Optional
+
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtWidgets import QComboBox
+
+from ..database.search import EntitySearch
+
+
+class SearchableComboBox(QComboBox):
+    entitySelected = Signal(int)
+
+    DEBOUNCE_MS = 150
+    LIMIT = 30
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        entity: str,
+        *,
+        active_only: bool = True,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self._search = EntitySearch(conn)
+        self._entity = EntitySearch.entity(entity).table
+        self._active_only = active_only
+        self._updating = False
+
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.NoInsert)
+        self.setMaxVisibleItems(15)
+        self.lineEdit().setPlaceholderText("Type to search…")
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._refresh)
+        self.lineEdit().textEdited.connect(lambda _t: self._timer.start(self.DEBOUNCE_MS))
+        self.activated.connect(self._on_activated)
+
+    # ---- public API ----
+    def current_id(self) -> Optional[int]:
+        data = self.currentData(Qt.UserRole)
+        return int(data) if data is not None else None
+
+    def set_current_id(self, entity_id: Optional[int]) -> None:
+        """Select `entity_id`, loading it into the list if it is not there."""
+        if entity_id is None:
+            self.setCurrentIndex(-1)
+            self.setEditText("")
+            return
+        idx = self.findData(int(entity_id), Qt.UserRole)
+        if idx < 0:
+            hits = self._search.search(
+                self._entity, str(int(entity_id)), limit=1, active_only=False
+            )
+            hit = next((h for h in hits if h.id == int(entity_id)), None)
+            if hit is None:
+                return
+            self._fill([hit])
+            idx = 0
+        self.setCurrentIndex(idx)
+
+    def refresh(self) -> None:
+        """Re-run the search for the current text immediately."""
+        self._timer.stop()
+        self._refresh()
+
+    # ---- internals ----
+    def _fill(self, hits) -> None:
+        self._updating = True
+        try:
+            self.clear()
+            for h in hits:
+                text = f"{h.label} — {h.detail}" if h.detail else h.label
+                self.addItem(text, h.id)
+        finally:
+            self._updating = False
+
+    def _refresh(self) -> None:
+        text = self.lineEdit().text()
+        hits = self._search.search(
+            self._entity, text, limit=self.LIMIT, active_only=self._active_only
+        )
+        self._fill(hits)
+        # clear() resets the edit text; keep what the user typed
+        self.setCurrentIndex(-1)
+        self.setEditText(text)
+        if hits and self.hasFocus():
+            self.showPopup()
+
+    def _on_activated(self, index: int) -> None:
+        if self._updating:
+            return
+        data = self.itemData(index, Qt.UserRole)
+        if data is not None:
+            self.entitySelected.emit(int(data))
+
+
+__all__ = ["SearchableComboBox"]